@@ -1,36 +1,55 @@
 import os
-os.environ['MPLBACKEND'] = 'Agg'  # Forzar backend Agg antes de importar matplotlib
-import matplotlib.pyplot as plt
+import functools
 import pandas as pd
-import seaborn as sns
-from datetime import datetime
-import locale
-import numpy as np
-import matplotlib.dates as mdates
-import traceback
-import plotly.graph_objects as go
-import plotly.express as px
 
-# Crear directorio para gráficos si no existe
-GRAFICOS_DIR = 'graficos'
-if not os.path.exists(GRAFICOS_DIR):
-    os.makedirs(GRAFICOS_DIR)
+# matplotlib, seaborn y plotly se importan al generar el primer gráfico, no al importar el módulo
+plt = None
+sns = None
+go = None
 
-# Configurar el estilo de los gráficos
-plt.style.use('seaborn')
-sns.set_palette("husl")
+GRAFICOS_DIR = 'graficos'
 
-# Configurar locale para formato de moneda
-try:
-    locale.setlocale(locale.LC_ALL, 'es_CL.UTF-8')
-except:
+def inicializar_graficos():
+    """Importa las librerías de gráficos y aplica estilo, directorio y locale (solo la primera vez)."""
+    global plt, sns, go
+    if plt is not None:
+        return
+    
+    os.environ.setdefault('MPLBACKEND', 'Agg')  # Forzar backend Agg antes de importar matplotlib
+    import locale
+    import matplotlib.pyplot as _plt
+    import seaborn as _sns
+    import plotly.graph_objects as _go
+    
+    # Crear directorio para gráficos si no existe
+    os.makedirs(GRAFICOS_DIR, exist_ok=True)
+    
+    # Configurar el estilo de los gráficos
+    _plt.style.use('seaborn')
+    _sns.set_palette("husl")
+    
+    # Configurar locale para formato de moneda
     try:
-        locale.setlocale(locale.LC_ALL, 'es-CL')
+        locale.setlocale(locale.LC_ALL, 'es_CL.UTF-8')
     except:
-        print("No se pudo configurar el locale para Chile, usando configuración por defecto")
+        try:
+            locale.setlocale(locale.LC_ALL, 'es-CL')
+        except:
+            print("No se pudo configurar el locale para Chile, usando configuración por defecto")
+    
+    plt, sns, go = _plt, _sns, _go
+
+def requiere_graficos(funcion):
+    """Decorador: asegura que las librerías de gráficos estén cargadas antes de ejecutar la función."""
+    @functools.wraps(funcion)
+    def envoltura(*args, **kwargs):
+        inicializar_graficos()
+        return funcion(*args, **kwargs)
+    return envoltura
 
 def formato_moneda(valor):
     """Formatea un número como moneda chilena"""
+    import locale
     return locale.currency(valor, grouping=True)
 
 def cargar_datos():
@@ -65,6 +84,7 @@ def procesar_fechas_reservas(df):
         print(f"Error procesando fechas: {e}")
         return None
 
+@requiere_graficos
 def grafico_gastos_por_categoria(df_gastos):
     """Genera un gráfico de torta de gastos por categoría"""
     plt.figure(figsize=(12, 8))
@@ -86,6 +106,7 @@ def grafico_gastos_por_categoria(df_gastos):
     plt.savefig(os.path.join(GRAFICOS_DIR, 'gastos_por_categoria.png'), bbox_inches='tight')
     plt.close()
 
+@requiere_graficos
 def grafico_tendencia_temporal(df_gastos, df_abonos):
     """Genera un gráfico de línea mostrando la tendencia de gastos y abonos en el tiempo"""
     plt.figure(figsize=(15, 8))
@@ -112,6 +133,7 @@ def grafico_tendencia_temporal(df_gastos, df_abonos):
     plt.savefig(os.path.join(GRAFICOS_DIR, 'tendencia_temporal.png'))
     plt.close()
 
+@requiere_graficos
 def grafico_barras_categorias_mensual(df_gastos):
     """Genera un gráfico de barras apiladas mostrando gastos por categoría por mes"""
     plt.figure(figsize=(15, 8))
@@ -163,6 +185,7 @@ def generar_resumen_estadistico(df_gastos, df_abonos):
     
     return resumen
 
+@requiere_graficos
 def grafico_balance_acumulado(df_gastos, df_abonos):
     """Genera un gráfico de balance acumulado en el tiempo"""
     plt.figure(figsize=(15, 8))
@@ -202,6 +225,7 @@ def grafico_balance_acumulado(df_gastos, df_abonos):
     plt.savefig(os.path.join(GRAFICOS_DIR, 'balance_acumulado.png'))
     plt.close()
 
+@requiere_graficos
 def grafico_ingresos_vs_gastos_mensual(df_gastos, df_abonos):
     """Genera un gráfico de barras comparando ingresos vs gastos por mes"""
     plt.figure(figsize=(15, 8))
@@ -243,6 +267,7 @@ def grafico_ingresos_vs_gastos_mensual(df_gastos, df_abonos):
     plt.savefig(os.path.join(GRAFICOS_DIR, 'ingresos_vs_gastos_mensual.png'))
     plt.close()
 
+@requiere_graficos
 def grafico_flujo_caja_neto(df_gastos, df_abonos):
     """Genera un gráfico de líneas mostrando el flujo de caja neto mensual"""
     plt.figure(figsize=(15, 8))
@@ -286,6 +311,7 @@ def grafico_flujo_caja_neto(df_gastos, df_abonos):
     plt.savefig(os.path.join(GRAFICOS_DIR, 'flujo_caja_neto.png'))
     plt.close()
 
+@requiere_graficos
 def grafico_heatmap_movimientos(df_gastos, df_abonos):
     """Genera un heatmap que muestra los días con mayor movimiento"""
     plt.figure(figsize=(15, 8))
@@ -313,6 +339,7 @@ def grafico_heatmap_movimientos(df_gastos, df_abonos):
     plt.savefig(os.path.join(GRAFICOS_DIR, 'heatmap_movimientos.png'))
     plt.close()
 
+@requiere_graficos
 def grafico_reservas_por_dia(df):
     """Genera gráfico de reservas por día"""
     try:
@@ -352,6 +379,7 @@ def grafico_reservas_por_dia(df):
         import traceback
         print(traceback.format_exc())
 
+@requiere_graficos
 def grafico_reservas_por_mes(df):
     """Genera gráfico de reservas por mes"""
     try:
@@ -387,6 +415,7 @@ def grafico_reservas_por_mes(df):
         import traceback
         print(traceback.format_exc())
 
+@requiere_graficos
 def grafico_horas_populares(df_reservas):
     """Genera un gráfico de barras mostrando las horas más populares para los trips"""
     plt.figure(figsize=(15, 8))
@@ -414,6 +443,7 @@ def grafico_horas_populares(df_reservas):
     plt.savefig(os.path.join(GRAFICOS_DIR, 'horas_populares.png'))
     plt.close()
 
+@requiere_graficos
 def grafico_tiempo_anticipacion(df_reservas):
     """Genera un histograma mostrando con cuánta anticipación se hacen las reservas"""
     plt.figure(figsize=(15, 8))
@@ -433,6 +463,7 @@ def grafico_tiempo_anticipacion(df_reservas):
     plt.savefig(os.path.join(GRAFICOS_DIR, 'anticipacion_reservas.png'))
     plt.close()
 
+@requiere_graficos
 def graficar_reservas_por_dia_mes(df_reservas):
     """
     Genera un gráfico de líneas mostrando las reservas por día, separadas por mes.
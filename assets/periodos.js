@@ -0,0 +1,289 @@
+// Reagrupación por periodo en el navegador.
+// El servidor envía en un dcc.Store las series diarias de cada gráfico temporal
+// (ver funciones/serie_diaria.py); aquí se agrupan por día, semana (lunes) o mes
+// y se actualizan las figuras existentes sin pasar por el servidor.
+// Por día, las trazas con más de UMBRAL_PUNTOS puntos se reducen con LTTB y se
+// dibujan con WebGL; un zoom vuelve a muestrear solo el rango visible
+// (misma regla que funciones/muestreo.py).
+
+(function () {
+    const MESES_ES = ['Enero', 'Febrero', 'Marzo', 'Abril', 'Mayo', 'Junio', 'Julio',
+        'Agosto', 'Septiembre', 'Octubre', 'Noviembre', 'Diciembre'];
+
+    // Mismo valor por defecto que funciones/muestreo.UMBRAL_PUNTOS
+    const UMBRAL_PUNTOS = 1000;
+
+    function dosDigitos(numero) {
+        return String(numero).padStart(2, '0');
+    }
+
+    // Inicio del periodo que contiene la fecha ISO 'YYYY-MM-DD'
+    function inicioPeriodo(fecha, periodo) {
+        if (periodo === 'D') {
+            return fecha;
+        }
+        const [anio, mes, dia] = fecha.split('-').map(Number);
+        if (periodo === 'M') {
+            return `${anio}-${dosDigitos(mes)}-01`;
+        }
+        const instante = new Date(Date.UTC(anio, mes - 1, dia));
+        const diaSemana = (instante.getUTCDay() + 6) % 7;  // lunes = 0
+        instante.setUTCDate(instante.getUTCDate() - diaSemana);
+        return instante.toISOString().slice(0, 10);
+    }
+
+    // Mismas etiquetas que funciones/calendario.py
+    function etiquetaPeriodo(inicio, periodo) {
+        const [anio, mes, dia] = inicio.split('-');
+        if (periodo === 'W') {
+            return `Semana del ${dia}/${mes}/${anio}`;
+        }
+        return `${MESES_ES[Number(mes) - 1]} ${anio}`;
+    }
+
+    function reagrupar(serie, periodo) {
+        const grupos = new Map();
+        serie.fechas.forEach(function (fecha, i) {
+            const clave = inicioPeriodo(fecha, periodo);
+            const grupo = grupos.get(clave) || {suma: 0, conteo: 0};
+            grupo.suma += serie.sumas[i];
+            grupo.conteo += serie.conteos[i];
+            grupos.set(clave, grupo);
+        });
+        // Las fechas ISO se ordenan correctamente como texto
+        const x = Array.from(grupos.keys()).sort();
+        const y = x.map(function (clave) {
+            const grupo = grupos.get(clave);
+            if (serie.agregacion === 'mean') {
+                return grupo.conteo > 0 ? grupo.suma / grupo.conteo : null;
+            }
+            return grupo.suma;
+        });
+        return {x: x, y: y};
+    }
+
+    // 'YYYY-MM-DD' o 'YYYY-MM-DD HH:MM:SS.fff' (rango de un eje de fechas) a ms UTC
+    function fechaMs(texto) {
+        if (typeof texto === 'number') {
+            return texto;
+        }
+        const iso = String(texto).replace(' ', 'T');
+        return Date.parse(iso.length > 10 ? iso.replace(/(\.\d{3})\d*$/, '$1') + 'Z' : iso);
+    }
+
+    // Índices de los n puntos elegidos por largest-triangle-three-buckets
+    function lttb(xs, ys, n) {
+        const total = xs.length;
+        if (n >= total || n < 3) {
+            return xs.map(function (_, i) { return i; });
+        }
+        const bordes = [];
+        for (let i = 0; i < n - 1; i++) {
+            bordes.push(Math.floor(1 + i * (total - 2) / (n - 2)));
+        }
+        const indices = [0];
+        let anterior = 0;
+        for (let i = 0; i < n - 2; i++) {
+            const inicio = bordes[i];
+            const fin = bordes[i + 1];
+            const siguienteFin = i + 2 < bordes.length ? bordes[i + 2] : total;
+            let cx = 0;
+            let cy = 0;
+            for (let j = fin; j < siguienteFin; j++) {
+                cx += xs[j];
+                cy += ys[j] || 0;
+            }
+            cx /= (siguienteFin - fin);
+            cy /= (siguienteFin - fin);
+            const ax = xs[anterior];
+            const ay = ys[anterior] || 0;
+            let mejor = inicio;
+            let mayorArea = -1;
+            for (let j = inicio; j < fin; j++) {
+                const area = Math.abs((ax - cx) * ((ys[j] || 0) - ay) - (ax - xs[j]) * (cy - ay));
+                if (area > mayorArea) {
+                    mayorArea = area;
+                    mejor = j;
+                }
+            }
+            indices.push(mejor);
+            anterior = mejor;
+        }
+        indices.push(total - 1);
+        return indices;
+    }
+
+    // Recorta al rango visible y reduce con LTTB si quedan más de UMBRAL_PUNTOS
+    function muestrear(agrupado, rango) {
+        const xs = agrupado.x.map(fechaMs);
+        let posiciones = xs.map(function (_, i) { return i; });
+        if (rango) {
+            const inicio = fechaMs(rango[0]);
+            const fin = fechaMs(rango[1]);
+            posiciones = posiciones.filter(function (i) { return xs[i] >= inicio && xs[i] <= fin; });
+        }
+        if (posiciones.length > UMBRAL_PUNTOS) {
+            const elegidos = lttb(posiciones.map(function (i) { return xs[i]; }),
+                                  posiciones.map(function (i) { return agrupado.y[i]; }), UMBRAL_PUNTOS);
+            posiciones = elegidos.map(function (j) { return posiciones[j]; });
+        }
+        return {
+            x: posiciones.map(function (i) { return agrupado.x[i]; }),
+            y: posiciones.map(function (i) { return agrupado.y[i]; })
+        };
+    }
+
+    // Cambia la traza a WebGL (las barras como área) o la devuelve a su tipo original
+    function tipoTraza(traza, grande) {
+        const tipoBase = (traza.meta && traza.meta.tipo_base) || traza.type || 'scatter';
+        const nueva = Object.assign({}, traza, {meta: Object.assign({}, traza.meta, {tipo_base: tipoBase})});
+        if (tipoBase === 'bar') {
+            if (grande) {
+                const color = traza.marker && traza.marker.color;
+                return Object.assign(nueva, {type: 'scattergl', mode: 'lines', fill: 'tozeroy',
+                                             line: Object.assign({}, traza.line, {color: color})});
+            }
+            delete nueva.mode;
+            delete nueva.fill;
+            return Object.assign(nueva, {type: 'bar'});
+        }
+        if (tipoBase === 'scatter' || tipoBase === 'scattergl') {
+            nueva.type = grande ? 'scattergl' : 'scatter';
+        }
+        return nueva;
+    }
+
+    function superaUmbral(especificacion) {
+        return Boolean(especificacion) && especificacion.trazas.some(function (serie) {
+            return serie.fechas.length > UMBRAL_PUNTOS;
+        });
+    }
+
+    // Rango pedido por un zoom; null al volver al rango completo, false si el evento no cambia el eje x
+    function rangoRelayout(relayout) {
+        if (!relayout) {
+            return false;
+        }
+        if (relayout['xaxis.autorange']) {
+            return null;
+        }
+        if ('xaxis.range[0]' in relayout && 'xaxis.range[1]' in relayout) {
+            return [relayout['xaxis.range[0]'], relayout['xaxis.range[1]']];
+        }
+        if (relayout['xaxis.range']) {
+            return relayout['xaxis.range'];
+        }
+        return false;
+    }
+
+    function actualizarFigura(figura, especificacion, periodo, seleccion, rango) {
+        if (!figura || !especificacion) {
+            return window.dash_clientside.no_update;
+        }
+        const visibles = new Set();
+        const data = figura.data.map(function (traza, i) {
+            const serie = especificacion.trazas[i];
+            if (!serie) {
+                return traza;
+            }
+            let agrupado = reagrupar(serie, periodo);
+            const grande = periodo === 'D' && agrupado.x.length > UMBRAL_PUNTOS;
+            if (grande) {
+                agrupado = muestrear(agrupado, rango);
+            }
+            const nueva = Object.assign(tipoTraza(traza, grande), agrupado);
+            if (serie.categoria !== undefined && seleccion) {
+                nueva.visible = seleccion.includes(serie.categoria);
+            }
+            if (nueva.visible !== false) {
+                agrupado.x.forEach(function (clave) { visibles.add(clave); });
+            }
+            return nueva;
+        });
+
+        const layout = Object.assign({}, figura.layout);
+        layout.title = Object.assign({}, layout.title, {text: especificacion.titulos[periodo]});
+        layout.xaxis = Object.assign({}, layout.xaxis);
+        if (periodo === 'W' || periodo === 'M') {
+            const tickvals = Array.from(visibles).sort();
+            layout.xaxis.tickvals = tickvals;
+            layout.xaxis.ticktext = tickvals.map(function (clave) { return etiquetaPeriodo(clave, periodo); });
+        } else {
+            delete layout.xaxis.tickvals;
+            delete layout.xaxis.ticktext;
+        }
+        if (rango) {
+            layout.xaxis.range = rango;
+            layout.xaxis.autorange = false;
+        } else {
+            delete layout.xaxis.range;
+            layout.xaxis.autorange = true;
+        }
+        return Object.assign({}, figura, {data: data, layout: layout});
+    }
+
+    // Posición del gráfico cuyo relayoutData disparó el callback, o -1.
+    // Los relayoutData son los Inputs que siguen a los `desplazamiento` primeros.
+    function graficoConZoom(desplazamiento, cantidad) {
+        const contexto = window.dash_clientside.callback_context;
+        if (!contexto || !contexto.triggered || !contexto.inputs_list) {
+            return -1;
+        }
+        const disparos = contexto.triggered.map(function (t) { return t.prop_id; });
+        for (let i = 0; i < cantidad; i++) {
+            const entrada = contexto.inputs_list[desplazamiento + i];
+            if (entrada && disparos.includes(`${entrada.id}.${entrada.property}`)) {
+                return i;
+            }
+        }
+        return -1;
+    }
+
+    function figurasPorPeriodo(periodo, datos, seleccion, relayouts, figuras, desplazamiento) {
+        if (!datos) {
+            throw window.dash_clientside.PreventUpdate;
+        }
+        const zoom = graficoConZoom(desplazamiento, figuras.length);
+        if (zoom >= 0) {
+            // Solo se vuelve a muestrear el gráfico del zoom, y solo si su serie fue reducida
+            const rango = rangoRelayout(relayouts[zoom]);
+            return figuras.map(function (figura, i) {
+                if (i !== zoom || rango === false || periodo !== 'D' || !superaUmbral(datos.figuras[i])) {
+                    return window.dash_clientside.no_update;
+                }
+                return actualizarFigura(figura, datos.figuras[i], periodo, seleccion, rango);
+            });
+        }
+        return figuras.map(function (figura, i) {
+            return actualizarFigura(figura, datos.figuras[i], periodo, seleccion, null);
+        });
+    }
+
+    // Los argumentos variables son n relayoutData seguidos de n figuras
+    function partir(resto) {
+        const n = resto.length / 2;
+        return [resto.slice(0, n), resto.slice(n)];
+    }
+
+    window.dash_clientside = Object.assign({}, window.dash_clientside, {
+        periodos: {
+            // (periodo, datos, ...relayouts, ...figuras) -> figuras
+            reagrupar_figuras: function (periodo, datos, ...resto) {
+                const [relayouts, figuras] = partir(resto);
+                return figurasPorPeriodo(periodo, datos, null, relayouts, figuras, 2);
+            },
+            // (periodo, seleccion, datos, ...relayouts, ...figuras) -> figuras, con visibilidad por categoría
+            reagrupar_figuras_seleccion: function (periodo, seleccion, datos, ...resto) {
+                const [relayouts, figuras] = partir(resto);
+                return figurasPorPeriodo(periodo, datos, seleccion || [], relayouts, figuras, 3);
+            },
+            // (periodo, datos) -> insights precalculados para el periodo
+            insights_periodo: function (periodo, datos) {
+                if (!datos) {
+                    throw window.dash_clientside.PreventUpdate;
+                }
+                return datos.insights.map(function (porPeriodo) { return porPeriodo[periodo]; });
+            }
+        }
+    });
+})();
@@ -1,7 +1,8 @@
-import pandas as pd
+from funciones.consolidado_meta import consolidar_meta
+from funciones.cubo_meta import CuboMeta
 
-# Cargar datos
-df = pd.read_csv('archivos_input/archivos input marketing/Comp-1-Conjunto-Anuncios-2Campañas-3-anuncios-por-dia (2).csv')
+# Cargar datos (consolidado de los exports de Meta con región: numéricos ya convertidos)
+df = consolidar_meta()['regiones']
 
 print("=== VERIFICACIÓN DE DATOS ===")
 print(f"Total filas: {len(df)}")
@@ -19,12 +20,8 @@ if 'Reproducciones de video de 3 segundos' in df.columns:
     print(f"  - Tipo de datos: {df[col].dtype}")
     print(f"  - Valores únicos: {df[col].nunique()}")
     print(f"  - Suma total: {df[col].sum()}")
-    print(f"  - Valores no nulos: {df[col].notna().sum()}")
+    print(f"  - Valores distintos de cero: {(df[col] != 0).sum()}")
     print(f"  - Primeros 10 valores: {df[col].head(10).tolist()}")
-    
-    # Convertir a numérico
-    df[col] = pd.to_numeric(df[col], errors='coerce')
-    print(f"  - Después de conversión numérica - Suma: {df[col].sum()}")
 
 print("\n=== DATOS DE IMPRESIONES ===")
 if 'Impresiones' in df.columns:
@@ -35,28 +32,11 @@ if 'Impresiones' in df.columns:
     print(f"  - Primeros 10 valores: {df[col].head(10).tolist()}")
 
 print("\n=== CÁLCULO DE HOOK RATE ===")
-if 'Reproducciones de video de 3 segundos' in df.columns and 'Impresiones' in df.columns:
-    # Convertir ambas columnas
-    df['Reproducciones de video de 3 segundos'] = pd.to_numeric(df['Reproducciones de video de 3 segundos'], errors='coerce').fillna(0)
-    df['Impresiones'] = pd.to_numeric(df['Impresiones'], errors='coerce').fillna(0)
-    
-    # Calcular hook rate
-    hook_rate = (df['Reproducciones de video de 3 segundos'] / df['Impresiones'] * 100).fillna(0)
-    print(f"Hook rate promedio: {hook_rate.mean():.2f}%")
-    print(f"Hook rate por fila (primeras 10): {hook_rate.head(10).tolist()}")
-    
-    # Por tipo de anuncio
-    df['Tipo_Anuncio'] = df['Nombre del anuncio'].apply(
-        lambda x: 'Video explicativo' if 'explicando servicio' in str(x).lower() else
-                 'Video parejas amor' if 'parejas amor' in str(x).lower() else
-                 'Video parejas dcto' if 'parejas dcto' in str(x).lower() else
-                 'Otro'
-    )
-    
-    agrupado = df.groupby('Tipo_Anuncio').agg({
-        'Reproducciones de video de 3 segundos': 'sum',
-        'Impresiones': 'sum'
-    })
-    agrupado['Hook_Rate'] = (agrupado['Reproducciones de video de 3 segundos'] / agrupado['Impresiones'] * 100).fillna(0)
-    print("\nHook rates por tipo de anuncio:")
-    print(agrupado) 
\ No newline at end of file
+# Las razones se derivan del cubo como suma/suma (no promedio de las filas)
+cubo = CuboMeta.desde_hechos(df)
+print(f"Hook rate global: {cubo.total(['Hook Rate 3s (%)'])['Hook Rate 3s (%)']:.2f}%")
+
+# Por tipo de anuncio
+agrupado = cubo.resumen('Tipo de Anuncio', ['Hook Rate 3s (%)'])
+print("\nHook rates por tipo de anuncio:")
+print(agrupado[['Tipo de Anuncio', 'Reproducciones de video de 3 segundos', 'Impresiones', 'Hook Rate 3s (%)']])
@@ -0,0 +1 @@
+# Presente para que pytest agregue la raíz del repositorio a sys.path (import funciones.*)
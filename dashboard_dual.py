@@ -1,48 +1,17 @@
 import dash
 from dash import html, dcc, Input, Output, callback
-import pandas as pd
 import plotly.graph_objects as go
 from plotly.subplots import make_subplots
 import os
 
-# Configuración de archivos
-ARCHIVO_REGIONES = "archivos_input/archivos input marketing/Comp-1-Conjunto-Anuncios-2Campañas-3-anuncios-por-dia (2).csv"
-ARCHIVO_PRINCIPAL = "archivos_input/archivos input marketing/Comp-1-Conjunto-Anuncios-2Campañas-3-anuncios-por-dia.csv"
+from funciones.consolidado_meta import consolidar_meta
+from funciones.cubo_meta import CuboMeta, HOOK_RATES, RAZONES_EMBUDO
 
 def cargar_datos_regiones():
-    """Carga datos específicos para el gráfico de regiones."""
+    """Carga datos específicos para el gráfico de regiones (exports con Región consolidados)."""
     try:
-        print(f"Cargando archivo para regiones: {ARCHIVO_REGIONES}")
-        df = pd.read_csv(ARCHIVO_REGIONES)
-        print(f"Archivo de regiones cargado. Dimensiones: {df.shape}")
-        
-        # Convertir columnas numéricas
-        numeric_columns = [
-            "Importe gastado (CLP)", "Impresiones", "Clics en el enlace", 
-            "Artículos agregados al carrito", "CTR (todos)", "CPC (todos)",
-            "Reproducciones de video de 3 segundos", "Reproducciones de video hasta el 25%",
-            "Reproducciones de video hasta el 50%", "Reproducciones de video hasta el 75%",
-            "Reproducciones de video hasta el 100%"
-        ]
-        
-        for col in numeric_columns:
-            if col in df.columns:
-                if df[col].dtype == 'object':
-                    df[col] = df[col].astype(str).str.replace(',', '.').str.replace(' ', '').str.replace('-', '0')
-                    df[col] = pd.to_numeric(df[col], errors='coerce').fillna(0)
-                else:
-                    df[col] = pd.to_numeric(df[col], errors='coerce').fillna(0)
-        
-        # Convertir fechas
-        df['Día'] = pd.to_datetime(df['Día'])
-        
-        # Clasificar públicos también en datos de regiones
-        df['Público'] = df['Nombre del conjunto de anuncios'].apply(
-            lambda x: 'Advantage' if 'advantage' in str(x).lower() else 
-                     'Pucón' if 'pucon' in str(x).lower() else 'Otro'
-        )
-        
-        print("Datos de regiones procesados exitosamente")
+        df = consolidar_meta()['regiones']
+        print(f"Datos de regiones cargados. Dimensiones: {df.shape}")
         return df
     
     except Exception as e:
@@ -50,49 +19,10 @@ def cargar_datos_regiones():
         return None
 
 def cargar_datos_principal():
-    """Carga datos principales para todos los demás gráficos."""
+    """Carga datos principales para todos los demás gráficos (consolidado diario sin región)."""
     try:
-        print(f"Cargando archivo principal: {ARCHIVO_PRINCIPAL}")
-        df = pd.read_csv(ARCHIVO_PRINCIPAL)
-        print(f"Archivo principal cargado. Dimensiones: {df.shape}")
-        
-        # Convertir columnas numéricas
-        numeric_columns = [
-            "Importe gastado (CLP)", "Impresiones", "Clics en el enlace", 
-            "Artículos agregados al carrito", "CTR (todos)", "CPC (todos)",
-            "Reproducciones de video de 3 segundos", "Reproducciones de video hasta el 25%",
-            "Reproducciones de video hasta el 50%", "Reproducciones de video hasta el 75%",
-            "Reproducciones de video hasta el 100%"
-        ]
-        
-        for col in numeric_columns:
-            if col in df.columns:
-                if df[col].dtype == 'object':
-                    df[col] = df[col].astype(str).str.replace(',', '.').str.replace(' ', '').str.replace('-', '0')
-                    df[col] = pd.to_numeric(df[col], errors='coerce').fillna(0)
-                else:
-                    df[col] = pd.to_numeric(df[col], errors='coerce').fillna(0)
-                print(f"Columna {col} convertida - Suma: {df[col].sum()}")
-        
-        # Convertir fechas si existe
-        if 'Día' in df.columns:
-            df['Día'] = pd.to_datetime(df['Día'])
-        
-        # Clasificar públicos
-        df['Público'] = df['Nombre del conjunto de anuncios'].apply(
-            lambda x: 'Advantage' if 'advantage' in str(x).lower() else 
-                     'Pucón' if 'pucon' in str(x).lower() else 'Otro'
-        )
-        
-        # Clasificar tipos de anuncios
-        df['Tipo_Anuncio'] = df['Nombre del anuncio'].apply(
-            lambda x: 'Video explicativo' if 'explicando servicio' in str(x).lower() else
-                     'Video parejas amor' if 'parejas amor' in str(x).lower() else
-                     'Video parejas dcto' if 'parejas dcto' in str(x).lower() else
-                     'Otro'
-        )
-        
-        print("Datos principales procesados exitosamente")
+        df = consolidar_meta()['diario']
+        print(f"Datos principales cargados. Dimensiones: {df.shape}")
         return df
     
     except Exception as e:
@@ -107,6 +37,8 @@ df_regiones = cargar_datos_regiones()
 df_principal = cargar_datos_principal()
 
 if df_regiones is not None and df_principal is not None:
+    # Sumas aditivas del archivo principal: CTR, CPC, conversión y hook rates se derivan como suma/suma
+    cubo_principal = CuboMeta.desde_hechos(df_principal)
     # Usar fechas del archivo principal si existe, sino del de regiones
     if 'Día' in df_principal.columns:
         fecha_min = df_principal['Día'].min()
@@ -120,7 +52,7 @@ if df_regiones is not None and df_principal is not None:
             'textAlign': 'center', 'color': '#2c3e50', 'marginBottom': '30px'
         }),
         
-        html.P('📊 Regiones: archivo (2) | 📈 Resto: archivo sin (2)', style={
+        html.P('📊 Regiones: exports con región | 📈 Resto: consolidado diario sin región', style={
             'textAlign': 'center', 'color': '#7f8c8d', 'fontStyle': 'italic'
         }),
         
@@ -208,6 +140,7 @@ if df_regiones is not None and df_principal is not None:
             df_filtrado_principal = df_principal[mask_principal]
         else:
             df_filtrado_principal = df_principal.copy()
+        cubo_filtrado = cubo_principal.filtrar(start_date, end_date)
         
         # Filtrar datos de regiones por fecha
         mask_regiones = (df_regiones['Día'] >= start_date) & (df_regiones['Día'] <= end_date)
@@ -287,7 +220,7 @@ if df_regiones is not None and df_principal is not None:
             else:
                 df_regiones_filtrado_publico = df_filtrado_regiones
             
-            df_regiones_agg = df_regiones_filtrado_publico.groupby('Región')['Importe gastado (CLP)'].sum().reset_index()
+            df_regiones_agg = df_regiones_filtrado_publico.groupby('Región', observed=True)['Importe gastado (CLP)'].sum().reset_index()
             df_regiones_agg = df_regiones_agg.sort_values('Importe gastado (CLP)', ascending=True).tail(10)
             
             fig_regiones = go.Figure(go.Bar(
@@ -299,7 +232,7 @@ if df_regiones is not None and df_principal is not None:
                 textposition='outside'
             ))
             
-            titulo_regiones = f'Gasto por Región (Top 10) - archivo con (2)'
+            titulo_regiones = f'Gasto por Región (Top 10)'
             if publico_regiones_filter != 'Todos':
                 titulo_regiones += f' - Público: {publico_regiones_filter}'
             
@@ -313,22 +246,11 @@ if df_regiones is not None and df_principal is not None:
             fig_regiones.update_layout(title='Gasto por Región - Sin datos regionales', height=400)
         
         # 4. Gráfico por públicos (usando datos principales)
-        df_publicos = df_filtrado_principal.groupby('Público').agg({
-            'Importe gastado (CLP)': 'sum',
-            'CTR (todos)': 'mean',
-            'CPC (todos)': 'mean',
-            'Impresiones': 'sum',
-            'Clics en el enlace': 'sum',
-            'Artículos agregados al carrito': 'sum'
-        }).reset_index()
-        
-        # Calcular tasa de conversión y costo por conversión
-        df_publicos['Conversion_Rate'] = (df_publicos['Artículos agregados al carrito'] / df_publicos['Clics en el enlace'] * 100).fillna(0)
-        df_publicos['Cost_Per_Conversion'] = (df_publicos['Importe gastado (CLP)'] / df_publicos['Artículos agregados al carrito']).replace([float('inf')], 0).fillna(0)
+        df_publicos = cubo_filtrado.resumen('Público', RAZONES_EMBUDO)
         
         fig_publicos = make_subplots(
             rows=2, cols=3,
-            subplot_titles=('Gasto Total', 'CTR Promedio', 'CPC Promedio', 
+            subplot_titles=('Gasto Total', 'CTR (%)', 'CPC (CLP)', 
                           'Tasa de Conversión (%)', 'Costo por Conversión', 'Conversiones'),
             specs=[[{"secondary_y": False}, {"secondary_y": False}, {"secondary_y": False}],
                    [{"secondary_y": False}, {"secondary_y": False}, {"secondary_y": False}]]
@@ -341,25 +263,25 @@ if df_regiones is not None and df_principal is not None:
         )
         
         fig_publicos.add_trace(
-            go.Bar(x=df_publicos['Público'], y=df_publicos['CTR (todos)'], 
+            go.Bar(x=df_publicos['Público'], y=df_publicos['CTR (%)'], 
                   name='CTR', marker_color='#ff7f0e'),
             row=1, col=2
         )
         
         fig_publicos.add_trace(
-            go.Bar(x=df_publicos['Público'], y=df_publicos['CPC (todos)'], 
+            go.Bar(x=df_publicos['Público'], y=df_publicos['CPC (CLP)'], 
                   name='CPC', marker_color='#2ca02c'),
             row=1, col=3
         )
         
         fig_publicos.add_trace(
-            go.Bar(x=df_publicos['Público'], y=df_publicos['Conversion_Rate'], 
+            go.Bar(x=df_publicos['Público'], y=df_publicos['Conversión (%)'], 
                   name='Conv Rate', marker_color='#d62728'),
             row=2, col=1
         )
         
         fig_publicos.add_trace(
-            go.Bar(x=df_publicos['Público'], y=df_publicos['Cost_Per_Conversion'], 
+            go.Bar(x=df_publicos['Público'], y=df_publicos['Costo por Conversión (CLP)'], 
                   name='Cost/Conv', marker_color='#9467bd'),
             row=2, col=2
         )
@@ -373,59 +295,48 @@ if df_regiones is not None and df_principal is not None:
         fig_publicos.update_layout(height=600, title_text="Análisis por Público (archivo principal)", showlegend=False)
         
         # 5. Gráfico por tipos de anuncios (usando datos principales)
-        df_tipos = df_filtrado_principal.groupby('Tipo_Anuncio').agg({
-            'Importe gastado (CLP)': 'sum',
-            'CTR (todos)': 'mean',
-            'CPC (todos)': 'mean',
-            'Impresiones': 'sum',
-            'Clics en el enlace': 'sum',
-            'Artículos agregados al carrito': 'sum'
-        }).reset_index()
-        
-        # Calcular tasa de conversión y costo por conversión
-        df_tipos['Conversion_Rate'] = (df_tipos['Artículos agregados al carrito'] / df_tipos['Clics en el enlace'] * 100).fillna(0)
-        df_tipos['Cost_Per_Conversion'] = (df_tipos['Importe gastado (CLP)'] / df_tipos['Artículos agregados al carrito']).replace([float('inf')], 0).fillna(0)
+        df_tipos = cubo_filtrado.resumen('Tipo de Anuncio', RAZONES_EMBUDO)
         
         fig_tipos = make_subplots(
             rows=2, cols=3,
-            subplot_titles=('Gasto Total', 'CTR Promedio', 'CPC Promedio',
+            subplot_titles=('Gasto Total', 'CTR (%)', 'CPC (CLP)',
                           'Tasa de Conversión (%)', 'Costo por Conversión', 'Conversiones'),
             specs=[[{"secondary_y": False}, {"secondary_y": False}, {"secondary_y": False}],
                    [{"secondary_y": False}, {"secondary_y": False}, {"secondary_y": False}]]
         )
         
         fig_tipos.add_trace(
-            go.Bar(x=df_tipos['Tipo_Anuncio'], y=df_tipos['Importe gastado (CLP)'], 
+            go.Bar(x=df_tipos['Tipo de Anuncio'], y=df_tipos['Importe gastado (CLP)'], 
                   name='Gasto', marker_color='#1f77b4'),
             row=1, col=1
         )
         
         fig_tipos.add_trace(
-            go.Bar(x=df_tipos['Tipo_Anuncio'], y=df_tipos['CTR (todos)'], 
+            go.Bar(x=df_tipos['Tipo de Anuncio'], y=df_tipos['CTR (%)'], 
                   name='CTR', marker_color='#ff7f0e'),
             row=1, col=2
         )
         
         fig_tipos.add_trace(
-            go.Bar(x=df_tipos['Tipo_Anuncio'], y=df_tipos['CPC (todos)'], 
+            go.Bar(x=df_tipos['Tipo de Anuncio'], y=df_tipos['CPC (CLP)'], 
                   name='CPC', marker_color='#2ca02c'),
             row=1, col=3
         )
         
         fig_tipos.add_trace(
-            go.Bar(x=df_tipos['Tipo_Anuncio'], y=df_tipos['Conversion_Rate'], 
+            go.Bar(x=df_tipos['Tipo de Anuncio'], y=df_tipos['Conversión (%)'], 
                   name='Conv Rate', marker_color='#d62728'),
             row=2, col=1
         )
         
         fig_tipos.add_trace(
-            go.Bar(x=df_tipos['Tipo_Anuncio'], y=df_tipos['Cost_Per_Conversion'], 
+            go.Bar(x=df_tipos['Tipo de Anuncio'], y=df_tipos['Costo por Conversión (CLP)'], 
                   name='Cost/Conv', marker_color='#9467bd'),
             row=2, col=2
         )
         
         fig_tipos.add_trace(
-            go.Bar(x=df_tipos['Tipo_Anuncio'], y=df_tipos['Artículos agregados al carrito'], 
+            go.Bar(x=df_tipos['Tipo de Anuncio'], y=df_tipos['Artículos agregados al carrito'], 
                   name='Conversiones', marker_color='#8c564b'),
             row=2, col=3
         )
@@ -433,21 +344,7 @@ if df_regiones is not None and df_principal is not None:
         fig_tipos.update_layout(height=600, title_text="Análisis por Tipo de Anuncio (archivo principal)", showlegend=False)
         
         # 6. Gráfico de Hook Rates (usando datos principales)
-        df_hook = df_filtrado_principal.groupby('Tipo_Anuncio').agg({
-            'Impresiones': 'sum',
-            'Reproducciones de video de 3 segundos': 'sum',
-            'Reproducciones de video hasta el 25%': 'sum',
-            'Reproducciones de video hasta el 50%': 'sum',
-            'Reproducciones de video hasta el 75%': 'sum',
-            'Reproducciones de video hasta el 100%': 'sum'
-        }).reset_index()
-        
-        # Calcular hook rates
-        df_hook['Hook_Rate_3s'] = (df_hook['Reproducciones de video de 3 segundos'] / df_hook['Impresiones']) * 100
-        df_hook['Hook_Rate_25'] = (df_hook['Reproducciones de video hasta el 25%'] / df_hook['Impresiones']) * 100
-        df_hook['Hook_Rate_50'] = (df_hook['Reproducciones de video hasta el 50%'] / df_hook['Impresiones']) * 100
-        df_hook['Hook_Rate_75'] = (df_hook['Reproducciones de video hasta el 75%'] / df_hook['Impresiones']) * 100
-        df_hook['Hook_Rate_100'] = (df_hook['Reproducciones de video hasta el 100%'] / df_hook['Impresiones']) * 100
+        df_hook = cubo_filtrado.resumen('Tipo de Anuncio', HOOK_RATES)
         
         # Debug hook rates
         print("=== Hook Rates Debug (archivo principal) ===")
@@ -455,24 +352,24 @@ if df_regiones is not None and df_principal is not None:
         print(f"Total reproducciones 3s: {df_hook['Reproducciones de video de 3 segundos'].sum():,}")
         print("Hook rates por tipo:")
         for _, row in df_hook.iterrows():
-            print(f"  {row['Tipo_Anuncio']}: {row['Hook_Rate_3s']:.1f}%")
+            print(f"  {row['Tipo de Anuncio']}: {row['Hook Rate 3s (%)']:.1f}%")
         print("========================")
         
         # Ordenar por Hook Rate 3s
-        df_hook = df_hook.sort_values('Hook_Rate_3s', ascending=True)
+        df_hook = df_hook.sort_values('Hook Rate 3s (%)', ascending=True)
         
         fig_hook = go.Figure()
         
         # Colores para cada hook rate
         colors = ['#FF9999', '#66B2FF', '#99FF99', '#FFCC99', '#FF99CC']
-        hook_columns = ['Hook_Rate_3s', 'Hook_Rate_25', 'Hook_Rate_50', 'Hook_Rate_75', 'Hook_Rate_100']
+        hook_columns = HOOK_RATES
         hook_names = ['3 segundos', '25%', '50%', '75%', '100%']
         
         for i, (col, name, color) in enumerate(zip(hook_columns, hook_names, colors)):
             fig_hook.add_trace(go.Bar(
                 name=f'Hook Rate {name}',
                 x=df_hook[col],
-                y=df_hook['Tipo_Anuncio'],
+                y=df_hook['Tipo de Anuncio'],
                 orientation='h',
                 marker_color=color,
                 text=[f'{val:.1f}%' for val in df_hook[col]],
@@ -490,14 +387,14 @@ if df_regiones is not None and df_principal is not None:
         
         # 7. Insights
         mejor_publico = df_publicos.loc[df_publicos['Importe gastado (CLP)'].idxmax(), 'Público'] if not df_publicos.empty else "N/A"
-        mejor_tipo = df_tipos.loc[df_tipos['CTR (todos)'].idxmax(), 'Tipo_Anuncio'] if not df_tipos.empty else "N/A"
-        mejor_hook = df_hook.loc[df_hook['Hook_Rate_3s'].idxmax(), 'Tipo_Anuncio'] if not df_hook.empty else "N/A"
+        mejor_tipo = df_tipos.loc[df_tipos['CTR (%)'].idxmax(), 'Tipo de Anuncio'] if not df_tipos.empty else "N/A"
+        mejor_hook = df_hook.loc[df_hook['Hook Rate 3s (%)'].idxmax(), 'Tipo de Anuncio'] if not df_hook.empty else "N/A"
         
         insights = html.Ul([
             html.Li(f"Público con mayor gasto: {mejor_publico} (archivo principal)"),
             html.Li(f"Tipo de anuncio con mejor CTR: {mejor_tipo} (archivo principal)"),
             html.Li(f"Mejor Hook Rate de 3s: {mejor_hook} (archivo principal)"),
-            html.Li(f"Datos de regiones desde: archivo con (2) - Filtro: {publico_regiones_filter}"),
+            html.Li(f"Datos de regiones desde: exports con región - Filtro: {publico_regiones_filter}"),
             html.Li(f"Total de conversiones: {total_conversiones}")
         ])
         
@@ -512,8 +409,8 @@ if df_regiones is not None and df_principal is not None:
         )
 
     print("=== DASHBOARD DE MARKETING DUAL (DOS ARCHIVOS) ===")
-    print("📊 Regiones: archivo con (2)")
-    print("📈 Resto: archivo sin (2)")
+    print("📊 Regiones: exports con región")
+    print("📈 Resto: consolidado diario sin región")
     print("Iniciando servidor en http://localhost:8054")
 
 if __name__ == '__main__':
@@ -1,57 +1,17 @@
 import dash
 from dash import html, dcc, Input, Output, callback
-import pandas as pd
 import plotly.graph_objects as go
 from plotly.subplots import make_subplots
 import os
 
+from funciones.consolidado_meta import consolidar_meta
+from funciones.cubo_meta import CuboMeta, HOOK_RATES, RAZONES_EMBUDO
+
 def cargar_datos():
-    """Carga los archivos CSV de marketing."""
+    """Carga los exports de marketing consolidados (con desglose por región)."""
     try:
-        archivo_path = "archivos_input/archivos input marketing/Comp-1-Conjunto-Anuncios-2Campañas-3-anuncios-por-dia (2).csv"
-        print(f"Cargando archivo: {archivo_path}")
-        
-        df = pd.read_csv(archivo_path)
-        print(f"Archivo cargado. Dimensiones: {df.shape}")
-        
-        # Convertir columnas numéricas con manejo especial de formato
-        numeric_columns = [
-            "Importe gastado (CLP)", "Impresiones", "Clics en el enlace", 
-            "Artículos agregados al carrito", "CTR (todos)", "CPC (todos)",
-            "Reproducciones de video de 3 segundos", "Reproducciones de video hasta el 25%",
-            "Reproducciones de video hasta el 50%", "Reproducciones de video hasta el 75%",
-            "Reproducciones de video hasta el 100%"
-        ]
-        
-        for col in numeric_columns:
-            if col in df.columns:
-                # Manejo especial para datos de Facebook/Meta que pueden tener comas
-                if df[col].dtype == 'object':
-                    # Limpiar formato: quitar espacios, comas, convertir "-" a 0
-                    df[col] = df[col].astype(str).str.replace(',', '.').str.replace(' ', '').str.replace('-', '0')
-                    df[col] = pd.to_numeric(df[col], errors='coerce').fillna(0)
-                else:
-                    df[col] = pd.to_numeric(df[col], errors='coerce').fillna(0)
-                print(f"Columna {col} convertida - Suma: {df[col].sum()}")
-        
-        # Convertir fechas
-        df['Día'] = pd.to_datetime(df['Día'])
-        
-        # Clasificar públicos
-        df['Público'] = df['Nombre del conjunto de anuncios'].apply(
-            lambda x: 'Advantage' if 'advantage' in str(x).lower() else 
-                     'Pucón' if 'pucon' in str(x).lower() else 'Otro'
-        )
-        
-        # Clasificar tipos de anuncios
-        df['Tipo_Anuncio'] = df['Nombre del anuncio'].apply(
-            lambda x: 'Video explicativo' if 'explicando servicio' in str(x).lower() else
-                     'Video parejas amor' if 'parejas amor' in str(x).lower() else
-                     'Video parejas dcto' if 'parejas dcto' in str(x).lower() else
-                     'Otro'
-        )
-        
-        print("Datos procesados exitosamente")
+        df = consolidar_meta()['regiones']
+        print(f"Datos cargados. Dimensiones: {df.shape}")
         return df
     
     except Exception as e:
@@ -63,6 +23,8 @@ app = dash.Dash(__name__)
 df_data = cargar_datos()
 
 if df_data is not None:
+    # Sumas aditivas: CTR, CPC, conversión y hook rates se derivan como suma/suma
+    cubo_data = CuboMeta.desde_hechos(df_data)
     fecha_min = df_data['Día'].min()
     fecha_max = df_data['Día'].max()
     
@@ -130,6 +92,7 @@ if df_data is not None:
         # Filtrar datos por fecha
         mask = (df_data['Día'] >= start_date) & (df_data['Día'] <= end_date)
         df_filtrado = df_data[mask]
+        cubo_filtrado = cubo_data.filtrar(start_date, end_date)
         
         if df_filtrado.empty:
             empty_fig = go.Figure()
@@ -194,7 +157,7 @@ if df_data is not None:
         fig_evolucion.update_layout(title=titulo, height=400)
         
         # 3. Gráfico por región
-        df_regiones = df_filtrado.groupby('Región')['Importe gastado (CLP)'].sum().reset_index()
+        df_regiones = cubo_filtrado.resumen('Región')
         df_regiones = df_regiones.sort_values('Importe gastado (CLP)', ascending=True).tail(10)
         
         fig_regiones = go.Figure(go.Bar(
@@ -206,17 +169,7 @@ if df_data is not None:
         fig_regiones.update_layout(title='Gasto por Región (Top 10)', height=500)
         
         # 4. Gráfico por públicos (6 métricas)
-        df_publicos = df_filtrado.groupby('Público').agg({
-            'Importe gastado (CLP)': 'sum',
-            'Impresiones': 'sum',
-            'Clics en el enlace': 'sum',
-            'Artículos agregados al carrito': 'sum'
-        }).reset_index()
-        
-        df_publicos['CTR (%)'] = (df_publicos['Clics en el enlace'] / df_publicos['Impresiones'] * 100).fillna(0)
-        df_publicos['CPC (CLP)'] = (df_publicos['Importe gastado (CLP)'] / df_publicos['Clics en el enlace']).fillna(0)
-        df_publicos['Conversión (%)'] = (df_publicos['Artículos agregados al carrito'] / df_publicos['Clics en el enlace'] * 100).fillna(0)
-        df_publicos['Costo por Conversión (CLP)'] = (df_publicos['Importe gastado (CLP)'] / df_publicos['Artículos agregados al carrito']).fillna(0)
+        df_publicos = cubo_filtrado.resumen('Público', RAZONES_EMBUDO)
         
         fig_publicos = make_subplots(
             rows=3, cols=2,
@@ -235,43 +188,25 @@ if df_data is not None:
         fig_publicos.update_layout(title='Comparación entre Públicos', height=800)
         
         # 5. Gráfico por tipos de anuncios (6 métricas)
-        df_tipos = df_filtrado.groupby('Tipo_Anuncio').agg({
-            'Importe gastado (CLP)': 'sum',
-            'Impresiones': 'sum',
-            'Clics en el enlace': 'sum',
-            'Artículos agregados al carrito': 'sum'
-        }).reset_index()
-        
-        df_tipos['CTR (%)'] = (df_tipos['Clics en el enlace'] / df_tipos['Impresiones'] * 100).fillna(0)
-        df_tipos['CPC (CLP)'] = (df_tipos['Importe gastado (CLP)'] / df_tipos['Clics en el enlace']).fillna(0)
-        df_tipos['Conversión (%)'] = (df_tipos['Artículos agregados al carrito'] / df_tipos['Clics en el enlace'] * 100).fillna(0)
-        df_tipos['Costo por Conversión (CLP)'] = (df_tipos['Importe gastado (CLP)'] / df_tipos['Artículos agregados al carrito']).fillna(0)
+        df_tipos = cubo_filtrado.resumen('Tipo de Anuncio', RAZONES_EMBUDO)
         
         fig_tipos = make_subplots(
             rows=3, cols=2,
             subplot_titles=['Gasto Total (CLP)', 'CTR (%)', 'CPC (CLP)', 'Conversión (%)', 'Costo por Conversión (CLP)', 'Artículos al carrito']
         )
         
-        fig_tipos.add_trace(go.Bar(x=df_tipos['Tipo_Anuncio'], y=df_tipos['Importe gastado (CLP)'], marker_color=colors[0], showlegend=False), row=1, col=1)
-        fig_tipos.add_trace(go.Bar(x=df_tipos['Tipo_Anuncio'], y=df_tipos['CTR (%)'], marker_color=colors[1], showlegend=False), row=1, col=2)
-        fig_tipos.add_trace(go.Bar(x=df_tipos['Tipo_Anuncio'], y=df_tipos['CPC (CLP)'], marker_color=colors[2], showlegend=False), row=2, col=1)
-        fig_tipos.add_trace(go.Bar(x=df_tipos['Tipo_Anuncio'], y=df_tipos['Conversión (%)'], marker_color=colors[3], showlegend=False), row=2, col=2)
-        fig_tipos.add_trace(go.Bar(x=df_tipos['Tipo_Anuncio'], y=df_tipos['Costo por Conversión (CLP)'], marker_color=colors[4], showlegend=False), row=3, col=1)
-        fig_tipos.add_trace(go.Bar(x=df_tipos['Tipo_Anuncio'], y=df_tipos['Artículos agregados al carrito'], marker_color=colors[5], showlegend=False), row=3, col=2)
+        fig_tipos.add_trace(go.Bar(x=df_tipos['Tipo de Anuncio'], y=df_tipos['Importe gastado (CLP)'], marker_color=colors[0], showlegend=False), row=1, col=1)
+        fig_tipos.add_trace(go.Bar(x=df_tipos['Tipo de Anuncio'], y=df_tipos['CTR (%)'], marker_color=colors[1], showlegend=False), row=1, col=2)
+        fig_tipos.add_trace(go.Bar(x=df_tipos['Tipo de Anuncio'], y=df_tipos['CPC (CLP)'], marker_color=colors[2], showlegend=False), row=2, col=1)
+        fig_tipos.add_trace(go.Bar(x=df_tipos['Tipo de Anuncio'], y=df_tipos['Conversión (%)'], marker_color=colors[3], showlegend=False), row=2, col=2)
+        fig_tipos.add_trace(go.Bar(x=df_tipos['Tipo de Anuncio'], y=df_tipos['Costo por Conversión (CLP)'], marker_color=colors[4], showlegend=False), row=3, col=1)
+        fig_tipos.add_trace(go.Bar(x=df_tipos['Tipo de Anuncio'], y=df_tipos['Artículos agregados al carrito'], marker_color=colors[5], showlegend=False), row=3, col=2)
         
         fig_tipos.update_layout(title='Comparación de Métricas por Tipo de Anuncio', height=800)
         fig_tipos.update_xaxes(tickangle=45)
         
         # 6. Gráfico de Hook Rates
-        # Calcular hook rates
-        df_hooks = df_filtrado.groupby('Tipo_Anuncio').agg({
-            'Reproducciones de video de 3 segundos': 'sum',
-            'Reproducciones de video hasta el 25%': 'sum',
-            'Reproducciones de video hasta el 50%': 'sum',
-            'Reproducciones de video hasta el 75%': 'sum',
-            'Reproducciones de video hasta el 100%': 'sum',
-            'Impresiones': 'sum'
-        }).reset_index()
+        df_hooks = cubo_filtrado.resumen('Tipo de Anuncio', HOOK_RATES)
         
         # DIAGNÓSTICO: Imprimir los datos para debug
         print("\n=== Hook Rates Debug ===")
@@ -280,20 +215,13 @@ if df_data is not None:
         print(f"Total impresiones: {total_impresiones:,.0f}")
         print(f"Total reproducciones 3s: {total_reproducciones:,.0f}")
         
-        # Calcular porcentajes
-        df_hooks['Hook_Rate_3s'] = (df_hooks['Reproducciones de video de 3 segundos'] / df_hooks['Impresiones'] * 100).fillna(0)
-        df_hooks['Hook_Rate_25'] = (df_hooks['Reproducciones de video hasta el 25%'] / df_hooks['Impresiones'] * 100).fillna(0)
-        df_hooks['Hook_Rate_50'] = (df_hooks['Reproducciones de video hasta el 50%'] / df_hooks['Impresiones'] * 100).fillna(0)
-        df_hooks['Hook_Rate_75'] = (df_hooks['Reproducciones de video hasta el 75%'] / df_hooks['Impresiones'] * 100).fillna(0)
-        df_hooks['Hook_Rate_100'] = (df_hooks['Reproducciones de video hasta el 100%'] / df_hooks['Impresiones'] * 100).fillna(0)
-        
         print("Hook rates por tipo:")
         for _, row in df_hooks.iterrows():
-            print(f"  {row['Tipo_Anuncio']}: {row['Hook_Rate_3s']:.1f}%")
+            print(f"  {row['Tipo de Anuncio']}: {row['Hook Rate 3s (%)']:.1f}%")
         print("========================")
         
         # Ordenar por Hook Rate 3s
-        df_hooks = df_hooks.sort_values('Hook_Rate_3s', ascending=True)
+        df_hooks = df_hooks.sort_values('Hook Rate 3s (%)', ascending=True)
         
         # Crear el gráfico de hook rates como barras VERTICALES agrupadas
         fig_hooks = go.Figure()
@@ -301,12 +229,12 @@ if df_data is not None:
         # Colores para cada hook rate
         hook_colors = ['#FF9999', '#66B2FF', '#99FF99', '#FFCC99', '#FF99CC']
         hook_names = ['3 segundos', '25%', '50%', '75%', '100%']
-        hook_columns = ['Hook_Rate_3s', 'Hook_Rate_25', 'Hook_Rate_50', 'Hook_Rate_75', 'Hook_Rate_100']
+        hook_columns = HOOK_RATES
         
         # Agregar cada serie de hook rates como barras VERTICALES
         for col, color, name in zip(hook_columns, hook_colors, hook_names):
             fig_hooks.add_trace(go.Bar(
-                x=df_hooks['Tipo_Anuncio'],
+                x=df_hooks['Tipo de Anuncio'],
                 y=df_hooks[col],
                 name=name,
                 marker_color=color,
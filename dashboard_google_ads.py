@@ -1,140 +1,43 @@
 import dash
-from dash import html, dcc, Input, Output, callback
-import pandas as pd
+from dash import html, dcc
 import plotly.graph_objects as go
 import plotly.express as px
 from plotly.subplots import make_subplots
-import os
 from datetime import datetime
 import numpy as np
-import glob
-import re
-
-# Configuración de colores
-COLORS = {
-    'background': '#111111',
-    'text': '#FFFFFF',
-    'grid': '#333333',
+
+from funciones.cache_figuras import CacheFiguras, huella_datos
+from funciones.carga_tablas import TABLAS_DASHBOARD, cargar_tablas
+from funciones.componentes_dashboard import COLORS
+from funciones.google_ads import cargar_google_ads
+from funciones.matriz_dia_hora import DIAS_SEMANA, HORAS, MEDIDAS_ANUNCIOS, indice_relativo, matrices_anuncios, matriz_reservas
+from funciones.muestreo import traza_temporal
+from funciones.payload import configurar_payload, plantilla_monto
+from funciones.tema import TEMA
+
+# Colores de las trazas (marca Google); fondo, texto y grilla vienen de COLORS y del tema
+COLORES_GOOGLE = {
     'primary': '#4285F4',  # Azul de Google
     'secondary': '#34A853',  # Verde de Google
     'accent': '#FBBC04',    # Amarillo de Google
     'expense': '#EA4335',   # Rojo de Google
-    'card_bg': '#222222'
 }
 
-def parse_google_ads_date(date_str):
-    """Parsea fechas en formato español de Google Ads."""
-    try:
-        # Formato: "Semana de 10 mar 2025"
-        if 'Semana de' in str(date_str):
-            # Extraer la fecha después de "Semana de"
-            date_part = str(date_str).replace('Semana de ', '').strip()
-            
-            # Mapeo de meses en español
-            meses = {
-                'ene': '01', 'feb': '02', 'mar': '03', 'abr': '04',
-                'may': '05', 'jun': '06', 'jul': '07', 'ago': '08',
-                'sep': '09', 'oct': '10', 'nov': '11', 'dic': '12'
-            }
-            
-            # Parsear usando regex
-            match = re.match(r'(\d{1,2})\s+(\w{3})\s+(\d{4})', date_part)
-            if match:
-                dia, mes, año = match.groups()
-                mes_num = meses.get(mes.lower(), '01')
-                return pd.to_datetime(f"{año}-{mes_num}-{dia.zfill(2)}")
-        
-        # Intentar parseo normal
-        return pd.to_datetime(date_str)
-        
-    except Exception as e:
-        print(f"Error parseando fecha '{date_str}': {e}")
-        return pd.NaT
-
-def limpiar_valor_monetario(valor):
-    """Limpia y convierte valores monetarios (ej: 'CLP1,234') a float."""
-    if pd.isna(valor):
-        return 0.0
-    s_valor = str(valor).replace('CLP', '').replace(',', '').strip()
-    if s_valor == '' or s_valor == '""':
-        return 0.0
-    try:
-        return float(s_valor)
-    except (ValueError, TypeError):
-        return 0.0
-
-def convertir_a_numero(valor):
-    """Convierte un valor a número, limpiando comas."""
-    if pd.isna(valor):
-        return 0
-    s_valor = str(valor).replace(',', '').strip()
-    if s_valor == '':
-        return 0
-    try:
-        return int(s_valor)
-    except (ValueError, TypeError):
-        return 0
-        
-def cargar_y_limpiar_csv(ruta_archivo, columnas_monetarias, columnas_numericas):
-    """Carga un CSV y limpia las columnas especificadas."""
-    if not os.path.exists(ruta_archivo):
-        print(f"   ⚠️ Archivo no encontrado: {os.path.basename(ruta_archivo)}")
-        return None
-    
-    df = pd.read_csv(ruta_archivo)
-    
-    for col in columnas_monetarias:
-        if col in df.columns:
-            df[col] = df[col].apply(limpiar_valor_monetario)
-            
-    for col in columnas_numericas:
-        if col in df.columns:
-            df[col] = df[col].apply(convertir_a_numero)
-            
-    print(f"   ✅ Cargado y limpiado: {os.path.basename(ruta_archivo)} ({df.shape[0]} filas)")
-    return df
-
 def cargar_datos_google_ads():
-    """Carga y procesa todos los datos de Google Ads."""
+    """Carga y procesa todos los datos de Google Ads (directo desde los zips descargados)."""
     try:
         print("🔍 Cargando y procesando datos de Google Ads...")
-        ruta_base = 'archivos_input/archivos input marketing/google ads'
-        datos = {}
-
-        # 1. Series temporales
-        archivo_series = os.path.join(ruta_base, 'Series_temporales(2025.03.10-2025.06.20).csv')
-        if os.path.exists(archivo_series):
-            df_series = pd.read_csv(archivo_series)
-            df_series['Semana'] = df_series['Semana'].apply(parse_google_ads_date)
-            df_series['Costo'] = df_series['Costo'].apply(limpiar_valor_monetario)
-            df_series['CPC prom.'] = df_series['CPC prom.'].apply(limpiar_valor_monetario)
-            df_series['Clics'] = df_series['Clics'].apply(convertir_a_numero)
-            df_series['Impresiones'] = df_series['Impresiones'].apply(convertir_a_numero)
-            df_series = df_series.dropna(subset=['Semana'])
-            datos['series_temporales'] = df_series
-            print(f"   ✅ Procesado: Series temporales ({df_series.shape[0]} filas)")
-        
-        # Cargar otros archivos
-        archivos_a_cargar = {
-            'campañas': ('Campañas(2025.03.10-2025.06.20).csv', ['Costo', 'CPC prom.'], ['Clics', 'Impresiones']),
-            'grupos_anuncios': ('Grupos_de_anuncios(2025.03.10-2025.06.20).csv', ['Costo', 'CPC prom.'], ['Clics', 'Impresiones']),
-            'palabras_clave': ('Palabras_clave_de_la_Búsqueda(2025.03.10-2025.06.20).csv', ['Costo', 'CPC prom.'], ['Clics', 'Impresiones']),
-            'dispositivos': ('Dispositivos(2025.03.10-2025.06.20).csv', ['Costo', 'CPC prom.'], ['Clics', 'Impresiones']),
-            'demograficos': ('Datos_demográficos(Género_Edad_2025.03.10-2025.06.20).csv', [], ['Impresiones']),
-        }
-        
-        for clave, (nombre_archivo, cols_mon, cols_num) in archivos_a_cargar.items():
-            ruta = os.path.join(ruta_base, nombre_archivo)
-            datos[clave] = cargar_y_limpiar_csv(ruta, cols_mon, cols_num)
-        
-        # Día y hora
-        archivo_dia_hora = os.path.join(ruta_base, 'Día_y_hora(Día_Hora_2025.03.10-2025.06.20).csv')
-        df_dia_hora = cargar_y_limpiar_csv(archivo_dia_hora, [], ['Impresiones']) # No hay costo, solo impresiones
-        if df_dia_hora is not None:
-            # Las columnas son 'Día' y 'Hora de inicio', no se necesita parseo de fecha aquí
-            datos['dia_hora'] = df_dia_hora
-            
+        datos = cargar_google_ads()
         print(f"\n🎉 Carga completada: {len(datos)} datasets procesados.")
+
+        # Matrices 7×24 (día de la semana × hora) calculadas una vez: anuncios y reservas creadas
+        reservas = cargar_tablas({'reservas': TABLAS_DASHBOARD['reservas']}, si_falta='vacio')['reservas']
+        matrices = matrices_anuncios(datos.get('dia_hora'))
+        matriz = matriz_reservas(reservas)
+        if matriz is not None:
+            matrices['Reservas'] = matriz
+        datos['matrices_dia_hora'] = matrices
+        print(f"🗓️ Matrices día × hora: {', '.join(matrices) or 'sin datos'}")
         return datos
         
     except Exception as e:
@@ -152,9 +55,7 @@ def crear_grafico_vacio(titulo="No hay datos disponibles"):
     fig = go.Figure()
     fig.update_layout(
         title=titulo,
-        paper_bgcolor=COLORS['card_bg'],
-        plot_bgcolor=COLORS['card_bg'],
-        font_color=COLORS['text'],
+        template=TEMA,
         xaxis={'visible': False},
         yaxis={'visible': False},
         annotations=[{
@@ -184,22 +85,18 @@ def crear_grafico_series_temporales(datos):
         horizontal_spacing=0.1
     )
     
-    fig.add_trace(go.Scatter(x=df['Semana'], y=df['Clics'], name='Clics', mode='lines+markers', line_color=COLORS['primary']), row=1, col=1)
-    fig.add_trace(go.Scatter(x=df['Semana'], y=df['Impresiones'], name='Impresiones', mode='lines+markers', line_color=COLORS['secondary']), row=1, col=2)
-    fig.add_trace(go.Scatter(x=df['Semana'], y=df['CPC prom.'], name='CPC Promedio', mode='lines+markers', line_color=COLORS['accent']), row=2, col=1)
-    fig.add_trace(go.Scatter(x=df['Semana'], y=df['Costo'], name='Costo', mode='lines+markers', line_color=COLORS['expense']), row=2, col=2)
+    fig.add_trace(traza_temporal(df['Semana'], df['Clics'], name='Clics', mode='lines+markers', line_color=COLORES_GOOGLE['primary']), row=1, col=1)
+    fig.add_trace(traza_temporal(df['Semana'], df['Impresiones'], name='Impresiones', mode='lines+markers', line_color=COLORES_GOOGLE['secondary']), row=1, col=2)
+    fig.add_trace(traza_temporal(df['Semana'], df['CPC prom.'], name='CPC Promedio', mode='lines+markers', line_color=COLORES_GOOGLE['accent']), row=2, col=1)
+    fig.add_trace(traza_temporal(df['Semana'], df['Costo'], name='Costo', mode='lines+markers', line_color=COLORES_GOOGLE['expense']), row=2, col=2)
     
     fig.update_layout(
         title_text='Evolución Semanal de Métricas de Google Ads',
-        paper_bgcolor=COLORS['card_bg'],
-        plot_bgcolor=COLORS['card_bg'],
-        font_color=COLORS['text'],
+        template=TEMA,
         showlegend=False,
         height=600,
         margin=dict(l=40, r=40, t=80, b=40)
     )
-    fig.update_xaxes(showgrid=True, gridcolor=COLORS['grid'])
-    fig.update_yaxes(showgrid=True, gridcolor=COLORS['grid'])
     return fig
 
 def crear_grafico_campañas(datos):
@@ -213,16 +110,14 @@ def crear_grafico_campañas(datos):
         x=df['Costo'],
         y=df['Nombre de la campaña'],
         orientation='h',
-        marker_color=COLORS['primary'],
-        text=df['Costo'].apply(lambda x: f"${x:,.0f}"),
+        marker_color=COLORES_GOOGLE['primary'],
+        texttemplate=plantilla_monto('x'),
         textposition='auto'
     ))
     
     fig.update_layout(
         title='Top 10 Campañas por Costo',
-        paper_bgcolor=COLORS['card_bg'],
-        plot_bgcolor=COLORS['card_bg'],
-        font_color=COLORS['text'],
+        template=TEMA,
         xaxis_title='Costo (CLP)',
         yaxis_title='Campaña',
         yaxis=dict(autorange="reversed"),
@@ -242,16 +137,14 @@ def crear_grafico_palabras_clave(datos):
         x=df['Costo'],
         y=df['Palabra clave de la Búsqueda'],
         orientation='h',
-        marker_color=COLORS['secondary'],
-        text=df['Costo'].apply(lambda x: f"${x:,.0f}"),
+        marker_color=COLORES_GOOGLE['secondary'],
+        texttemplate=plantilla_monto('x'),
         textposition='auto'
     ))
 
     fig.update_layout(
         title='Top 10 Palabras Clave por Costo',
-        paper_bgcolor=COLORS['card_bg'],
-        plot_bgcolor=COLORS['card_bg'],
-        font_color=COLORS['text'],
+        template=TEMA,
         xaxis_title='Costo (CLP)',
         yaxis_title='Palabra Clave',
         yaxis=dict(autorange="reversed"),
@@ -271,16 +164,14 @@ def crear_grafico_dispositivos(datos):
         labels=df['Dispositivo'],
         values=df['Costo'],
         hole=.5,
-        marker_colors=[COLORS['primary'], COLORS['secondary'], COLORS['accent'], COLORS['expense']],
+        marker_colors=[COLORES_GOOGLE['primary'], COLORES_GOOGLE['secondary'], COLORES_GOOGLE['accent'], COLORES_GOOGLE['expense']],
         textinfo='percent+label',
         pull=[0.05, 0, 0, 0]
     ))
     
     fig.update_layout(
         title='Distribución de Gasto por Dispositivo',
-        paper_bgcolor=COLORS['card_bg'],
-        plot_bgcolor=COLORS['card_bg'],
-        font_color=COLORS['text'],
+        template=TEMA,
         showlegend=False,
         height=400,
         margin=dict(t=50, b=40)
@@ -304,14 +195,12 @@ def crear_grafico_demograficos(datos):
         color='Género',
         barmode='group',
         text_auto='.2s',
-        color_discrete_map={'Masculino': COLORS['primary'], 'Femenino': COLORS['accent'], 'Desconocido': COLORS['grid']}
+        color_discrete_map={'Masculino': COLORES_GOOGLE['primary'], 'Femenino': COLORES_GOOGLE['accent'], 'Desconocido': COLORS['grid']}
     )
     
     fig.update_layout(
         title='Impresiones por Edad y Género',
-        paper_bgcolor=COLORS['card_bg'],
-        plot_bgcolor=COLORS['card_bg'],
-        font_color=COLORS['text'],
+        template=TEMA,
         xaxis_title='Rango de Edad',
         yaxis_title='Impresiones',
         height=400,
@@ -322,35 +211,21 @@ def crear_grafico_demograficos(datos):
 
 def crear_grafico_dia_hora(datos):
     """Crea un mapa de calor para impresiones por día y hora."""
-    if 'dia_hora' not in datos or datos['dia_hora'].empty:
+    matriz = datos.get('matrices_dia_hora', {}).get('Impresiones')
+    if matriz is None:
         return crear_grafico_vacio('Impresiones por Día y Hora')
-        
-    df = datos['dia_hora']
-    
-    # Extraer y normalizar hora
-    df['hora'] = df['Hora de inicio'].str.extract(r'(\d+)').astype(int)
-    
-    # Crear tabla pivote
-    pivot_table = df.pivot_table(index='Día', columns='hora', values='Impresiones', aggfunc='sum').fillna(0)
-    
-    # Ordenar días de la semana y horas
-    dias_ordenados = ['Lunes', 'Martes', 'Miércoles', 'Jueves', 'Viernes', 'Sábado', 'Domingo']
-    pivot_table = pivot_table.reindex(dias_ordenados).fillna(0)
-    pivot_table = pivot_table.reindex(sorted(pivot_table.columns), axis=1)
     
     fig = go.Figure(data=go.Heatmap(
-        z=pivot_table.values,
-        x=pivot_table.columns,
-        y=pivot_table.index,
+        z=matriz.values,
+        x=HORAS,
+        y=DIAS_SEMANA,
         colorscale='Viridis',
         hovertemplate='Día: %{y}<br>Hora: %{x}<br>Impresiones: %{z}<extra></extra>'
     ))
     
     fig.update_layout(
         title='Heatmap de Impresiones por Día y Hora',
-        paper_bgcolor=COLORS['card_bg'],
-        plot_bgcolor=COLORS['card_bg'],
-        font_color=COLORS['text'],
+        template=TEMA,
         xaxis_title='Hora del Día',
         yaxis_title='Día de la Semana',
         height=400,
@@ -358,6 +233,58 @@ def crear_grafico_dia_hora(datos):
     )
     return fig
 
+def crear_grafico_anuncios_vs_reservas(datos):
+    """Anuncios vs. reservas creadas por día y hora, con el índice reservas/anuncios.
+
+    El índice es la participación de cada franja en las reservas dividida por su
+    participación en la medida de anuncios: > 1 indica que ahí se reserva más de
+    lo que se pauta. Los botones cambian la medida sin volver a calcular nada.
+    """
+    matrices = datos.get('matrices_dia_hora', {})
+    medidas = [medida for medida in MEDIDAS_ANUNCIOS if medida in matrices]
+    if not medidas or 'Reservas' not in matrices:
+        return crear_grafico_vacio('Anuncios vs. Reservas por Día y Hora')
+
+    reservas = matrices['Reservas']
+    indices = {medida: indice_relativo(reservas, matrices[medida]) for medida in medidas}
+    inicial = medidas[0]
+
+    fig = make_subplots(rows=3, cols=1, shared_xaxes=True, vertical_spacing=0.06,
+                        subplot_titles=('Anuncios', 'Reservas creadas', 'Índice reservas / anuncios'))
+    fig.add_trace(go.Heatmap(
+        z=matrices[inicial].values, x=HORAS, y=DIAS_SEMANA, colorscale='Viridis',
+        colorbar=dict(y=0.85, len=0.3),
+        hovertemplate=f'Día: %{{y}}<br>Hora: %{{x}}<br>{inicial}: %{{z:,.0f}}<extra></extra>'
+    ), row=1, col=1)
+    fig.add_trace(go.Heatmap(
+        z=reservas.values, x=HORAS, y=DIAS_SEMANA, colorscale='Greens',
+        colorbar=dict(y=0.5, len=0.3),
+        hovertemplate='Día: %{y}<br>Hora: %{x}<br>Reservas: %{z:,.0f}<extra></extra>'
+    ), row=2, col=1)
+    fig.add_trace(go.Heatmap(
+        z=indices[inicial].values, x=HORAS, y=DIAS_SEMANA, colorscale='RdBu', zmid=1, zmin=0, zmax=3,
+        colorbar=dict(y=0.15, len=0.3),
+        hovertemplate='Día: %{y}<br>Hora: %{x}<br>Índice: %{z:.2f}<extra></extra>'
+    ), row=3, col=1)
+
+    botones = [dict(
+        label=medida, method='restyle',
+        args=[{'z': [matrices[medida].values, indices[medida].values],
+               'hovertemplate': [f'Día: %{{y}}<br>Hora: %{{x}}<br>{medida}: %{{z:,.0f}}<extra></extra>',
+                                 'Día: %{y}<br>Hora: %{x}<br>Índice: %{z:.2f}<extra></extra>']},
+              [0, 2]],
+    ) for medida in medidas]
+
+    fig.update_layout(
+        title='Anuncios vs. Reservas por Día y Hora',
+        template=TEMA,
+        height=800,
+        margin=dict(t=90, b=40),
+        updatemenus=[dict(type='buttons', direction='right', buttons=botones, x=1, xanchor='right', y=1.1, yanchor='bottom')],
+    )
+    fig.update_xaxes(title_text='Hora del Día', row=3, col=1)
+    return fig
+
 # ==============================================================================
 # Generación de Insights
 # ==============================================================================
@@ -393,6 +320,14 @@ def generar_insights_google_ads(datos):
         top_segmento = df_demograficos.loc[df_demograficos['Impresiones'].idxmax()]
         insights.append(html.Li(f"El segmento demográfico con más impresiones es '{top_segmento['Rango de edades']}' de género '{top_segmento['Género']}'."))
 
+    # Insight de Día y Hora: franja donde más se reserva en relación a lo que se pauta
+    matrices = datos.get('matrices_dia_hora', {})
+    if 'Reservas' in matrices and 'Impresiones' in matrices:
+        indice = indice_relativo(matrices['Reservas'], matrices['Impresiones']).stack()
+        if indice.notna().any():
+            dia, hora = indice.idxmax()
+            insights.append(html.Li(f"El {dia} a las {hora}:00 se reserva {indice.max():.1f} veces más de lo que se pauta (impresiones): revisa la programación de anuncios en esa franja."))
+
     return html.Ul(insights, style={'color': COLORS['text']})
 
 # ==============================================================================
@@ -401,42 +336,78 @@ def generar_insights_google_ads(datos):
 
 app = dash.Dash(__name__, suppress_callback_exceptions=True, assets_folder='assets')
 server = app.server
+configurar_payload(app, 'Google Ads')
 
 # Cargar datos una sola vez al iniciar
 datos_google_ads = cargar_datos_google_ads()
 
+# Los gráficos solo dependen de los datos: se guardan en disco con el hash de su contenido
+# y las cargas de página (o un reinicio con los mismos CSV) los leen del archivo
+cache_figuras = CacheFiguras()
+huella_google_ads = huella_datos(datos_google_ads)
+
+GRAFICOS_GOOGLE_ADS = [
+    crear_grafico_series_temporales,
+    crear_grafico_campañas,
+    crear_grafico_palabras_clave,
+    crear_grafico_dispositivos,
+    crear_grafico_demograficos,
+    crear_grafico_dia_hora,
+    crear_grafico_anuncios_vs_reservas,
+]
+
+def construir_vista():
+    """Figuras (en el orden de GRAFICOS_GOOGLE_ADS) e insights del dashboard.
+
+    Los datos se cargan una sola vez, así que la vista se calcula al iniciar y
+    va incrustada en el layout: abrir la página no dispara ningún callback.
+    """
+    try:
+        figuras = [cache_figuras.obtener(crear_grafico, datos_google_ads, huella=huella_google_ads)
+                   for crear_grafico in GRAFICOS_GOOGLE_ADS]
+        return figuras, generar_insights_google_ads(datos_google_ads)
+    except Exception as e:
+        print(f"❌ Error construyendo la vista: {e}")
+        import traceback
+        print(traceback.format_exc())
+        return [crear_grafico_vacio(f"Error en la Vista: {e}")] * len(GRAFICOS_GOOGLE_ADS), html.P(f"Error en la vista: {e}")
+
 # Definir layout
 if datos_google_ads is not None:
+    (fig_series, fig_campañas, fig_palabras, fig_dispositivos,
+     fig_demograficos, fig_dia_hora, fig_anuncios_reservas), insights_google_ads = construir_vista()
     app.layout = html.Div(id='main-container', children=[
         dcc.Location(id='url', refresh=False),
-        html.Div(id='page-load-trigger', style={'display': 'none'}),
         
         # Header
         html.Div([
-            html.H1('📊 Dashboard de Google Ads', style={'color': COLORS['primary'], 'textAlign': 'center'}),
-            html.P('Análisis completo del rendimiento de campañas en Google Ads', style={'color': COLORS['text'], 'textAlign': 'center'})
+            html.H1('📊 Dashboard de Google Ads', style={'color': COLORES_GOOGLE['primary'], 'textAlign': 'center'}),
+            html.P('Análisis completo del rendimiento de campañas en Google Ads', style={'color': COLORS['text'], 'textAlign': 'center'}),
         ]),
         
         # Contenedores de Gráficos
         html.Div([
             # Columna Izquierda
             html.Div([
-                html.Div(dcc.Graph(id='grafico-series'), className='card'),
-                html.Div(dcc.Graph(id='grafico-palabras'), className='card'),
-                html.Div(dcc.Graph(id='grafico-dia-hora'), className='card'),
+                html.Div(dcc.Graph(id='grafico-series', figure=fig_series), className='card'),
+                html.Div(dcc.Graph(id='grafico-palabras', figure=fig_palabras), className='card'),
+                html.Div(dcc.Graph(id='grafico-dia-hora', figure=fig_dia_hora), className='card'),
             ], className='column'),
             # Columna Derecha
             html.Div([
-                html.Div(dcc.Graph(id='grafico-campañas'), className='card'),
-                html.Div(dcc.Graph(id='grafico-dispositivos'), className='card'),
-                html.Div(dcc.Graph(id='grafico-demograficos'), className='card'),
+                html.Div(dcc.Graph(id='grafico-campañas', figure=fig_campañas), className='card'),
+                html.Div(dcc.Graph(id='grafico-dispositivos', figure=fig_dispositivos), className='card'),
+                html.Div(dcc.Graph(id='grafico-demograficos', figure=fig_demograficos), className='card'),
             ], className='column'),
         ], className='row'),
 
+        # Anuncios vs. reservas por día y hora
+        html.Div(dcc.Graph(id='grafico-anuncios-reservas', figure=fig_anuncios_reservas), className='card'),
+
         # Insights
         html.Div([
             html.H3('💡 Insights y Recomendaciones', style={'color': COLORS['text']}),
-            html.Div(id='insights-contenido', className='insights-box')
+            html.Div(insights_google_ads, id='insights-contenido', className='insights-box')
         ], className='card'),
     ])
 else:
@@ -445,41 +416,6 @@ else:
         html.P('No se pudieron cargar o procesar los archivos de Google Ads. Verifica la consola para más detalles.')
     ])
 
-@callback(
-    [Output('grafico-series', 'figure'),
-     Output('grafico-campañas', 'figure'),
-     Output('grafico-palabras', 'figure'),
-     Output('grafico-dispositivos', 'figure'),
-     Output('grafico-demograficos', 'figure'),
-     Output('grafico-dia-hora', 'figure'),
-     Output('insights-contenido', 'children')],
-    [Input('page-load-trigger', 'children')]
-)
-def actualizar_dashboard(_):
-    if datos_google_ads is None:
-        # Si los datos no se cargaron, devolver gráficos vacíos
-        return [crear_grafico_vacio("Error en Carga de Datos")] * 6 + [html.P("Error en la carga de datos.")]
-
-    try:
-        # Crear todos los gráficos
-        fig_series = crear_grafico_series_temporales(datos_google_ads)
-        fig_campañas = crear_grafico_campañas(datos_google_ads)
-        fig_palabras = crear_grafico_palabras_clave(datos_google_ads)
-        fig_dispositivos = crear_grafico_dispositivos(datos_google_ads)
-        fig_demograficos = crear_grafico_demograficos(datos_google_ads)
-        fig_dia_hora = crear_grafico_dia_hora(datos_google_ads)
-        
-        # Generar insights
-        insights = generar_insights_google_ads(datos_google_ads)
-        
-        return fig_series, fig_campañas, fig_palabras, fig_dispositivos, fig_demograficos, fig_dia_hora, insights
-        
-    except Exception as e:
-        print(f"❌ Error en el callback: {e}")
-        import traceback
-        print(traceback.format_exc())
-        return [crear_grafico_vacio(f"Error en Callback: {e}")] * 6 + [html.P(f"Error en callback: {e}")]
-
 if __name__ == '__main__':
     print("=== Iniciando Dashboard de Google Ads ===")
     app.run(debug=True, port=8058) 
\ No newline at end of file
@@ -1,24 +1,25 @@
 import dash
-from dash import html, dcc, Input, Output
-import pandas as pd
+from dash import html, dcc, Input, Output, ctx
+from dash.exceptions import PreventUpdate
 import plotly.graph_objects as go
-import plotly.express as px
-from datetime import datetime
 import os
 import numpy as np
 from plotly.subplots import make_subplots
 
 # Importar colores y estilos comunes
-COLORS = {
-    'background': '#111111',
-    'text': '#FFFFFF',
-    'grid': '#333333',
-    'primary': '#00A6FB',
-    'secondary': '#0582CA',
-    'expense': '#FF6B6B',
-    'income': '#4CAF50',
-    'card_bg': '#222222'
-}
+from funciones.componentes_dashboard import COLORS
+from funciones.atribucion import VENTANAS_ATRIBUCION, cargar_atribucion, generar_insights_atribucion
+from funciones.calendario import agrupar_por_periodo
+from funciones.cache_callbacks import CacheCallbacks, filtrar_por_fechas
+from funciones.figuras_parciales import aplicar_serie, parche_figura, ticks_periodo
+from funciones.graficos_dashboard import crear_grafico_atribucion
+from funciones.payload import configurar_payload, plantilla_monto
+from funciones.consolidado_meta import consolidar_meta, rutas_exports
+from funciones.cubo_meta import CuboMeta, HOOK_RATES, MatrizRegional
+from funciones.muestreo import muestrear_serie, rango_relayout, supera_umbral, trazas_base
+from funciones.tema import TEMA
+from funciones.trabajos_fondo import crear_gestor_fondo, callback_pesado, barra_progreso, avance
+
 
 CARD_STYLE = {
     'backgroundColor': COLORS['card_bg'],
@@ -80,11 +81,12 @@ def crear_selector_periodo():
         'borderRadius': '5px'
     })
 
-def crear_contenedor_grafico(id_grafico, titulo=""):
-    """Crea un contenedor para un gráfico."""
+def crear_contenedor_grafico(id_grafico, titulo="", figura=None, id_progreso=None):
+    """Crea un contenedor para un gráfico (opcionalmente con su figura base y barra de progreso)."""
     return html.Div([
         html.H3(titulo, style={'color': COLORS['text'], 'marginBottom': '10px'}),
-        dcc.Graph(id=id_grafico)
+        *([barra_progreso(id_progreso)] if id_progreso is not None else []),
+        dcc.Graph(id=id_grafico) if figura is None else dcc.Graph(id=id_grafico, figure=figura)
     ], style={
         'backgroundColor': COLORS['card_bg'],
         'padding': '15px',
@@ -130,90 +132,39 @@ def cargar_datos_marketing():
     print("\nIniciando carga de datos...")
     
     try:
-    # Crear directorio para gráficos si no existe
-    if not os.path.exists("archivos_output/graficos"):
-        os.makedirs("archivos_output/graficos")
+        # Crear directorio para gráficos si no existe
+        if not os.path.exists("archivos_output/graficos"):
+            os.makedirs("archivos_output/graficos")
             print("Directorio de gráficos creado")
         
-        # Verificar la existencia del archivo
-        archivo_path = "archivos_input/archivos input marketing/Comp-1-Conjunto-Anuncios-2Campañas-3-anuncios-por-dia (2).csv"
-        if not os.path.exists(archivo_path):
-            print(f"ERROR: No se encuentra el archivo en la ruta: {archivo_path}")
-            return None
+        # Consolidado de todos los exports de Meta con desglose por región
+        df_campana = consolidar_meta()['regiones']
+        print(f"Datos cargados exitosamente. Dimensiones: {df_campana.shape}")
         
-        print(f"Cargando archivo: {archivo_path}")
-    # Cargar datos de campaña de Meta
-        df_campana = pd.read_csv(archivo_path)
-        print(f"Archivo cargado exitosamente. Dimensiones: {df_campana.shape}")
+        print("\nCreando DataFrame de gasto diario...")
+        # Crear una copia del DataFrame de campaña para usarlo como gasto diario
+        df_gasto_diario = df_campana.groupby('Día')['Importe gastado (CLP)'].sum().reset_index()
         
-        # Mostrar las columnas disponibles
-        print("\nColumnas en el archivo:")
-        print(df_campana.columns.tolist())
-    
-    # Convertir columnas numéricas en df_campana (limpiando formato de moneda)
-    columnas_numericas = [
-        "Alcance", "Impresiones", "Frecuencia", "Importe gastado (CLP)", 
-        "Clics en el enlace", "CTR (todos)", "CPC (todos)", 
-        "CPM (costo por mil impresiones)", "Artículos agregados al carrito",
-            "Costo por artículo agregado al carrito", "Reproducciones de video de 3 segundos",
-            "Reproducciones de video hasta el 25%", "Reproducciones de video hasta el 50%",
-            "Reproducciones de video hasta el 75%", "Reproducciones de video hasta el 100%"
-    ]
-    
-        print("\nConvirtiendo columnas numéricas...")
-    # Convertir columnas numéricas
-    for col in columnas_numericas:
-        if col in df_campana.columns:
-            df_campana.loc[:, col] = pd.to_numeric(df_campana[col].astype(str).str.replace(',', '.'), errors='coerce')
-                print(f"Columna {col} convertida")
-    
-        print("\nAñadiendo columnas calculadas...")
-    # Añadir columnas útiles para análisis
-    df_campana.loc[:, 'CTR (%)'] = df_campana['CTR (todos)'] * 100  # Convertir a porcentaje
+        # Cubo de sumas aditivas del que salen todas las razones (CTR, CPC, hook rates)
+        cubo_meta = CuboMeta.desde_hechos(df_campana)
+        # Día × región × medida acumulada: la vista regional solo resta dos filas y divide
+        matriz_regional = MatrizRegional.desde_cubo(cubo_meta)
+        
+        # Gasto por plataforma y por público contra las reservas creadas (opcional: sin archivos no se muestra)
+        try:
+            atribucion = cargar_atribucion(cubo_meta)
+        except Exception as e:
+            print(f"⚠️ Atribución de gasto a reservas no disponible: {e}")
+            atribucion = {}
         
-        # Calcular métricas de hook rate
-        df_campana.loc[:, 'Hook Rate 3s (%)'] = (df_campana['Reproducciones de video de 3 segundos'] / df_campana['Impresiones'] * 100).fillna(0)
-        df_campana.loc[:, 'Hook Rate 25% (%)'] = (df_campana['Reproducciones de video hasta el 25%'] / df_campana['Impresiones'] * 100).fillna(0)
-        df_campana.loc[:, 'Hook Rate 50% (%)'] = (df_campana['Reproducciones de video hasta el 50%'] / df_campana['Impresiones'] * 100).fillna(0)
-        df_campana.loc[:, 'Hook Rate 75% (%)'] = (df_campana['Reproducciones de video hasta el 75%'] / df_campana['Impresiones'] * 100).fillna(0)
-        df_campana.loc[:, 'Hook Rate 100% (%)'] = (df_campana['Reproducciones de video hasta el 100%'] / df_campana['Impresiones'] * 100).fillna(0)
-    
-    # Identificar categoría de público (advantage vs pucon)
-    df_campana.loc[:, 'Público'] = df_campana['Nombre del conjunto de anuncios'].apply(
-        lambda x: 'Advantage' if 'advantage' in str(x).lower() else 
-                  'Pucón' if 'pucon' in str(x).lower() else 'Otro'
-    )
-    
-    # Clasificar tipo de anuncio
-    df_campana.loc[:, 'Tipo de Anuncio'] = df_campana['Nombre del anuncio'].apply(
-        lambda x: 'Video explicativo' if 'explicando servicio' in str(x).lower() else
-                  'Video inicial' if 'inicial' in str(x).lower() else
-                  'Video publicitario' if 'publicitario' in str(x).lower() else
-                  'Video Flo' if 'flo' in str(x).lower() else
-                  'Día de la madre' if 'madre' in str(x).lower() or 'dia madre' in str(x).lower() else
-                  'Parejas Amor' if 'parejas amor' in str(x).lower() else
-                  'Parejas Descuento' if 'parejas dcto' in str(x).lower() or 'parejas descuento' in str(x).lower() else
-                  'Video Karin' if 'karin' in str(x).lower() else
-                  'Video Lluvia' if 'lluvia' in str(x).lower() else
-                  'Otro'
-    )
-    
-        print("\nConvirtiendo fechas...")
-    # Convertir fechas
-    df_campana.loc[:, 'Día'] = pd.to_datetime(df_campana['Día'])
-    
-    # Llenar valores nulos en nombres de campaña
-    df_campana.loc[:, 'Nombre de la campaña'] = df_campana['Nombre de la campaña'].fillna('Sin nombre')
-    
-        print("\nCreando DataFrame de gasto diario...")
-    # Crear una copia del DataFrame de campaña para usarlo como gasto diario
-    df_gasto_diario = df_campana.groupby('Día')['Importe gastado (CLP)'].sum().reset_index()
-    
         print("Carga de datos completada exitosamente")
-    return {
-        'campana_meta': df_campana,
-        'gasto_diario_meta': df_gasto_diario
-    }
+        return {
+            'campana_meta': df_campana,
+            'cubo_meta': cubo_meta,
+            'matriz_regional': matriz_regional,
+            'atribucion': atribucion,
+            'gasto_diario_meta': df_gasto_diario
+        }
     
     except Exception as e:
         print(f"\nError al cargar los datos: {str(e)}")
@@ -222,32 +173,21 @@ def cargar_datos_marketing():
         return None
 
 # ======== FUNCIONES PARA GRÁFICOS ========
-def crear_grafico_rendimiento_adsets(df_campana):
+def crear_grafico_rendimiento_adsets(cubo):
     """Crea un gráfico que compara el rendimiento de los diferentes conjuntos de anuncios."""
     
-    if df_campana.empty:
+    if cubo.vacio:
         # Devolver un gráfico vacío si no hay datos
         fig = go.Figure()
         fig.update_layout(
             title='No hay datos disponibles para el período seleccionado',
-            paper_bgcolor=COLORS['card_bg'],
-            plot_bgcolor=COLORS['card_bg'],
-            font={'color': COLORS['text']},
+            template=TEMA,
             height=500
         )
         return fig
     
-    # Agrupar por conjunto de anuncios
-    metrics_by_adset = df_campana.groupby('Nombre del conjunto de anuncios').agg({
-        'Importe gastado (CLP)': 'sum',
-        'Impresiones': 'sum',
-        'Clics en el enlace': 'sum',
-        'Artículos agregados al carrito': 'sum'
-    }).reset_index()
-    
-    # Calcular métricas adicionales
-    metrics_by_adset['CTR (%)'] = (metrics_by_adset['Clics en el enlace'] / metrics_by_adset['Impresiones'] * 100).fillna(0)
-    metrics_by_adset['CPC (CLP)'] = (metrics_by_adset['Importe gastado (CLP)'] / metrics_by_adset['Clics en el enlace']).fillna(0)
+    # Sumas por nombre del conjunto de anuncios y razones suma/suma desde el cubo
+    metrics_by_adset = cubo.resumen('Nombre del conjunto de anuncios', ['CTR (%)', 'CPC (CLP)'])
     
     # Ordenar por gasto total y tomar los top 10
     metrics_by_adset = metrics_by_adset.sort_values('Importe gastado (CLP)', ascending=False).head(10)
@@ -279,24 +219,15 @@ def crear_grafico_rendimiento_adsets(df_campana):
     # Configurar diseño
     fig.update_layout(
         title='Rendimiento de Conjuntos de Anuncios',
-        paper_bgcolor=COLORS['card_bg'],
-        plot_bgcolor=COLORS['card_bg'],
-        font={'color': COLORS['text']},
+        template=TEMA,
         height=500,
         xaxis=dict(
             title='Conjunto de Anuncios',
-            showgrid=True,
-            gridcolor=COLORS['grid'],
-            tickfont={'color': COLORS['text'], 'size': 10},
-            title_font={'color': COLORS['text']},
+            tickfont={'size': 10},
             tickangle=45
         ),
         yaxis=dict(
             title='Gasto Total (CLP)',
-            showgrid=True,
-            gridcolor=COLORS['grid'],
-            tickfont={'color': COLORS['text']},
-            title_font={'color': COLORS['text']},
             tickformat='$,.0f'
         ),
         yaxis2=dict(
@@ -307,40 +238,26 @@ def crear_grafico_rendimiento_adsets(df_campana):
             tickfont={'color': '#FFD700'},
             title_font={'color': '#FFD700'}
         ),
-        legend=dict(font=dict(color=COLORS['text'])),
         hovermode='closest'
     )
     
     return fig
 
-def crear_grafico_comparacion_publicos(df_campana):
+def crear_grafico_comparacion_publicos(cubo):
     """Crea un gráfico que compara el rendimiento entre los diferentes públicos."""
     
-    if df_campana.empty:
+    if cubo.vacio:
         # Devolver un gráfico vacío si no hay datos
         fig = go.Figure()
         fig.update_layout(
             title='No hay datos disponibles para el período seleccionado',
-            paper_bgcolor=COLORS['card_bg'],
-            plot_bgcolor=COLORS['card_bg'],
-            font={'color': COLORS['text']},
+            template=TEMA,
             height=500
         )
         return fig
     
-    # Agrupar por público
-    metrics_by_audience = df_campana.groupby('Público').agg({
-        'Importe gastado (CLP)': 'sum',
-        'Impresiones': 'sum',
-        'Clics en el enlace': 'sum',
-        'Artículos agregados al carrito': 'sum'
-    }).reset_index()
-    
-    # Calcular métricas adicionales
-    metrics_by_audience['CTR (%)'] = (metrics_by_audience['Clics en el enlace'] / metrics_by_audience['Impresiones'] * 100).fillna(0)
-    metrics_by_audience['CPC (CLP)'] = (metrics_by_audience['Importe gastado (CLP)'] / metrics_by_audience['Clics en el enlace']).fillna(0)
-    metrics_by_audience['Conversión (%)'] = (metrics_by_audience['Artículos agregados al carrito'] / metrics_by_audience['Clics en el enlace'] * 100).fillna(0)
-    metrics_by_audience['Costo por Conversión (CLP)'] = (metrics_by_audience['Importe gastado (CLP)'] / metrics_by_audience['Artículos agregados al carrito']).fillna(0)
+    # Sumas por público y razones suma/suma desde el cubo
+    metrics_by_audience = cubo.resumen('Público', ['CTR (%)', 'CPC (CLP)', 'Conversión (%)', 'Costo por Conversión (CLP)'])
     
     # Crear figura con subplots
     fig = make_subplots(
@@ -437,27 +354,14 @@ def crear_grafico_comparacion_publicos(df_campana):
     # Actualizar diseño
     fig.update_layout(
         title='Comparación entre Públicos',
-        paper_bgcolor=COLORS['card_bg'],
-        plot_bgcolor=COLORS['card_bg'],
-        font={'color': COLORS['text']},
+        template=TEMA,
         height=1000,  # Aumentar altura para acomodar todos los subplots
         showlegend=False,
         margin=dict(t=100)
     )
     
     # Actualizar ejes
-    fig.update_xaxes(
-        showgrid=True,
-        gridcolor=COLORS['grid'],
-        tickfont={'color': COLORS['text'], 'size': 10}
-    )
-    
-    fig.update_yaxes(
-        showgrid=True,
-        gridcolor=COLORS['grid'],
-        tickfont={'color': COLORS['text']},
-        title_font={'color': COLORS['text']}
-    )
+    fig.update_xaxes(tickfont={'size': 10})
     
     # Actualizar formato específico para cada tipo de métrica
     for i in range(1, 7):
@@ -473,31 +377,21 @@ def crear_grafico_comparacion_publicos(df_campana):
     
     return fig
 
-def crear_grafico_hook_rates(df_campana):
+def crear_grafico_hook_rates(cubo):
     """Crea un gráfico que compara los diferentes hook rates por tipo de anuncio."""
     
-    if df_campana.empty:
+    if cubo.vacio:
         # Devolver un gráfico vacío si no hay datos
         fig = go.Figure()
         fig.update_layout(
             title='No hay datos disponibles para el período seleccionado',
-            paper_bgcolor=COLORS['card_bg'],
-            plot_bgcolor=COLORS['card_bg'],
-            font={'color': COLORS['text']},
+            template=TEMA,
             height=500
         )
         return fig
     
-    # Agrupar por tipo de anuncio y calcular promedios de hook rates
-    metrics_by_ad = df_campana.groupby('Tipo de Anuncio').agg({
-        'Hook Rate 3s (%)': 'mean',
-        'Hook Rate 25% (%)': 'mean',
-        'Hook Rate 50% (%)': 'mean',
-        'Hook Rate 75% (%)': 'mean',
-        'Hook Rate 100% (%)': 'mean',
-        'Impresiones': 'sum'  # Para referencia
-    }).reset_index()
-    
+    # Sumas por tipo de anuncio y razones suma/suma desde el cubo
+    metrics_by_ad = cubo.resumen('Tipo de Anuncio', HOOK_RATES)
     # Ordenar por Hook Rate 3s
     metrics_by_ad = metrics_by_ad.sort_values('Hook Rate 3s (%)', ascending=True)
     
@@ -563,95 +457,45 @@ def crear_grafico_hook_rates(df_campana):
     fig.update_layout(
         title='Hook Rates por Tipo de Anuncio',
         barmode='group',
-        paper_bgcolor=COLORS['card_bg'],
-        plot_bgcolor=COLORS['card_bg'],
-        font={'color': COLORS['text']},
+        template=TEMA,
         height=500,
         xaxis=dict(
             title='Hook Rate (%)',
-            showgrid=True,
-            gridcolor=COLORS['grid'],
-            tickfont={'color': COLORS['text']},
-            title_font={'color': COLORS['text']},
             tickformat='.2f'
         ),
         yaxis=dict(
             title='Tipo de Anuncio',
-            showgrid=False,
-            tickfont={'color': COLORS['text']},
-            title_font={'color': COLORS['text']}
+            showgrid=False
         ),
         legend=dict(
             orientation='h',
             yanchor='bottom',
             y=1.02,
             xanchor='right',
-            x=1,
-            font=dict(color=COLORS['text'])
+            x=1
         ),
         margin=dict(l=200)  # Margen izquierdo para nombres largos
     )
     
     return fig
 
-def crear_grafico_evolucion_diaria(df_gasto_diario, periodo):
-    """Crea un gráfico que muestra la evolución diaria del gasto en Meta Ads."""
-    
-    if df_gasto_diario.empty:
-        # Devolver un gráfico vacío si no hay datos
-        fig = go.Figure()
-        fig.update_layout(
-            title='No hay datos disponibles para el período seleccionado',
-            paper_bgcolor=COLORS['card_bg'],
-            plot_bgcolor=COLORS['card_bg'],
-            font={'color': COLORS['text']},
-            height=500
-        )
-        return fig
-    
-    # Agrupar datos según el período seleccionado
-    if periodo == 'D':
-        df_agrupado = df_gasto_diario.copy()
-        formato_fecha = '%d/%m/%Y'
-        titulo = 'Evolución Diaria del Gasto en Meta Ads'
-    elif periodo == 'W':
-        df_agrupado = df_gasto_diario.groupby(
-            df_gasto_diario['Día'].dt.to_period('W').dt.start_time
-        )['Importe gastado (CLP)'].sum().reset_index()
-        df_agrupado['fecha_label'] = df_agrupado['Día'].dt.strftime('Semana del %d/%m/%Y')
-        formato_fecha = 'Semana del %d/%m/%Y'
-        titulo = 'Evolución Semanal del Gasto en Meta Ads'
-    else:  # 'M'
-        df_agrupado = df_gasto_diario.groupby(
-            df_gasto_diario['Día'].dt.to_period('M').dt.start_time
-        )['Importe gastado (CLP)'].sum().reset_index()
-        df_agrupado['fecha_label'] = df_agrupado['Día'].dt.strftime('%B %Y')
-        formato_fecha = '%B %Y'
-        titulo = 'Evolución Mensual del Gasto en Meta Ads'
-    
-    # Calcular la tendencia
-    x_num = np.arange(len(df_agrupado))
-    y = df_agrupado['Importe gastado (CLP)'].values
-    z = np.polyfit(x_num, y, 1)
-    p = np.poly1d(z)
-    tendencia = p(x_num)
-    
-    # Crear figura
+def figura_base_evolucion_diaria():
+    """Layout y trazas vacías del gráfico de evolución del gasto en Meta Ads."""
     fig = go.Figure()
     
-    # Añadir barras para el gasto
+    # Barras para el gasto
     fig.add_trace(go.Bar(
-        x=df_agrupado['Día'],
-        y=df_agrupado['Importe gastado (CLP)'],
+        x=[],
+        y=[],
         name='Gasto',
         marker_color=COLORS['expense'],
         hovertemplate='Fecha: %{x}<br>Gasto: $%{y:,.0f}<br>'
     ))
     
-    # Añadir línea de tendencia
+    # Línea de tendencia
     fig.add_trace(go.Scatter(
-        x=df_agrupado['Día'],
-        y=tendencia,
+        x=[],
+        y=[],
         name='Tendencia',
         mode='lines',
         line=dict(color='#FFD700', width=2, dash='dash'),
@@ -660,67 +504,81 @@ def crear_grafico_evolucion_diaria(df_gasto_diario, periodo):
     
     # Configurar diseño
     fig.update_layout(
-        title=titulo,
-        paper_bgcolor=COLORS['card_bg'],
-        plot_bgcolor=COLORS['card_bg'],
-        font={'color': COLORS['text']},
+        template=TEMA,
         height=500,
-        xaxis=dict(
-            title='Fecha',
-            showgrid=True,
-            gridcolor=COLORS['grid'],
-            tickfont={'color': COLORS['text']},
-            title_font={'color': COLORS['text']},
-            tickangle=45 if periodo == 'D' else 0
-        ),
+        xaxis_title='Fecha',
         yaxis=dict(
             title='Gasto (CLP)',
-            showgrid=True,
-            gridcolor=COLORS['grid'],
-            tickfont={'color': COLORS['text']},
-            title_font={'color': COLORS['text']},
             tickformat='$,.0f'
         ),
-        legend=dict(font=dict(color=COLORS['text'])),
         hovermode='x unified'
     )
+    return fig
+
+def series_evolucion_diaria(df_gasto_diario, periodo):
+    """Gasto agrupado por periodo y su línea de tendencia."""
+    
+    if df_gasto_diario.empty:
+        return {
+            'titulo': 'No hay datos disponibles para el período seleccionado',
+            'trazas': [{'x': [], 'y': []}, {'x': [], 'y': []}],
+            'ejes': {'xaxis': ticks_periodo('D')}
+        }
+    
+    # Agrupar datos según el período seleccionado
+    if periodo == 'D':
+        df_agrupado = df_gasto_diario
+        titulo = 'Evolución Diaria del Gasto en Meta Ads'
+    else:
+        # Semana (lunes) y mes desde el calendario compartido, con etiquetas en español
+        grupo, etiqueta = agrupar_por_periodo(df_gasto_diario, 'Día', periodo)
+        df_agrupado = df_gasto_diario['Importe gastado (CLP)'].groupby(grupo).sum().rename_axis('Día').reset_index()
+        df_agrupado['fecha_label'] = etiqueta.groupby(grupo).first().reindex(df_agrupado['Día']).to_numpy()
+        titulo = 'Evolución Semanal del Gasto en Meta Ads' if periodo == 'W' else 'Evolución Mensual del Gasto en Meta Ads'
+    
+    # Calcular la tendencia
+    x_num = np.arange(len(df_agrupado))
+    y = df_agrupado['Importe gastado (CLP)'].values
+    z = np.polyfit(x_num, y, 1)
+    p = np.poly1d(z)
+    tendencia = p(x_num)
     
     # Ajustar etiquetas si es semanal o mensual
-    if periodo in ['W', 'M']:
-        fig.update_xaxes(
-            ticktext=df_agrupado['fecha_label'],
-            tickvals=df_agrupado['Día']
-        )
+    ejes_x = ticks_periodo(
+        periodo,
+        tickvals=df_agrupado['Día'],
+        ticktext=df_agrupado['fecha_label'] if periodo in ['W', 'M'] else None
+    )
+    ejes_x['tickangle'] = 45 if periodo == 'D' else 0
     
-    return fig
+    return {
+        'titulo': titulo,
+        'trazas': [
+            {'x': df_agrupado['Día'], 'y': df_agrupado['Importe gastado (CLP)']},
+            {'x': df_agrupado['Día'], 'y': tendencia}
+        ],
+        'ejes': {'xaxis': ejes_x}
+    }
+
+def crear_grafico_evolucion_diaria(df_gasto_diario, periodo):
+    """Crea un gráfico que muestra la evolución diaria del gasto en Meta Ads."""
+    return aplicar_serie(figura_base_evolucion_diaria(), series_evolucion_diaria(df_gasto_diario, periodo))
 
-def crear_grafico_anuncios_rendimiento(df_campana):
+def crear_grafico_anuncios_rendimiento(cubo):
     """Crea un gráfico que muestra el rendimiento de los diferentes anuncios."""
     
-    if df_campana.empty:
+    if cubo.vacio:
         # Devolver un gráfico vacío si no hay datos
         fig = go.Figure()
         fig.update_layout(
             title='No hay datos disponibles para el período seleccionado',
-            paper_bgcolor=COLORS['card_bg'],
-            plot_bgcolor=COLORS['card_bg'],
-            font={'color': COLORS['text']},
+            template=TEMA,
             height=500
         )
         return fig
     
-    # Agrupar por tipo de anuncio
-    metrics_by_ad = df_campana.groupby('Tipo de Anuncio').agg({
-        'Importe gastado (CLP)': 'sum',
-        'Impresiones': 'sum',
-        'Clics en el enlace': 'sum',
-        'Artículos agregados al carrito': 'sum'
-    }).reset_index()
-    
-    # Calcular métricas adicionales
-    metrics_by_ad['CTR (%)'] = (metrics_by_ad['Clics en el enlace'] / metrics_by_ad['Impresiones'] * 100).fillna(0)
-    metrics_by_ad['CPC (CLP)'] = (metrics_by_ad['Importe gastado (CLP)'] / metrics_by_ad['Clics en el enlace']).fillna(0)
-    metrics_by_ad['Conversión (%)'] = (metrics_by_ad['Artículos agregados al carrito'] / metrics_by_ad['Clics en el enlace'] * 100).fillna(0)
+    # Sumas por tipo de anuncio y razones suma/suma desde el cubo
+    metrics_by_ad = cubo.resumen('Tipo de Anuncio', ['CTR (%)', 'CPC (CLP)', 'Conversión (%)'])
     
     # Ordenar por gasto total
     metrics_by_ad = metrics_by_ad.sort_values('Importe gastado (CLP)', ascending=False)
@@ -771,24 +629,16 @@ def crear_grafico_anuncios_rendimiento(df_campana):
     # Configurar diseño
     fig.update_layout(
         title='Rendimiento por Tipo de Anuncio',
-        paper_bgcolor=COLORS['card_bg'],
-        plot_bgcolor=COLORS['card_bg'],
-        font={'color': COLORS['text']},
+        template=TEMA,
         height=max(500, len(metrics_by_ad) * 60),  # Altura dinámica según cantidad de tipos
         showlegend=True,
         xaxis=dict(
             title='Gasto Total (CLP)',
-            showgrid=True,
-            gridcolor=COLORS['grid'],
-            tickfont={'color': COLORS['text']},
-            title_font={'color': COLORS['text']},
             tickformat='$,.0f',
             domain=[0, 0.5]
         ),
         xaxis2=dict(
             title='CTR (%)',
-            showgrid=True,
-            gridcolor=COLORS['grid'],
             tickfont={'color': '#FFD700'},
             title_font={'color': '#FFD700'},
             overlaying='x',
@@ -798,8 +648,6 @@ def crear_grafico_anuncios_rendimiento(df_campana):
         ),
         xaxis3=dict(
             title='Conversión (%)',
-            showgrid=True,
-            gridcolor=COLORS['grid'],
             tickfont={'color': '#6AB187'},
             title_font={'color': '#6AB187'},
             overlaying='x',
@@ -807,13 +655,8 @@ def crear_grafico_anuncios_rendimiento(df_campana):
             position=0.75,
             domain=[0.75, 1]
         ),
-        yaxis=dict(
-            showgrid=False,
-            tickfont={'color': COLORS['text']},
-            title_font={'color': COLORS['text']}
-        ),
+        yaxis=dict(showgrid=False),
         legend=dict(
-            font=dict(color=COLORS['text']),
             x=0.5,
             y=-0.2,
             orientation='h',
@@ -824,34 +667,21 @@ def crear_grafico_anuncios_rendimiento(df_campana):
     
     return fig
 
-def crear_grafico_comparacion_metricas(df_campana, metrica_seleccionada=None):
+def crear_grafico_comparacion_metricas(cubo, metrica_seleccionada=None):
     """Crea un gráfico que compara todas las métricas principales entre los diferentes anuncios."""
     
-    if df_campana.empty:
+    if cubo.vacio:
         # Devolver un gráfico vacío si no hay datos
         fig = go.Figure()
         fig.update_layout(
             title='No hay datos disponibles para el período seleccionado',
-            paper_bgcolor=COLORS['card_bg'],
-            plot_bgcolor=COLORS['card_bg'],
-            font={'color': COLORS['text']},
+            template=TEMA,
             height=500
         )
         return fig
     
-    # Agrupar por tipo de anuncio y calcular todas las métricas
-    metrics_by_ad = df_campana.groupby('Tipo de Anuncio').agg({
-        'Importe gastado (CLP)': 'sum',
-        'Impresiones': 'sum',
-        'Clics en el enlace': 'sum',
-        'Artículos agregados al carrito': 'sum'
-    }).reset_index()
-    
-    # Calcular métricas adicionales
-    metrics_by_ad['CTR (%)'] = (metrics_by_ad['Clics en el enlace'] / metrics_by_ad['Impresiones'] * 100).fillna(0)
-    metrics_by_ad['CPC (CLP)'] = (metrics_by_ad['Importe gastado (CLP)'] / metrics_by_ad['Clics en el enlace']).fillna(0)
-    metrics_by_ad['Conversión (%)'] = (metrics_by_ad['Artículos agregados al carrito'] / metrics_by_ad['Clics en el enlace'] * 100).fillna(0)
-    metrics_by_ad['Costo por Conversión (CLP)'] = (metrics_by_ad['Importe gastado (CLP)'] / metrics_by_ad['Artículos agregados al carrito']).fillna(0)
+    # Sumas por tipo de anuncio y razones suma/suma desde el cubo
+    metrics_by_ad = cubo.resumen('Tipo de Anuncio', ['CTR (%)', 'CPC (CLP)', 'Conversión (%)', 'Costo por Conversión (CLP)'])
     
     # Crear figura con subplots
     fig = make_subplots(
@@ -948,9 +778,7 @@ def crear_grafico_comparacion_metricas(df_campana, metrica_seleccionada=None):
     # Actualizar diseño
     fig.update_layout(
         title='Comparación de Métricas por Tipo de Anuncio',
-        paper_bgcolor=COLORS['card_bg'],
-        plot_bgcolor=COLORS['card_bg'],
-        font={'color': COLORS['text']},
+        template=TEMA,
         height=1000,  # Aumentar altura para acomodar todos los subplots
         showlegend=False,
         margin=dict(t=100)
@@ -958,19 +786,10 @@ def crear_grafico_comparacion_metricas(df_campana, metrica_seleccionada=None):
     
     # Actualizar ejes
     fig.update_xaxes(
-        showgrid=True,
-        gridcolor=COLORS['grid'],
-        tickfont={'color': COLORS['text'], 'size': 10},
+        tickfont={'size': 10},
         tickangle=45
     )
     
-    fig.update_yaxes(
-            showgrid=True,
-            gridcolor=COLORS['grid'],
-            tickfont={'color': COLORS['text']},
-            title_font={'color': COLORS['text']}
-    )
-    
     # Actualizar formato específico para cada tipo de métrica
     for i in range(1, 7):
         row = (i-1) // 2 + 1
@@ -995,7 +814,6 @@ def generar_insights_evolucion_gasto(df_gasto_diario):
     # Calcular métricas clave
     gasto_total = df_gasto_diario['Importe gastado (CLP)'].sum()
     gasto_promedio = df_gasto_diario['Importe gastado (CLP)'].mean()
-    dias_totales = len(df_gasto_diario)
     
     # Calcular tendencia
     x = np.arange(len(df_gasto_diario))
@@ -1027,24 +845,14 @@ def generar_insights_evolucion_gasto(df_gasto_diario):
     
     return html.Div([html.P(insight) for insight in insights])
 
-def generar_insights_adsets(df_campana):
+def generar_insights_adsets(cubo):
     """Genera insights sobre el rendimiento de los conjuntos de anuncios."""
     
-    if df_campana.empty:
+    if cubo.vacio:
         return "No hay datos disponibles para el período seleccionado."
     
-    # Agrupar por conjunto de anuncios
-    metrics_by_adset = df_campana.groupby('Nombre del conjunto de anuncios').agg({
-        'Importe gastado (CLP)': 'sum',
-        'Impresiones': 'sum',
-        'Clics en el enlace': 'sum',
-        'Artículos agregados al carrito': 'sum'
-    }).reset_index()
-    
-    # Calcular métricas adicionales
-    metrics_by_adset['CTR (%)'] = (metrics_by_adset['Clics en el enlace'] / metrics_by_adset['Impresiones'] * 100).fillna(0)
-    metrics_by_adset['CPC (CLP)'] = (metrics_by_adset['Importe gastado (CLP)'] / metrics_by_adset['Clics en el enlace']).fillna(0)
-    metrics_by_adset['Conversión (%)'] = (metrics_by_adset['Artículos agregados al carrito'] / metrics_by_adset['Clics en el enlace'] * 100).fillna(0)
+    # Sumas por nombre del conjunto de anuncios y razones suma/suma desde el cubo
+    metrics_by_adset = cubo.resumen('Nombre del conjunto de anuncios', ['CTR (%)', 'CPC (CLP)', 'Conversión (%)'])
     
     # Identificar mejores y peores conjuntos
     mejor_ctr = metrics_by_adset.nlargest(1, 'CTR (%)').iloc[0]
@@ -1069,24 +877,14 @@ def generar_insights_adsets(df_campana):
     
     return html.Div([html.P(insight) for insight in insights])
 
-def generar_insights_publicos(df_campana):
+def generar_insights_publicos(cubo):
     """Genera insights sobre el rendimiento de los diferentes públicos."""
     
-    if df_campana.empty:
+    if cubo.vacio:
         return "No hay datos disponibles para el período seleccionado."
     
-    # Agrupar por público
-    metrics_by_audience = df_campana.groupby('Público').agg({
-        'Importe gastado (CLP)': 'sum',
-        'Impresiones': 'sum',
-        'Clics en el enlace': 'sum',
-        'Artículos agregados al carrito': 'sum'
-    }).reset_index()
-    
-    # Calcular métricas adicionales
-    metrics_by_audience['CTR (%)'] = (metrics_by_audience['Clics en el enlace'] / metrics_by_audience['Impresiones'] * 100).fillna(0)
-    metrics_by_audience['CPC (CLP)'] = (metrics_by_audience['Importe gastado (CLP)'] / metrics_by_audience['Clics en el enlace']).fillna(0)
-    metrics_by_audience['Conversión (%)'] = (metrics_by_audience['Artículos agregados al carrito'] / metrics_by_audience['Clics en el enlace'] * 100).fillna(0)
+    # Sumas por público y razones suma/suma desde el cubo
+    metrics_by_audience = cubo.resumen('Público', ['CTR (%)', 'CPC (CLP)', 'Conversión (%)'])
     
     # Generar insights
     insights = []
@@ -1114,24 +912,14 @@ def generar_insights_publicos(df_campana):
     
     return html.Div([html.P(insight) for insight in insights])
 
-def generar_insights_anuncios(df_campana):
+def generar_insights_anuncios(cubo):
     """Genera insights sobre el rendimiento de los diferentes tipos de anuncios."""
     
-    if df_campana.empty:
+    if cubo.vacio:
         return "No hay datos disponibles para el período seleccionado."
     
-    # Agrupar por tipo de anuncio
-    metrics_by_ad = df_campana.groupby('Tipo de Anuncio').agg({
-        'Importe gastado (CLP)': 'sum',
-        'Impresiones': 'sum',
-        'Clics en el enlace': 'sum',
-        'Artículos agregados al carrito': 'sum'
-    }).reset_index()
-    
-    # Calcular métricas adicionales
-    metrics_by_ad['CTR (%)'] = (metrics_by_ad['Clics en el enlace'] / metrics_by_ad['Impresiones'] * 100).fillna(0)
-    metrics_by_ad['CPC (CLP)'] = (metrics_by_ad['Importe gastado (CLP)'] / metrics_by_ad['Clics en el enlace']).fillna(0)
-    metrics_by_ad['Conversión (%)'] = (metrics_by_ad['Artículos agregados al carrito'] / metrics_by_ad['Clics en el enlace'] * 100).fillna(0)
+    # Sumas por tipo de anuncio y razones suma/suma desde el cubo
+    metrics_by_ad = cubo.resumen('Tipo de Anuncio', ['CTR (%)', 'CPC (CLP)', 'Conversión (%)'])
     
     # Ordenar por gasto total
     metrics_by_ad = metrics_by_ad.sort_values('Importe gastado (CLP)', ascending=False)
@@ -1160,22 +948,14 @@ def generar_insights_anuncios(df_campana):
     
     return html.Div([html.P(insight) for insight in insights])
 
-def generar_insights_hook_rates(df_campana):
+def generar_insights_hook_rates(cubo):
     """Genera insights sobre los hook rates de los diferentes tipos de anuncios."""
     
-    if df_campana.empty:
+    if cubo.vacio:
         return "No hay datos disponibles para el período seleccionado."
     
-    # Agrupar por tipo de anuncio
-    metrics_by_ad = df_campana.groupby('Tipo de Anuncio').agg({
-        'Hook Rate 3s (%)': 'mean',
-        'Hook Rate 25% (%)': 'mean',
-        'Hook Rate 50% (%)': 'mean',
-        'Hook Rate 75% (%)': 'mean',
-        'Hook Rate 100% (%)': 'mean',
-        'Impresiones': 'sum'
-    }).reset_index()
-    
+    # Sumas por tipo de anuncio y razones suma/suma desde el cubo
+    metrics_by_ad = cubo.resumen('Tipo de Anuncio', HOOK_RATES)
     # Generar insights
     insights = []
     
@@ -1197,63 +977,35 @@ def generar_insights_hook_rates(df_campana):
     
     return html.Div([html.P(insight) for insight in insights])
 
-def crear_grafico_distribucion_regional(df_campana, metrica_seleccionada):
+def crear_grafico_distribucion_regional(matriz, start_date, end_date, metrica_seleccionada):
     """Crea un mapa de calor que muestra la distribución de la métrica seleccionada por región."""
     
-    if df_campana.empty:
-        fig = go.Figure()
-        fig.update_layout(
-            title='No hay datos disponibles para el período seleccionado',
-            paper_bgcolor=COLORS['card_bg'],
-            plot_bgcolor=COLORS['card_bg'],
-            font={'color': COLORS['text']},
-            height=500
-        )
-        return fig
-    
     # Definir las métricas disponibles y sus formatos
     metricas = {
-        'gasto': {'nombre': 'Importe gastado (CLP)', 'formato': '${:,.0f}', 'titulo': 'Gasto por Región'},
-        'impresiones': {'nombre': 'Impresiones', 'formato': '{:,.0f}', 'titulo': 'Impresiones por Región'},
-        'clics': {'nombre': 'Clics en el enlace', 'formato': '{:,.0f}', 'titulo': 'Clics por Región'},
-        'ctr': {'nombre': 'CTR (%)', 'formato': '{:.2f}%', 'titulo': 'CTR por Región'},
-        'cpc': {'nombre': 'CPC (todos)', 'formato': '${:,.0f}', 'titulo': 'CPC por Región'},
-        'conversiones': {'nombre': 'Artículos agregados al carrito', 'formato': '{:,.0f}', 'titulo': 'Conversiones por Región'},
-        'hook_rate_3s': {'nombre': 'Hook Rate 3s (%)', 'formato': '{:.2f}%', 'titulo': 'Hook Rate 3s por Región'}
+        'gasto': {'nombre': 'Importe gastado (CLP)', 'formato': '${:,.0f}', 'plantilla': plantilla_monto(), 'titulo': 'Gasto por Región'},
+        'impresiones': {'nombre': 'Impresiones', 'formato': '{:,.0f}', 'plantilla': '%{y:,.0f}', 'titulo': 'Impresiones por Región'},
+        'clics': {'nombre': 'Clics en el enlace', 'formato': '{:,.0f}', 'plantilla': '%{y:,.0f}', 'titulo': 'Clics por Región'},
+        'ctr': {'nombre': 'CTR (%)', 'formato': '{:.2f}%', 'plantilla': '%{y:.2f}%', 'titulo': 'CTR por Región'},
+        'cpc': {'nombre': 'CPC (CLP)', 'formato': '${:,.0f}', 'plantilla': plantilla_monto(), 'titulo': 'CPC por Región'},
+        'conversiones': {'nombre': 'Artículos agregados al carrito', 'formato': '{:,.0f}', 'plantilla': '%{y:,.0f}', 'titulo': 'Conversiones por Región'},
+        'hook_rate_3s': {'nombre': 'Hook Rate 3s (%)', 'formato': '{:.2f}%', 'plantilla': '%{y:.2f}%', 'titulo': 'Hook Rate 3s por Región'}
     }
     
     # Obtener la métrica seleccionada
     metrica = metricas[metrica_seleccionada]
     
-    # Agrupar por región
-    if metrica_seleccionada == 'ctr':
-        # Para CTR, necesitamos calcular clics/impresiones
-        df_region = df_campana.groupby('Región').agg({
-            'Clics en el enlace': 'sum',
-            'Impresiones': 'sum'
-        }).reset_index()
-        df_region['CTR (%)'] = (df_region['Clics en el enlace'] / df_region['Impresiones'] * 100).fillna(0)
-        valores = df_region['CTR (%)']
-    elif metrica_seleccionada == 'cpc':
-        # Para CPC, necesitamos calcular gasto/clics
-        df_region = df_campana.groupby('Región').agg({
-            'Importe gastado (CLP)': 'sum',
-            'Clics en el enlace': 'sum'
-        }).reset_index()
-        df_region['CPC (todos)'] = (df_region['Importe gastado (CLP)'] / df_region['Clics en el enlace']).fillna(0)
-        valores = df_region['CPC (todos)']
-    elif metrica_seleccionada == 'hook_rate_3s':
-        # Para Hook Rate, necesitamos calcular reproducciones/impresiones
-        df_region = df_campana.groupby('Región').agg({
-            'Reproducciones de video de 3 segundos': 'sum',
-            'Impresiones': 'sum'
-        }).reset_index()
-        df_region['Hook Rate 3s (%)'] = (df_region['Reproducciones de video de 3 segundos'] / df_region['Impresiones'] * 100).fillna(0)
-        valores = df_region['Hook Rate 3s (%)']
-    else:
-        # Para métricas simples, solo sumamos
-        df_region = df_campana.groupby('Región')[metrica['nombre']].sum().reset_index()
-        valores = df_region[metrica['nombre']]
+    # Sumas del rango por región (dos filas de la matriz acumulada) y la métrica suma/suma
+    df_region = matriz.valores(metrica['nombre'], start_date, end_date)
+    if df_region.empty:
+        fig = go.Figure()
+        fig.update_layout(
+            title='No hay datos disponibles para el período seleccionado',
+            template=TEMA,
+            height=500
+        )
+        return fig
+    
+    valores = df_region['valor']
     
     # Crear figura
     fig = go.Figure(data=go.Bar(
@@ -1263,56 +1015,39 @@ def crear_grafico_distribucion_regional(df_campana, metrica_seleccionada):
         marker=dict(
             colorscale='Viridis',
             showscale=True,
-            colorbar=dict(
-                title=metrica['titulo'],
-                tickfont=dict(color=COLORS['text']),
-                title_font=dict(color=COLORS['text'])  # Cambiado de titlefont a title_font
-            )
+            colorbar=dict(title=metrica['titulo'])
         ),
-        text=[metrica['formato'].format(val) for val in valores],
+        texttemplate=metrica['plantilla'],
         textposition='auto',
     ))
     
     # Actualizar diseño
     fig.update_layout(
         title=metrica['titulo'],
-        paper_bgcolor=COLORS['card_bg'],
-        plot_bgcolor=COLORS['card_bg'],
-        font={'color': COLORS['text']},
+        template=TEMA,
         height=500,
         xaxis=dict(
             title='Región',
-            showgrid=True,
-            gridcolor=COLORS['grid'],
-            tickfont={'color': COLORS['text']},
-            title_font={'color': COLORS['text']},
             tickangle=45
         ),
         yaxis=dict(
             title=metrica['titulo'],
-            showgrid=True,
-            gridcolor=COLORS['grid'],
-            tickfont={'color': COLORS['text']},
-            title_font={'color': COLORS['text']},
             tickformat=metrica['formato'].replace('{:,', '').replace('{:.2', '').replace('f}', '').replace('%}', '%')
         )
     )
     
     return fig
 
-def generar_insights_regionales(df_campana, metrica_seleccionada):
+def generar_insights_regionales(matriz, start_date, end_date, metrica_seleccionada):
     """Genera insights sobre la distribución regional de la métrica seleccionada."""
     
-    if df_campana.empty:
-        return "No hay datos disponibles para el período seleccionado."
-    
     # Definir las métricas y sus descripciones
     metricas = {
         'gasto': {'nombre': 'Importe gastado (CLP)', 'formato': '${:,.0f}', 'desc': 'gasto'},
         'impresiones': {'nombre': 'Impresiones', 'formato': '{:,.0f}', 'desc': 'impresiones'},
         'clics': {'nombre': 'Clics en el enlace', 'formato': '{:,.0f}', 'desc': 'clics'},
         'ctr': {'nombre': 'CTR (%)', 'formato': '{:.2f}%', 'desc': 'CTR'},
-        'cpc': {'nombre': 'CPC (todos)', 'formato': '${:,.0f}', 'desc': 'CPC'},
+        'cpc': {'nombre': 'CPC (CLP)', 'formato': '${:,.0f}', 'desc': 'CPC'},
         'conversiones': {'nombre': 'Artículos agregados al carrito', 'formato': '{:,.0f}', 'desc': 'conversiones'},
         'hook_rate_3s': {'nombre': 'Hook Rate 3s (%)', 'formato': '{:.2f}%', 'desc': 'Hook Rate 3s'}
     }
@@ -1320,28 +1055,9 @@ def generar_insights_regionales(df_campana, metrica_seleccionada):
     metrica = metricas[metrica_seleccionada]
     insights = []
     
-    # Calcular métricas por región
-    if metrica_seleccionada == 'ctr':
-        df_region = df_campana.groupby('Región').agg({
-            'Clics en el enlace': 'sum',
-            'Impresiones': 'sum'
-        }).reset_index()
-        df_region['valor'] = (df_region['Clics en el enlace'] / df_region['Impresiones'] * 100).fillna(0)
-    elif metrica_seleccionada == 'cpc':
-        df_region = df_campana.groupby('Región').agg({
-            'Importe gastado (CLP)': 'sum',
-            'Clics en el enlace': 'sum'
-        }).reset_index()
-        df_region['valor'] = (df_region['Importe gastado (CLP)'] / df_region['Clics en el enlace']).fillna(0)
-    elif metrica_seleccionada == 'hook_rate_3s':
-        df_region = df_campana.groupby('Región').agg({
-            'Reproducciones de video de 3 segundos': 'sum',
-            'Impresiones': 'sum'
-        }).reset_index()
-        df_region['valor'] = (df_region['Reproducciones de video de 3 segundos'] / df_region['Impresiones'] * 100).fillna(0)
-    else:
-        df_region = df_campana.groupby('Región')[metrica['nombre']].sum().reset_index()
-        df_region['valor'] = df_region[metrica['nombre']]
+    df_region = matriz.valores(metrica['nombre'], start_date, end_date)
+    if df_region.empty:
+        return "No hay datos disponibles para el período seleccionado."
     
     # Encontrar región con mayor y menor valor
     mejor_region = df_region.loc[df_region['valor'].idxmax()]
@@ -1371,24 +1087,38 @@ def generar_insights_regionales(df_campana, metrica_seleccionada):
     return html.Div([html.P(insight) for insight in insights])
 
 # ======== CREACIÓN DE LA APLICACIÓN ========
+def _construir_o_defecto(nombre, funcion, *args, defecto=None):
+    """Ejecuta un constructor de gráfico/insight y devuelve `defecto` si falla."""
+    try:
+        return funcion(*args)
+    except Exception as e:
+        print(f"Error en {nombre}: {str(e)}")
+        return go.Figure() if defecto is None else defecto
+
 def crear_app_marketing():
     """Crea la aplicación Dash para la página de marketing."""
     try:
         print("\nCreando aplicación Dash...")
-    datos = cargar_datos_marketing()
+        datos = cargar_datos_marketing()
         if datos is None:
             print("Error: No se pudieron cargar los datos")
             return None
         
-    df_campana = datos['campana_meta']
-    df_gasto_diario = datos['gasto_diario_meta']
-    
-    app = dash.Dash(__name__, suppress_callback_exceptions=True)
-    
-    # Obtener fechas mínima y máxima
-    fecha_min = df_campana['Día'].min()
-    fecha_max = df_campana['Día'].max()
-    
+        df_campana = datos['campana_meta']
+        cubo_meta = datos['cubo_meta']
+        matriz_regional = datos['matriz_regional']
+        atribucion = datos['atribucion']
+        df_gasto_diario = datos['gasto_diario_meta']
+        
+        app = dash.Dash(__name__, suppress_callback_exceptions=True)
+        configurar_payload(app, 'Marketing Meta')
+        # Métricas por anuncio, hook rates y regiones se calculan en segundo plano
+        gestor_fondo = crear_gestor_fondo('marketing_meta')
+        
+        # Obtener fechas mínima y máxima
+        fecha_min = df_campana['Día'].min()
+        fecha_max = df_campana['Día'].max()
+        
         # Definir las métricas disponibles para el análisis regional
         METRICAS_REGIONALES = [
             {'label': 'Gasto', 'value': 'gasto'},
@@ -1398,237 +1128,287 @@ def crear_app_marketing():
             {'label': 'CPC', 'value': 'cpc'},
             {'label': 'Conversiones', 'value': 'conversiones'}
         ]
-    
-    app.layout = html.Div([
-        crear_header(),
-        html.Div([
-            html.Div("DASHBOARD DE MARKETING - META ADS", style={
-                'color': COLORS['primary'], 
-                'fontSize': '24px', 
-                'fontWeight': 'bold',
-                'padding': '10px',
-                'marginBottom': '20px',
-                'textAlign': 'center',
-                'backgroundColor': COLORS['card_bg'],
-                'borderRadius': '5px'
-            })
-        ]),
-        crear_filtros(fecha_min, fecha_max),
-        html.Div([
-            html.Div([
-                html.H3('Gasto Total Meta', style={'color': COLORS['text'], 'marginBottom': '10px'}),
-                html.H2(id='total-gasto-meta', style={'color': COLORS['expense'], 'fontSize': '2.5em', 'margin': '0'}),
-            ], style=CARD_STYLE),
-            html.Div([
-                html.H3('Impresiones', style={'color': COLORS['text'], 'marginBottom': '10px'}),
-                html.H2(id='total-impresiones', style={'color': COLORS['income'], 'fontSize': '2.5em', 'margin': '0'}),
-            ], style=CARD_STYLE),
-            html.Div([
-                html.H3('Clics', style={'color': COLORS['text'], 'marginBottom': '10px'}),
-                html.H2(id='total-clics', style={'color': COLORS['income'], 'fontSize': '2.5em', 'margin': '0'}),
-            ], style=CARD_STYLE),
-            html.Div([
-                html.H3('CTR Promedio', style={'color': COLORS['text'], 'marginBottom': '10px'}),
-                html.H2(id='ctr-promedio', style={'color': '#FFD700', 'fontSize': '2.5em', 'margin': '0'}),
-            ], style=CARD_STYLE),
+        
+        app.layout = html.Div([
+            crear_header(),
             html.Div([
-                html.H3('CPC Promedio', style={'color': COLORS['text'], 'marginBottom': '10px'}),
-                html.H2(id='cpc-promedio', style={'color': '#FFD700', 'fontSize': '2.5em', 'margin': '0'}),
-            ], style=CARD_STYLE),
+                html.Div("DASHBOARD DE MARKETING - META ADS", style={
+                    'color': COLORS['primary'], 
+                    'fontSize': '24px', 
+                    'fontWeight': 'bold',
+                    'padding': '10px',
+                    'marginBottom': '20px',
+                    'textAlign': 'center',
+                    'backgroundColor': COLORS['card_bg'],
+                    'borderRadius': '5px'
+                })
+            ]),
+            crear_filtros(fecha_min, fecha_max),
             html.Div([
-                html.H3('Artículos al Carrito', style={'color': COLORS['text'], 'marginBottom': '10px'}),
-                html.H2(id='articulos-carrito', style={'color': COLORS['income'], 'fontSize': '2.5em', 'margin': '0'}),
-            ], style=CARD_STYLE),
-        ], style={'display': 'flex', 'justifyContent': 'center', 'marginBottom': '30px', 'flexWrap': 'wrap'}),
-        crear_selector_periodo(),
-        crear_contenedor_grafico('evolucion-gasto-meta', 'Evolución del Gasto en Meta Ads'),
-        crear_contenedor_insights('insights-evolucion', 'Conclusiones: Evolución del Gasto'),
-            crear_contenedor_grafico('comparacion-metricas', 'Comparación de Métricas por Tipo de Anuncio'),
+                html.Div([
+                    html.H3('Gasto Total Meta', style={'color': COLORS['text'], 'marginBottom': '10px'}),
+                    html.H2(id='total-gasto-meta', style={'color': COLORS['expense'], 'fontSize': '2.5em', 'margin': '0'}),
+                ], style=CARD_STYLE),
+                html.Div([
+                    html.H3('Impresiones', style={'color': COLORS['text'], 'marginBottom': '10px'}),
+                    html.H2(id='total-impresiones', style={'color': COLORS['income'], 'fontSize': '2.5em', 'margin': '0'}),
+                ], style=CARD_STYLE),
+                html.Div([
+                    html.H3('Clics', style={'color': COLORS['text'], 'marginBottom': '10px'}),
+                    html.H2(id='total-clics', style={'color': COLORS['income'], 'fontSize': '2.5em', 'margin': '0'}),
+                ], style=CARD_STYLE),
+                html.Div([
+                    html.H3('CTR Promedio', style={'color': COLORS['text'], 'marginBottom': '10px'}),
+                    html.H2(id='ctr-promedio', style={'color': '#FFD700', 'fontSize': '2.5em', 'margin': '0'}),
+                ], style=CARD_STYLE),
+                html.Div([
+                    html.H3('CPC Promedio', style={'color': COLORS['text'], 'marginBottom': '10px'}),
+                    html.H2(id='cpc-promedio', style={'color': '#FFD700', 'fontSize': '2.5em', 'margin': '0'}),
+                ], style=CARD_STYLE),
+                html.Div([
+                    html.H3('Artículos al Carrito', style={'color': COLORS['text'], 'marginBottom': '10px'}),
+                    html.H2(id='articulos-carrito', style={'color': COLORS['income'], 'fontSize': '2.5em', 'margin': '0'}),
+                ], style=CARD_STYLE),
+            ], style={'display': 'flex', 'justifyContent': 'center', 'marginBottom': '30px', 'flexWrap': 'wrap'}),
+            crear_selector_periodo(),
+            crear_contenedor_grafico('evolucion-gasto-meta', 'Evolución del Gasto en Meta Ads', figura=figura_base_evolucion_diaria()),
+            crear_contenedor_insights('insights-evolucion', 'Conclusiones: Evolución del Gasto'),
+            crear_contenedor_grafico('comparacion-metricas', 'Comparación de Métricas por Tipo de Anuncio', id_progreso='progreso-metricas'),
             crear_contenedor_insights('insights-metricas', 'Conclusiones: Comparación de Métricas'),
             crear_contenedor_grafico('comparacion-publicos', 'Comparación entre Públicos'),
             crear_contenedor_insights('insights-publicos', 'Conclusiones: Análisis de Públicos'),
-            crear_contenedor_grafico('hook-rates', 'Hook Rates por Tipo de Anuncio'),
+            crear_contenedor_grafico('hook-rates', 'Hook Rates por Tipo de Anuncio', id_progreso='progreso-hook-rates'),
             crear_contenedor_insights('insights-hook-rates', 'Conclusiones: Hook Rates'),
-        html.Div([
+            html.Div([
                 html.H3('Análisis Regional', style={'color': COLORS['text'], 'marginBottom': '10px'}),
-            dcc.Dropdown(
+                dcc.Dropdown(
                     id='selector-metrica-regional',
                     options=METRICAS_REGIONALES,
                     value='gasto',
-                style={
-                    'backgroundColor': COLORS['card_bg'],
+                    style={
+                        'backgroundColor': COLORS['card_bg'],
                         'color': '#000000',
                         'border': f'1px solid {COLORS["grid"]}',
                         'width': '300px'
-                }
-            )
-        ], style={
+                    }
+                )
+            ], style={
                 'backgroundColor': COLORS['card_bg'],
-            'padding': '15px',
+                'padding': '15px',
                 'marginBottom': '20px',
                 'borderRadius': '5px'
             }),
             crear_contenedor_grafico('distribucion-regional', 'Distribución Regional'),
-            crear_contenedor_insights('insights-regional', 'Conclusiones: Análisis Regional')
-    ], style={
-        'padding': 20,
-        'backgroundColor': COLORS['background'],
-        'minHeight': '100vh'
-    })
-    
-        def actualizar_graficos_marketing(periodo, start_date, end_date, metrica_regional):
+            crear_contenedor_insights('insights-regional', 'Conclusiones: Análisis Regional'),
+            *([
+                html.Div([
+                    html.H3('Atribución de Gasto a Reservas', style={'color': COLORS['text'], 'marginBottom': '10px'}),
+                    html.Div([
+                        dcc.Dropdown(
+                            id='selector-dimension-atribucion',
+                            options=[{'label': f'Por {dimension}', 'value': dimension} for dimension in atribucion],
+                            value=next(iter(atribucion)),
+                            clearable=False,
+                            style={'color': '#000000', 'width': '250px'}
+                        ),
+                        dcc.Dropdown(
+                            id='selector-ventana-atribucion',
+                            options=[{'label': f'Ventana de {ventana} días', 'value': ventana} for ventana in VENTANAS_ATRIBUCION],
+                            value=VENTANAS_ATRIBUCION[len(VENTANAS_ATRIBUCION) // 2],
+                            clearable=False,
+                            style={'color': '#000000', 'width': '250px'}
+                        )
+                    ], style={'display': 'flex', 'gap': '15px'})
+                ], style={
+                    'backgroundColor': COLORS['card_bg'],
+                    'padding': '15px',
+                    'marginBottom': '20px',
+                    'borderRadius': '5px'
+                }),
+                crear_contenedor_grafico('atribucion-reservas', 'Costo por Reserva y ROAS'),
+                crear_contenedor_insights('insights-atribucion', 'Conclusiones: Atribución de Reservas')
+            ] if atribucion else [])
+        ], style={
+            'padding': 20,
+            'backgroundColor': COLORS['background'],
+            'minHeight': '100vh'
+        })
+        
+        # Cada callback depende solo de sus propios inputs; los subcubos filtrados
+        # por fecha se comparten a través de la caché del servidor.
+        cache = CacheCallbacks()
+        
+        def cubo_filtrado(start_date, end_date):
+            return cache.obtener(
+                ('cubo', str(start_date), str(end_date)),
+                lambda: cubo_meta.filtrar(start_date, end_date)
+            )
+        
+        def gasto_filtrado(start_date, end_date):
+            return cache.obtener(
+                ('gasto_diario', str(start_date), str(end_date)),
+                lambda: filtrar_por_fechas(df_gasto_diario, 'Día', start_date, end_date)
+            )
+        
+        @app.callback(
+            [Output('total-gasto-meta', 'children'),
+             Output('total-impresiones', 'children'),
+             Output('total-clics', 'children'),
+             Output('ctr-promedio', 'children'),
+             Output('cpc-promedio', 'children'),
+             Output('articulos-carrito', 'children')],
+            [Input('date-range-picker', 'start_date'),
+             Input('date-range-picker', 'end_date')]
+        )
+        def actualizar_tarjetas(start_date, end_date):
             try:
-                print(f"Actualizando gráficos con periodo={periodo}, start_date={start_date}, end_date={end_date}, metrica={metrica_regional}")
-                
-                # Convertir fechas una sola vez
-                start_date = pd.to_datetime(start_date)
-                end_date = pd.to_datetime(end_date)
-                
-                print("Aplicando filtros de fecha...")
-                # Usar máscaras booleanas para filtrado eficiente
-                mask_campana = (df_campana['Día'] >= start_date) & (df_campana['Día'] <= end_date)
-                mask_gasto = (df_gasto_diario['Día'] >= start_date) & (df_gasto_diario['Día'] <= end_date)
-                
-                df_filtrado = df_campana[mask_campana]
-                df_gasto_filtrado = df_gasto_diario[mask_gasto]
-                
-                print("Calculando métricas totales...")
-                # Calcular métricas totales de una vez
-                metricas = df_filtrado.agg({
-                    'Importe gastado (CLP)': 'sum',
-                    'Impresiones': 'sum',
-                    'Clics en el enlace': 'sum',
-                    'Artículos agregados al carrito': 'sum'
-                })
+                metricas = cubo_filtrado(start_date, end_date).total(['CTR (%)', 'CPC (CLP)'])
                 
                 total_gasto = metricas['Importe gastado (CLP)']
                 total_impresiones = metricas['Impresiones']
                 total_clics = metricas['Clics en el enlace']
                 total_carrito = metricas['Artículos agregados al carrito']
                 
-        ctr_promedio = (total_clics / total_impresiones * 100) if total_impresiones > 0 else 0
-        cpc_promedio = (total_gasto / total_clics) if total_clics > 0 else 0
-        
-                print("Creando gráficos...")
-        # Crear gráficos
-                try:
-        fig_evolucion = crear_grafico_evolucion_diaria(df_gasto_filtrado, periodo)
-                    print("Gráfico evolución creado")
-                except Exception as e:
-                    print(f"Error en gráfico evolución: {str(e)}")
-                    fig_evolucion = go.Figure()
-                    
-                try:
-                    fig_metricas = crear_grafico_comparacion_metricas(df_filtrado)
-                    print("Gráfico métricas creado")
-                except Exception as e:
-                    print(f"Error en gráfico métricas: {str(e)}")
-                    fig_metricas = go.Figure()
-                    
-                try:
-        fig_publicos = crear_grafico_comparacion_publicos(df_filtrado)
-                    print("Gráfico públicos creado")
-                except Exception as e:
-                    print(f"Error en gráfico públicos: {str(e)}")
-                    fig_publicos = go.Figure()
-                    
-                try:
-                    fig_hook_rates = crear_grafico_hook_rates(df_filtrado)
-                    print("Gráfico hook rates creado")
-                except Exception as e:
-                    print(f"Error en gráfico hook rates: {str(e)}")
-                    fig_hook_rates = go.Figure()
-                    
-                try:
-                    fig_regional = crear_grafico_distribucion_regional(df_filtrado, metrica_regional)
-                    print("Gráfico regional creado")
-                except Exception as e:
-                    print(f"Error en gráfico regional: {str(e)}")
-                    fig_regional = go.Figure()
-                
-                print("Generando insights...")
-        # Generar insights
-                try:
-        insights_evolucion = generar_insights_evolucion_gasto(df_gasto_filtrado)
-                except Exception as e:
-                    print(f"Error en insights evolución: {str(e)}")
-                    insights_evolucion = "Error al generar insights de evolución"
-                    
-                try:
-                    insights_metricas = generar_insights_anuncios(df_filtrado)
-                except Exception as e:
-                    print(f"Error en insights métricas: {str(e)}")
-                    insights_metricas = "Error al generar insights de métricas"
-                    
-                try:
-        insights_publicos = generar_insights_publicos(df_filtrado)
-                except Exception as e:
-                    print(f"Error en insights públicos: {str(e)}")
-                    insights_publicos = "Error al generar insights de públicos"
-                    
-                try:
-                    insights_hook_rates = generar_insights_hook_rates(df_filtrado)
-                except Exception as e:
-                    print(f"Error en insights hook rates: {str(e)}")
-                    insights_hook_rates = "Error al generar insights de hook rates"
-                    
-                try:
-                    insights_regional = generar_insights_regionales(df_filtrado, metrica_regional)
-                except Exception as e:
-                    print(f"Error en insights regionales: {str(e)}")
-                    insights_regional = "Error al generar insights regionales"
+                ctr_promedio = metricas['CTR (%)']
+                cpc_promedio = metricas['CPC (CLP)']
                 
-                print("Retornando resultados...")
-        return (
-            fig_evolucion,
-            fig_metricas,
-            fig_publicos,
-                    fig_hook_rates,
-                    fig_regional,
-            f'${total_gasto:,.0f}',
-            f'{total_impresiones:,.0f}',
-            f'{total_clics:,.0f}',
-            f'{ctr_promedio:.2f}%',
-            f'${cpc_promedio:,.0f}',
-            f'{total_carrito:,.0f}',
-            insights_evolucion,
-            insights_metricas,
-            insights_publicos,
-                    insights_hook_rates,
-                    insights_regional
+                return (
+                    f'${total_gasto:,.0f}',
+                    f'{total_impresiones:,.0f}',
+                    f'{total_clics:,.0f}',
+                    f'{ctr_promedio:.2f}%',
+                    f'${cpc_promedio:,.0f}',
+                    f'{total_carrito:,.0f}'
                 )
             except Exception as e:
-                print(f"Error en el callback principal: {str(e)}")
-                import traceback
-                print(traceback.format_exc())
-                # Retornar valores por defecto en caso de error
-                empty_fig = go.Figure()
-                return [empty_fig] * 5 + ['Error'] * 11
+                print(f"Error en tarjetas de métricas: {str(e)}")
+                return ['Error'] * 6
         
-        app.callback(
-            [Output('evolucion-gasto-meta', 'figure'),
-             Output('comparacion-metricas', 'figure'),
-             Output('comparacion-publicos', 'figure'),
-             Output('hook-rates', 'figure'),
-             Output('distribucion-regional', 'figure'),
-             Output('total-gasto-meta', 'children'),
-             Output('total-impresiones', 'children'),
-             Output('total-clics', 'children'),
-             Output('ctr-promedio', 'children'),
-             Output('cpc-promedio', 'children'),
-             Output('articulos-carrito', 'children'),
-             Output('insights-evolucion', 'children'),
-             Output('insights-metricas', 'children'),
-             Output('insights-publicos', 'children'),
-             Output('insights-hook-rates', 'children'),
-             Output('insights-regional', 'children')],
+        bases_evolucion = trazas_base(figura_base_evolucion_diaria())
+        
+        @app.callback(
+            Output('evolucion-gasto-meta', 'figure'),
             [Input('periodo-selector', 'value'),
              Input('date-range-picker', 'start_date'),
+             Input('date-range-picker', 'end_date'),
+             Input('evolucion-gasto-meta', 'relayoutData')]
+        )
+        def actualizar_evolucion(periodo, start_date, end_date, relayout):
+            # Un zoom solo vuelve al servidor si la serie completa fue muestreada
+            rango = None
+            if ctx.triggered_id == 'evolucion-gasto-meta':
+                rango = rango_relayout(relayout)
+                if rango is False:
+                    raise PreventUpdate
+            
+            # Solo viajan x/y, título y ticks; el layout ya está en la figura base
+            serie = _construir_o_defecto(
+                'gráfico evolución', series_evolucion_diaria, gasto_filtrado(start_date, end_date), periodo,
+                defecto={'titulo': 'Error al generar el gráfico', 'trazas': [{'x': [], 'y': []}, {'x': [], 'y': []}]}
+            )
+            if ctx.triggered_id == 'evolucion-gasto-meta' and not supera_umbral(serie):
+                raise PreventUpdate
+            return parche_figura(muestrear_serie(serie, bases_evolucion, rango))
+        
+        @app.callback(
+            Output('insights-evolucion', 'children'),
+            [Input('date-range-picker', 'start_date'),
+             Input('date-range-picker', 'end_date')]
+        )
+        def actualizar_insights_evolucion(start_date, end_date):
+            return _construir_o_defecto(
+                'insights evolución', generar_insights_evolucion_gasto, gasto_filtrado(start_date, end_date),
+                defecto="Error al generar insights de evolución"
+            )
+        
+        @callback_pesado(
+            app.callback, gestor_fondo,
+            [Output('comparacion-metricas', 'figure'),
+             Output('insights-metricas', 'children')],
+            [Input('date-range-picker', 'start_date'),
+             Input('date-range-picker', 'end_date')],
+            id_progreso='progreso-metricas'
+        )
+        def actualizar_metricas(set_progress, start_date, end_date):
+            cubo_periodo = cubo_filtrado(start_date, end_date)
+            figura = _construir_o_defecto('gráfico métricas', crear_grafico_comparacion_metricas, cubo_periodo)
+            avance(set_progress, 1, 2)
+            return (
+                figura,
+                _construir_o_defecto('insights métricas', generar_insights_anuncios, cubo_periodo,
+                                     defecto="Error al generar insights de métricas")
+            )
+        
+        @app.callback(
+            [Output('comparacion-publicos', 'figure'),
+             Output('insights-publicos', 'children')],
+            [Input('date-range-picker', 'start_date'),
+             Input('date-range-picker', 'end_date')]
+        )
+        def actualizar_publicos(start_date, end_date):
+            cubo_periodo = cubo_filtrado(start_date, end_date)
+            return (
+                _construir_o_defecto('gráfico públicos', crear_grafico_comparacion_publicos, cubo_periodo),
+                _construir_o_defecto('insights públicos', generar_insights_publicos, cubo_periodo,
+                                     defecto="Error al generar insights de públicos")
+            )
+        
+        @callback_pesado(
+            app.callback, gestor_fondo,
+            [Output('hook-rates', 'figure'),
+             Output('insights-hook-rates', 'children')],
+            [Input('date-range-picker', 'start_date'),
+             Input('date-range-picker', 'end_date')],
+            id_progreso='progreso-hook-rates'
+        )
+        def actualizar_hook_rates(set_progress, start_date, end_date):
+            cubo_periodo = cubo_filtrado(start_date, end_date)
+            figura = _construir_o_defecto('gráfico hook rates', crear_grafico_hook_rates, cubo_periodo)
+            avance(set_progress, 1, 2)
+            return (
+                figura,
+                _construir_o_defecto('insights hook rates', generar_insights_hook_rates, cubo_periodo,
+                                     defecto="Error al generar insights de hook rates")
+            )
+        
+        # Con la matriz acumulada el cambio de métrica o fechas es una resta y una razón: callback directo
+        @app.callback(
+            [Output('distribucion-regional', 'figure'),
+             Output('insights-regional', 'children')],
+            [Input('date-range-picker', 'start_date'),
              Input('date-range-picker', 'end_date'),
              Input('selector-metrica-regional', 'value')]
-        )(actualizar_graficos_marketing)
-    
-    return app
+        )
+        def actualizar_regional(start_date, end_date, metrica_regional):
+            return (
+                _construir_o_defecto('gráfico regional', crear_grafico_distribucion_regional,
+                                     matriz_regional, start_date, end_date, metrica_regional),
+                _construir_o_defecto('insights regionales', generar_insights_regionales,
+                                     matriz_regional, start_date, end_date, metrica_regional,
+                                     defecto="Error al generar insights regionales")
+            )
+        
+        if atribucion:
+            # Sumas acumuladas por día: cambiar ventana, dimensión o fechas no reagrupa reservas
+            @app.callback(
+                [Output('atribucion-reservas', 'figure'),
+                 Output('insights-atribucion', 'children')],
+                [Input('date-range-picker', 'start_date'),
+                 Input('date-range-picker', 'end_date'),
+                 Input('selector-dimension-atribucion', 'value'),
+                 Input('selector-ventana-atribucion', 'value')]
+            )
+            def actualizar_atribucion(start_date, end_date, dimension, ventana):
+                return (
+                    _construir_o_defecto('gráfico atribución', crear_grafico_atribucion,
+                                         atribucion[dimension], ventana, start_date, end_date),
+                    _construir_o_defecto('insights atribución',
+                                         lambda: html.Div([html.P(insight) for insight in generar_insights_atribucion(
+                                             atribucion[dimension], ventana, start_date, end_date)]),
+                                         defecto="Error al generar insights de atribución")
+                )
+        
+        return app
         
     except Exception as e:
         print(f"Error al crear la aplicación: {str(e)}")
@@ -1639,7 +1419,7 @@ def crear_app_marketing():
 # ======== EJECUCIÓN DE LA APLICACIÓN ========
 if __name__ == '__main__':
     try:
-    print("\n=== DASHBOARD DE MARKETING - META ADS ===")
+        print("\n=== DASHBOARD DE MARKETING - META ADS ===")
         print("Iniciando la aplicación...")
         
         # Verificar directorios necesarios
@@ -1655,13 +1435,13 @@ if __name__ == '__main__':
             else:
                 print(f"Directorio existente: {directory}")
 
-        # Verificar archivo de datos
-        data_file = "archivos_input/archivos input marketing/Comp-1-Conjunto-Anuncios-2Campañas-3-anuncios-por-dia (2).csv"
-        if not os.path.exists(data_file):
-            print(f"ERROR: No se encuentra el archivo de datos en: {data_file}")
+        # Verificar exports de datos
+        exports = rutas_exports()
+        if not exports:
+            print("ERROR: No se encuentran exports de Meta en archivos_input/archivos input marketing")
             exit(1)
         else:
-            print(f"Archivo de datos encontrado: {data_file}")
+            print(f"Exports de datos encontrados: {len(exports)}")
 
         print("\nCreando la aplicación Dash...")
         app = crear_app_marketing()
@@ -1672,7 +1452,7 @@ if __name__ == '__main__':
             print("- http://localhost:8052")
             print("- http://127.0.0.1:8052")
             print("\nIniciando el servidor...")
-            app.run(debug=False, port=8052)
+            app.run(debug=False, port=8052, threaded=True)
         else:
             print("ERROR: No se pudo crear la aplicación.")
             exit(1)
@@ -1,104 +1,37 @@
 import dash
-from dash import html, dcc, Input, Output, callback
+from dash import html, dcc, Input, Output, State, ClientsideFunction, callback, clientside_callback
 import pandas as pd
 import plotly.graph_objects as go
-import plotly.express as px
 from plotly.subplots import make_subplots
 from datetime import datetime
-import os
-import numpy as np
+import functools
 
 # Importar componentes comunes de navegación
-from funciones.componentes_dashboard import crear_header, crear_filtros, crear_selector_periodo, COLORS, CARD_STYLE
+from funciones.componentes_dashboard import crear_header, crear_filtros, crear_selector_periodo, crear_pagina_error, COLORS, CARD_STYLE
+from funciones.almacen_datos import AlmacenDatos
+from funciones.atribucion import VENTANAS_ATRIBUCION, cargar_atribucion, generar_insights_atribucion
+from funciones.cache_callbacks import CacheCallbacks, filtrar_por_fechas
+from funciones.figuras_parciales import parche_figura
+from funciones.graficos_dashboard import crear_grafico_atribucion
+from funciones.consolidado_meta import consolidar_meta
+from funciones.cubo_meta import CuboMeta, MatrizRegional, RAZONES_EMBUDO
+from funciones.payload import configurar_payload, plantilla_monto
+from funciones.serie_diaria import serie_diaria, por_periodo, figura_periodica
+from funciones.tema import TEMA
+
+DIRECTORIO_MARKETING = "archivos_input/archivos input marketing"
 
 # Función para cargar datos con más procesamiento
 def cargar_datos():
-    """Carga los archivos CSV de marketing específicos: (5) CON región y (6) SIN región."""
+    """Carga los exports de marketing consolidados: CON región y SIN región."""
     try:
-        # Archivo CON región (5) - para gráfico de regiones
-        archivo_con_region = "archivos_input/archivos input marketing/Comp-1-Conjunto-Anuncios-2Campañas-3-anuncios-por-dia (5).csv"
-        print(f"🔄 Cargando archivo CON región (5): {archivo_con_region}")
-        
-        if not os.path.exists(archivo_con_region):
-            print(f"❌ ERROR: No se encuentra el archivo en: {archivo_con_region}")
-            return None, None
-        
-        df_con_region = pd.read_csv(archivo_con_region)
-        print(f"✅ Archivo CON región (5) cargado. Dimensiones: {df_con_region.shape}")
-        
-        # Archivo SIN región (6) - para demás gráficos  
-        archivo_sin_region = "archivos_input/archivos input marketing/Comp-1-Conjunto-Anuncios-2Campañas-3-anuncios-por-dia (6).csv"
-        print(f"🔄 Cargando archivo SIN región (6): {archivo_sin_region}")
-        
-        if not os.path.exists(archivo_sin_region):
-            print(f"❌ ERROR: No se encuentra el archivo en: {archivo_sin_region}")
-            return None, None
-            
-        df_sin_region = pd.read_csv(archivo_sin_region)
-        print(f"✅ Archivo SIN región (6) cargado. Dimensiones: {df_sin_region.shape}")
+        # Consolidado de todos los exports: CON región para el gráfico de regiones, SIN región para los demás
+        tablas = consolidar_meta(DIRECTORIO_MARKETING)
+        df_con_region = tablas['regiones']
+        df_sin_region = tablas['diario']
         
-        print("📊 USANDO NUEVOS INPUTS ESPECÍFICOS:")
-        print(f"   📈 Dataset (6): {len(df_sin_region)} filas - Sin región")
-        print(f"   🗺️ Dataset (5): {len(df_con_region)} filas - Con región")
-        
-        # Procesar archivos con datos actualizados
-        numeric_columns = [
-            "Importe gastado (CLP)", "Impresiones", "Clics en el enlace", 
-            "Artículos agregados al carrito", "CTR (todos)", "CPC (todos)",
-            "Reproducciones de video de 3 segundos", "Reproducciones de video hasta el 25%",
-            "Reproducciones de video hasta el 50%", "Reproducciones de video hasta el 75%",
-            "Reproducciones de video hasta el 100%"
-        ]
-        
-        for df in [df_con_region, df_sin_region]:
-            for col in numeric_columns:
-                if col in df.columns:
-                    df[col] = pd.to_numeric(df[col], errors='coerce').fillna(0)
-            
-            # Convertir fechas
-            df['Día'] = pd.to_datetime(df['Día'])
-            
-            # Agregar columnas calculadas
-            df['CTR_calc'] = (df['Clics en el enlace'] / df['Impresiones'] * 100).fillna(0)
-            df['CPC_calc'] = (df['Importe gastado (CLP)'] / df['Clics en el enlace']).fillna(0)
-            df['Hook_Rate_3s'] = (df['Reproducciones de video de 3 segundos'] / df['Impresiones'] * 100).fillna(0)
-            df['Hook_Rate_25'] = (df['Reproducciones de video hasta el 25%'] / df['Impresiones'] * 100).fillna(0)
-            df['Hook_Rate_50'] = (df['Reproducciones de video hasta el 50%'] / df['Impresiones'] * 100).fillna(0)
-            df['Hook_Rate_75'] = (df['Reproducciones de video hasta el 75%'] / df['Impresiones'] * 100).fillna(0)
-            df['Hook_Rate_100'] = (df['Reproducciones de video hasta el 100%'] / df['Impresiones'] * 100).fillna(0)
-            df['Conversion_Rate'] = (df['Artículos agregados al carrito'] / df['Clics en el enlace'] * 100).fillna(0)
-            df['Cost_Per_Conversion'] = (df['Importe gastado (CLP)'] / df['Artículos agregados al carrito']).fillna(0)
-            
-            # Clasificar públicos - mantener todas las regiones/públicos separados
-            def clasificar_publico(x):
-                nombre = str(x).lower()
-                if 'advantage' in nombre:
-                    return 'Publico Advantage'
-                elif 'pucon' in nombre:
-                    return 'Publico Pucón'
-                elif 'concepcion' in nombre:
-                    return 'Publico Concepción'
-                elif 'valdivia' in nombre:
-                    return 'Publico Valdivia'
-                elif 'temuco' in nombre:
-                    return 'Test Públicos Temuco'
-                else:
-                    # Mantener el nombre original para otros casos
-                    return str(x)
-            
-            df['Público'] = df['Nombre del conjunto de anuncios'].apply(clasificar_publico)
-            
-            # Clasificar tipos de anuncios
-            df['Tipo_Anuncio'] = df['Nombre del anuncio'].apply(
-                lambda x: 'Video explicativo' if 'explicando servicio' in str(x).lower() else
-                         'Video parejas amor' if 'parejas amor' in str(x).lower() else
-                         'Video parejas dcto' if 'parejas dcto' in str(x).lower() or 'pareja dcto' in str(x).lower() else
-                         'Otro'
-            )
-        
-        print("🎉 Ambos archivos procesados exitosamente con nuevos inputs")
-        print(f"✅ Dataset (5) CON región: {len(df_con_region)} filas")
-        print(f"✅ Dataset (6) SIN región: {len(df_sin_region)} filas")
+        print(f"✅ Dataset CON región: {len(df_con_region)} filas")
+        print(f"✅ Dataset SIN región: {len(df_sin_region)} filas")
         print("=" * 60)
         return df_con_region, df_sin_region
     
@@ -106,21 +39,63 @@ def cargar_datos():
         print(f"Error cargando datos: {str(e)}")
         return None, None
 
+def cargar_datos_marketing():
+    """Adaptador de cargar_datos() para el AlmacenDatos del dashboard."""
+    df_con_region, df_sin_region = cargar_datos()
+    datos = {'con_region': df_con_region, 'sin_region': df_sin_region}
+    # Cubos de sumas aditivas: todas las razones (CTR, CPC, hook rates) se derivan como suma/suma
+    for nombre, df in (('con_region', df_con_region), ('sin_region', df_sin_region)):
+        datos[f'cubo_{nombre}'] = CuboMeta.desde_hechos(df) if df is not None else None
+    # Regiones: sumas acumuladas por día, cualquier rango se resuelve restando dos filas
+    if datos['cubo_con_region'] is not None:
+        datos['matriz_regional'] = MatrizRegional.desde_cubo(datos['cubo_con_region'])
+    # Gasto por plataforma y por público contra las reservas creadas (opcional: sin archivos no se muestra)
+    try:
+        datos['atribucion'] = cargar_atribucion(datos['cubo_sin_region'])
+    except Exception as e:
+        print(f"⚠️ Atribución de gasto a reservas no disponible: {e}")
+        datos['atribucion'] = {}
+    return datos
+
 # Crear aplicación
-app = dash.Dash(__name__)
+app = dash.Dash(__name__, suppress_callback_exceptions=True)
+configurar_payload(app, 'Marketing')
+
+# Los datos se cargan en segundo plano: el servidor abre el puerto sin esperar la lectura de los CSV
+almacen = AlmacenDatos(
+    cargar_datos_marketing,
+    directorio=DIRECTORIO_MARKETING,
+    cargar_en_segundo_plano=True
+)
+
+def construir_layout():
+    """Layout construido en cada carga de página con la versión vigente de los datos."""
+    datos = almacen.datos
+    if datos is None:
+        return crear_pagina_error("Dashboard de Marketing", almacen.error)
+    df_con_region = datos.get('con_region')
+    df_sin_region = datos.get('sin_region')
 
-# Cargar datos
-df_con_region, df_sin_region = cargar_datos()
+    if df_con_region is None or df_sin_region is None:
+        return html.Div([
+            html.H1("Error: No se pudieron cargar los datos", style={
+                'textAlign': 'center', 
+                'color': COLORS['expense'],
+                'backgroundColor': COLORS['background'],
+                'minHeight': '100vh',
+                'padding': '20px'
+            })
+        ], style={'backgroundColor': COLORS['background']})
 
-if df_con_region is not None and df_sin_region is not None:
     fecha_min = df_con_region['Día'].min()
     fecha_max = df_con_region['Día'].max()
-    
+    atribucion = datos.get('atribucion', {})
+
     # Layout con tema oscuro idéntico a otros dashboards
-    app.layout = html.Div([
+    return html.Div([
         # Header con navegación
         crear_header("Dashboard de Marketing HotBoat", 8056),
-        
+    
         # Título del dashboard
         html.Div([
             html.Div("DASHBOARD DE MARKETING", style={
@@ -134,20 +109,21 @@ if df_con_region is not None and df_sin_region is not None:
                 'borderRadius': '5px'
             })
         ]),
-        
+    
         # Filtros con el mismo estilo que otros dashboards
         crear_filtros(fecha_min, fecha_max),
-        
+    
         # Métricas principales
         html.Div(id='metricas-principales', style={'margin': '20px'}),
-        
+    
         # Selector de período con el mismo estilo
         crear_selector_periodo(),
-        
+    
         # Gráficos con contenedores oscuros
         html.Div([
             html.H3('Evolución Temporal del Gasto', style={'color': COLORS['text'], 'marginBottom': '15px'}),
-            dcc.Graph(id='grafico-evolucion')
+            dcc.Graph(id='grafico-evolucion', figure=figura_base_evolucion()),
+            dcc.Store(id='serie-diaria')
         ], style={
             'backgroundColor': COLORS['card_bg'],
             'padding': '20px',
@@ -155,10 +131,10 @@ if df_con_region is not None and df_sin_region is not None:
             'marginBottom': '20px',
             'boxShadow': '0px 0px 10px rgba(255,255,255,0.1)'
         }),
-        
+    
         html.Div([
             html.H3('Gasto por Región', style={'color': COLORS['text'], 'marginBottom': '15px'}),
-            dcc.Graph(id='grafico-regiones')
+            dcc.Graph(id='grafico-regiones', figure=figura_base_regiones())
         ], style={
             'backgroundColor': COLORS['card_bg'],
             'padding': '20px',
@@ -166,10 +142,10 @@ if df_con_region is not None and df_sin_region is not None:
             'marginBottom': '20px',
             'boxShadow': '0px 0px 10px rgba(255,255,255,0.1)'
         }),
-        
+    
         html.Div([
             html.H3('Análisis por Públicos', style={'color': COLORS['text'], 'marginBottom': '15px'}),
-            dcc.Graph(id='grafico-publicos')
+            dcc.Graph(id='grafico-publicos', figure=figura_base_resumen())
         ], style={
             'backgroundColor': COLORS['card_bg'],
             'padding': '20px',
@@ -177,10 +153,10 @@ if df_con_region is not None and df_sin_region is not None:
             'marginBottom': '20px',
             'boxShadow': '0px 0px 10px rgba(255,255,255,0.1)'
         }),
-        
+    
         html.Div([
             html.H3('Análisis por Tipos de Anuncios', style={'color': COLORS['text'], 'marginBottom': '15px'}),
-            dcc.Graph(id='grafico-tipos-anuncios')
+            dcc.Graph(id='grafico-tipos-anuncios', figure=figura_base_resumen(rotar_etiquetas=True))
         ], style={
             'backgroundColor': COLORS['card_bg'],
             'padding': '20px',
@@ -188,10 +164,10 @@ if df_con_region is not None and df_sin_region is not None:
             'marginBottom': '20px',
             'boxShadow': '0px 0px 10px rgba(255,255,255,0.1)'
         }),
-        
+    
         html.Div([
             html.H3('Hook Rates por Tipo de Anuncio', style={'color': COLORS['text'], 'marginBottom': '15px'}),
-            dcc.Graph(id='grafico-hook-rates')
+            dcc.Graph(id='grafico-hook-rates', figure=figura_base_hook_rates())
         ], style={
             'backgroundColor': COLORS['card_bg'],
             'padding': '20px',
@@ -199,7 +175,36 @@ if df_con_region is not None and df_sin_region is not None:
             'marginBottom': '20px',
             'boxShadow': '0px 0px 10px rgba(255,255,255,0.1)'
         }),
-        
+    
+        # Atribución de gasto a reservas (solo si hay reservas y gastos que cruzar)
+        *([html.Div([
+            html.H3('Atribución de Gasto a Reservas', style={'color': COLORS['text'], 'marginBottom': '15px'}),
+            html.Div([
+                dcc.Dropdown(
+                    id='selector-dimension-atribucion',
+                    options=[{'label': f'Por {dimension}', 'value': dimension} for dimension in atribucion],
+                    value=next(iter(atribucion)),
+                    clearable=False,
+                    style={'color': '#000000', 'width': '250px'}
+                ),
+                dcc.Dropdown(
+                    id='selector-ventana-atribucion',
+                    options=[{'label': f'Ventana de {ventana} días', 'value': ventana} for ventana in VENTANAS_ATRIBUCION],
+                    value=VENTANAS_ATRIBUCION[len(VENTANAS_ATRIBUCION) // 2],
+                    clearable=False,
+                    style={'color': '#000000', 'width': '250px'}
+                )
+            ], style={'display': 'flex', 'gap': '15px', 'marginBottom': '15px'}),
+            dcc.Graph(id='grafico-atribucion'),
+            html.Div(id='insights-atribucion', style={'color': COLORS['text']})
+        ], style={
+            'backgroundColor': COLORS['card_bg'],
+            'padding': '20px',
+            'borderRadius': '5px',
+            'marginBottom': '20px',
+            'boxShadow': '0px 0px 10px rgba(255,255,255,0.1)'
+        })] if atribucion else []),
+    
         # Insights con estilo oscuro
         html.Div([
             html.H3('💡 Conclusiones e Insights', style={
@@ -219,461 +224,469 @@ if df_con_region is not None and df_sin_region is not None:
         'minHeight': '100vh',
         'padding': '20px'
     })
+
+app.layout = construir_layout
+
+# ======== CALLBACKS ========
+# Cada salida tiene su propio callback con solo los inputs de los que depende:
+# cambiar el periodo recalcula únicamente la evolución temporal. Las tablas
+# filtradas y los agregados compartidos viven en una caché del servidor
+# indexada por versión de datos y rango de fechas.
+#
+# Los gráficos se envían una vez como figura base (ejes, hovertemplates; el tema es funciones/tema.py)
+# con el layout de la página; los callbacks responden con un Patch que trae
+# solo x/y de las trazas, el título y los ticks.
+cache = CacheCallbacks()
+
+COLORES_METRICAS = [COLORS['expense'], COLORS['secondary'], '#9b59b6', COLORS['income'], '#e67e22', COLORS['primary']]
+
+# (columna, título del subgráfico) en el orden de las trazas de los gráficos de resumen
+METRICAS_RESUMEN = [
+    ('Importe gastado (CLP)', 'Gasto Total (CLP)'),
+    ('CTR (%)', 'CTR (%)'),
+    ('CPC (CLP)', 'CPC (CLP)'),
+    ('Conversión (%)', 'Conversión (%)'),
+    ('Costo por Conversión (CLP)', 'Costo por Conversión (CLP)'),
+    ('Artículos agregados al carrito', 'Artículos agregados al carrito')
+]
+
+# (columna, nombre, color, etiqueta del hover) de cada hook rate
+HOOK_RATES = [
+    ('Hook Rate 3s (%)', '3 segundos', '#FF9999', '3s'),
+    ('Hook Rate 25% (%)', '25%', '#66B2FF', '25%'),
+    ('Hook Rate 50% (%)', '50%', '#99FF99', '50%'),
+    ('Hook Rate 75% (%)', '75%', '#FFCC99', '75%'),
+    ('Hook Rate 100% (%)', '100%', '#FF99CC', '100%')
+]
+
+TITULO_SIN_DATOS = "No hay datos para el período seleccionado"
+
+def datos_filtrados(start_date, end_date):
+    """Devuelve (version, df sin región filtrado, df con región filtrado) desde la caché."""
+    version, datos = almacen.instantanea()
+    filtrados = cache.obtener(
+        ('filtrados', version, str(start_date), str(end_date)),
+        lambda: (
+            filtrar_por_fechas(datos.get('sin_region'), 'Día', start_date, end_date),
+            filtrar_por_fechas(datos.get('con_region'), 'Día', start_date, end_date)
+        )
+    )
+    return (version,) + filtrados
+
+def cubo_filtrado(start_date, end_date):
+    """Devuelve (version, cubo sin región del período) desde la caché."""
+    version, datos = almacen.instantanea()
+    return version, cache.obtener(
+        ('cubo', version, str(start_date), str(end_date)),
+        lambda: datos.get('cubo_sin_region').filtrar(start_date, end_date)
+    )
+
+def regiones_periodo(start_date, end_date):
+    """Sumas por región del período desde la matriz acumulada (sin reagrupar filas)."""
+    _, datos = almacen.instantanea()
+    return datos.get('matriz_regional').sumar(start_date, end_date)
+
+def totales_periodo(start_date, end_date):
+    """Totales del período (consolidado SIN región) compartidos por métricas e insights."""
+    version, cubo_sin_region = cubo_filtrado(start_date, end_date)
     
-    # Callback principal
-    @callback(
-        [Output('metricas-principales', 'children'),
-         Output('grafico-evolucion', 'figure'),
-         Output('grafico-regiones', 'figure'),
-         Output('grafico-publicos', 'figure'),
-         Output('grafico-tipos-anuncios', 'figure'),
-         Output('grafico-hook-rates', 'figure'),
-         Output('insights-contenido', 'children')],
-        [Input('date-range-picker', 'start_date'),
-         Input('date-range-picker', 'end_date'),
-         Input('periodo-selector', 'value')]
+    def calcular():
+        total = cubo_sin_region.total(['CTR (%)', 'CPC (CLP)'])
+        return {
+            'gasto': total['Importe gastado (CLP)'],
+            'impresiones': total['Impresiones'],
+            'clics': total['Clics en el enlace'],
+            'conversiones': total['Artículos agregados al carrito'],
+            'ctr': total['CTR (%)'],
+            'cpc': total['CPC (CLP)']
+        }
+    
+    return cache.obtener(('totales', version, str(start_date), str(end_date)), calcular)
+
+def resumen_por(columna, start_date, end_date):
+    """Métricas por `columna` (Público detallado o Tipo de Anuncio) en el período, como suma/suma."""
+    version, cubo_sin_region = cubo_filtrado(start_date, end_date)
+    return cache.obtener(
+        ('resumen', columna, version, str(start_date), str(end_date)),
+        lambda: cubo_sin_region.resumen(columna, RAZONES_EMBUDO)
+    )
+
+def serie_vacia(numero_trazas, titulo=TITULO_SIN_DATOS):
+    """Serie que vacía todas las trazas de una figura base y muestra `titulo`."""
+    return {'titulo': titulo, 'trazas': [{'x': [], 'y': []} for _ in range(numero_trazas)]}
+
+# ---- Figuras base ----
+def figura_base_evolucion():
+    """Evolución temporal del gasto (eje izquierdo) y conversiones (eje derecho)."""
+    fig = go.Figure()
+    
+    # Línea de gasto (eje Y izquierdo)
+    fig.add_trace(go.Scatter(
+        x=[],
+        y=[],
+        mode='lines+markers',
+        name='Gasto (CLP)',
+        line=dict(color=COLORS['expense'], width=3),
+        marker=dict(size=8),
+        yaxis='y'
+    ))
+    
+    # Línea de conversiones (eje Y derecho)
+    fig.add_trace(go.Scatter(
+        x=[],
+        y=[],
+        mode='lines+markers',
+        name='Conversiones',
+        line=dict(color=COLORS['income'], width=3),
+        marker=dict(size=8, symbol='diamond'),
+        yaxis='y2'
+    ))
+    
+    fig.update_layout(
+        template=TEMA,
+        xaxis_title='Período',
+        height=400,
+        yaxis=dict(
+            title='Gasto (CLP)',
+            titlefont=dict(color=COLORS['expense']),
+            tickfont=dict(color=COLORS['expense']),
+            side='left'
+        ),
+        yaxis2=dict(
+            title='Conversiones',
+            titlefont=dict(color=COLORS['income']),
+            tickfont=dict(color=COLORS['income']),
+            showgrid=False,
+            side='right',
+            overlaying='y'
+        ),
+        legend=dict(
+            orientation='h',
+            yanchor='bottom',
+            y=1.02,
+            xanchor='right',
+            x=1
+        ),
+        hovermode='x unified'
+    )
+    return fig
+
+def figura_base_regiones():
+    """Barras horizontales del gasto por región (top 10)."""
+    fig = go.Figure(go.Bar(
+        x=[],
+        y=[],
+        orientation='h',
+        marker_color=COLORS['primary'],
+        texttemplate=plantilla_monto('x'),
+        textposition='auto'
+    ))
+    
+    fig.update_layout(
+        template=TEMA,
+        xaxis_title='Gasto (CLP)',
+        yaxis_title='',
+        height=500
+    )
+    return fig
+
+def figura_base_resumen(rotar_etiquetas=False):
+    """Gráfico 3x2 con una barra por métrica de `resumen_por`."""
+    fig = make_subplots(
+        rows=3, cols=2,
+        subplot_titles=[titulo for _, titulo in METRICAS_RESUMEN],
+        vertical_spacing=0.15,
+        horizontal_spacing=0.1
+    )
+    
+    for i in range(len(METRICAS_RESUMEN)):
+        fig.add_trace(
+            go.Bar(x=[], y=[], marker_color=COLORES_METRICAS[i], showlegend=False),
+            row=i // 2 + 1, col=i % 2 + 1
+        )
+    
+    fig.update_layout(template=TEMA, height=800)
+    if rotar_etiquetas:
+        # Rotar etiquetas del eje x para tipos de anuncios
+        fig.update_xaxes(tickangle=45)
+    return fig
+
+def figura_base_hook_rates():
+    """Barras horizontales agrupadas con cada hook rate por tipo de anuncio."""
+    fig = go.Figure()
+    
+    # Cada hook rate como una barra horizontal separada
+    for _, nombre, color, etiqueta in HOOK_RATES:
+        fig.add_trace(go.Bar(
+            y=[],
+            x=[],
+            name=nombre,
+            orientation='h',
+            marker_color=color,
+            hovertemplate=f'Hook Rate {etiqueta}: %{{x:.2f}}%<br><extra></extra>'
+        ))
+    
+    fig.update_layout(
+        template=TEMA,
+        height=500,
+        barmode='group',
+        legend=dict(
+            orientation='h',
+            yanchor='bottom',
+            y=1.02,
+            xanchor='right',
+            x=1
+        ),
+        margin=dict(l=200)
+    )
+    return fig
+
+def con_manejo_errores(salida_error):
+    """Decorador: registra la excepción y devuelve `salida_error()` para no romper el resto del dashboard."""
+    def decorador(funcion):
+        @functools.wraps(funcion)
+        def envoltura(*args):
+            try:
+                return funcion(*args)
+            except Exception as e:
+                print(f"Error en callback {funcion.__name__}: {str(e)}")
+                import traceback
+                traceback.print_exc()
+                return salida_error()
+        return envoltura
+    return decorador
+
+def parche_error(numero_trazas):
+    """Salida de error de un callback de gráfico: vacía las trazas sin reenviar la figura."""
+    return lambda: parche_figura(serie_vacia(numero_trazas, titulo="Error al cargar datos"))
+
+@callback(
+    Output('metricas-principales', 'children'),
+    [Input('date-range-picker', 'start_date'),
+     Input('date-range-picker', 'end_date')]
+)
+@con_manejo_errores(lambda: html.Div("Error al cargar datos", style={'color': COLORS['text']}))
+def actualizar_metricas(start_date, end_date):
+    _, cubo_sin_region = cubo_filtrado(start_date, end_date)
+    if cubo_sin_region.vacio:
+        return html.Div("No hay datos")
+    
+    totales = totales_periodo(start_date, end_date)
+    
+    # Tarjetas de métricas con estilo oscuro
+    return html.Div([
+        html.Div([
+            html.H3(f"${totales['gasto']:,.0f}", style={'color': COLORS['expense'], 'margin': '0', 'fontSize': '2.5em'}),
+            html.P('Gasto Total', style={'margin': '5px 0', 'fontWeight': 'bold', 'color': COLORS['text']})
+        ], style=CARD_STYLE),
+        
+        html.Div([
+            html.H3(f"{totales['impresiones']:,.0f}", style={'color': COLORS['primary'], 'margin': '0', 'fontSize': '2.5em'}),
+            html.P('Impresiones', style={'margin': '5px 0', 'fontWeight': 'bold', 'color': COLORS['text']})
+        ], style=CARD_STYLE),
+        
+        html.Div([
+            html.H3(f"{totales['clics']:,.0f}", style={'color': COLORS['income'], 'margin': '0', 'fontSize': '2.5em'}),
+            html.P('Clics', style={'margin': '5px 0', 'fontWeight': 'bold', 'color': COLORS['text']})
+        ], style=CARD_STYLE),
+        
+        html.Div([
+            html.H3(f"{totales['ctr']:.2f}%", style={'color': COLORS['secondary'], 'margin': '0', 'fontSize': '2.5em'}),
+            html.P('CTR Promedio', style={'margin': '5px 0', 'fontWeight': 'bold', 'color': COLORS['text']})
+        ], style=CARD_STYLE),
+        
+        html.Div([
+            html.H3(f"{totales['conversiones']:,.0f}", style={'color': '#9b59b6', 'margin': '0', 'fontSize': '2.5em'}),
+            html.P('Conversiones', style={'margin': '5px 0', 'fontWeight': 'bold', 'color': COLORS['text']})
+        ], style=CARD_STYLE)
+    ], style={'display': 'flex', 'justifyContent': 'center', 'marginBottom': '30px', 'flexWrap': 'wrap'})
+
+TITULOS_EVOLUCION = {
+    'D': 'Evolución Diaria del Gasto y Conversiones',
+    'W': 'Evolución Semanal del Gasto y Conversiones',
+    'M': 'Evolución Mensual del Gasto y Conversiones'
+}
+
+# La evolución temporal se reagrupa en el navegador: el servidor solo envía la
+# serie diaria al cambiar el rango y el cambio de periodo no vuelve al servidor.
+@callback(
+    Output('serie-diaria', 'data'),
+    [Input('date-range-picker', 'start_date'),
+     Input('date-range-picker', 'end_date')]
+)
+@con_manejo_errores(lambda: None)
+def actualizar_serie_evolucion(start_date, end_date):
+    _, df_sin_region, _ = datos_filtrados(start_date, end_date)
+    if df_sin_region.empty:
+        titulos = por_periodo(lambda p: TITULO_SIN_DATOS)
+    else:
+        titulos = TITULOS_EVOLUCION
+    
+    return {
+        'figuras': [figura_periodica(titulos, [
+            serie_diaria(df_sin_region, 'Día', 'Importe gastado (CLP)'),
+            serie_diaria(df_sin_region, 'Día', 'Artículos agregados al carrito')
+        ])],
+        'insights': []
+    }
+
+clientside_callback(
+    ClientsideFunction(namespace='periodos', function_name='reagrupar_figuras'),
+    [Output('grafico-evolucion', 'figure')],
+    [Input('periodo-selector', 'value'),
+     Input('serie-diaria', 'data'),
+     Input('grafico-evolucion', 'relayoutData')],
+    [State('grafico-evolucion', 'figure')]
+)
+
+@callback(
+    Output('grafico-regiones', 'figure'),
+    [Input('date-range-picker', 'start_date'),
+     Input('date-range-picker', 'end_date')]
+)
+@con_manejo_errores(parche_error(1))
+def actualizar_regiones(start_date, end_date):
+    _, cubo_sin_region = cubo_filtrado(start_date, end_date)
+    if cubo_sin_region.vacio:
+        return parche_figura(serie_vacia(1))
+    df_regiones = regiones_periodo(start_date, end_date)
+    if df_regiones.empty:
+        return parche_figura(serie_vacia(1, "No hay datos regionales para el período seleccionado"))
+    
+    df_regiones = df_regiones.sort_values('Importe gastado (CLP)', ascending=True).tail(10)
+    
+    return parche_figura({
+        'titulo': 'Gasto por Región (Top 10)',
+        'trazas': [{
+            'x': df_regiones['Importe gastado (CLP)'],
+            'y': df_regiones['Región']
+        }]
+    })
+
+def serie_resumen(df_resumen, columna, titulo):
+    """Serie de un gráfico de resumen: una traza por métrica con las categorías en x."""
+    return {
+        'titulo': titulo,
+        'trazas': [{'x': df_resumen[columna], 'y': df_resumen[metrica]} for metrica, _ in METRICAS_RESUMEN]
+    }
+
+@callback(
+    Output('grafico-publicos', 'figure'),
+    [Input('date-range-picker', 'start_date'),
+     Input('date-range-picker', 'end_date')]
+)
+@con_manejo_errores(parche_error(len(METRICAS_RESUMEN)))
+def actualizar_publicos(start_date, end_date):
+    _, cubo_sin_region = cubo_filtrado(start_date, end_date)
+    if cubo_sin_region.vacio:
+        return parche_figura(serie_vacia(len(METRICAS_RESUMEN)))
+    
+    df_publicos = resumen_por('Público detallado', start_date, end_date)
+    return parche_figura(serie_resumen(df_publicos, 'Público detallado', 'Comparación entre Públicos'))
+
+@callback(
+    Output('grafico-tipos-anuncios', 'figure'),
+    [Input('date-range-picker', 'start_date'),
+     Input('date-range-picker', 'end_date')]
+)
+@con_manejo_errores(parche_error(len(METRICAS_RESUMEN)))
+def actualizar_tipos_anuncios(start_date, end_date):
+    _, cubo_sin_region = cubo_filtrado(start_date, end_date)
+    if cubo_sin_region.vacio:
+        return parche_figura(serie_vacia(len(METRICAS_RESUMEN)))
+    
+    df_tipos = resumen_por('Tipo de Anuncio', start_date, end_date)
+    return parche_figura(serie_resumen(df_tipos, 'Tipo de Anuncio', 'Comparación de Métricas por Tipo de Anuncio'))
+
+@callback(
+    Output('grafico-hook-rates', 'figure'),
+    [Input('date-range-picker', 'start_date'),
+     Input('date-range-picker', 'end_date')]
+)
+@con_manejo_errores(parche_error(len(HOOK_RATES)))
+def actualizar_hook_rates(start_date, end_date):
+    _, cubo_sin_region = cubo_filtrado(start_date, end_date)
+    if cubo_sin_region.vacio:
+        return parche_figura(serie_vacia(len(HOOK_RATES)))
+    
+    # Hook rate de cada tipo = reproducciones / impresiones sumadas (no el promedio de las filas)
+    df_hooks = cubo_sin_region.resumen('Tipo de Anuncio', [columna for columna, _, _, _ in HOOK_RATES])
+    
+    # Ordenar por Hook Rate 3s
+    df_hooks = df_hooks.sort_values('Hook Rate 3s (%)', ascending=True)
+    
+    return parche_figura({
+        'titulo': 'Hook Rates por Tipo de Anuncio',
+        'trazas': [{'y': df_hooks['Tipo de Anuncio'], 'x': df_hooks[columna]} for columna, _, _, _ in HOOK_RATES]
+    })
+
+@callback(
+    Output('insights-contenido', 'children'),
+    [Input('date-range-picker', 'start_date'),
+     Input('date-range-picker', 'end_date')]
+)
+@con_manejo_errores(lambda: "Error en insights")
+def actualizar_insights(start_date, end_date):
+    _, df_sin_region, df_con_region = datos_filtrados(start_date, end_date)
+    if df_sin_region.empty:
+        return "No hay insights disponibles"
+    
+    totales = totales_periodo(start_date, end_date)
+    df_publicos = resumen_por('Público detallado', start_date, end_date)
+    
+    dias_analizados = (pd.to_datetime(end_date) - pd.to_datetime(start_date)).days + 1
+    gasto_promedio_diario = totales['gasto'] / dias_analizados if dias_analizados > 0 else 0
+    
+    # Mejor región (de los datos con región)
+    mejor_region = None
+    df_regiones_insight = regiones_periodo(start_date, end_date)
+    if not df_regiones_insight.empty:
+        mejor_region = df_regiones_insight.loc[df_regiones_insight['Importe gastado (CLP)'].idxmax()]
+    
+    # Mejor público (de los datos sin región)
+    mejor_publico = df_publicos.loc[df_publicos['Importe gastado (CLP)'].idxmax()] if not df_publicos.empty else None
+    
+    insights = [
+        html.P(f"📊 Análisis del período: {dias_analizados} días", style={
+            'fontWeight': 'bold', 
+            'fontSize': '16px',
+            'color': COLORS['text']
+        }),
+        html.P(f"💰 Gasto promedio diario: ${gasto_promedio_diario:,.0f}", style={'color': COLORS['text']}),
+        html.P(f"📈 CTR promedio: {totales['ctr']:.2f}%", style={'color': COLORS['text']}),
+        html.P(f"💸 CPC promedio: ${totales['cpc']:,.0f}", style={'color': COLORS['text']}),
+        html.P(f"📋 Datos procesados: {len(df_sin_region)} registros principales, {len(df_con_region)} registros regionales", style={'color': COLORS['text']}),
+    ]
+    
+    if mejor_region is not None:
+        insights.append(html.P(f"🎯 Región con mayor gasto: {mejor_region['Región']} (${mejor_region['Importe gastado (CLP)']:,.0f})", style={'color': COLORS['text']}))
+    
+    if mejor_publico is not None:
+        insights.append(html.P(f"👥 Público con mejor rendimiento: {mejor_publico['Público detallado']} (${mejor_publico['Importe gastado (CLP)']:,.0f})", style={'color': COLORS['text']}))
+    
+    return html.Div(insights)
+
+
+# Sumas acumuladas por día: cambiar ventana, dimensión o fechas no reagrupa reservas
+@callback(
+    [Output('grafico-atribucion', 'figure'),
+     Output('insights-atribucion', 'children')],
+    [Input('date-range-picker', 'start_date'),
+     Input('date-range-picker', 'end_date'),
+     Input('selector-dimension-atribucion', 'value'),
+     Input('selector-ventana-atribucion', 'value')]
+)
+@con_manejo_errores(lambda: (go.Figure(), "Error al generar insights de atribución"))
+def actualizar_atribucion(start_date, end_date, dimension, ventana):
+    _, datos = almacen.instantanea()
+    atribucion = datos['atribucion'][dimension]
+    return (
+        crear_grafico_atribucion(atribucion, ventana, start_date, end_date),
+        html.Div([html.P(insight) for insight in generar_insights_atribucion(atribucion, ventana, start_date, end_date)])
     )
-    def actualizar_dashboard(start_date, end_date, periodo):
-        try:
-            # Filtrar datos por fecha - USAR ARCHIVO SIN REGIÓN para métricas generales
-            mask_sin_region = (df_sin_region['Día'] >= start_date) & (df_sin_region['Día'] <= end_date)
-            df_filtrado_sin_region = df_sin_region[mask_sin_region]
-            
-            # Filtrar datos por fecha - USAR ARCHIVO CON REGIÓN solo para gráfico regional
-            mask_con_region = (df_con_region['Día'] >= start_date) & (df_con_region['Día'] <= end_date)
-            df_filtrado_con_region = df_con_region[mask_con_region]
-            
-            if df_filtrado_sin_region.empty:
-                empty_fig = go.Figure()
-                empty_fig.update_layout(
-                    title="No hay datos para el período seleccionado",
-                    paper_bgcolor=COLORS['card_bg'],
-                    plot_bgcolor=COLORS['card_bg'],
-                    font={'color': COLORS['text']}
-                )
-                return (html.Div("No hay datos"), empty_fig, empty_fig, empty_fig, empty_fig, empty_fig, "No hay insights disponibles")
-            
-            # Calcular métricas principales (usar archivo SIN región)
-            total_gasto = df_filtrado_sin_region['Importe gastado (CLP)'].sum()
-            total_impresiones = df_filtrado_sin_region['Impresiones'].sum()
-            total_clics = df_filtrado_sin_region['Clics en el enlace'].sum()
-            total_conversiones = df_filtrado_sin_region['Artículos agregados al carrito'].sum()
-            
-            ctr = (total_clics / total_impresiones * 100) if total_impresiones > 0 else 0
-            cpc = (total_gasto / total_clics) if total_clics > 0 else 0
-            
-            # 1. Tarjetas de métricas con estilo oscuro
-            metricas = html.Div([
-                html.Div([
-                    html.H3(f'${total_gasto:,.0f}', style={'color': COLORS['expense'], 'margin': '0', 'fontSize': '2.5em'}),
-                    html.P('Gasto Total', style={'margin': '5px 0', 'fontWeight': 'bold', 'color': COLORS['text']})
-                ], style=CARD_STYLE),
-                
-                html.Div([
-                    html.H3(f'{total_impresiones:,.0f}', style={'color': COLORS['primary'], 'margin': '0', 'fontSize': '2.5em'}),
-                    html.P('Impresiones', style={'margin': '5px 0', 'fontWeight': 'bold', 'color': COLORS['text']})
-                ], style=CARD_STYLE),
-                
-                html.Div([
-                    html.H3(f'{total_clics:,.0f}', style={'color': COLORS['income'], 'margin': '0', 'fontSize': '2.5em'}),
-                    html.P('Clics', style={'margin': '5px 0', 'fontWeight': 'bold', 'color': COLORS['text']})
-                ], style=CARD_STYLE),
-                
-                html.Div([
-                    html.H3(f'{ctr:.2f}%', style={'color': COLORS['secondary'], 'margin': '0', 'fontSize': '2.5em'}),
-                    html.P('CTR Promedio', style={'margin': '5px 0', 'fontWeight': 'bold', 'color': COLORS['text']})
-                ], style=CARD_STYLE),
-                
-                html.Div([
-                    html.H3(f'{total_conversiones:,.0f}', style={'color': '#9b59b6', 'margin': '0', 'fontSize': '2.5em'}),
-                    html.P('Conversiones', style={'margin': '5px 0', 'fontWeight': 'bold', 'color': COLORS['text']})
-                ], style=CARD_STYLE)
-            ], style={'display': 'flex', 'justifyContent': 'center', 'marginBottom': '30px', 'flexWrap': 'wrap'})
-            
-            # 2. Gráfico de evolución temporal con tema oscuro
-            if periodo == 'D':
-                df_temporal = df_filtrado_sin_region.groupby('Día').agg({
-                    'Importe gastado (CLP)': 'sum',
-                    'Artículos agregados al carrito': 'sum'
-                }).reset_index()
-                titulo_evolucion = 'Evolución Diaria del Gasto y Conversiones'
-            elif periodo == 'W':
-                df_temporal = df_filtrado_sin_region.groupby(df_filtrado_sin_region['Día'].dt.to_period('W').dt.start_time).agg({
-                    'Importe gastado (CLP)': 'sum',
-                    'Artículos agregados al carrito': 'sum'
-                }).reset_index()
-                titulo_evolucion = 'Evolución Semanal del Gasto y Conversiones'
-            else:
-                df_temporal = df_filtrado_sin_region.groupby(df_filtrado_sin_region['Día'].dt.to_period('M').dt.start_time).agg({
-                    'Importe gastado (CLP)': 'sum',
-                    'Artículos agregados al carrito': 'sum'
-                }).reset_index()
-                titulo_evolucion = 'Evolución Mensual del Gasto y Conversiones'
-            
-            fig_evolucion = go.Figure()
-            
-            # Agregar línea de gasto (eje Y izquierdo)
-            fig_evolucion.add_trace(go.Scatter(
-                x=df_temporal['Día'],
-                y=df_temporal['Importe gastado (CLP)'],
-                mode='lines+markers',
-                name='Gasto (CLP)',
-                line=dict(color=COLORS['expense'], width=3),
-                marker=dict(size=8),
-                yaxis='y'
-            ))
-            
-            # Agregar línea de conversiones (eje Y derecho)
-            fig_evolucion.add_trace(go.Scatter(
-                x=df_temporal['Día'],
-                y=df_temporal['Artículos agregados al carrito'],
-                mode='lines+markers',
-                name='Conversiones',
-                line=dict(color=COLORS['income'], width=3),
-                marker=dict(size=8, symbol='diamond'),
-                yaxis='y2'
-            ))
-            
-            fig_evolucion.update_layout(
-                title=titulo_evolucion,
-                xaxis_title='Período',
-                height=400,
-                paper_bgcolor=COLORS['card_bg'],
-                plot_bgcolor=COLORS['card_bg'],
-                font={'color': COLORS['text']},
-                xaxis=dict(
-                    showgrid=True,
-                    gridcolor=COLORS['grid'],
-                    tickfont={'color': COLORS['text']},
-                    title_font={'color': COLORS['text']}
-                ),
-                yaxis=dict(
-                    title='Gasto (CLP)',
-                    titlefont=dict(color=COLORS['expense']),
-                    tickfont=dict(color=COLORS['expense']),
-                    showgrid=True,
-                    gridcolor=COLORS['grid'],
-                    side='left'
-                ),
-                yaxis2=dict(
-                    title='Conversiones',
-                    titlefont=dict(color=COLORS['income']),
-                    tickfont=dict(color=COLORS['income']),
-                    showgrid=False,
-                    side='right',
-                    overlaying='y'
-                ),
-                legend=dict(
-                    font=dict(color=COLORS['text']),
-                    orientation='h',
-                    yanchor='bottom',
-                    y=1.02,
-                    xanchor='right',
-                    x=1
-                ),
-                hovermode='x unified'
-            )
-            
-            # 3. Gráfico por región con tema oscuro
-            if df_filtrado_con_region.empty:
-                fig_regiones = go.Figure()
-                fig_regiones.update_layout(
-                    title="No hay datos regionales para el período seleccionado",
-                    paper_bgcolor=COLORS['card_bg'],
-                    plot_bgcolor=COLORS['card_bg'],
-                    font={'color': COLORS['text']}
-                )
-            else:
-                df_regiones = df_filtrado_con_region.groupby('Región').agg({
-                    'Importe gastado (CLP)': 'sum',
-                    'Impresiones': 'sum',
-                    'Clics en el enlace': 'sum'
-                }).reset_index()
-                df_regiones = df_regiones.sort_values('Importe gastado (CLP)', ascending=True).tail(10)
-                
-                fig_regiones = go.Figure(go.Bar(
-                    x=df_regiones['Importe gastado (CLP)'],
-                    y=df_regiones['Región'],
-                    orientation='h',
-                    marker_color=COLORS['primary'],
-                    text=df_regiones['Importe gastado (CLP)'].apply(lambda x: f'${x:,.0f}'),
-                    textposition='auto'
-                ))
-                
-                fig_regiones.update_layout(
-                    title='Gasto por Región (Top 10)',
-                    xaxis_title='Gasto (CLP)',
-                    yaxis_title='',
-                    height=500,
-                    paper_bgcolor=COLORS['card_bg'],
-                    plot_bgcolor=COLORS['card_bg'],
-                    font={'color': COLORS['text']},
-                    xaxis=dict(
-                        showgrid=True,
-                        gridcolor=COLORS['grid'],
-                        tickfont={'color': COLORS['text']},
-                        title_font={'color': COLORS['text']}
-                    ),
-                    yaxis=dict(
-                        showgrid=True,
-                        gridcolor=COLORS['grid'],
-                        tickfont={'color': COLORS['text']},
-                        title_font={'color': COLORS['text']}
-                    )
-                )
-            
-            # 4. Gráfico por públicos con tema oscuro
-            df_publicos = df_filtrado_sin_region.groupby('Público').agg({
-                'Importe gastado (CLP)': 'sum',
-                'Impresiones': 'sum',
-                'Clics en el enlace': 'sum',
-                'Artículos agregados al carrito': 'sum'
-            }).reset_index()
-            
-            df_publicos['CTR (%)'] = (df_publicos['Clics en el enlace'] / df_publicos['Impresiones'] * 100).fillna(0)
-            df_publicos['CPC (CLP)'] = (df_publicos['Importe gastado (CLP)'] / df_publicos['Clics en el enlace']).fillna(0)
-            df_publicos['Conversión (%)'] = (df_publicos['Artículos agregados al carrito'] / df_publicos['Clics en el enlace'] * 100).fillna(0)
-            df_publicos['Costo por Conversión (CLP)'] = (df_publicos['Importe gastado (CLP)'] / df_publicos['Artículos agregados al carrito']).fillna(0)
-            
-            fig_publicos = make_subplots(
-                rows=3, cols=2,
-                subplot_titles=(
-                    'Gasto Total (CLP)',
-                    'CTR (%)',
-                    'CPC (CLP)',
-                    'Conversión (%)',
-                    'Costo por Conversión (CLP)',
-                    'Artículos agregados al carrito'
-                ),
-                vertical_spacing=0.15,
-                horizontal_spacing=0.1
-            )
-            
-            # Colores para cada métrica
-            colors = [COLORS['expense'], COLORS['secondary'], '#9b59b6', COLORS['income'], '#e67e22', COLORS['primary']]
-            
-            # Añadir barras para cada métrica
-            fig_publicos.add_trace(go.Bar(x=df_publicos['Público'], y=df_publicos['Importe gastado (CLP)'], marker_color=colors[0], showlegend=False), row=1, col=1)
-            fig_publicos.add_trace(go.Bar(x=df_publicos['Público'], y=df_publicos['CTR (%)'], marker_color=colors[1], showlegend=False), row=1, col=2)
-            fig_publicos.add_trace(go.Bar(x=df_publicos['Público'], y=df_publicos['CPC (CLP)'], marker_color=colors[2], showlegend=False), row=2, col=1)
-            fig_publicos.add_trace(go.Bar(x=df_publicos['Público'], y=df_publicos['Conversión (%)'], marker_color=colors[3], showlegend=False), row=2, col=2)
-            fig_publicos.add_trace(go.Bar(x=df_publicos['Público'], y=df_publicos['Costo por Conversión (CLP)'], marker_color=colors[4], showlegend=False), row=3, col=1)
-            fig_publicos.add_trace(go.Bar(x=df_publicos['Público'], y=df_publicos['Artículos agregados al carrito'], marker_color=colors[5], showlegend=False), row=3, col=2)
-            
-            # 5. Gráfico por tipos de anuncios con tema oscuro
-            df_tipos = df_filtrado_sin_region.groupby('Tipo_Anuncio').agg({
-                'Importe gastado (CLP)': 'sum',
-                'Impresiones': 'sum',
-                'Clics en el enlace': 'sum',
-                'Artículos agregados al carrito': 'sum'
-            }).reset_index()
-            
-            df_tipos['CTR (%)'] = (df_tipos['Clics en el enlace'] / df_tipos['Impresiones'] * 100).fillna(0)
-            df_tipos['CPC (CLP)'] = (df_tipos['Importe gastado (CLP)'] / df_tipos['Clics en el enlace']).fillna(0)
-            df_tipos['Conversión (%)'] = (df_tipos['Artículos agregados al carrito'] / df_tipos['Clics en el enlace'] * 100).fillna(0)
-            df_tipos['Costo por Conversión (CLP)'] = (df_tipos['Importe gastado (CLP)'] / df_tipos['Artículos agregados al carrito']).fillna(0)
-            
-            fig_tipos = make_subplots(
-                rows=3, cols=2,
-                subplot_titles=(
-                    'Gasto Total (CLP)',
-                    'CTR (%)',
-                    'CPC (CLP)',
-                    'Conversión (%)',
-                    'Costo por Conversión (CLP)',
-                    'Artículos agregados al carrito'
-                ),
-                vertical_spacing=0.15,
-                horizontal_spacing=0.1
-            )
-            
-            # Añadir barras para cada métrica
-            fig_tipos.add_trace(go.Bar(x=df_tipos['Tipo_Anuncio'], y=df_tipos['Importe gastado (CLP)'], marker_color=colors[0], showlegend=False), row=1, col=1)
-            fig_tipos.add_trace(go.Bar(x=df_tipos['Tipo_Anuncio'], y=df_tipos['CTR (%)'], marker_color=colors[1], showlegend=False), row=1, col=2)
-            fig_tipos.add_trace(go.Bar(x=df_tipos['Tipo_Anuncio'], y=df_tipos['CPC (CLP)'], marker_color=colors[2], showlegend=False), row=2, col=1)
-            fig_tipos.add_trace(go.Bar(x=df_tipos['Tipo_Anuncio'], y=df_tipos['Conversión (%)'], marker_color=colors[3], showlegend=False), row=2, col=2)
-            fig_tipos.add_trace(go.Bar(x=df_tipos['Tipo_Anuncio'], y=df_tipos['Costo por Conversión (CLP)'], marker_color=colors[4], showlegend=False), row=3, col=1)
-            fig_tipos.add_trace(go.Bar(x=df_tipos['Tipo_Anuncio'], y=df_tipos['Artículos agregados al carrito'], marker_color=colors[5], showlegend=False), row=3, col=2)
-            
-            # Rotar etiquetas del eje x para tipos de anuncios
-            fig_tipos.update_xaxes(tickangle=45)
-            
-            # 6. Gráfico de Hook Rates con tema oscuro
-            df_hooks = df_filtrado_sin_region.groupby('Tipo_Anuncio').agg({
-                'Hook_Rate_3s': 'mean',
-                'Hook_Rate_25': 'mean',
-                'Hook_Rate_50': 'mean',
-                'Hook_Rate_75': 'mean',
-                'Hook_Rate_100': 'mean'
-            }).reset_index()
-            
-            # Ordenar por Hook Rate 3s
-            df_hooks = df_hooks.sort_values('Hook_Rate_3s', ascending=True)
-            
-            # Colores específicos para cada hook rate
-            colors_hooks = {
-                '3s': '#FF9999',
-                '25%': '#66B2FF', 
-                '50%': '#99FF99',
-                '75%': '#FFCC99',
-                '100%': '#FF99CC'
-            }
-            
-            fig_hooks = go.Figure()
-            
-            # Añadir cada hook rate como una barra horizontal separada
-            fig_hooks.add_trace(go.Bar(
-                y=df_hooks['Tipo_Anuncio'],
-                x=df_hooks['Hook_Rate_3s'],
-                name='3 segundos',
-                orientation='h',
-                marker_color=colors_hooks['3s'],
-                hovertemplate='Hook Rate 3s: %{x:.2f}%<br><extra></extra>'
-            ))
-            
-            fig_hooks.add_trace(go.Bar(
-                y=df_hooks['Tipo_Anuncio'],
-                x=df_hooks['Hook_Rate_25'],
-                name='25%',
-                orientation='h',
-                marker_color=colors_hooks['25%'],
-                hovertemplate='Hook Rate 25%: %{x:.2f}%<br><extra></extra>'
-            ))
-            
-            fig_hooks.add_trace(go.Bar(
-                y=df_hooks['Tipo_Anuncio'],
-                x=df_hooks['Hook_Rate_50'],
-                name='50%',
-                orientation='h',
-                marker_color=colors_hooks['50%'],
-                hovertemplate='Hook Rate 50%: %{x:.2f}%<br><extra></extra>'
-            ))
-            
-            fig_hooks.add_trace(go.Bar(
-                y=df_hooks['Tipo_Anuncio'],
-                x=df_hooks['Hook_Rate_75'],
-                name='75%',
-                orientation='h',
-                marker_color=colors_hooks['75%'],
-                hovertemplate='Hook Rate 75%: %{x:.2f}%<br><extra></extra>'
-            ))
-            
-            fig_hooks.add_trace(go.Bar(
-                y=df_hooks['Tipo_Anuncio'],
-                x=df_hooks['Hook_Rate_100'],
-                name='100%',
-                orientation='h',
-                marker_color=colors_hooks['100%'],
-                hovertemplate='Hook Rate 100%: %{x:.2f}%<br><extra></extra>'
-            ))
-            
-            # Configurar todos los gráficos con tema oscuro
-            for fig in [fig_publicos, fig_tipos, fig_hooks]:
-                fig.update_layout(
-                    paper_bgcolor=COLORS['card_bg'],
-                    plot_bgcolor=COLORS['card_bg'],
-                    font={'color': COLORS['text']},
-                    xaxis=dict(
-                        showgrid=True,
-                        gridcolor=COLORS['grid'],
-                        tickfont={'color': COLORS['text']},
-                        title_font={'color': COLORS['text']}
-                    ),
-                    yaxis=dict(
-                        showgrid=True,
-                        gridcolor=COLORS['grid'],
-                        tickfont={'color': COLORS['text']},
-                        title_font={'color': COLORS['text']}
-                    ),
-                    legend=dict(font=dict(color=COLORS['text']))
-                )
-            
-            # Configuraciones específicas
-            fig_publicos.update_layout(
-                title='Comparación entre Públicos',
-                height=800
-            )
-            
-            fig_tipos.update_layout(
-                title='Comparación de Métricas por Tipo de Anuncio',
-                height=800
-            )
-            
-            fig_hooks.update_layout(
-                title='Hook Rates por Tipo de Anuncio',
-                height=500,
-                barmode='group',
-                legend=dict(
-                    orientation='h',
-                    yanchor='bottom',
-                    y=1.02,
-                    xanchor='right',
-                    x=1
-                ),
-                margin=dict(l=200)
-            )
-            
-            # 7. Generar insights con estilo oscuro
-            dias_analizados = (pd.to_datetime(end_date) - pd.to_datetime(start_date)).days + 1
-            gasto_promedio_diario = total_gasto / dias_analizados if dias_analizados > 0 else 0
-            
-            # Mejor región (de los datos con región)
-            mejor_region = None
-            if not df_filtrado_con_region.empty:
-                df_regiones_insight = df_filtrado_con_region.groupby('Región')['Importe gastado (CLP)'].sum().reset_index()
-                if not df_regiones_insight.empty:
-                    mejor_region = df_regiones_insight.loc[df_regiones_insight['Importe gastado (CLP)'].idxmax()]
-            
-            # Mejor público (de los datos sin región)
-            mejor_publico = df_publicos.loc[df_publicos['Importe gastado (CLP)'].idxmax()] if not df_publicos.empty else None
-            
-            insights = [
-                html.P(f"📊 Análisis del período: {dias_analizados} días", style={
-                    'fontWeight': 'bold', 
-                    'fontSize': '16px',
-                    'color': COLORS['text']
-                }),
-                html.P(f"💰 Gasto promedio diario: ${gasto_promedio_diario:,.0f}", style={'color': COLORS['text']}),
-                html.P(f"📈 CTR promedio: {ctr:.2f}%", style={'color': COLORS['text']}),
-                html.P(f"💸 CPC promedio: ${cpc:,.0f}", style={'color': COLORS['text']}),
-                html.P(f"📋 Datos procesados: {len(df_filtrado_sin_region)} registros principales, {len(df_filtrado_con_region)} registros regionales", style={'color': COLORS['text']}),
-            ]
-            
-            if mejor_region is not None:
-                insights.append(html.P(f"🎯 Región con mayor gasto: {mejor_region['Región']} (${mejor_region['Importe gastado (CLP)']:,.0f})", style={'color': COLORS['text']}))
-            
-            if mejor_publico is not None:
-                insights.append(html.P(f"👥 Público con mejor rendimiento: {mejor_publico['Público']} (${mejor_publico['Importe gastado (CLP)']:,.0f})", style={'color': COLORS['text']}))
-            
-            insights_contenido = html.Div(insights)
-            
-            return metricas, fig_evolucion, fig_regiones, fig_publicos, fig_tipos, fig_hooks, insights_contenido
-            
-        except Exception as e:
-            print(f"Error en callback: {str(e)}")
-            import traceback
-            traceback.print_exc()
-            empty_fig = go.Figure()
-            empty_fig.update_layout(
-                paper_bgcolor=COLORS['card_bg'],
-                plot_bgcolor=COLORS['card_bg'],
-                font={'color': COLORS['text']}
-            )
-            return (html.Div("Error al cargar datos", style={'color': COLORS['text']}), empty_fig, empty_fig, empty_fig, empty_fig, empty_fig, "Error en insights")
-
-else:
-    app.layout = html.Div([
-        html.H1("Error: No se pudieron cargar los datos", style={
-            'textAlign': 'center', 
-            'color': COLORS['expense'],
-            'backgroundColor': COLORS['background'],
-            'minHeight': '100vh',
-            'padding': '20px'
-        })
-    ], style={'backgroundColor': COLORS['background']})
 
 if __name__ == '__main__':
     print("\n=== DASHBOARD DE MARKETING COMPLETO ===")
-    print("Datos cargados exitosamente")
+    print("Datos cargándose en segundo plano")
     print("Iniciando servidor en http://localhost:8056")
     app.run(debug=False, port=8056) 
\ No newline at end of file
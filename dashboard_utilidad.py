@@ -4,15 +4,12 @@ import pandas as pd
 from datetime import datetime
 import os
 import plotly.graph_objects as go
-from funciones.funciones import *
-from funciones.funciones_reservas import *
 
 # Importar módulos personalizados
 from funciones.graficos_dashboard import (
-    crear_grafico_ingresos_gastos,
-    crear_grafico_horas_populares,
-    crear_grafico_reservas,
-    crear_grafico_utilidad_operativa,
+    crear_grafico_correlacion,
+    figura_base_utilidad_operativa,
+    series_utilidad_operativa,
     COLORS
 )
 
@@ -26,7 +23,27 @@ from funciones.componentes_dashboard import (
     CARD_STYLE
 )
 
+from funciones.calendario import agregar_dia_key, construir_calendario_datos
+from funciones.cache_callbacks import CacheCallbacks
+from funciones.carga_tablas import cargar_tablas, TABLAS_DASHBOARD
+from funciones.correlacion import MAX_REZAGO, correlacion_rezagada, generar_insights_correlacion, series_diarias
+from funciones.figuras_parciales import aplicar_serie, parche_figura
+from funciones.payload import configurar_payload
+from funciones.contexto_analisis import ContextoAnalisis, contexto_de
+from funciones.tema import TEMA
+
 # ======== CARGA DE DATOS ========
+# Columna de fecha de cada tabla, usada para la clave de día y el calendario
+COLUMNAS_FECHA = {
+    'reservas': 'fecha_trip',
+    'pagos': 'Fecha',
+    'gastos': 'Fecha',
+    'costos_fijos': 'Fecha',
+    'ingresos': 'fecha',
+    'costos_operativos': 'fecha',
+    'gastos_marketing': 'fecha'
+}
+
 def cargar_datos():
     """Carga todos los archivos CSV necesarios para el dashboard."""
     
@@ -37,69 +54,15 @@ def cargar_datos():
     datos = {}
     
     try:
-        # Carga de datos de reservas
-        if os.path.exists("archivos_output/reservas_HotBoat.csv"):
-            df = pd.read_csv("archivos_output/reservas_HotBoat.csv")
-            df["fecha_trip"] = pd.to_datetime(df["fecha_trip"])
-            datos['reservas'] = df
-        else:
-            print("Archivo de reservas no encontrado, creando DataFrame vacío")
-            datos['reservas'] = pd.DataFrame()
-        
-        # Carga de datos financieros
-        if os.path.exists("archivos_output/abonos hotboat.csv"):
-            df_payments = pd.read_csv("archivos_output/abonos hotboat.csv")
-            df_payments["Fecha"] = pd.to_datetime(df_payments["Fecha"])
-            df_payments["Monto"] = df_payments["Monto"].astype(float)
-            datos['pagos'] = df_payments
-        else:
-            print("Archivo de abonos no encontrado, creando DataFrame vacío")
-            datos['pagos'] = pd.DataFrame()
-        
-        if os.path.exists("archivos_output/gastos hotboat.csv"):
-            df_expenses = pd.read_csv("archivos_output/gastos hotboat.csv")
-            df_expenses["Fecha"] = pd.to_datetime(df_expenses["Fecha"])
-            df_expenses["Monto"] = df_expenses["Monto"].astype(float)
-            datos['gastos'] = df_expenses
-            
-            # Extraer costos fijos desde gastos
-            if "Categoría 1" in df_expenses.columns:
-                df_costos_fijos = df_expenses[df_expenses["Categoría 1"] == "Costos Fijos"].copy()
-            else:
-                df_costos_fijos = pd.DataFrame()
-            datos['costos_fijos'] = df_costos_fijos
-        else:
-            print("Archivo de gastos no encontrado, creando DataFrame vacío")
-            datos['gastos'] = pd.DataFrame()
-            datos['costos_fijos'] = pd.DataFrame()
+        # Lectura en paralelo con formatos y dtypes explícitos; los archivos faltantes quedan vacíos
+        datos = cargar_tablas(TABLAS_DASHBOARD, si_falta='vacio')
         
-        # Datos para análisis de utilidad operativa
-        if os.path.exists("archivos_output/ingresos_totales.csv"):
-            df_ingresos = pd.read_csv("archivos_output/ingresos_totales.csv")
-            df_ingresos["fecha"] = pd.to_datetime(df_ingresos["fecha"])
-            datos['ingresos'] = df_ingresos
-            print(f"✅ Ingresos cargados: {len(df_ingresos)} filas")
+        # Extraer costos fijos desde gastos
+        df_expenses = datos['gastos']
+        if "Categoría 1" in df_expenses.columns:
+            datos['costos_fijos'] = df_expenses[df_expenses["Categoría 1"] == "Costos Fijos"].copy()
         else:
-            print("❌ Archivo de ingresos totales no encontrado, creando DataFrame vacío")
-            datos['ingresos'] = pd.DataFrame()
-        
-        if os.path.exists("archivos_output/costos_operativos.csv"):
-            df_costos_operativos = pd.read_csv("archivos_output/costos_operativos.csv")
-            df_costos_operativos["fecha"] = pd.to_datetime(df_costos_operativos["fecha"])
-            datos['costos_operativos'] = df_costos_operativos
-            print(f"✅ Costos operativos cargados: {len(df_costos_operativos)} filas")
-        else:
-            print("❌ Archivo de costos operativos no encontrado, creando DataFrame vacío")
-            datos['costos_operativos'] = pd.DataFrame()
-        
-        if os.path.exists("archivos_output/gastos_marketing.csv"):
-            df_gastos_marketing = pd.read_csv("archivos_output/gastos_marketing.csv")
-            df_gastos_marketing["fecha"] = pd.to_datetime(df_gastos_marketing["fecha"])
-            datos['gastos_marketing'] = df_gastos_marketing
-            print(f"✅ Gastos marketing cargados: {len(df_gastos_marketing)} filas")
-        else:
-            print("❌ Archivo de gastos marketing no encontrado, creando DataFrame vacío")
-            datos['gastos_marketing'] = pd.DataFrame()
+            datos['costos_fijos'] = pd.DataFrame()
         
     except Exception as e:
         print(f"Error al cargar datos: {e}")
@@ -108,195 +71,88 @@ def cargar_datos():
             if key not in datos:
                 datos[key] = pd.DataFrame()
     
+    # Clave entera de día en cada tabla y calendario compartido para agrupar por periodo
+    for clave, columna in COLUMNAS_FECHA.items():
+        agregar_dia_key(datos[clave], columna)
+    datos['calendario'] = construir_calendario_datos(datos, COLUMNAS_FECHA)
+    
     return datos
 
 # ======== FUNCIONES PARA GRÁFICOS INTERACTIVOS ========
-def crear_grafico_interactivo(df_ingresos, df_costos_operativos, df_gastos_marketing, df_costos_fijos, periodo, variables_seleccionadas):
-    """Crea un gráfico interactivo que muestra solo las variables seleccionadas."""
-    
-    # Preparar datos según el periodo seleccionado
-    if periodo == 'D':
-        # Preparación para ingresos
-        if df_ingresos is not None:
-            df_ingresos['fecha_grupo'] = df_ingresos["fecha"].dt.date
-        # Preparación para costos operativos  
-        if df_costos_operativos is not None:
-            df_costos_operativos['fecha_grupo'] = df_costos_operativos["fecha"].dt.date
-        # Preparación para gastos marketing
-        if df_gastos_marketing is not None:
-            df_gastos_marketing['fecha_grupo'] = df_gastos_marketing["fecha"].dt.date
-        # Preparación para costos fijos
-        if df_costos_fijos is not None:
-            df_costos_fijos['fecha_grupo'] = df_costos_fijos["Fecha"].dt.date
-        
-        titulo = 'Análisis Financiero por Día'
-    elif periodo == 'W':
-        # Preparación para ingresos
-        if df_ingresos is not None:
-            df_ingresos['fecha_grupo'] = df_ingresos["fecha"] - pd.to_timedelta(df_ingresos["fecha"].dt.dayofweek, unit='D')
-            df_ingresos['fecha_label'] = df_ingresos['fecha_grupo'].dt.strftime('Semana del %d/%m/%Y')
-        # Preparación para costos operativos
-        if df_costos_operativos is not None:
-            df_costos_operativos['fecha_grupo'] = df_costos_operativos["fecha"] - pd.to_timedelta(df_costos_operativos["fecha"].dt.dayofweek, unit='D')
-            df_costos_operativos['fecha_label'] = df_costos_operativos['fecha_grupo'].dt.strftime('Semana del %d/%m/%Y')
-        # Preparación para gastos marketing
-        if df_gastos_marketing is not None:
-            df_gastos_marketing['fecha_grupo'] = df_gastos_marketing["fecha"] - pd.to_timedelta(df_gastos_marketing["fecha"].dt.dayofweek, unit='D')
-            df_gastos_marketing['fecha_label'] = df_gastos_marketing['fecha_grupo'].dt.strftime('Semana del %d/%m/%Y')
-        # Preparación para costos fijos
-        if df_costos_fijos is not None:
-            df_costos_fijos['fecha_grupo'] = df_costos_fijos["Fecha"] - pd.to_timedelta(df_costos_fijos["Fecha"].dt.dayofweek, unit='D')
-            df_costos_fijos['fecha_label'] = df_costos_fijos['fecha_grupo'].dt.strftime('Semana del %d/%m/%Y')
-        
-        titulo = 'Análisis Financiero por Semana'
-    else:  # 'M'
-        # Preparación para ingresos
-        if df_ingresos is not None:
-            df_ingresos['fecha_grupo'] = df_ingresos["fecha"].dt.to_period('M').dt.to_timestamp()
-            df_ingresos['fecha_label'] = df_ingresos["fecha"].dt.strftime('%B %Y')
-        # Preparación para costos operativos
-        if df_costos_operativos is not None:
-            df_costos_operativos['fecha_grupo'] = df_costos_operativos["fecha"].dt.to_period('M').dt.to_timestamp()
-            df_costos_operativos['fecha_label'] = df_costos_operativos["fecha"].dt.strftime('%B %Y')
-        # Preparación para gastos marketing
-        if df_gastos_marketing is not None:
-            df_gastos_marketing['fecha_grupo'] = df_gastos_marketing["fecha"].dt.to_period('M').dt.to_timestamp()
-            df_gastos_marketing['fecha_label'] = df_gastos_marketing["fecha"].dt.strftime('%B %Y')
-        # Preparación para costos fijos
-        if df_costos_fijos is not None:
-            df_costos_fijos['fecha_grupo'] = df_costos_fijos["Fecha"].dt.to_period('M').dt.to_timestamp()
-            df_costos_fijos['fecha_label'] = df_costos_fijos["Fecha"].dt.strftime('%B %Y')
-        
-        titulo = 'Análisis Financiero por Mes'
-
-    # Agrupar datos para cada categoría
-    datos_agrupados = {}
-    fechas_todas = set()
-    etiquetas_fecha = {}
-    
-    # Procesar ingresos
-    if 'ingresos' in variables_seleccionadas and df_ingresos is not None:
-        ingresos_totales = df_ingresos.groupby('fecha_grupo')['monto'].sum().reset_index()
-        datos_agrupados['ingresos'] = ingresos_totales
-        fechas_todas.update(ingresos_totales['fecha_grupo'])
-        
-        if periodo in ['W', 'M']:
-            for idx, row in df_ingresos.iterrows():
-                etiquetas_fecha[row['fecha_grupo']] = row['fecha_label']
-    
-    # Procesar costos operativos
-    if 'costos_operativos' in variables_seleccionadas and df_costos_operativos is not None:
-        costos_operativos = df_costos_operativos.groupby('fecha_grupo')['monto'].sum().reset_index()
-        datos_agrupados['costos_operativos'] = costos_operativos
-        fechas_todas.update(costos_operativos['fecha_grupo'])
-        
-        if periodo in ['W', 'M']:
-            for idx, row in df_costos_operativos.iterrows():
-                etiquetas_fecha[row['fecha_grupo']] = row['fecha_label']
+# Categorías del gráfico interactivo: (clave, nombre en la leyenda, color, columna de fecha, columna de monto).
+# La figura base tiene siempre las cuatro trazas en este orden; la selección solo cambia su visibilidad.
+CATEGORIAS_INTERACTIVO = [
+    ('ingresos', 'Ingresos Totales', COLORS['income'], 'fecha', 'monto'),
+    ('costos_operativos', 'Costos Operativos', COLORS['expense'], 'fecha', 'monto'),
+    ('gastos_marketing', 'Gastos Marketing', '#ff6b6b', 'fecha', 'monto'),
+    ('costos_fijos', 'Costos Fijos', '#9370db', 'Fecha', 'Monto'),  # Púrpura medio para costos fijos
+]
 
-    # Procesar gastos marketing
-    if 'gastos_marketing' in variables_seleccionadas and df_gastos_marketing is not None:
-        gastos_marketing = df_gastos_marketing.groupby('fecha_grupo')['monto'].sum().reset_index()
-        datos_agrupados['gastos_marketing'] = gastos_marketing
-        fechas_todas.update(gastos_marketing['fecha_grupo'])
-        
-        if periodo in ['W', 'M']:
-            for idx, row in df_gastos_marketing.iterrows():
-                etiquetas_fecha[row['fecha_grupo']] = row['fecha_label']
-    
-    # Procesar costos fijos
-    if 'costos_fijos' in variables_seleccionadas and df_costos_fijos is not None:
-        costos_fijos = df_costos_fijos.groupby('fecha_grupo')['Monto'].sum().reset_index()
-        datos_agrupados['costos_fijos'] = costos_fijos
-        fechas_todas.update(costos_fijos['fecha_grupo'])
-        
-        if periodo in ['W', 'M']:
-            for idx, row in df_costos_fijos.iterrows():
-                etiquetas_fecha[row['fecha_grupo']] = row['fecha_label']
-
-    # Crear figura
+def figura_base_interactivo():
+    """Layout y trazas vacías del gráfico financiero interactivo."""
     fig = go.Figure()
     
-    # Colores para cada categoría
-    colores_categoria = {
-        'ingresos': COLORS['income'],
-        'costos_operativos': COLORS['expense'],
-        'gastos_marketing': '#ff6b6b',
-        'costos_fijos': '#9370db'  # Púrpura medio para costos fijos
-    }
-    
-    # Nombres amigables para mostrar en la leyenda
-    nombres_amigables = {
-        'ingresos': 'Ingresos Totales',
-        'costos_operativos': 'Costos Operativos',
-        'gastos_marketing': 'Gastos Marketing',
-        'costos_fijos': 'Costos Fijos'
-    }
-    
-    # Añadir barras para cada categoría seleccionada
-    for categoria, datos in datos_agrupados.items():
+    # Una barra por categoría (se muestran u ocultan según la selección)
+    for _, nombre, color, _, _ in CATEGORIAS_INTERACTIVO:
         fig.add_trace(go.Bar(
-            x=datos['fecha_grupo'],
-            y=datos['monto'] if categoria != 'costos_fijos' else datos['Monto'],
-            name=nombres_amigables[categoria],
-            marker_color=colores_categoria[categoria]
+            x=[],
+            y=[],
+            name=nombre,
+            marker_color=color
         ))
     
     # Configurar layout
     fig.update_layout(
-        title=titulo,
         xaxis_title='Período',
         yaxis_title='Monto (CLP)',
         barmode='group',
         hovermode='x unified',
-        template='plotly_white',
+        template=TEMA,
         height=400
     )
-    
     return fig
 
-def crear_grafico_avg_sale_value(df_reservas, periodo):
-    """Crea un gráfico de valor promedio de venta agrupado por período."""
-    
-    # Filtrar datos válidos
-    df_filtered = df_reservas.dropna(subset=['precio_total', 'fecha_trip'])
-    
-    if df_filtered.empty:
-        fig = go.Figure()
-        fig.add_annotation(
-            text="No hay datos suficientes para mostrar el gráfico",
-            x=0.5, y=0.5,
-            xref="paper", yref="paper",
-            showarrow=False,
-            font=dict(size=16)
-        )
-        fig.update_layout(
-            title="Valor Promedio de Venta por Período",
-            template='plotly_white',
-            height=400
-        )
-        return fig
-    
-    # Agrupar según el periodo
-    if periodo == 'D':
-        df_filtered['periodo'] = df_filtered['fecha_trip'].dt.date
-        titulo = 'Valor Promedio de Venta por Día'
-    elif periodo == 'W':
-        df_filtered['periodo'] = df_filtered['fecha_trip'] - pd.to_timedelta(df_filtered['fecha_trip'].dt.dayofweek, unit='D')
-        titulo = 'Valor Promedio de Venta por Semana'
-    else:  # 'M'
-        df_filtered['periodo'] = df_filtered['fecha_trip'].dt.to_period('M').dt.to_timestamp()
-        titulo = 'Valor Promedio de Venta por Mes'
-    
-    # Calcular valor promedio por período
-    avg_sale_by_period = df_filtered.groupby('periodo')['precio_total'].mean().reset_index()
-    
-    # Crear gráfico de línea
+def series_interactivo(df_ingresos, df_costos_operativos, df_gastos_marketing, df_costos_fijos, periodo, variables_seleccionadas, contexto=None):
+    """Datos del gráfico interactivo: solo las variables seleccionadas quedan visibles."""
+    
+    fuentes = {
+        'ingresos': df_ingresos,
+        'costos_operativos': df_costos_operativos,
+        'gastos_marketing': df_gastos_marketing,
+        'costos_fijos': df_costos_fijos,
+    }
+    if contexto is None:
+        contexto = ContextoAnalisis({categoria: (fuentes[categoria], col_fecha)
+                                     for categoria, _, _, col_fecha, _ in CATEGORIAS_INTERACTIVO})
+    trazas = []
+    
+    # Agregados por categoría compartidos con el resto del callback
+    for categoria, _, _, _, col_monto in CATEGORIAS_INTERACTIVO:
+        if categoria not in variables_seleccionadas or fuentes[categoria] is None:
+            trazas.append({'x': [], 'y': [], 'visible': False})
+            continue
+        agrupado = contexto.agrupado(categoria, periodo, col_monto)['suma']
+        trazas.append({'x': agrupado.index, 'y': agrupado.to_numpy(), 'visible': True})
+    
+    return {
+        'titulo': {'D': 'Análisis Financiero por Día', 'W': 'Análisis Financiero por Semana'}.get(periodo, 'Análisis Financiero por Mes'),
+        'trazas': trazas
+    }
+
+def crear_grafico_interactivo(df_ingresos, df_costos_operativos, df_gastos_marketing, df_costos_fijos, periodo, variables_seleccionadas):
+    """Crea un gráfico interactivo que muestra solo las variables seleccionadas."""
+    return aplicar_serie(
+        figura_base_interactivo(),
+        series_interactivo(df_ingresos, df_costos_operativos, df_gastos_marketing, df_costos_fijos, periodo, variables_seleccionadas)
+    )
+
+def figura_base_avg_sale_value():
+    """Layout y traza vacía del gráfico de valor promedio de venta."""
     fig = go.Figure()
     
     fig.add_trace(go.Scatter(
-        x=avg_sale_by_period['periodo'],
-        y=avg_sale_by_period['precio_total'],
+        x=[],
+        y=[],
         mode='lines+markers',
         name='Valor Promedio',
         line=dict(color=COLORS['primary'], width=3),
@@ -305,17 +161,45 @@ def crear_grafico_avg_sale_value(df_reservas, periodo):
     
     # Configurar layout
     fig.update_layout(
-        title=titulo,
         xaxis_title='Período',
         yaxis_title='Valor Promedio (CLP)',
-        template='plotly_white',
+        template=TEMA,
         hovermode='x unified',
         height=400
     )
-    
     return fig
 
-def generar_insights_utilidad_operativa(df_ingresos, df_costos_operativos, df_gastos_marketing, df_costos_fijos, periodo):
+def series_avg_sale_value(df_reservas, periodo, contexto=None):
+    """Valor promedio de venta agrupado por período."""
+    
+    # Promedio por período de las filas con precio y fecha
+    contexto = contexto_de(contexto, 'reservas', df_reservas, 'fecha_trip')
+    avg_sale_by_period = contexto.promedio('reservas', periodo, 'precio_total').dropna()
+    
+    if avg_sale_by_period.empty:
+        return {
+            'titulo': "Valor Promedio de Venta por Período",
+            'trazas': [{'x': [], 'y': []}],
+            'layout': {'annotations': [dict(
+                text="No hay datos suficientes para mostrar el gráfico",
+                x=0.5, y=0.5,
+                xref="paper", yref="paper",
+                showarrow=False,
+                font=dict(size=16)
+            )]}
+        }
+    
+    return {
+        'titulo': {'D': 'Valor Promedio de Venta por Día', 'W': 'Valor Promedio de Venta por Semana'}.get(periodo, 'Valor Promedio de Venta por Mes'),
+        'trazas': [{'x': avg_sale_by_period.index, 'y': avg_sale_by_period.to_numpy()}],
+        'layout': {'annotations': []}
+    }
+
+def crear_grafico_avg_sale_value(df_reservas, periodo):
+    """Crea un gráfico de valor promedio de venta agrupado por período."""
+    return aplicar_serie(figura_base_avg_sale_value(), series_avg_sale_value(df_reservas, periodo))
+
+def generar_insights_utilidad_operativa(df_ingresos, df_costos_operativos, df_gastos_marketing, df_costos_fijos, periodo, contexto=None):
     """Genera insights automáticos para la utilidad operativa."""
     
     insights = []
@@ -360,13 +244,9 @@ def generar_insights_utilidad_operativa(df_ingresos, df_costos_operativos, df_ga
     
     # Insight 3: Tendencia por período
     if periodo != 'D' and df_ingresos is not None and len(df_ingresos) > 1:
-        # Agrupar por período
-        if periodo == 'W':
-            df_ingresos['periodo'] = df_ingresos['fecha'] - pd.to_timedelta(df_ingresos['fecha'].dt.dayofweek, unit='D')
-        else:  # 'M'
-            df_ingresos['periodo'] = df_ingresos['fecha'].dt.to_period('M').dt.to_timestamp()
-        
-        ingresos_por_periodo = df_ingresos.groupby('periodo')['monto'].sum()
+        # Ingresos por período (agregado compartido con el gráfico)
+        contexto = contexto_de(contexto, 'ingresos', df_ingresos, 'fecha')
+        ingresos_por_periodo = contexto.agrupado('ingresos', periodo, 'monto')['suma']
         
         if len(ingresos_por_periodo) >= 2:
             ultimo_periodo = ingresos_por_periodo.iloc[-1]
@@ -381,7 +261,7 @@ def generar_insights_utilidad_operativa(df_ingresos, df_costos_operativos, df_ga
     
     return insights
 
-def generar_insights_valor_promedio_venta(df_reservas, periodo):
+def generar_insights_valor_promedio_venta(df_reservas, periodo, contexto=None):
     """Genera insights automáticos para el valor promedio de venta."""
     
     insights = []
@@ -397,19 +277,12 @@ def generar_insights_valor_promedio_venta(df_reservas, periodo):
     valor_promedio_general = df_filtered['precio_total'].mean()
     insights.append(f"💰 Valor promedio de venta general: ${valor_promedio_general:,.0f} CLP")
     
-    # Agrupar por período
-    if periodo == 'D':
-        df_filtered['periodo'] = df_filtered['fecha_trip'].dt.date
-        nombre_periodo = 'día'
-    elif periodo == 'W':
-        df_filtered['periodo'] = df_filtered['fecha_trip'] - pd.to_timedelta(df_filtered['fecha_trip'].dt.dayofweek, unit='D')
-        nombre_periodo = 'semana'
-    else:  # 'M'
-        df_filtered['periodo'] = df_filtered['fecha_trip'].dt.to_period('M').dt.to_timestamp()
-        nombre_periodo = 'mes'
+    # Promedio por período (agregado compartido con el gráfico)
+    contexto = contexto_de(contexto, 'reservas', df_reservas, 'fecha_trip')
+    nombre_periodo = {'D': 'día', 'W': 'semana'}.get(periodo, 'mes')
     
     # Analizar tendencia
-    avg_by_period = df_filtered.groupby('periodo')['precio_total'].mean()
+    avg_by_period = contexto.promedio('reservas', periodo, 'precio_total').dropna()
     
     if len(avg_by_period) >= 2:
         ultimo_valor = avg_by_period.iloc[-1]
@@ -448,6 +321,7 @@ def crear_app_utilidad(datos=None):
     
     # Inicializar la aplicación
     app = dash.Dash(__name__)
+    configurar_payload(app, 'Utilidad')
     
     # Cargar datos si no se proporcionan
     if datos is None:
@@ -545,13 +419,13 @@ def crear_app_utilidad(datos=None):
         html.Div([
             # Gráfico de utilidad operativa
             html.Div([
-                crear_contenedor_grafico("Utilidad Operativa por Período", "utilidad-operativa-chart"),
+                crear_contenedor_grafico("utilidad-operativa-chart", "Utilidad Operativa por Período", figura=figura_base_utilidad_operativa()),
                 crear_contenedor_insights("insights-utilidad")
             ], className="col-md-6"),
             
             # Gráfico interactivo
             html.Div([
-                crear_contenedor_grafico("Análisis Financiero Interactivo", "grafico-interactivo"),
+                crear_contenedor_grafico("grafico-interactivo", "Análisis Financiero Interactivo", figura=figura_base_interactivo()),
                 crear_contenedor_insights("insights-interactivo")
             ], className="col-md-6")
         ], className="row mb-4"),
@@ -559,12 +433,44 @@ def crear_app_utilidad(datos=None):
         # Gráfico de valor promedio de venta
         html.Div([
             html.Div([
-                crear_contenedor_grafico("Valor Promedio de Venta", "avg-sale-value-chart"),
+                crear_contenedor_grafico("avg-sale-value-chart", "Valor Promedio de Venta", figura=figura_base_avg_sale_value()),
                 crear_contenedor_insights("insights-avg-sale")
             ], className="col-md-12")
+        ], className="row"),
+        
+        # Correlación rezagada entre gasto en marketing e ingresos/reservas
+        html.Div([
+            html.Div([
+                crear_contenedor_grafico("correlacion-marketing-chart", f"Correlación Marketing vs Ingresos (rezagos de 0 a {MAX_REZAGO} días)"),
+                crear_contenedor_insights("insights-correlacion")
+            ], className="col-md-12")
         ], className="row")
     ], className="container-fluid")
     
+    # Series diarias de gasto, ingresos y reservas; la correlación se cachea por rango de fechas
+    try:
+        diaria_correlacion = series_diarias(datos.get('gastos_marketing'), datos.get('ingresos'), datos.get('reservas'))
+    except Exception as e:
+        print(f"⚠️ No se pudieron armar las series para la correlación: {e}")
+        diaria_correlacion = pd.DataFrame()
+    cache = CacheCallbacks()
+    
+    @app.callback(
+        [Output('correlacion-marketing-chart', 'figure'),
+         Output('insights-correlacion', 'children')],
+        [Input('date-range-picker', 'start_date'),
+         Input('date-range-picker', 'end_date')]
+    )
+    def actualizar_correlacion(start_date, end_date):
+        df_correlacion = cache.obtener(
+            ('correlacion', str(start_date), str(end_date)),
+            lambda: correlacion_rezagada(diaria_correlacion, start_date, end_date)
+        )
+        return (
+            crear_grafico_correlacion(df_correlacion),
+            [html.Li(insight) for insight in generar_insights_correlacion(df_correlacion)]
+        )
+    
     # Callback principal
     @app.callback(
         [Output('utilidad-operativa-chart', 'figure'),
@@ -625,45 +531,54 @@ def crear_app_utilidad(datos=None):
                 df_ingresos_filtrado = df_ingresos_filtrado[
                     (df_ingresos_filtrado['fecha'] >= start_date) & 
                     (df_ingresos_filtrado['fecha'] <= end_date)
-                ].copy()
+                ]
             
             if df_costos_operativos_filtrado is not None:
                 df_costos_operativos_filtrado = df_costos_operativos_filtrado[
                     (df_costos_operativos_filtrado['fecha'] >= start_date) & 
                     (df_costos_operativos_filtrado['fecha'] <= end_date)
-                ].copy()
+                ]
             
             if df_gastos_marketing_filtrado is not None:
                 df_gastos_marketing_filtrado = df_gastos_marketing_filtrado[
                     (df_gastos_marketing_filtrado['fecha'] >= start_date) & 
                     (df_gastos_marketing_filtrado['fecha'] <= end_date)
-                ].copy()
+                ]
             
             if df_costos_fijos_filtrado is not None:
                 df_costos_fijos_filtrado = df_costos_fijos_filtrado[
                     (df_costos_fijos_filtrado['Fecha'] >= start_date) & 
                     (df_costos_fijos_filtrado['Fecha'] <= end_date)
-                ].copy()
+                ]
             
             if df_reservas_filtrado is not None:
                 df_reservas_filtrado = df_reservas_filtrado[
                     (df_reservas_filtrado['fecha_trip'] >= start_date) & 
                     (df_reservas_filtrado['fecha_trip'] <= end_date)
-                ].copy()
-        
-        # Crear gráficos
-        fig_utilidad = crear_grafico_utilidad_operativa(
+                ]
+        
+        # Una sola pasada de agrupamiento por serie, compartida por gráficos e insights
+        contexto = ContextoAnalisis({
+            'ingresos': (df_ingresos_filtrado, 'fecha'),
+            'costos_operativos': (df_costos_operativos_filtrado, 'fecha'),
+            'gastos_marketing': (df_gastos_marketing_filtrado, 'fecha'),
+            'costos_fijos': (df_costos_fijos_filtrado, 'Fecha'),
+            'reservas': (df_reservas_filtrado, 'fecha_trip'),
+        })
+        
+        # Parches de las figuras base: solo datos, título y ticks
+        fig_utilidad = parche_figura(series_utilidad_operativa(
             df_ingresos_filtrado, df_costos_operativos_filtrado, 
-            df_gastos_marketing_filtrado, df_costos_fijos_filtrado, periodo
-        )
+            df_gastos_marketing_filtrado, periodo, contexto
+        ))
         
-        fig_interactivo = crear_grafico_interactivo(
+        fig_interactivo = parche_figura(series_interactivo(
             df_ingresos_filtrado, df_costos_operativos_filtrado,
             df_gastos_marketing_filtrado, df_costos_fijos_filtrado, 
-            periodo, variables_seleccionadas
-        )
+            periodo, variables_seleccionadas, contexto
+        ))
         
-        fig_avg_sale = crear_grafico_avg_sale_value(df_reservas_filtrado, periodo)
+        fig_avg_sale = parche_figura(series_avg_sale_value(df_reservas_filtrado, periodo, contexto))
         
         # Calcular métricas
         total_ingresos = 0
@@ -730,8 +645,8 @@ def crear_app_utilidad(datos=None):
         
         # Generar insights
         insights_interactivo = ["📊 Selecciona diferentes variables para comparar tendencias"] if variables_seleccionadas else ["ℹ️ Selecciona al menos una variable para mostrar insights"]
-        insights_utilidad = generar_insights_utilidad_operativa(df_ingresos_filtrado, df_costos_operativos_filtrado, df_gastos_marketing_filtrado, df_costos_fijos_filtrado, periodo)
-        insights_avg_sale = generar_insights_valor_promedio_venta(df_reservas_filtrado, periodo)
+        insights_utilidad = generar_insights_utilidad_operativa(df_ingresos_filtrado, df_costos_operativos_filtrado, df_gastos_marketing_filtrado, df_costos_fijos_filtrado, periodo, contexto)
+        insights_avg_sale = generar_insights_valor_promedio_venta(df_reservas_filtrado, periodo, contexto)
         
         return (
             fig_utilidad, fig_interactivo, fig_avg_sale,
@@ -1,18 +1,20 @@
 import dash
-from dash import html, dcc, Input, Output
+from dash import html, dcc, Input, Output, State, ClientsideFunction
 import pandas as pd
 from datetime import datetime
 import os
 import plotly.graph_objects as go
-from funciones.funciones import *
-from funciones.funciones_reservas import *
 
 # Importar módulos personalizados
 from funciones.graficos_dashboard import (
-    crear_grafico_ingresos_gastos,
+    crear_grafico_correlacion,
     crear_grafico_horas_populares,
-    crear_grafico_reservas,
-    crear_grafico_utilidad_operativa,
+    figura_base_ingresos_gastos,
+    figura_base_reservas,
+    figura_base_utilidad_operativa,
+    NOMBRES_PERIODO,
+    GRAPH_STYLE,
+    LAYOUT_BARRAS_MONTO,
     COLORS
 )
 
@@ -23,271 +25,115 @@ from funciones.componentes_dashboard import (
     crear_tarjetas_metricas,
     crear_contenedor_grafico,
     crear_contenedor_insights,
+    crear_pagina_error,
     CARD_STYLE
 )
 
+from funciones.calendario import agregar_dia_key, construir_calendario_datos
+from funciones.almacen_datos import como_almacen
+from funciones.cache_callbacks import CacheCallbacks
+from funciones.carga_tablas import cargar_tablas, TABLAS_DASHBOARD
+from funciones.correlacion import MAX_REZAGO, correlacion_rezagada, generar_insights_correlacion, series_diarias
+from funciones.payload import configurar_payload
+from funciones.serie_diaria import por_periodo, figura_periodica, figura_dia
+from funciones.contexto_analisis import ContextoAnalisis, contexto_de
+from funciones.cache_figuras import CacheFiguras
+from funciones.vista_inicial import VistaInicial
+
 # ======== CARGA DE DATOS ========
-def cargar_datos():
-    """Carga todos los archivos CSV necesarios para el dashboard."""
+# Columna de fecha de cada tabla, usada para la clave de día y el calendario
+COLUMNAS_FECHA = {
+    'reservas': 'fecha_trip',
+    'pagos': 'Fecha',
+    'gastos': 'Fecha',
+    'costos_fijos': 'Fecha',
+    'ingresos': 'fecha',
+    'costos_operativos': 'fecha',
+    'gastos_marketing': 'fecha'
+}
+
+def cargar_datos(paralelo=True, cambiados=None, anteriores=None):
+    """Carga todos los archivos CSV necesarios para el dashboard.
+
+    Con `cambiados` (nombres de archivo) y `anteriores` (instantánea vigente) solo se leen las
+    tablas cuyos archivos cambiaron; las demás se reutilizan tal cual de la instantánea.
+    """
     
     # Crear directorio para gráficos si no existe
     if not os.path.exists("archivos_output/graficos"):
         os.makedirs("archivos_output/graficos")
     
-    # Carga de datos de reservas
-    df = pd.read_csv("archivos_output/reservas_HotBoat.csv")
-    df["fecha_trip"] = pd.to_datetime(df["fecha_trip"])
+    if cambiados is None or anteriores is None:
+        especificaciones = TABLAS_DASHBOARD
+    else:
+        especificaciones = {clave: especificacion for clave, especificacion in TABLAS_DASHBOARD.items()
+                            if especificacion['archivo'] in cambiados}
     
-    # Carga de datos financieros
-    df_payments = pd.read_csv("archivos_output/abonos hotboat.csv")
-    df_payments["Fecha"] = pd.to_datetime(df_payments["Fecha"])
-    df_payments["Monto"] = df_payments["Monto"].astype(float)
-    
-    df_expenses = pd.read_csv("archivos_output/gastos hotboat.csv")
-    df_expenses["Fecha"] = pd.to_datetime(df_expenses["Fecha"])
-    df_expenses["Monto"] = df_expenses["Monto"].astype(float)
+    # Lectura de las tablas con formatos de fecha y dtypes explícitos (en paralelo por defecto)
+    leidas = cargar_tablas(especificaciones, paralelo=paralelo) if especificaciones else {}
+    datos = {clave: leidas[clave] if clave in leidas else anteriores[clave] for clave in TABLAS_DASHBOARD}
     
     # Extraer costos fijos desde gastos
-    df_costos_fijos = df_expenses[df_expenses["Categoría 1"] == "Costos Fijos"].copy()
-    
-    # Datos para análisis de utilidad operativa
-    df_ingresos = pd.read_csv("archivos_output/ingresos_totales.csv")
-    df_ingresos["fecha"] = pd.to_datetime(df_ingresos["fecha"])
-    
-    df_costos_operativos = pd.read_csv("archivos_output/costos_operativos.csv")
-    df_costos_operativos["fecha"] = pd.to_datetime(df_costos_operativos["fecha"])
-    
-    df_gastos_marketing = pd.read_csv("archivos_output/gastos_marketing.csv")
-    df_gastos_marketing["fecha"] = pd.to_datetime(df_gastos_marketing["fecha"])
-    
-    return {
-        'reservas': df,
-        'pagos': df_payments,
-        'gastos': df_expenses,
-        'costos_fijos': df_costos_fijos,
-        'ingresos': df_ingresos,
-        'costos_operativos': df_costos_operativos,
-        'gastos_marketing': df_gastos_marketing
-    }
-
-# ======== FUNCIONES PARA GRÁFICOS INTERACTIVOS ========
-def crear_grafico_interactivo(df_ingresos, df_costos_operativos, df_gastos_marketing, df_costos_fijos, periodo, variables_seleccionadas):
-    """Crea un gráfico interactivo que muestra solo las variables seleccionadas."""
-    
-    # Preparar datos según el periodo seleccionado
-    if periodo == 'D':
-        # Preparación para ingresos
-        if df_ingresos is not None:
-            df_ingresos['fecha_grupo'] = df_ingresos["fecha"].dt.date
-        # Preparación para costos operativos  
-        if df_costos_operativos is not None:
-            df_costos_operativos['fecha_grupo'] = df_costos_operativos["fecha"].dt.date
-        # Preparación para gastos marketing
-        if df_gastos_marketing is not None:
-            df_gastos_marketing['fecha_grupo'] = df_gastos_marketing["fecha"].dt.date
-        # Preparación para costos fijos
-        if df_costos_fijos is not None:
-            df_costos_fijos['fecha_grupo'] = df_costos_fijos["Fecha"].dt.date
-        
-        titulo = 'Análisis Financiero por Día'
-    elif periodo == 'W':
-        # Preparación para ingresos
-        if df_ingresos is not None:
-            df_ingresos['fecha_grupo'] = df_ingresos["fecha"] - pd.to_timedelta(df_ingresos["fecha"].dt.dayofweek, unit='D')
-            df_ingresos['fecha_label'] = df_ingresos['fecha_grupo'].dt.strftime('Semana del %d/%m/%Y')
-        # Preparación para costos operativos
-        if df_costos_operativos is not None:
-            df_costos_operativos['fecha_grupo'] = df_costos_operativos["fecha"] - pd.to_timedelta(df_costos_operativos["fecha"].dt.dayofweek, unit='D')
-            df_costos_operativos['fecha_label'] = df_costos_operativos['fecha_grupo'].dt.strftime('Semana del %d/%m/%Y')
-        # Preparación para gastos marketing
-        if df_gastos_marketing is not None:
-            df_gastos_marketing['fecha_grupo'] = df_gastos_marketing["fecha"] - pd.to_timedelta(df_gastos_marketing["fecha"].dt.dayofweek, unit='D')
-            df_gastos_marketing['fecha_label'] = df_gastos_marketing['fecha_grupo'].dt.strftime('Semana del %d/%m/%Y')
-        # Preparación para costos fijos
-        if df_costos_fijos is not None:
-            df_costos_fijos['fecha_grupo'] = df_costos_fijos["Fecha"] - pd.to_timedelta(df_costos_fijos["Fecha"].dt.dayofweek, unit='D')
-            df_costos_fijos['fecha_label'] = df_costos_fijos['fecha_grupo'].dt.strftime('Semana del %d/%m/%Y')
-        
-        titulo = 'Análisis Financiero por Semana'
-    else:  # 'M'
-        # Preparación para ingresos
-        if df_ingresos is not None:
-            df_ingresos['fecha_grupo'] = df_ingresos["fecha"].dt.to_period('M').dt.to_timestamp()
-            df_ingresos['fecha_label'] = df_ingresos["fecha"].dt.strftime('%B %Y')
-        # Preparación para costos operativos
-        if df_costos_operativos is not None:
-            df_costos_operativos['fecha_grupo'] = df_costos_operativos["fecha"].dt.to_period('M').dt.to_timestamp()
-            df_costos_operativos['fecha_label'] = df_costos_operativos["fecha"].dt.strftime('%B %Y')
-        # Preparación para gastos marketing
-        if df_gastos_marketing is not None:
-            df_gastos_marketing['fecha_grupo'] = df_gastos_marketing["fecha"].dt.to_period('M').dt.to_timestamp()
-            df_gastos_marketing['fecha_label'] = df_gastos_marketing["fecha"].dt.strftime('%B %Y')
-        # Preparación para costos fijos
-        if df_costos_fijos is not None:
-            df_costos_fijos['fecha_grupo'] = df_costos_fijos["Fecha"].dt.to_period('M').dt.to_timestamp()
-            df_costos_fijos['fecha_label'] = df_costos_fijos["Fecha"].dt.strftime('%B %Y')
-        
-        titulo = 'Análisis Financiero por Mes'
+    if 'gastos' in leidas:
+        df_expenses = datos['gastos']
+        datos['costos_fijos'] = df_expenses[df_expenses["Categoría 1"] == "Costos Fijos"].copy()
+        leidas['costos_fijos'] = datos['costos_fijos']
+    else:
+        datos['costos_fijos'] = anteriores['costos_fijos']
+    
+    # Clave entera de día en cada tabla nueva (las reutilizadas ya la traen) y calendario compartido
+    for clave, columna in COLUMNAS_FECHA.items():
+        if clave in leidas:
+            agregar_dia_key(datos[clave], columna)
+    datos['calendario'] = construir_calendario_datos(datos, COLUMNAS_FECHA)
+    
+    return datos
 
-    # Agrupar datos para cada categoría
-    datos_agrupados = {}
-    fechas_todas = set()
-    etiquetas_fecha = {}
-    
-    # Procesar ingresos
-    if 'ingresos' in variables_seleccionadas and df_ingresos is not None:
-        ingresos_totales = df_ingresos.groupby('fecha_grupo')['monto'].sum().reset_index()
-        datos_agrupados['ingresos'] = ingresos_totales
-        fechas_todas.update(ingresos_totales['fecha_grupo'])
-        
-        if periodo in ['W', 'M']:
-            for idx, row in df_ingresos.iterrows():
-                etiquetas_fecha[row['fecha_grupo']] = row['fecha_label']
-    
-    # Procesar costos operativos
-    if 'costos_operativos' in variables_seleccionadas and df_costos_operativos is not None:
-        costos_operativos = df_costos_operativos.groupby('fecha_grupo')['monto'].sum().reset_index()
-        datos_agrupados['costos_operativos'] = costos_operativos
-        fechas_todas.update(costos_operativos['fecha_grupo'])
-        
-        if periodo in ['W', 'M']:
-            for idx, row in df_costos_operativos.iterrows():
-                etiquetas_fecha[row['fecha_grupo']] = row['fecha_label']
+def rango_reservas(datos):
+    """Rango de fechas por defecto del selector: de la primera a la última reserva."""
+    df = datos['reservas']
+    return df['fecha_trip'].min(), df['fecha_trip'].max()
 
-    # Procesar gastos marketing
-    if 'gastos_marketing' in variables_seleccionadas and df_gastos_marketing is not None:
-        gastos_marketing = df_gastos_marketing.groupby('fecha_grupo')['monto'].sum().reset_index()
-        datos_agrupados['gastos_marketing'] = gastos_marketing
-        fechas_todas.update(gastos_marketing['fecha_grupo'])
-        
-        if periodo in ['W', 'M']:
-            for idx, row in df_gastos_marketing.iterrows():
-                etiquetas_fecha[row['fecha_grupo']] = row['fecha_label']
-    
-    # Procesar costos fijos
-    if 'costos_fijos' in variables_seleccionadas and df_costos_fijos is not None:
-        costos_fijos = df_costos_fijos.groupby('fecha_grupo')['Monto'].sum().reset_index()
-        datos_agrupados['costos_fijos'] = costos_fijos
-        fechas_todas.update(costos_fijos['fecha_grupo'])
-        
-        if periodo in ['W', 'M']:
-            for idx, row in df_costos_fijos.iterrows():
-                etiquetas_fecha[row['fecha_grupo']] = row['fecha_label']
+# ======== FUNCIONES PARA GRÁFICOS INTERACTIVOS ========
+# Categorías del gráfico interactivo: (clave, nombre en la leyenda, color, columna de fecha, columna de monto).
+# La figura base tiene siempre las cuatro trazas en este orden; la selección solo cambia su visibilidad.
+CATEGORIAS_INTERACTIVO = [
+    ('ingresos', 'Ingresos Totales', COLORS['income'], 'fecha', 'monto'),
+    ('costos_operativos', 'Costos Operativos', COLORS['expense'], 'fecha', 'monto'),
+    ('gastos_marketing', 'Gastos Marketing', '#ff6b6b', 'fecha', 'monto'),
+    ('costos_fijos', 'Costos Fijos', '#9370db', 'Fecha', 'Monto'),  # Púrpura medio para costos fijos
+]
+# Variables visibles al abrir la página (todas)
+VARIABLES_DEFECTO = [categoria for categoria, _, _, _, _ in CATEGORIAS_INTERACTIVO]
 
-    # Crear figura
+def figura_base_interactivo():
+    """Layout y trazas vacías del gráfico financiero interactivo."""
     fig = go.Figure()
     
-    # Colores para cada categoría
-    colores_categoria = {
-        'ingresos': COLORS['income'],
-        'costos_operativos': COLORS['expense'],
-        'gastos_marketing': '#ff6b6b',
-        'costos_fijos': '#9370db'  # Púrpura medio para costos fijos
-    }
-    
-    # Nombres amigables para mostrar en la leyenda
-    nombres_amigables = {
-        'ingresos': 'Ingresos Totales',
-        'costos_operativos': 'Costos Operativos',
-        'gastos_marketing': 'Gastos Marketing',
-        'costos_fijos': 'Costos Fijos'
-    }
-    
-    # Añadir barras para cada categoría seleccionada
-    for categoria, datos in datos_agrupados.items():
+    # Una barra por categoría (se muestran u ocultan según la selección)
+    for _, nombre, color, _, _ in CATEGORIAS_INTERACTIVO:
         fig.add_trace(go.Bar(
-            x=datos['fecha_grupo'],
-            y=datos['monto'] if categoria != 'costos_fijos' else datos['Monto'],
-            name=nombres_amigables[categoria],
-            marker_color=colores_categoria[categoria],
+            x=[],
+            y=[],
+            name=nombre,
+            marker_color=color,
             hovertemplate='Fecha: %{x}<br>Monto: $%{y:,.0f}<br>',
             type='bar'
         ))
     
     # Configurar diseño
-    fig.update_layout(
-        title=titulo,
-        paper_bgcolor=COLORS['card_bg'],
-        plot_bgcolor=COLORS['card_bg'],
-        font={'color': COLORS['text']},
-        height=500,
-        barmode='group',
-        bargap=0.2,
-        bargroupgap=0.1,
-        xaxis=dict(
-            title='Fecha',
-            showgrid=True,
-            gridcolor=COLORS['grid'],
-            tickfont={'color': COLORS['text']},
-            title_font={'color': COLORS['text']}
-        ),
-        yaxis=dict(
-            title='Monto (CLP)',
-            showgrid=True,
-            gridcolor=COLORS['grid'],
-            tickfont={'color': COLORS['text']},
-            title_font={'color': COLORS['text']}
-        ),
-        legend=dict(font=dict(color=COLORS['text'])),
-        hovermode='x unified'
-    )
-    
-    # Ajustar etiquetas si es semanal o mensual
-    if periodo in ['W', 'M'] and etiquetas_fecha:
-        fechas_ordenadas = sorted(list(fechas_todas))
-        etiquetas = [etiquetas_fecha.get(fecha, '') for fecha in fechas_ordenadas]
-        fig.update_xaxes(
-            ticktext=etiquetas,
-            tickvals=fechas_ordenadas
-        )
-    
+    fig.update_layout(**LAYOUT_BARRAS_MONTO)
     return fig
 
 # ======== FUNCIÓN PARA GRÁFICO DE VALOR PROMEDIO DE VENTAS ========
-def crear_grafico_avg_sale_value(df_reservas, periodo):
-    """Crea un gráfico que muestra la evolución del valor promedio de las ventas a lo largo del tiempo."""
-    
-    # Asegurarse de que tengamos los datos necesarios
-    if df_reservas is None or len(df_reservas) == 0:
-        fig = go.Figure()
-        fig.update_layout(
-            title='No hay datos disponibles para mostrar',
-            paper_bgcolor=COLORS['card_bg'],
-            plot_bgcolor=COLORS['card_bg'],
-            font={'color': COLORS['text']},
-            height=500,
-        )
-        return fig
-    
-    # Convertir TOTAL AMOUNT a tipo numérico si no lo es
-    df_reservas['TOTAL AMOUNT'] = pd.to_numeric(df_reservas['TOTAL AMOUNT'], errors='coerce')
-    
-    # Crear una copia para no modificar el original
-    df = df_reservas.copy()
-    
-    # Agrupar por periodo
-    if periodo == 'D':
-        df['fecha_grupo'] = df['fecha_trip'].dt.date
-        titulo = 'Valor Promedio de Venta por Día'
-    elif periodo == 'W':
-        df['fecha_grupo'] = df['fecha_trip'] - pd.to_timedelta(df['fecha_trip'].dt.dayofweek, unit='D')
-        df['fecha_label'] = df['fecha_grupo'].dt.strftime('Semana del %d/%m/%Y')
-        titulo = 'Valor Promedio de Venta por Semana'
-    else:  # 'M'
-        df['fecha_grupo'] = df['fecha_trip'].dt.to_period('M').dt.to_timestamp()
-        df['fecha_label'] = df['fecha_trip'].dt.strftime('%B %Y')
-        titulo = 'Valor Promedio de Venta por Mes'
-    
-    # Calcular el promedio por grupo de fecha
-    avg_values = df.groupby('fecha_grupo')['TOTAL AMOUNT'].mean().reset_index()
-    
-    # Crear figura
+def figura_base_avg_sale_value():
+    """Layout y traza vacía del gráfico de valor promedio de venta."""
     fig = go.Figure()
     
     # Añadir línea para el valor promedio
     fig.add_trace(go.Scatter(
-        x=avg_values['fecha_grupo'],
-        y=avg_values['TOTAL AMOUNT'],
+        x=[],
+        y=[],
         mode='lines+markers',
         name='Valor Promedio de Venta',
         line=dict(color='#6AB187', width=3),
@@ -297,50 +143,16 @@ def crear_grafico_avg_sale_value(df_reservas, periodo):
     
     # Configurar diseño
     fig.update_layout(
-        title=titulo,
-        paper_bgcolor=COLORS['card_bg'],
-        plot_bgcolor=COLORS['card_bg'],
-        font={'color': COLORS['text']},
-        height=500,
-        xaxis=dict(
-            title='Fecha',
-            showgrid=True,
-            gridcolor=COLORS['grid'],
-            tickfont={'color': COLORS['text']},
-            title_font={'color': COLORS['text']}
-        ),
-        yaxis=dict(
-            title='Valor Promedio (CLP)',
-            showgrid=True,
-            gridcolor=COLORS['grid'],
-            tickfont={'color': COLORS['text']},
-            title_font={'color': COLORS['text']},
-            tickformat='$,.0f'
-        ),
-        legend=dict(font=dict(color=COLORS['text'])),
+        **GRAPH_STYLE,
+        xaxis_title='Fecha',
+        yaxis=dict(title='Valor Promedio (CLP)', tickformat='$,.0f'),
         hovermode='x unified'
     )
-    
-    # Ajustar etiquetas si es semanal o mensual
-    if periodo in ['W', 'M']:
-        etiquetas_fecha = {}
-        for idx, row in df.iterrows():
-            etiquetas_fecha[row['fecha_grupo']] = row['fecha_label']
-            
-        fechas_ordenadas = sorted(list(set(avg_values['fecha_grupo'])))
-        etiquetas = [etiquetas_fecha.get(fecha, '') for fecha in fechas_ordenadas]
-        
-        if etiquetas and fechas_ordenadas:
-            fig.update_xaxes(
-                ticktext=etiquetas,
-                tickvals=fechas_ordenadas
-            )
-    
     return fig
 
 # ======== FUNCIONES PARA GENERAR INSIGHTS ========
-def generar_insights_reservas(df_reservas, periodo):
-    """Genera insights sobre las reservas."""
+def generar_insights_reservas(df_reservas, periodo, contexto=None):
+    """Genera insights sobre las reservas (tabla 'reservas' del contexto)."""
     try:
         # Calcular tendencias y días con mayor/menor reservas
         total_reservas = len(df_reservas)
@@ -348,22 +160,14 @@ def generar_insights_reservas(df_reservas, periodo):
         if total_reservas == 0:
             return html.Div([html.P("No hay datos de reservas para el período seleccionado.")])
         
-        # Agrupar por fecha según período
-        if periodo == 'D':
-            df_reservas['fecha_grupo'] = df_reservas['fecha_trip'].dt.date
-            agrupacion = 'diario'
-        elif periodo == 'W':
-            df_reservas['fecha_grupo'] = df_reservas['fecha_trip'] - pd.to_timedelta(df_reservas['fecha_trip'].dt.dayofweek, unit='D')
-            agrupacion = 'semanal'
-        else:  # 'M'
-            df_reservas['fecha_grupo'] = df_reservas['fecha_trip'].dt.to_period('M').dt.to_timestamp()
-            agrupacion = 'mensual'
-        
-        # Contar reservas por fecha
-        reservas_por_fecha = df_reservas.groupby('fecha_grupo').size().reset_index(name='count')
+        # Contar reservas por fecha según período (agregado compartido con el gráfico)
+        contexto = contexto_de(contexto, 'reservas', df_reservas, 'fecha_trip')
+        agrupacion = {'D': 'diario', 'W': 'semanal'}.get(periodo, 'mensual')
+        reservas_por_fecha = contexto.agrupado('reservas', periodo)['conteo'].rename('count').reset_index()
         
         # Encontrar período con más reservas
-        max_reservas = reservas_por_fecha.loc[reservas_por_fecha['count'].idxmax()]
+        posicion_max = reservas_por_fecha['count'].idxmax()
+        max_reservas = reservas_por_fecha.loc[posicion_max]
         
         # Calcular promedio y tendencia
         promedio_reservas = reservas_por_fecha['count'].mean()
@@ -383,12 +187,10 @@ def generar_insights_reservas(df_reservas, periodo):
         embarcacion_popular = tipos_embarcacion.index[0] if not tipos_embarcacion.empty else "No disponible"
         
         # Generar insights
-        if periodo == 'D':
-            fecha_max = max_reservas['fecha_grupo'].strftime('%d/%m/%Y')
-        elif periodo == 'W':
-            fecha_max = f"semana del {max_reservas['fecha_grupo'].strftime('%d/%m/%Y')}"
-        else:
-            fecha_max = max_reservas['fecha_grupo'].strftime('%B %Y')
+        # Etiqueta del calendario compartido ('06/01/2025', 'Semana del 06/01/2025', 'Enero 2025')
+        fecha_max = contexto.etiquetas('reservas', periodo)[posicion_max]
+        if periodo == 'W':
+            fecha_max = fecha_max[:1].lower() + fecha_max[1:]
         
         insights = [
             f"Se registraron un total de {total_reservas} reservas en el período seleccionado, con un promedio {agrupacion} de {promedio_reservas:.1f} reservas.",
@@ -401,8 +203,7 @@ def generar_insights_reservas(df_reservas, periodo):
         
         # Análisis adicional de ingreso promedio si hay datos de monto
         if 'TOTAL AMOUNT' in df_reservas.columns:
-            df_reservas['TOTAL AMOUNT'] = pd.to_numeric(df_reservas['TOTAL AMOUNT'], errors='coerce')
-            monto_promedio = df_reservas['TOTAL AMOUNT'].mean()
+            monto_promedio = pd.to_numeric(df_reservas['TOTAL AMOUNT'], errors='coerce').mean()
             insights.append(f"El monto promedio por reserva fue de ${monto_promedio:,.0f} CLP.")
         
         return html.Div([html.P(insight) for insight in insights])
@@ -410,8 +211,8 @@ def generar_insights_reservas(df_reservas, periodo):
     except Exception as e:
         return html.Div([html.P(f"No se pudieron generar insights: {str(e)}")])
 
-def generar_insights_ingresos_gastos(df_payments, df_expenses, periodo):
-    """Genera insights sobre ingresos y gastos."""
+def generar_insights_ingresos_gastos(df_payments, df_expenses, periodo, contexto=None):
+    """Genera insights sobre ingresos y gastos (tabla 'pagos' del contexto)."""
     try:
         # Calcular totales
         total_ingresos = df_payments['Monto'].sum()
@@ -421,23 +222,9 @@ def generar_insights_ingresos_gastos(df_payments, df_expenses, periodo):
         if total_ingresos == 0 and total_gastos == 0:
             return html.Div([html.P("No hay datos financieros para el período seleccionado.")])
         
-        # Agrupar por fecha según período
-        if periodo == 'D':
-            df_payments['fecha_grupo'] = df_payments['Fecha'].dt.date
-            df_expenses['fecha_grupo'] = df_expenses['Fecha'].dt.date
-            agrupacion = 'diario'
-        elif periodo == 'W':
-            df_payments['fecha_grupo'] = df_payments['Fecha'] - pd.to_timedelta(df_payments['Fecha'].dt.dayofweek, unit='D')
-            df_expenses['fecha_grupo'] = df_expenses['Fecha'] - pd.to_timedelta(df_expenses['Fecha'].dt.dayofweek, unit='D')
-            agrupacion = 'semanal'
-        else:  # 'M'
-            df_payments['fecha_grupo'] = df_payments['Fecha'].dt.to_period('M').dt.to_timestamp()
-            df_expenses['fecha_grupo'] = df_expenses['Fecha'].dt.to_period('M').dt.to_timestamp()
-            agrupacion = 'mensual'
-        
-        # Sumar por fecha
-        ingresos_por_fecha = df_payments.groupby('fecha_grupo')['Monto'].sum().reset_index()
-        gastos_por_fecha = df_expenses.groupby('fecha_grupo')['Monto'].sum().reset_index()
+        # Sumar ingresos por fecha según período (agregado compartido con el gráfico)
+        contexto = contexto_de(contexto, 'pagos', df_payments, 'Fecha')
+        ingresos_por_fecha = contexto.agrupado('pagos', periodo, 'Monto')['suma']
         
         # Análisis de gastos por categoría
         categorias_gastos = df_expenses.groupby('Categoría 1')['Monto'].sum().sort_values(ascending=False)
@@ -456,8 +243,8 @@ def generar_insights_ingresos_gastos(df_payments, df_expenses, periodo):
         
         # Análisis de tendencia si hay suficientes datos
         if len(ingresos_por_fecha) > 1:
-            primera_mitad_ingresos = ingresos_por_fecha.iloc[:len(ingresos_por_fecha)//2]['Monto'].sum()
-            segunda_mitad_ingresos = ingresos_por_fecha.iloc[len(ingresos_por_fecha)//2:]['Monto'].sum()
+            primera_mitad_ingresos = ingresos_por_fecha.iloc[:len(ingresos_por_fecha)//2].sum()
+            segunda_mitad_ingresos = ingresos_por_fecha.iloc[len(ingresos_por_fecha)//2:].sum()
             
             tendencia_ingresos = "creciente" if segunda_mitad_ingresos > primera_mitad_ingresos else "decreciente" if segunda_mitad_ingresos < primera_mitad_ingresos else "estable"
             insights.append(f"La tendencia de ingresos es {tendencia_ingresos} a lo largo del período analizado.")
@@ -532,20 +319,6 @@ def generar_insights_utilidad_operativa(df_ingresos, df_costos_operativos, df_ga
         pct_marketing = (total_marketing / total_ingresos) * 100 if total_ingresos > 0 else 0
         pct_costos_fijos = (total_costos_fijos / total_ingresos) * 100 if total_ingresos > 0 else 0
         
-        # Agrupar por fecha según período para analizar tendencias
-        if periodo == 'D':
-            df_ingresos['fecha_grupo'] = df_ingresos['fecha'].dt.date
-            agrupacion = 'diaria'
-        elif periodo == 'W':
-            df_ingresos['fecha_grupo'] = df_ingresos['fecha'] - pd.to_timedelta(df_ingresos['fecha'].dt.dayofweek, unit='D')
-            agrupacion = 'semanal'
-        else:  # 'M'
-            df_ingresos['fecha_grupo'] = df_ingresos['fecha'].dt.to_period('M').dt.to_timestamp()
-            agrupacion = 'mensual'
-        
-        # Calcular utilidad por período
-        ingresos_por_periodo = df_ingresos.groupby('fecha_grupo')['monto'].sum()
-        
         # Generar insights
         insights = [
             f"La utilidad operativa del período fue de ${utilidad_operativa:,.0f} CLP, representando un margen del {margen_op:.1f}% sobre los ingresos.",
@@ -576,32 +349,22 @@ def generar_insights_utilidad_operativa(df_ingresos, df_costos_operativos, df_ga
     except Exception as e:
         return html.Div([html.P(f"No se pudieron generar insights: {str(e)}")])
 
-def generar_insights_valor_promedio_venta(df_reservas, periodo):
-    """Genera insights sobre el valor promedio de venta."""
+def generar_insights_valor_promedio_venta(df_reservas, periodo, contexto=None):
+    """Genera insights sobre el valor promedio de venta (tabla 'reservas' del contexto)."""
     try:
         if df_reservas.empty or 'TOTAL AMOUNT' not in df_reservas.columns:
             return html.Div([html.P("No hay datos suficientes para analizar el valor promedio de venta.")])
         
-        # Convertir a numérico
-        df_reservas['TOTAL AMOUNT'] = pd.to_numeric(df_reservas['TOTAL AMOUNT'], errors='coerce')
+        # Convertir a numérico sobre una serie local
+        montos = pd.to_numeric(df_reservas['TOTAL AMOUNT'], errors='coerce')
         
         # Calcular promedios
-        valor_promedio = df_reservas['TOTAL AMOUNT'].mean()
-        valor_mediano = df_reservas['TOTAL AMOUNT'].median()
-        
-        # Agrupar por fecha según período
-        if periodo == 'D':
-            df_reservas['fecha_grupo'] = df_reservas['fecha_trip'].dt.date
-            agrupacion = 'diario'
-        elif periodo == 'W':
-            df_reservas['fecha_grupo'] = df_reservas['fecha_trip'] - pd.to_timedelta(df_reservas['fecha_trip'].dt.dayofweek, unit='D')
-            agrupacion = 'semanal'
-        else:  # 'M'
-            df_reservas['fecha_grupo'] = df_reservas['fecha_trip'].dt.to_period('M').dt.to_timestamp()
-            agrupacion = 'mensual'
-        
-        # Calcular valor promedio por período
-        promedios_por_periodo = df_reservas.groupby('fecha_grupo')['TOTAL AMOUNT'].mean()
+        valor_promedio = montos.mean()
+        valor_mediano = montos.median()
+        
+        # Valor promedio por período (agregado compartido con el gráfico)
+        contexto = contexto_de(contexto, 'reservas', df_reservas, 'fecha_trip')
+        promedios_por_periodo = contexto.promedio('reservas', periodo, 'TOTAL AMOUNT')
         
         # Analizar tendencia si hay suficientes datos
         if len(promedios_por_periodo) > 1:
@@ -622,7 +385,7 @@ def generar_insights_valor_promedio_venta(df_reservas, periodo):
         
         # Análisis por tipo de embarcación si está disponible
         if 'type boat' in df_reservas.columns:
-            promedio_por_tipo = df_reservas.groupby('type boat')['TOTAL AMOUNT'].mean().sort_values(ascending=False)
+            promedio_por_tipo = montos.groupby(df_reservas['type boat']).mean().sort_values(ascending=False)
             if not promedio_por_tipo.empty:
                 tipo_max = promedio_por_tipo.index[0]
                 tipo_min = promedio_por_tipo.index[-1]
@@ -645,61 +408,20 @@ def generar_insights_valor_promedio_venta(df_reservas, periodo):
 def crear_app_reservas(datos=None):
     """Crea la aplicación Dash para la página de reservas."""
     
-    if datos is None:
-        datos = cargar_datos()
-        
-    df = datos['reservas']
-    df_payments = datos['pagos']
-    df_expenses = datos['gastos']
+    # Acepta un dict de datos o un AlmacenDatos con recarga en caliente
+    almacen = como_almacen(datos, cargar_datos)
     
     app = dash.Dash(__name__, suppress_callback_exceptions=True)
+    configurar_payload(app, 'Reservas')
+    # Horarios populares no depende de los filtros: se lee de disco si los datos no cambiaron
+    cache_figuras = CacheFiguras()
     
-    app.layout = html.Div([
-        crear_header("Dashboard de Reservas HotBoat", 8050),
-        html.Div([
-            html.Div("DASHBOARD DE RESERVAS", style={
-                'color': COLORS['primary'], 
-                'fontSize': '24px', 
-                'fontWeight': 'bold',
-                'padding': '10px',
-                'marginBottom': '20px',
-                'textAlign': 'center',
-                'backgroundColor': COLORS['card_bg'],
-                'borderRadius': '5px'
-            })
-        ]),
-        crear_filtros(df['fecha_trip'].min(), df['fecha_trip'].max()),
-        crear_tarjetas_metricas(),
-        crear_selector_periodo(),
-        crear_contenedor_grafico('reservas-tiempo'),
-        crear_contenedor_insights('insights-reservas'),
-        crear_contenedor_grafico('ingresos-tiempo'),
-        crear_contenedor_insights('insights-financieros'),
-        crear_contenedor_grafico('horas-populares', figura=crear_grafico_horas_populares(df)),
-        crear_contenedor_insights('insights-horas'),
-    ], style={
-        'padding': 20,
-        'backgroundColor': COLORS['background'],
-        'minHeight': '100vh'
-    })
-    
-    @app.callback(
-        [Output('reservas-tiempo', 'figure'),
-         Output('ingresos-tiempo', 'figure'),
-         Output('total-reservas', 'children'),
-         Output('total-ingresos', 'children'),
-         Output('total-gastos', 'children'),
-         Output('balance', 'children'),
-         Output('balance', 'style'),
-         # Nuevos outputs para los insights
-         Output('insights-reservas', 'children'),
-         Output('insights-financieros', 'children'),
-         Output('insights-horas', 'children')],
-        [Input('periodo-selector', 'value'),
-         Input('date-range-picker', 'start_date'),
-         Input('date-range-picker', 'end_date')]
-    )
-    def actualizar_graficos_reservas(periodo, start_date, end_date):
+    def calcular_datos_reservas(datos_actuales, start_date, end_date):
+        """Salidas del callback de fechas para una instantánea de los datos."""
+        df = datos_actuales['reservas']
+        df_payments = datos_actuales['pagos']
+        df_expenses = datos_actuales['gastos']
+        
         # Filtrar DataFrames
         df_filtrado = df[(df['fecha_trip'] >= pd.to_datetime(start_date)) & (df['fecha_trip'] <= pd.to_datetime(end_date))]
         df_payments_filtrado = df_payments[(df_payments['Fecha'] >= pd.to_datetime(start_date)) & (df_payments['Fecha'] <= pd.to_datetime(end_date))]
@@ -711,9 +433,32 @@ def crear_app_reservas(datos=None):
         total_gastos_filtrado = df_expenses_filtrado['Monto'].sum()
         balance_filtrado = total_ingresos_filtrado - total_gastos_filtrado
 
-        # Crear gráficos
-        fig_reservas = crear_grafico_reservas(df_filtrado, periodo)
-        fig_ingresos = crear_grafico_ingresos_gastos(df_payments_filtrado, df_expenses_filtrado, periodo)
+        # Una sola pasada de agrupamiento por serie, compartida por gráficos e insights
+        contexto = ContextoAnalisis({
+            'reservas': (df_filtrado, 'fecha_trip'),
+            'pagos': (df_payments_filtrado, 'Fecha'),
+            'gastos': (df_expenses_filtrado, 'Fecha'),
+        })
+
+        # Series diarias de los gráficos temporales, en el orden de FIGURAS_RESERVAS
+        serie = {
+            'figuras': [
+                figura_periodica(
+                    por_periodo(lambda p: f'Reservas por {NOMBRES_PERIODO[p]}'),
+                    [contexto.serie('reservas')]
+                ),
+                figura_periodica(
+                    por_periodo(lambda p: f'Ingresos y Gastos por {NOMBRES_PERIODO[p]}'),
+                    [contexto.serie('pagos', 'Monto'),
+                     contexto.serie('gastos', 'Monto')]
+                ),
+            ],
+            # Insights que dependen del periodo, en el orden de INSIGHTS_RESERVAS
+            'insights': [
+                por_periodo(lambda p: generar_insights_reservas(df_filtrado, p, contexto)),
+                por_periodo(lambda p: generar_insights_ingresos_gastos(df_payments_filtrado, df_expenses_filtrado, p, contexto)),
+            ]
+        }
 
         # Estilo del balance
         balance_style = {
@@ -721,81 +466,312 @@ def crear_app_reservas(datos=None):
             'fontSize': '2.5em',
             'margin': '0'
         }
-        
-        # Generar insights
-        insights_reservas = generar_insights_reservas(df_filtrado, periodo)
-        insights_financieros = generar_insights_ingresos_gastos(df_payments_filtrado, df_expenses_filtrado, periodo)
-        insights_horas = generar_insights_horas_populares(df_filtrado)
 
         return (
-            fig_reservas,
-            fig_ingresos,
+            serie,
             f'{total_reservas_filtrado:,}',
             f'${total_ingresos_filtrado:,.0f}',
             f'${total_gastos_filtrado:,.0f}',
             f'${balance_filtrado:,.0f}',
             balance_style,
-            insights_reservas,
-            insights_financieros,
-            insights_horas
+            generar_insights_horas_populares(df_filtrado)
         )
     
+    # Salidas para el rango completo: se incrustan en el layout y se recalculan en cada recarga
+    vista_inicial = VistaInicial(
+        almacen,
+        lambda datos_actuales: calcular_datos_reservas(datos_actuales, *rango_reservas(datos_actuales)),
+        'Reservas'
+    )
+    
+    def construir_layout():
+        """Layout construido en cada carga de página con la versión vigente de los datos."""
+        datos_actuales, salidas = vista_inicial.obtener()
+        if datos_actuales is None:
+            return crear_pagina_error("Dashboard de Reservas", almacen.error)
+        serie, total_reservas, total_ingresos, total_gastos, balance, balance_style, insights_horas = salidas
+        df = datos_actuales['reservas']
+        return html.Div([
+            crear_header("Dashboard de Reservas HotBoat", 8050),
+            html.Div([
+                html.Div("DASHBOARD DE RESERVAS", style={
+                    'color': COLORS['primary'], 
+                    'fontSize': '24px', 
+                    'fontWeight': 'bold',
+                    'padding': '10px',
+                    'marginBottom': '20px',
+                    'textAlign': 'center',
+                    'backgroundColor': COLORS['card_bg'],
+                    'borderRadius': '5px'
+                })
+            ]),
+            crear_filtros(*rango_reservas(datos_actuales)),
+            crear_tarjetas_metricas(
+                {'total-reservas': total_reservas, 'total-ingresos': total_ingresos,
+                 'total-gastos': total_gastos, 'balance': balance},
+                {'balance': balance_style}
+            ),
+            crear_selector_periodo(),
+            # Vista 'Por Día' incrustada; luego el periodo se reagrupa en el navegador
+            crear_contenedor_grafico('reservas-tiempo', figura=figura_dia(figura_base_reservas(), serie['figuras'][0])),
+            crear_contenedor_insights('insights-reservas', contenido=serie['insights'][0]['D']),
+            crear_contenedor_grafico('ingresos-tiempo', figura=figura_dia(figura_base_ingresos_gastos(), serie['figuras'][1])),
+            crear_contenedor_insights('insights-financieros', contenido=serie['insights'][1]['D']),
+            crear_contenedor_grafico('horas-populares', figura=cache_figuras.obtener(crear_grafico_horas_populares, df)),
+            crear_contenedor_insights('insights-horas', contenido=insights_horas),
+            dcc.Store(id='serie-diaria', data=serie),
+        ], style={
+            'padding': 20,
+            'backgroundColor': COLORS['background'],
+            'minHeight': '100vh'
+        })
+    
+    app.layout = construir_layout
+    
+    # El servidor solo responde a cambios de rango de fechas: envía las series diarias
+    # (y los insights de cada periodo) al Store; el periodo se resuelve en el navegador.
+    @app.callback(
+        [Output('serie-diaria', 'data'),
+         Output('total-reservas', 'children'),
+         Output('total-ingresos', 'children'),
+         Output('total-gastos', 'children'),
+         Output('balance', 'children'),
+         Output('balance', 'style'),
+         Output('insights-horas', 'children')],
+        [Input('date-range-picker', 'start_date'),
+         Input('date-range-picker', 'end_date')],
+        # La vista del rango completo ya viene en el layout
+        prevent_initial_call=True
+    )
+    def actualizar_datos_reservas(start_date, end_date):
+        # Tomar la instantánea vigente una sola vez por callback
+        return calcular_datos_reservas(almacen.datos, start_date, end_date)
+    
+    # Cambio de periodo: reagrupar en el navegador (assets/periodos.js)
+    FIGURAS_RESERVAS = ['reservas-tiempo', 'ingresos-tiempo']
+    INSIGHTS_RESERVAS = ['insights-reservas', 'insights-financieros']
+    app.clientside_callback(
+        ClientsideFunction(namespace='periodos', function_name='reagrupar_figuras'),
+        [Output(id_grafico, 'figure') for id_grafico in FIGURAS_RESERVAS],
+        [Input('periodo-selector', 'value'),
+         Input('serie-diaria', 'data')] +
+        [Input(id_grafico, 'relayoutData') for id_grafico in FIGURAS_RESERVAS],
+        [State(id_grafico, 'figure') for id_grafico in FIGURAS_RESERVAS],
+        prevent_initial_call=True
+    )
+    app.clientside_callback(
+        ClientsideFunction(namespace='periodos', function_name='insights_periodo'),
+        [Output(id_insights, 'children') for id_insights in INSIGHTS_RESERVAS],
+        [Input('periodo-selector', 'value'),
+         Input('serie-diaria', 'data')],
+        prevent_initial_call=True
+    )
+    
     return app
 
 def crear_app_utilidad(datos=None):
     """Crea la aplicación Dash para la página de utilidad operativa."""
     
-    if datos is None:
-        datos = cargar_datos()
-        
-    df = datos['reservas']
-    df_ingresos = datos['ingresos']
-    df_costos_operativos = datos['costos_operativos']
-    df_gastos_marketing = datos['gastos_marketing']
-    df_costos_fijos = datos['costos_fijos']
+    # Acepta un dict de datos o un AlmacenDatos con recarga en caliente
+    almacen = como_almacen(datos, cargar_datos)
     
     app = dash.Dash(__name__, suppress_callback_exceptions=True)
+    configurar_payload(app, 'Utilidad')
     
-    app.layout = html.Div([
-        crear_header("Dashboard de Utilidad Operativa HotBoat", 8055),
-        html.Div([
-            html.Div("DASHBOARD DE UTILIDAD OPERATIVA", style={
-                'color': COLORS['income'], 
-                'fontSize': '24px', 
-                'fontWeight': 'bold',
-                'padding': '10px',
-                'marginBottom': '20px',
-                'textAlign': 'center',
-                'backgroundColor': COLORS['card_bg'],
-                'borderRadius': '5px'
-            })
-        ]),
-        crear_filtros(df['fecha_trip'].min(), df['fecha_trip'].max()),
-        html.Div([
-            html.Div([
-                html.H3('Ingresos Totales', style={'color': COLORS['text'], 'marginBottom': '10px'}),
-                html.H2(id='total-ingresos-op', style={'color': COLORS['income'], 'fontSize': '2.5em', 'margin': '0'}),
-            ], style=CARD_STYLE),
-            html.Div([
-                html.H3('Costos Operativos', style={'color': COLORS['text'], 'marginBottom': '10px'}),
-                html.H2(id='total-costos-op', style={'color': COLORS['expense'], 'fontSize': '2.5em', 'margin': '0'}),
-            ], style=CARD_STYLE),
-            html.Div([
-                html.H3('Gastos Marketing', style={'color': COLORS['text'], 'marginBottom': '10px'}),
-                html.H2(id='total-marketing', style={'color': COLORS['expense'], 'fontSize': '2.5em', 'margin': '0'}),
-            ], style=CARD_STYLE),
-            html.Div([
-                html.H3('Costos Fijos', style={'color': COLORS['text'], 'marginBottom': '10px'}),
-                html.H2(id='total-costos-fijos', style={'color': '#9370db', 'fontSize': '2.5em', 'margin': '0'}),
-            ], style=CARD_STYLE),
+    def calcular_datos_utilidad(datos_actuales, start_date, end_date):
+        """Salidas del callback de fechas para una instantánea de los datos."""
+        df = datos_actuales['reservas']
+        df_ingresos = datos_actuales['ingresos']
+        df_costos_operativos = datos_actuales['costos_operativos']
+        df_gastos_marketing = datos_actuales['gastos_marketing']
+        df_costos_fijos = datos_actuales['costos_fijos']
+        
+        # Filtrar DataFrames
+        df_ingresos_filtrado = df_ingresos[(df_ingresos['fecha'] >= pd.to_datetime(start_date)) & (df_ingresos['fecha'] <= pd.to_datetime(end_date))]
+        df_costos_operativos_filtrado = df_costos_operativos[(df_costos_operativos['fecha'] >= pd.to_datetime(start_date)) & (df_costos_operativos['fecha'] <= pd.to_datetime(end_date))]
+        df_gastos_marketing_filtrado = df_gastos_marketing[(df_gastos_marketing['fecha'] >= pd.to_datetime(start_date)) & (df_gastos_marketing['fecha'] <= pd.to_datetime(end_date))]
+        df_costos_fijos_filtrado = df_costos_fijos[(df_costos_fijos['Fecha'] >= pd.to_datetime(start_date)) & (df_costos_fijos['Fecha'] <= pd.to_datetime(end_date))]
+        df_filtrado = df[(df['fecha_trip'] >= pd.to_datetime(start_date)) & (df['fecha_trip'] <= pd.to_datetime(end_date))]
+
+        # Calcular métricas
+        total_ingresos = df_ingresos_filtrado['monto'].sum()
+        total_costos_op = df_costos_operativos_filtrado['monto'].sum()
+        total_marketing = df_gastos_marketing_filtrado['monto'].sum()
+        total_costos_fijos = df_costos_fijos_filtrado['Monto'].sum()
+        utilidad_operativa = total_ingresos - total_costos_op - total_marketing - total_costos_fijos
+        
+        # Calcular promedio de ventas (TOTAL AMOUNT ya es numérico desde cargar_datos)
+        avg_sale = df_filtrado['TOTAL AMOUNT'].mean() if not df_filtrado.empty else 0
+
+        # Series diarias del gráfico interactivo (una por categoría, en el orden de sus trazas)
+        filtrados_interactivo = {
+            'ingresos': df_ingresos_filtrado,
+            'costos_operativos': df_costos_operativos_filtrado,
+            'gastos_marketing': df_gastos_marketing_filtrado,
+            'costos_fijos': df_costos_fijos_filtrado,
+        }
+        # Una sola pasada de agrupamiento por serie, compartida por gráficos e insights
+        contexto = ContextoAnalisis(
+            [(categoria, (filtrados_interactivo[categoria], col_fecha))
+             for categoria, _, _, col_fecha, _ in CATEGORIAS_INTERACTIVO] +
+            [('reservas', (df_filtrado, 'fecha_trip'))]
+        )
+        trazas_interactivo = [
+            contexto.serie(categoria, col_monto, categoria=categoria)
+            for categoria, _, _, _, col_monto in CATEGORIAS_INTERACTIVO
+        ]
+        
+        if df_filtrado.empty:
+            titulos_avg_sale = por_periodo(lambda p: 'No hay datos disponibles para mostrar')
+        else:
+            titulos_avg_sale = por_periodo(lambda p: f'Valor Promedio de Venta por {NOMBRES_PERIODO[p]}')
+        
+        # Insights de utilidad operativa (los del gráfico interactivo son los mismos).
+        # Solo usan totales del rango, así que se calculan una vez para los tres periodos.
+        insight_utilidad = generar_insights_utilidad_operativa(
+            df_ingresos_filtrado,
+            df_costos_operativos_filtrado,
+            df_gastos_marketing_filtrado,
+            df_costos_fijos_filtrado,
+            'M'
+        )
+        insights_utilidad = por_periodo(lambda p: insight_utilidad)
+
+        # Series y insights en el orden de FIGURAS_UTILIDAD e INSIGHTS_UTILIDAD
+        serie = {
+            'figuras': [
+                figura_periodica(
+                    por_periodo(lambda p: f'Utilidad Operativa por {NOMBRES_PERIODO[p]}'),
+                    [contexto.serie('ingresos', 'monto'),
+                     contexto.serie('costos_operativos', 'monto'),
+                     contexto.serie('gastos_marketing', 'monto')]
+                ),
+                figura_periodica(
+                    por_periodo(lambda p: {'D': 'Análisis Financiero por Día', 'W': 'Análisis Financiero por Semana'}.get(p, 'Análisis Financiero por Mes')),
+                    trazas_interactivo
+                ),
+                figura_periodica(
+                    titulos_avg_sale,
+                    [contexto.serie('reservas', 'TOTAL AMOUNT', agregacion='mean')]
+                ),
+            ],
+            'insights': [
+                insights_utilidad,
+                insights_utilidad,
+                por_periodo(lambda p: generar_insights_valor_promedio_venta(df_filtrado, p, contexto)),
+            ]
+        }
+
+        # Estilo de utilidad operativa
+        utilidad_style = {
+            'color': COLORS['income'] if utilidad_operativa >= 0 else COLORS['expense'],
+            'fontSize': '2.5em',
+            'margin': '0'
+        }
+
+        return (
+            serie,
+            f'${total_ingresos:,.0f}',
+            f'${total_costos_op:,.0f}',
+            f'${total_marketing:,.0f}',
+            f'${total_costos_fijos:,.0f}',
+            f'${utilidad_operativa:,.0f}',
+            utilidad_style,
+            f'${avg_sale:,.0f}'
+        )
+    
+    # Salidas para el rango completo: se incrustan en el layout y se recalculan en cada recarga
+    vista_inicial = VistaInicial(
+        almacen,
+        lambda datos_actuales: calcular_datos_utilidad(datos_actuales, *rango_reservas(datos_actuales)),
+        'Utilidad'
+    )
+    
+    # Correlación gasto en marketing → ingresos/reservas: las series diarias se arman una vez por
+    # versión de los datos y el resultado se guarda por rango; la versión va en la clave, así una
+    # recarga del almacén no sirve correlaciones de los datos anteriores.
+    cache_correlacion = CacheCallbacks(max_entradas=16)
+    
+    def series_correlacion(datos_actuales):
+        try:
+            return series_diarias(datos_actuales['gastos_marketing'], datos_actuales['ingresos'], datos_actuales['reservas'])
+        except Exception as e:
+            print(f"⚠️ No se pudieron armar las series para la correlación: {e}")
+            return pd.DataFrame()
+    
+    def calcular_correlacion(version, datos_actuales, start_date, end_date):
+        """(figura, insights) de la correlación rezagada para una instantánea y un rango de fechas."""
+        diaria = cache_correlacion.obtener(('series', version), lambda: series_correlacion(datos_actuales))
+        inicio = pd.Timestamp(start_date).normalize()
+        fin = pd.Timestamp(end_date).normalize()
+        df_correlacion = cache_correlacion.obtener(
+            ('correlacion', version, inicio, fin),
+            lambda: correlacion_rezagada(diaria, inicio, fin)
+        )
+        return (
+            crear_grafico_correlacion(df_correlacion),
+            [html.Li(insight) for insight in generar_insights_correlacion(df_correlacion)]
+        )
+    
+    def precalcular_correlacion(version, datos_actuales):
+        # Rango completo listo antes de la primera carga de página de cada versión
+        try:
+            calcular_correlacion(version, datos_actuales, *rango_reservas(datos_actuales))
+        except Exception as e:
+            print(f"⚠️ Utilidad: no se pudo precalcular la correlación: {e}")
+    
+    almacen.suscribir(precalcular_correlacion)
+    
+    def construir_layout():
+        """Layout construido en cada carga de página con la versión vigente de los datos."""
+        datos_actuales, salidas = vista_inicial.obtener()
+        if datos_actuales is None:
+            return crear_pagina_error("Dashboard de Utilidad Operativa", almacen.error)
+        (serie, total_ingresos, total_costos_op, total_marketing, total_costos_fijos,
+         utilidad_operativa, utilidad_style, avg_sale) = salidas
+        version, datos_correlacion = almacen.instantanea()
+        figura_correlacion, insights_correlacion = calcular_correlacion(
+            version, datos_correlacion, *rango_reservas(datos_correlacion))
+        return html.Div([
+            crear_header("Dashboard de Utilidad Operativa HotBoat", 8055),
             html.Div([
-                html.H3('Utilidad Operativa', style={'color': COLORS['text'], 'marginBottom': '10px'}),
-                html.H2(id='utilidad-operativa-valor', style={'color': COLORS['income'], 'fontSize': '2.5em', 'margin': '0'}),
-            ], style=CARD_STYLE),
+                html.Div("DASHBOARD DE UTILIDAD OPERATIVA", style={
+                    'color': COLORS['income'], 
+                    'fontSize': '24px', 
+                    'fontWeight': 'bold',
+                    'padding': '10px',
+                    'marginBottom': '20px',
+                    'textAlign': 'center',
+                    'backgroundColor': COLORS['card_bg'],
+                    'borderRadius': '5px'
+                })
+            ]),
+            crear_filtros(*rango_reservas(datos_actuales)),
             html.Div([
-                html.H3('Valor Promedio de Venta', style={'color': COLORS['text'], 'marginBottom': '10px'}),
-                html.H2(id='avg-sale-value', style={'color': '#6AB187', 'fontSize': '2.5em', 'margin': '0'}),
-            ], style=CARD_STYLE),
+                html.Div([
+                    html.H3('Ingresos Totales', style={'color': COLORS['text'], 'marginBottom': '10px'}),
+                    html.H2(total_ingresos, id='total-ingresos-op', style={'color': COLORS['income'], 'fontSize': '2.5em', 'margin': '0'}),
+                ], style=CARD_STYLE),
+                html.Div([
+                    html.H3('Costos Operativos', style={'color': COLORS['text'], 'marginBottom': '10px'}),
+                    html.H2(total_costos_op, id='total-costos-op', style={'color': COLORS['expense'], 'fontSize': '2.5em', 'margin': '0'}),
+                ], style=CARD_STYLE),
+                html.Div([
+                    html.H3('Gastos Marketing', style={'color': COLORS['text'], 'marginBottom': '10px'}),
+                    html.H2(total_marketing, id='total-marketing', style={'color': COLORS['expense'], 'fontSize': '2.5em', 'margin': '0'}),
+                ], style=CARD_STYLE),
+                html.Div([
+                    html.H3('Costos Fijos', style={'color': COLORS['text'], 'marginBottom': '10px'}),
+                    html.H2(total_costos_fijos, id='total-costos-fijos', style={'color': '#9370db', 'fontSize': '2.5em', 'margin': '0'}),
+                ], style=CARD_STYLE),
+                html.Div([
+                    html.H3('Utilidad Operativa', style={'color': COLORS['text'], 'marginBottom': '10px'}),
+                    html.H2(utilidad_operativa, id='utilidad-operativa-valor', style=utilidad_style),
+                ], style=CARD_STYLE),
+                html.Div([
+                    html.H3('Valor Promedio de Venta', style={'color': COLORS['text'], 'marginBottom': '10px'}),
+                    html.H2(avg_sale, id='avg-sale-value', style={'color': '#6AB187', 'fontSize': '2.5em', 'margin': '0'}),
+                ], style=CARD_STYLE),
         ], style={'display': 'flex', 'justifyContent': 'center', 'marginBottom': '30px', 'flexWrap': 'wrap'}),
         crear_selector_periodo(),
         
@@ -810,7 +786,7 @@ def crear_app_utilidad(datos=None):
                     {'label': ' Gastos Marketing', 'value': 'gastos_marketing'},
                     {'label': ' Costos Fijos', 'value': 'costos_fijos'}
                 ],
-                value=['ingresos', 'costos_operativos', 'gastos_marketing', 'costos_fijos'],  # Todos seleccionados por defecto
+                value=VARIABLES_DEFECTO,  # Todos seleccionados por defecto
                 inline=True,
                 style={
                     'color': COLORS['text'],
@@ -833,123 +809,87 @@ def crear_app_utilidad(datos=None):
             'textAlign': 'center'
         }),
         
+        # Vistas 'Por Día' incrustadas (orden del Store: utilidad, interactivo, valor promedio)
         # Gráfico interactivo
-        crear_contenedor_grafico('grafico-interactivo', 'Análisis Financiero Interactivo'),
-        crear_contenedor_insights('insights-interactivo', 'Conclusiones: Análisis Financiero'),
+        crear_contenedor_grafico('grafico-interactivo', 'Análisis Financiero Interactivo',
+                                 figura=figura_dia(figura_base_interactivo(), serie['figuras'][1], VARIABLES_DEFECTO)),
+        crear_contenedor_insights('insights-interactivo', 'Conclusiones: Análisis Financiero', contenido=serie['insights'][0]['D']),
         
         # Gráfico original de utilidad operativa
-        crear_contenedor_grafico('utilidad-operativa-chart', 'Análisis de Utilidad Operativa'),
-        crear_contenedor_insights('insights-utilidad', 'Conclusiones: Utilidad Operativa'),
+        crear_contenedor_grafico('utilidad-operativa-chart', 'Análisis de Utilidad Operativa',
+                                 figura=figura_dia(figura_base_utilidad_operativa(), serie['figuras'][0])),
+        crear_contenedor_insights('insights-utilidad', 'Conclusiones: Utilidad Operativa', contenido=serie['insights'][1]['D']),
         
         # Nuevo gráfico de valor promedio de venta
-        crear_contenedor_grafico('avg-sale-value-chart', 'Evolución del Valor Promedio de Venta'),
-        crear_contenedor_insights('insights-avg-sale', 'Conclusiones: Valor Promedio de Venta'),
-    ], style={
-        'padding': 20,
-        'backgroundColor': COLORS['background'],
-        'minHeight': '100vh'
-    })
+        crear_contenedor_grafico('avg-sale-value-chart', 'Evolución del Valor Promedio de Venta',
+                                 figura=figura_dia(figura_base_avg_sale_value(), serie['figuras'][2])),
+        crear_contenedor_insights('insights-avg-sale', 'Conclusiones: Valor Promedio de Venta', contenido=serie['insights'][2]['D']),
+        
+        # Correlación rezagada entre gasto en marketing e ingresos/reservas
+        crear_contenedor_grafico('correlacion-marketing-chart', f'Correlación Marketing vs Ingresos (rezagos de 0 a {MAX_REZAGO} días)',
+                                 figura=figura_correlacion),
+        crear_contenedor_insights('insights-correlacion', 'Conclusiones: Correlación Marketing', contenido=insights_correlacion),
+        dcc.Store(id='serie-diaria', data=serie),
+        ], style={
+            'padding': 20,
+            'backgroundColor': COLORS['background'],
+            'minHeight': '100vh'
+        })
     
+    app.layout = construir_layout
+    
+    # El servidor solo responde a cambios de rango de fechas; periodo y selección de
+    # variables se resuelven en el navegador a partir de las series diarias del Store.
     @app.callback(
-        [Output('utilidad-operativa-chart', 'figure'),
-         Output('grafico-interactivo', 'figure'),
-         Output('avg-sale-value-chart', 'figure'),
+        [Output('serie-diaria', 'data'),
          Output('total-ingresos-op', 'children'),
          Output('total-costos-op', 'children'),
          Output('total-marketing', 'children'),
          Output('total-costos-fijos', 'children'),
          Output('utilidad-operativa-valor', 'children'),
          Output('utilidad-operativa-valor', 'style'),
-         Output('avg-sale-value', 'children'),
-         # Nuevos outputs para los insights
-         Output('insights-interactivo', 'children'),
-         Output('insights-utilidad', 'children'),
-         Output('insights-avg-sale', 'children')],
+         Output('avg-sale-value', 'children')],
+        [Input('date-range-picker', 'start_date'),
+         Input('date-range-picker', 'end_date')],
+        # La vista del rango completo ya viene en el layout
+        prevent_initial_call=True
+    )
+    def actualizar_datos_utilidad(start_date, end_date):
+        # Tomar la instantánea vigente una sola vez por callback
+        return calcular_datos_utilidad(almacen.datos, start_date, end_date)
+    
+    @app.callback(
+        [Output('correlacion-marketing-chart', 'figure'),
+         Output('insights-correlacion', 'children')],
+        [Input('date-range-picker', 'start_date'),
+         Input('date-range-picker', 'end_date')],
+        # La correlación del rango completo ya viene en el layout
+        prevent_initial_call=True
+    )
+    def actualizar_correlacion(start_date, end_date):
+        version, datos_actuales = almacen.instantanea()
+        return calcular_correlacion(version, datos_actuales, start_date, end_date)
+    
+    # Cambio de periodo o de variables: reagrupar en el navegador (assets/periodos.js)
+    FIGURAS_UTILIDAD = ['utilidad-operativa-chart', 'grafico-interactivo', 'avg-sale-value-chart']
+    INSIGHTS_UTILIDAD = ['insights-interactivo', 'insights-utilidad', 'insights-avg-sale']
+    app.clientside_callback(
+        ClientsideFunction(namespace='periodos', function_name='reagrupar_figuras_seleccion'),
+        [Output(id_grafico, 'figure') for id_grafico in FIGURAS_UTILIDAD],
         [Input('periodo-selector', 'value'),
-         Input('date-range-picker', 'start_date'),
-         Input('date-range-picker', 'end_date'),
-         Input('seleccion-variables', 'value')]
+         Input('seleccion-variables', 'value'),
+         Input('serie-diaria', 'data')] +
+        [Input(id_grafico, 'relayoutData') for id_grafico in FIGURAS_UTILIDAD],
+        [State(id_grafico, 'figure') for id_grafico in FIGURAS_UTILIDAD],
+        prevent_initial_call=True
+    )
+    app.clientside_callback(
+        ClientsideFunction(namespace='periodos', function_name='insights_periodo'),
+        [Output(id_insights, 'children') for id_insights in INSIGHTS_UTILIDAD],
+        [Input('periodo-selector', 'value'),
+         Input('serie-diaria', 'data')],
+        prevent_initial_call=True
     )
-    def actualizar_graficos_utilidad(periodo, start_date, end_date, variables_seleccionadas):
-        # Filtrar DataFrames
-        df_ingresos_filtrado = df_ingresos[(df_ingresos['fecha'] >= pd.to_datetime(start_date)) & (df_ingresos['fecha'] <= pd.to_datetime(end_date))]
-        df_costos_operativos_filtrado = df_costos_operativos[(df_costos_operativos['fecha'] >= pd.to_datetime(start_date)) & (df_costos_operativos['fecha'] <= pd.to_datetime(end_date))]
-        df_gastos_marketing_filtrado = df_gastos_marketing[(df_gastos_marketing['fecha'] >= pd.to_datetime(start_date)) & (df_gastos_marketing['fecha'] <= pd.to_datetime(end_date))]
-        df_costos_fijos_filtrado = df_costos_fijos[(df_costos_fijos['Fecha'] >= pd.to_datetime(start_date)) & (df_costos_fijos['Fecha'] <= pd.to_datetime(end_date))]
-        df_filtrado = df[(df['fecha_trip'] >= pd.to_datetime(start_date)) & (df['fecha_trip'] <= pd.to_datetime(end_date))]
-
-        # Calcular métricas
-        total_ingresos = df_ingresos_filtrado['monto'].sum()
-        total_costos_op = df_costos_operativos_filtrado['monto'].sum()
-        total_marketing = df_gastos_marketing_filtrado['monto'].sum()
-        total_costos_fijos = df_costos_fijos_filtrado['Monto'].sum()
-        utilidad_operativa = total_ingresos - total_costos_op - total_marketing - total_costos_fijos
-        
-        # Calcular promedio de ventas
-        df_filtrado['TOTAL AMOUNT'] = pd.to_numeric(df_filtrado['TOTAL AMOUNT'], errors='coerce')
-        avg_sale = df_filtrado['TOTAL AMOUNT'].mean() if not df_filtrado.empty else 0
-
-        # Crear gráfico tradicional de utilidad operativa
-        fig_utilidad = crear_grafico_utilidad_operativa(
-            df_ingresos_filtrado, 
-            df_costos_operativos_filtrado, 
-            df_gastos_marketing_filtrado, 
-            periodo
-        )
-        
-        # Crear gráfico interactivo con las variables seleccionadas
-        fig_interactivo = crear_grafico_interactivo(
-            df_ingresos_filtrado if 'ingresos' in variables_seleccionadas else None,
-            df_costos_operativos_filtrado if 'costos_operativos' in variables_seleccionadas else None,
-            df_gastos_marketing_filtrado if 'gastos_marketing' in variables_seleccionadas else None,
-            df_costos_fijos_filtrado if 'costos_fijos' in variables_seleccionadas else None,
-            periodo,
-            variables_seleccionadas
-        )
-        
-        # Crear gráfico de valor promedio de ventas
-        fig_avg_sale = crear_grafico_avg_sale_value(
-            df_filtrado,
-            periodo
-        )
-
-        # Estilo de utilidad operativa
-        utilidad_style = {
-            'color': COLORS['income'] if utilidad_operativa >= 0 else COLORS['expense'],
-            'fontSize': '2.5em',
-            'margin': '0'
-        }
-        
-        # Generar insights
-        insights_utilidad = generar_insights_utilidad_operativa(
-            df_ingresos_filtrado,
-            df_costos_operativos_filtrado,
-            df_gastos_marketing_filtrado,
-            df_costos_fijos_filtrado,
-            periodo
-        )
-        
-        # Los insights interactivos son los mismos que los de utilidad operativa
-        insights_interactivo = insights_utilidad
-        
-        # Insights para valor promedio de venta
-        insights_avg_sale = generar_insights_valor_promedio_venta(df_filtrado, periodo)
-
-        return (
-            fig_utilidad,
-            fig_interactivo,
-            fig_avg_sale,
-            f'${total_ingresos:,.0f}',
-            f'${total_costos_op:,.0f}',
-            f'${total_marketing:,.0f}',
-            f'${total_costos_fijos:,.0f}',
-            f'${utilidad_operativa:,.0f}',
-            utilidad_style,
-            f'${avg_sale:,.0f}',
-            insights_interactivo,
-            insights_utilidad,
-            insights_avg_sale
-        )
     
     return app
 
@@ -961,4 +901,4 @@ if __name__ == '__main__':
     print("Dashboard disponible en: http://localhost:8050")
     print("O alternativamente en: http://127.0.0.1:8050")
     print("\nPara ver el Dashboard de Utilidad Operativa, ejecute el archivo: python utilidad.py")
-    app.run(debug=True, host='localhost', port=8050)
\ No newline at end of file
+    app.run(debug=True, host='localhost', port=8050, threaded=True)
\ No newline at end of file
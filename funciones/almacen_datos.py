@@ -0,0 +1,190 @@
+import inspect
+import os
+import threading
+import time
+
+# Almacén de datos con recarga en caliente.
+# Los callbacks leen siempre la instantánea vigente (version, datos). Cuando
+# cambian los CSV de archivos_output, la nueva instantánea se construye aparte
+# y se publica con un único cambio de referencia, sin bloquear a los lectores.
+# Si el cargador acepta `cambiados` y `anteriores`, la recarga solo relee los
+# archivos modificados y reutiliza las demás tablas de la instantánea vigente.
+# Una recarga fallida no se reintenta hasta que los archivos vuelvan a cambiar.
+
+
+class AlmacenDatos:
+    """Mantiene la instantánea vigente de los datos y la recarga cuando cambian los archivos."""
+
+    def __init__(self, cargador, directorio='archivos_output', intervalo_segundos=5.0, datos_iniciales=None,
+                 cargar_en_segundo_plano=False):
+        self._cargador = cargador
+        try:
+            parametros = inspect.signature(cargador).parameters
+        except (TypeError, ValueError):
+            parametros = {}
+        self._recarga_parcial = 'cambiados' in parametros and 'anteriores' in parametros
+        # Firma de archivos con la que falló la última recarga (no se reintenta hasta que cambie)
+        self._firma_fallida = None
+        self._directorio = directorio
+        self._intervalo = intervalo_segundos
+        self._lock_recarga = threading.Lock()
+        self._lock_suscriptores = threading.Lock()
+        self._detener = threading.Event()
+        self._lista = threading.Event()
+        self._hilo = None
+        self._suscriptores = []
+        self._instantanea = (0, None)
+        # Excepción de la carga inicial mientras no haya ninguna versión publicada
+        self._error = None
+
+        self._firma = self._firma_archivos()
+        if datos_iniciales is not None:
+            self._publicar(1, datos_iniciales)
+        elif cargar_en_segundo_plano:
+            # El servidor puede abrir el puerto mientras se cargan los datos
+            threading.Thread(target=self._precargar, name='precarga-datos', daemon=True).start()
+        else:
+            self._publicar(1, cargador())
+
+    def _publicar(self, version, datos):
+        self._instantanea = (version, datos)
+        self._error = None
+        self._lista.set()
+
+    def _precargar(self):
+        inicio = time.perf_counter()
+        try:
+            datos = self._cargador()
+        except Exception as e:
+            # No se publica nada: los lectores ven el error y la vigilancia reintenta en la próxima vuelta
+            print(f"❌ Error en la precarga de datos: {e}")
+            import traceback
+            print(traceback.format_exc())
+            self._error = e
+            self._firma = {}
+            self._lista.set()
+            return
+        print(f"✅ Precarga de datos completada en {time.perf_counter() - inicio:.2f}s")
+        with self._lock_suscriptores:
+            self._publicar(1, datos)
+            self._notificar(1, datos)
+
+    def _notificar(self, version, datos):
+        for funcion in list(self._suscriptores):
+            try:
+                funcion(version, datos)
+            except Exception as e:
+                print(f"⚠️ Error notificando recarga: {e}")
+
+    # ---- Lectura ----
+    def instantanea(self):
+        """Devuelve (version, datos) de forma consistente (espera la precarga si aún no termina).
+
+        Si la carga inicial falló devuelve (0, None) y la causa queda en `error`.
+        """
+        self._lista.wait()
+        return self._instantanea
+
+    @property
+    def datos(self):
+        return self.instantanea()[1]
+
+    @property
+    def version(self):
+        return self.instantanea()[0]
+
+    @property
+    def listo(self):
+        return self._lista.is_set()
+
+    @property
+    def error(self):
+        """Excepción de la carga inicial si falló y aún no se publica ninguna versión; si no, None."""
+        return self._error
+
+    def suscribir(self, funcion):
+        """Registra una función que se llama con (version, datos) cada vez que se publica una versión."""
+        with self._lock_suscriptores:
+            self._suscriptores.append(funcion)
+            if self._instantanea[0] > 0:
+                funcion(*self._instantanea)
+
+    # ---- Recarga ----
+    def _firma_archivos(self):
+        """Firma (mtime, tamaño) de los CSV del directorio vigilado."""
+        firma = {}
+        if not os.path.isdir(self._directorio):
+            return firma
+        for entrada in os.scandir(self._directorio):
+            if entrada.is_file() and entrada.name.lower().endswith('.csv'):
+                estado = entrada.stat()
+                firma[entrada.name] = (estado.st_mtime_ns, estado.st_size)
+        return firma
+
+    def recargar(self, forzar=False):
+        """Reconstruye los datos si cambiaron los archivos. Devuelve True si publicó una nueva versión."""
+        with self._lock_recarga:
+            firma_nueva = self._firma_archivos()
+            if not forzar and (firma_nueva == self._firma or firma_nueva == self._firma_fallida):
+                return False
+
+            cambiados = sorted(
+                nombre for nombre in set(firma_nueva) | set(self._firma)
+                if firma_nueva.get(nombre) != self._firma.get(nombre)
+            )
+            inicio = time.perf_counter()
+            version_actual, datos_actuales = self._instantanea
+            try:
+                if self._recarga_parcial and not forzar and datos_actuales is not None:
+                    datos_nuevos = self._cargador(cambiados=set(cambiados), anteriores=datos_actuales)
+                else:
+                    datos_nuevos = self._cargador()
+            except Exception as e:
+                # No se reintenta con los mismos archivos: se espera al próximo cambio
+                self._firma_fallida = firma_nueva
+                print(f"⚠️ Error recargando datos, se mantiene la versión {version_actual} "
+                      f"hasta que los archivos vuelvan a cambiar: {e}")
+                return False
+
+            # Si los archivos siguieron cambiando durante la carga, se reintenta en la próxima vuelta
+            if self._firma_archivos() != firma_nueva:
+                print("⏳ Archivos aún en escritura, se reintentará la recarga")
+                return False
+
+            version_nueva = version_actual + 1
+            self._publicar(version_nueva, datos_nuevos)
+            self._firma = firma_nueva
+            self._firma_fallida = None
+
+        duracion = time.perf_counter() - inicio
+        print(f"🔄 Datos recargados (versión {version_nueva}) en {duracion:.2f}s: {', '.join(cambiados) or 'recarga forzada'}")
+        self._notificar(version_nueva, datos_nuevos)
+        return True
+
+    # ---- Vigilancia ----
+    def _vigilar(self):
+        self._lista.wait()
+        while not self._detener.wait(self._intervalo):
+            self.recargar()
+
+    def iniciar_vigilancia(self):
+        """Inicia el hilo que revisa periódicamente el directorio de datos."""
+        if self._hilo is not None and self._hilo.is_alive():
+            return
+        self._detener.clear()
+        self._hilo = threading.Thread(target=self._vigilar, name='vigilancia-archivos_output', daemon=True)
+        self._hilo.start()
+        print(f"👀 Vigilando cambios en '{self._directorio}' cada {self._intervalo:.0f}s")
+
+    def detener_vigilancia(self):
+        self._detener.set()
+        if self._hilo is not None:
+            self._hilo.join(timeout=self._intervalo)
+            self._hilo = None
+
+
+def como_almacen(datos, cargador):
+    """Acepta un AlmacenDatos, un dict de datos o None y devuelve siempre un AlmacenDatos."""
+    if isinstance(datos, AlmacenDatos):
+        return datos
+    return AlmacenDatos(cargador, datos_iniciales=datos)
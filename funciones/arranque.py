@@ -0,0 +1,48 @@
+import os
+import sys
+import time
+
+# Medición del tiempo de arranque de los dashboards.
+# Este módulo se importa primero en los scripts de entrada: desde ese momento
+# se registran marcas por etapa y, antes de abrir el puerto, se imprime un
+# reporte y se verifica el presupuesto de arranque.
+
+PRESUPUESTO_ARRANQUE_SEGUNDOS = float(os.environ.get('HOTBOAT_PRESUPUESTO_ARRANQUE', '1.0'))
+
+# Con HOTBOAT_PRESUPUESTO_ESTRICTO=1 el proceso termina si se excede el presupuesto
+PRESUPUESTO_ESTRICTO = os.environ.get('HOTBOAT_PRESUPUESTO_ESTRICTO', '0') == '1'
+
+# Módulos que no deberían cargarse al arrancar un dashboard
+MODULOS_PESADOS = ('matplotlib', 'seaborn', 'pdfplumber', 'scipy', 'sklearn', 'statsmodels')
+
+_inicio = time.perf_counter()
+_marcas = []
+
+
+def marcar(etapa):
+    """Registra el instante en que termina una etapa del arranque."""
+    _marcas.append((etapa, time.perf_counter()))
+
+
+def reporte_arranque(nombre, presupuesto=None):
+    """Imprime la duración de cada etapa y verifica el presupuesto de arranque."""
+    presupuesto = PRESUPUESTO_ARRANQUE_SEGUNDOS if presupuesto is None else presupuesto
+    total = time.perf_counter() - _inicio
+
+    print(f"⏱️ Arranque de {nombre}:")
+    anterior = _inicio
+    for etapa, instante in _marcas:
+        print(f"   {etapa:<30} {instante - anterior:6.3f}s")
+        anterior = instante
+    print(f"   {'TOTAL':<30} {total:6.3f}s (presupuesto {presupuesto:.2f}s)")
+
+    pesados = [modulo for modulo in MODULOS_PESADOS if modulo in sys.modules]
+    if pesados:
+        print(f"⚠️ Módulos pesados cargados al arrancar: {', '.join(pesados)}")
+
+    if total > presupuesto:
+        mensaje = f"❌ {nombre} excedió el presupuesto de arranque ({total:.2f}s > {presupuesto:.2f}s)"
+        if PRESUPUESTO_ESTRICTO:
+            raise SystemExit(mensaje)
+        print(mensaje)
+    return total
@@ -0,0 +1,161 @@
+import os
+
+import numpy as np
+import pandas as pd
+
+from funciones.carga_tablas import DIRECTORIO_OUTPUT, TABLAS_DASHBOARD, cargar_tablas
+
+# Atribución del gasto publicitario a las reservas.
+# El gasto diario (por plataforma desde gastos_marketing.csv, o por público
+# desde el cubo de Meta) se lleva a un calendario continuo. Cada reserva se
+# asocia con merge_asof al último día con gasto dentro de la ventana previa a
+# su creación ('fecha_creacion_reserva') y se reparte entre los grupos según el
+# gasto de cada uno en esa ventana (suma móvil). Las reservas sin gasto en la
+# ventana quedan como "Sin atribuir". Todo se guarda como sumas acumuladas por
+# día: costo por reserva y ROAS de cualquier ventana y rango de fechas son dos
+# restas y una división.
+
+# Ventanas de atribución en días (la reserva puede crearse hasta N-1 días después del gasto)
+VENTANAS_ATRIBUCION = [int(dias) for dias in os.environ.get('HOTBOAT_VENTANAS_ATRIBUCION', '1,7,14,28').split(',') if dias.strip()]
+
+SIN_ATRIBUIR = 'Sin atribuir'
+
+TABLAS_ATRIBUCION = {clave: TABLAS_DASHBOARD[clave] for clave in ('gastos_marketing', 'reservas')}
+
+
+def gasto_diario(df, columna_fecha, columna_monto, columna_grupo):
+    """Gasto por día (filas continuas, 0 en los días sin gasto) y grupo (columnas)."""
+    if df is None or df.empty:
+        return pd.DataFrame(index=pd.DatetimeIndex([], freq='D'))
+    df = df[df[columna_fecha].notna()]
+    if df.empty:
+        return pd.DataFrame(index=pd.DatetimeIndex([], freq='D'))
+    tabla = df.pivot_table(index=columna_fecha, columns=columna_grupo, values=columna_monto,
+                           aggfunc='sum', fill_value=0, observed=True)
+    tabla.columns = [str(grupo) for grupo in tabla.columns]
+    return tabla.asfreq('D', fill_value=0)
+
+
+def _acumular(matriz):
+    """Sumas acumuladas por día con una fila inicial de ceros: rango [i, j) = acumulada[j] - acumulada[i]."""
+    acumulada = np.zeros((matriz.shape[0] + 1, matriz.shape[1]))
+    np.cumsum(matriz, axis=0, out=acumulada[1:])
+    return acumulada
+
+
+class AtribucionGasto:
+    """Gasto y reservas/ingresos atribuidos por día y grupo, acumulados, para cada ventana."""
+
+    def __init__(self, dimension, dias, grupos, gasto_acumulado, por_ventana):
+        self.dimension = dimension
+        self.dias = dias
+        self.grupos = grupos
+        self.gasto_acumulado = gasto_acumulado
+        # ventana -> (reservas acumuladas, ingresos acumulados); la última columna es "Sin atribuir"
+        self.por_ventana = por_ventana
+
+    @classmethod
+    def desde_tablas(cls, dimension, gasto, reservas, ventanas=VENTANAS_ATRIBUCION):
+        """Atribución a partir del gasto diario por grupo (ver gasto_diario) y la tabla de reservas."""
+        reservas = reservas[reservas['fecha_creacion_reserva'].notna()]
+        reservas = reservas.sort_values('fecha_creacion_reserva', kind='mergesort', ignore_index=True)
+        fechas = [indice for indice in (gasto.index, pd.DatetimeIndex(reservas['fecha_creacion_reserva'])) if len(indice)]
+        if not fechas:
+            dias = pd.DatetimeIndex([], freq='D')
+        else:
+            dias = pd.date_range(min(indice.min() for indice in fechas), max(indice.max() for indice in fechas), freq='D')
+        gasto = gasto.reindex(dias, fill_value=0)
+        grupos = list(gasto.columns)
+        matriz_gasto = gasto.to_numpy(dtype='float64')
+
+        posicion_reserva = dias.searchsorted(reservas['fecha_creacion_reserva'])
+        montos = reservas['TOTAL AMOUNT'].fillna(0).to_numpy(dtype='float64')[:, None]
+        dias_con_gasto = pd.DataFrame({'dia_gasto': dias[matriz_gasto.sum(axis=1) > 0]})
+
+        por_ventana = {}
+        for ventana in ventanas:
+            # Gasto de cada grupo en los `ventana` días que terminan en cada día
+            en_ventana = gasto.rolling(ventana, min_periods=1).sum().to_numpy()
+            # Último día con gasto a menos de `ventana` días antes de la creación de cada reserva
+            toque = pd.merge_asof(reservas[['fecha_creacion_reserva']], dias_con_gasto,
+                                  left_on='fecha_creacion_reserva', right_on='dia_gasto',
+                                  direction='backward', tolerance=pd.Timedelta(days=ventana - 1))
+            # merge_asof solo decide si la reserva se atribuye; el reparto usa el gasto de la
+            # ventana que termina el día de creación (el gasto anterior a la ventana no suma)
+            atribuida = toque['dia_gasto'].notna().to_numpy()
+            filas = en_ventana[posicion_reserva[atribuida]]
+
+            participacion = np.zeros((len(reservas), len(grupos) + 1))
+            participacion[atribuida, :-1] = filas / filas.sum(axis=1, keepdims=True)
+            participacion[~atribuida, -1] = 1
+
+            reservas_dia = np.zeros((len(dias), len(grupos) + 1))
+            ingresos_dia = np.zeros((len(dias), len(grupos) + 1))
+            np.add.at(reservas_dia, posicion_reserva, participacion)
+            np.add.at(ingresos_dia, posicion_reserva, participacion * montos)
+            por_ventana[ventana] = (_acumular(reservas_dia), _acumular(ingresos_dia))
+
+        return cls(dimension, dias.to_numpy(), grupos, _acumular(matriz_gasto), por_ventana)
+
+    def _tramo(self, desde, hasta):
+        inicio = 0 if desde is None else np.searchsorted(self.dias, np.datetime64(pd.Timestamp(desde)), side='left')
+        fin = len(self.dias) if hasta is None else np.searchsorted(self.dias, np.datetime64(pd.Timestamp(hasta)), side='right')
+        return inicio, fin
+
+    def resumen(self, ventana, desde=None, hasta=None):
+        """Por grupo: gasto, reservas e ingresos atribuidos, costo por reserva y ROAS entre dos días."""
+        inicio, fin = self._tramo(desde, hasta)
+        reservas_acumuladas, ingresos_acumulados = self.por_ventana[ventana]
+        df = pd.DataFrame({
+            self.dimension: self.grupos + [SIN_ATRIBUIR],
+            'Gasto (CLP)': np.append(self.gasto_acumulado[fin] - self.gasto_acumulado[inicio], 0),
+            'Reservas atribuidas': reservas_acumuladas[fin] - reservas_acumuladas[inicio],
+            'Ingresos atribuidos (CLP)': ingresos_acumulados[fin] - ingresos_acumulados[inicio],
+        })
+        # Sin gasto en el rango (o sin reservas, o "Sin atribuir") el costo por reserva no está definido
+        con_costo = (df['Gasto (CLP)'] > 0) & (df['Reservas atribuidas'] > 0) & (df[self.dimension] != SIN_ATRIBUIR)
+        df['Costo por reserva (CLP)'] = (df['Gasto (CLP)'] / df['Reservas atribuidas']).where(con_costo)
+        df['ROAS'] = df['Ingresos atribuidos (CLP)'] / df['Gasto (CLP)'].where(df['Gasto (CLP)'] > 0)
+        return df
+
+
+def cargar_atribucion(cubo_meta=None, directorio=DIRECTORIO_OUTPUT, ventanas=VENTANAS_ATRIBUCION):
+    """Atribuciones {'Plataforma', 'Público'}: gasto de gastos_marketing.csv y del cubo de Meta contra las reservas."""
+    tablas = cargar_tablas(TABLAS_ATRIBUCION, directorio)
+    reservas = tablas['reservas']
+    atribuciones = {
+        'Plataforma': AtribucionGasto.desde_tablas(
+            'Plataforma', gasto_diario(tablas['gastos_marketing'], 'fecha', 'monto', 'plataforma'), reservas, ventanas),
+    }
+    if cubo_meta is not None and not cubo_meta.vacio:
+        atribuciones['Público'] = AtribucionGasto.desde_tablas(
+            'Público', gasto_diario(cubo_meta.celdas, 'Día', 'Importe gastado (CLP)', 'Público'), reservas, ventanas)
+    print(f"🔗 Atribución gasto → reservas: {len(reservas)} reservas, ventanas de {ventanas} días")
+    return atribuciones
+
+
+def generar_insights_atribucion(atribucion, ventana, desde=None, hasta=None):
+    """Textos de resumen del gasto atribuido a reservas por grupo entre dos días."""
+    df = atribucion.resumen(ventana, desde, hasta)
+    atribuidas = df[df[atribucion.dimension] != SIN_ATRIBUIR]
+    total_gasto = atribuidas['Gasto (CLP)'].sum()
+    total_reservas = atribuidas['Reservas atribuidas'].sum()
+    total_ingresos = atribuidas['Ingresos atribuidos (CLP)'].sum()
+    sin_atribuir = df.loc[df[atribucion.dimension] == SIN_ATRIBUIR, 'Reservas atribuidas'].sum()
+
+    if total_gasto <= 0:
+        return ["No hay gasto publicitario en el período seleccionado."]
+
+    insights = [
+        f"• Con una ventana de {ventana} días, {total_reservas:.1f} reservas se atribuyen al gasto de ${total_gasto:,.0f}",
+        f"• Costo por reserva: ${total_gasto / total_reservas:,.0f}" if total_reservas > 0 else "• Ninguna reserva cae dentro de la ventana de atribución",
+        f"• ROAS total: {total_ingresos / total_gasto:.2f} (${total_ingresos:,.0f} en reservas atribuidas)",
+        f"• Reservas sin gasto en la ventana previa: {sin_atribuir:.0f}"
+    ]
+
+    con_costo = atribuidas.dropna(subset=['Costo por reserva (CLP)'])
+    if not con_costo.empty:
+        mejor = con_costo.loc[con_costo['Costo por reserva (CLP)'].idxmin()]
+        insights.append(f"• Menor costo por reserva: {mejor[atribucion.dimension]} (${mejor['Costo por reserva (CLP)']:,.0f}, ROAS {mejor['ROAS']:.2f})")
+
+    return insights
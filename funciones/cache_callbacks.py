@@ -0,0 +1,72 @@
+import threading
+from collections import OrderedDict
+
+import pandas as pd
+
+# Caché del lado del servidor compartida entre callbacks.
+# Cuando un cambio de fechas dispara varios callbacks a la vez, el primero que
+# llega calcula la tabla filtrada (o el agregado) y los demás reutilizan el
+# resultado en lugar de volver a filtrar. Las claves incluyen la versión de los
+# datos, de modo que una recarga invalida las entradas anteriores.
+
+
+class _Entrada:
+    __slots__ = ('lista', 'valor', 'error')
+
+    def __init__(self):
+        self.lista = threading.Event()
+        self.valor = None
+        self.error = None
+
+
+class CacheCallbacks:
+    """LRU de resultados intermedios (tablas filtradas, agregados) indexados por clave."""
+
+    def __init__(self, max_entradas=64):
+        self._max_entradas = max_entradas
+        self._entradas = OrderedDict()
+        self._lock = threading.Lock()
+
+    def obtener(self, clave, calcular):
+        """Devuelve el valor de `clave`; si no existe lo calcula una sola vez aunque lo pidan varios hilos."""
+        with self._lock:
+            entrada = self._entradas.get(clave)
+            if entrada is not None:
+                self._entradas.move_to_end(clave)
+                propia = False
+            else:
+                entrada = _Entrada()
+                self._entradas[clave] = entrada
+                propia = True
+                while len(self._entradas) > self._max_entradas:
+                    self._entradas.popitem(last=False)
+
+        if propia:
+            try:
+                entrada.valor = calcular()
+            except Exception as e:
+                entrada.error = e
+                with self._lock:
+                    if self._entradas.get(clave) is entrada:
+                        del self._entradas[clave]
+            finally:
+                entrada.lista.set()
+        else:
+            entrada.lista.wait()
+
+        if entrada.error is not None:
+            raise entrada.error
+        return entrada.valor
+
+    def limpiar(self):
+        with self._lock:
+            self._entradas.clear()
+
+
+def filtrar_por_fechas(df, columna_fecha, start_date, end_date):
+    """Filtra `df` por el rango [start_date, end_date] sin copiar la tabla original."""
+    if df is None or df.empty:
+        return df
+    inicio = pd.to_datetime(start_date)
+    fin = pd.to_datetime(end_date)
+    return df[(df[columna_fecha] >= inicio) & (df[columna_fecha] <= fin)]
@@ -0,0 +1,179 @@
+import functools
+import hashlib
+import json
+import os
+import threading
+import weakref
+
+import pandas as pd
+
+from funciones.cache_callbacks import CacheCallbacks
+
+# Caché persistente de figuras estáticas.
+# Algunas figuras no dependen de ningún Input (horarios populares, gráficos de
+# Google Ads): solo de los datos cargados. Se guardan serializadas en disco con
+# una clave nombre-del-constructor + hash del contenido de los datos, de modo
+# que un reinicio del proceso o una nueva carga de página las lee del archivo en
+# lugar de volver a construirlas. Si los datos cambian, cambia el hash y la
+# figura se reconstruye; las figuras viejas se descartan por antigüedad.
+#
+# Las figuras se devuelven como dict (JSON de plotly ya decodificado): sirven
+# tal cual para dcc.Graph(figure=...) y como salida de un callback, pero no
+# deben modificarse porque se comparten entre peticiones.
+
+DIRECTORIO_FIGURAS = os.environ.get('HOTBOAT_DIRECTORIO_FIGURAS', os.path.join('archivos_output', 'cache_figuras'))
+
+# Máximo de archivos en el directorio; al superarlo se borran los más antiguos
+MAX_ARCHIVOS_FIGURAS = int(os.environ.get('HOTBOAT_MAX_FIGURAS_DISCO', '200'))
+
+# Versión de las figuras en disco. La clave ya cambia con el código del constructor y con la
+# plantilla de funciones/tema.py, pero no con los helpers que llama (plantilla_monto,
+# traza_temporal, series de graficos_dashboard...): subirla al cambiar esos módulos.
+VERSION_FIGURAS = 1
+
+# Hash por identidad de las tablas ya vistas: las instantáneas de datos no se modifican en el lugar
+_huellas = {}
+_lock_huellas = threading.Lock()
+
+
+def _actualizar_hash(h, objeto):
+    if objeto is None:
+        h.update(b'None')
+    elif isinstance(objeto, (pd.DataFrame, pd.Series)):
+        h.update(_huella_tabla(objeto).encode())
+    elif isinstance(objeto, dict):
+        for clave in sorted(objeto, key=str):
+            h.update(str(clave).encode())
+            _actualizar_hash(h, objeto[clave])
+    elif isinstance(objeto, (list, tuple)):
+        for valor in objeto:
+            _actualizar_hash(h, valor)
+    else:
+        h.update(repr(objeto).encode())
+
+
+def _huella_tabla(tabla):
+    """Hash de columnas, tipos, índice y valores de un DataFrame o Series."""
+    with _lock_huellas:
+        guardada = _huellas.get(id(tabla))
+    if guardada is not None and guardada[0]() is tabla:
+        return guardada[1]
+
+    h = hashlib.blake2b(digest_size=16)
+    if isinstance(tabla, pd.DataFrame):
+        h.update(repr(list(tabla.columns)).encode())
+        h.update(repr([str(tipo) for tipo in tabla.dtypes]).encode())
+    else:
+        h.update(repr((tabla.name, str(tabla.dtype))).encode())
+    h.update(pd.util.hash_pandas_object(tabla, index=True).to_numpy().tobytes())
+    huella = h.hexdigest()
+
+    with _lock_huellas:
+        # Limpieza perezosa de tablas ya liberadas
+        for clave in [clave for clave, (ref, _) in _huellas.items() if ref() is None]:
+            del _huellas[clave]
+        _huellas[id(tabla)] = (weakref.ref(tabla), huella)
+    return huella
+
+
+def huella_datos(*objetos):
+    """Hash del contenido de tablas (o dicts/listas de tablas) y parámetros simples."""
+    h = hashlib.blake2b(digest_size=16)
+    for objeto in objetos:
+        _actualizar_hash(h, objeto)
+    return h.hexdigest()
+
+
+def _firma_constructor(constructor):
+    """Cambia si cambia el código del constructor, para no servir figuras de una versión anterior."""
+    codigo = getattr(constructor, '__code__', None)
+    if codigo is None:
+        return ''
+    h = hashlib.blake2b(digest_size=4)
+    h.update(codigo.co_code)
+    h.update(repr(codigo.co_consts).encode())
+    return h.hexdigest()
+
+
+@functools.lru_cache(maxsize=None)
+def _firma_entorno():
+    """Hash de VERSION_FIGURAS y de la plantilla TEMA registrada (colores, fuentes, ejes)."""
+    import plotly.io as pio
+    from funciones.tema import TEMA
+
+    h = hashlib.blake2b(digest_size=4)
+    h.update(str(VERSION_FIGURAS).encode())
+    h.update(json.dumps(pio.templates[TEMA].to_plotly_json(), sort_keys=True, default=str).encode())
+    return h.hexdigest()
+
+
+class CacheFiguras:
+    """Figuras serializadas en disco (más un LRU en memoria) indexadas por constructor y datos."""
+
+    def __init__(self, directorio=DIRECTORIO_FIGURAS, max_archivos=MAX_ARCHIVOS_FIGURAS, max_memoria=32):
+        self.directorio = directorio
+        self.max_archivos = max_archivos
+        self._memoria = CacheCallbacks(max_entradas=max_memoria)
+        os.makedirs(directorio, exist_ok=True)
+
+    def clave(self, constructor, huella):
+        return f"{constructor.__name__}-{_firma_constructor(constructor)}-{_firma_entorno()}-{huella}"
+
+    def obtener(self, constructor, *args, huella=None):
+        """Figura `constructor(*args)` como dict, leída de disco si ya se construyó con los mismos datos.
+
+        `huella` permite pasar un hash precalculado (huella_datos) de los argumentos.
+        """
+        if huella is None:
+            try:
+                huella = huella_datos(*args)
+            except TypeError as e:
+                # Columnas con valores no hasheables (listas, dicts): se construye sin caché
+                print(f"⚠️ {constructor.__name__}: datos sin hash estable, figura sin caché ({e})")
+                return constructor(*args)
+        clave = self.clave(constructor, huella)
+        return self._memoria.obtener(clave, lambda: self._leer_o_construir(clave, constructor, args))
+
+    def _leer_o_construir(self, clave, constructor, args):
+        ruta = os.path.join(self.directorio, f'{clave}.json')
+        try:
+            with open(ruta, encoding='utf-8') as archivo:
+                return json.load(archivo)
+        except FileNotFoundError:
+            pass
+        except (OSError, ValueError) as e:
+            print(f"⚠️ Figura en caché ilegible, se reconstruye ({os.path.basename(ruta)}): {e}")
+
+        import plotly.io as pio
+        texto = pio.to_json(constructor(*args), validate=False)
+
+        # Escritura atómica: otro proceso nunca lee un archivo a medio escribir
+        temporal = f'{ruta}.{os.getpid()}.{threading.get_ident()}.tmp'
+        try:
+            with open(temporal, 'w', encoding='utf-8') as archivo:
+                archivo.write(texto)
+            os.replace(temporal, ruta)
+            print(f"💾 Figura guardada en caché: {os.path.basename(ruta)}")
+            self._podar()
+        except OSError as e:
+            print(f"⚠️ No se pudo guardar la figura en caché: {e}")
+        return json.loads(texto)
+
+    def _podar(self):
+        """Borra las figuras más antiguas si hay más de max_archivos."""
+        try:
+            entradas = [entrada for entrada in os.scandir(self.directorio) if entrada.name.endswith('.json')]
+            if len(entradas) <= self.max_archivos:
+                return
+            entradas.sort(key=lambda entrada: entrada.stat().st_mtime)
+            for entrada in entradas[:len(entradas) - self.max_archivos]:
+                os.remove(entrada.path)
+        except OSError:
+            pass
+
+    def limpiar(self):
+        """Vacía la memoria y borra las figuras del directorio."""
+        self._memoria.limpiar()
+        for entrada in os.scandir(self.directorio):
+            if entrada.name.endswith('.json'):
+                os.remove(entrada.path)
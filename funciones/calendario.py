@@ -0,0 +1,142 @@
+import threading
+
+import numpy as np
+import pandas as pd
+
+# Dimensión calendario compartida por todos los dashboards.
+# Cada tabla lleva una clave entera de día (días desde 1970-01-01) por columna
+# de fecha ('dia_key_<columna>') y el agrupamiento por día/semana/mes se
+# resuelve como un lookup en este calendario.
+
+MESES_ES = {
+    1: 'Enero', 2: 'Febrero', 3: 'Marzo', 4: 'Abril', 5: 'Mayo', 6: 'Junio',
+    7: 'Julio', 8: 'Agosto', 9: 'Septiembre', 10: 'Octubre', 11: 'Noviembre', 12: 'Diciembre'
+}
+
+# periodo -> (columna de bucket, columna de etiqueta)
+COLUMNAS_PERIODO = {
+    'D': ('fecha', 'label_dia'),
+    'W': ('inicio_semana', 'label_semana'),
+    'M': ('inicio_mes', 'label_mes'),
+}
+
+DIA_KEY_NULO = -1
+
+_calendario_actual = None
+_lock_calendario = threading.Lock()
+
+
+def fechas_a_dia_key(fechas):
+    """Convierte una serie de fechas en claves enteras de día (-1 para fechas nulas)."""
+    valores = pd.to_datetime(fechas).to_numpy(dtype='datetime64[ns]').astype('datetime64[D]')
+    nulos = np.isnat(valores)
+    keys = valores.astype(np.int64)
+    keys[nulos] = DIA_KEY_NULO
+    return pd.Series(keys.astype(np.int32), index=fechas.index, name='dia_key')
+
+
+def columna_dia_key(columna_fecha):
+    """Nombre de la columna con la clave de día calculada desde `columna_fecha`."""
+    return f'dia_key_{columna_fecha}'
+
+
+def agregar_dia_key(df, columna_fecha):
+    """Agrega la clave de día de `columna_fecha` a una tabla recién cargada (se usa solo en la carga)."""
+    if df is None or df.empty or columna_fecha not in df.columns:
+        return df
+    df[columna_dia_key(columna_fecha)] = fechas_a_dia_key(df[columna_fecha])
+    return df
+
+
+def _formatear_unicos(serie, formato):
+    """Formatea una sola vez cada valor único y expande el resultado a toda la serie."""
+    codigos, unicos = pd.factorize(serie)
+    etiquetas = np.array([formato(valor) for valor in unicos], dtype=object)
+    return etiquetas[codigos]
+
+
+def construir_calendario(fecha_min, fecha_max):
+    """Construye la tabla calendario diaria entre dos fechas con buckets y etiquetas precalculadas."""
+    dias = pd.date_range(pd.Timestamp(fecha_min).normalize(), pd.Timestamp(fecha_max).normalize(), freq='D')
+    calendario = pd.DataFrame({'fecha': dias})
+    calendario['dia_key'] = fechas_a_dia_key(calendario['fecha'])
+    calendario['inicio_semana'] = calendario['fecha'] - pd.to_timedelta(calendario['fecha'].dt.dayofweek, unit='D')
+    calendario['inicio_mes'] = calendario['fecha'].dt.to_period('M').dt.to_timestamp()
+    calendario['label_dia'] = _formatear_unicos(calendario['fecha'], lambda f: f.strftime('%d/%m/%Y'))
+    calendario['label_semana'] = _formatear_unicos(calendario['inicio_semana'], lambda f: f.strftime('Semana del %d/%m/%Y'))
+    calendario['label_mes'] = _formatear_unicos(calendario['inicio_mes'], lambda f: f"{MESES_ES[f.month]} {f.year}")
+    return calendario
+
+
+def construir_calendario_datos(datos, columnas_fecha):
+    """Construye el calendario que cubre todas las tablas de `datos` y lo registra como el actual."""
+    minimos, maximos = [], []
+    for clave, columna in columnas_fecha.items():
+        df = datos.get(clave)
+        if df is None or df.empty or columna not in df.columns:
+            continue
+        minimos.append(df[columna].min())
+        maximos.append(df[columna].max())
+
+    minimos = [f for f in minimos if pd.notna(f)]
+    maximos = [f for f in maximos if pd.notna(f)]
+    if not minimos:
+        hoy = pd.Timestamp.today()
+        minimos, maximos = [hoy], [hoy]
+
+    calendario = construir_calendario(min(minimos), max(maximos))
+    registrar_calendario(calendario)
+    return calendario
+
+
+def registrar_calendario(calendario):
+    """Publica el calendario como el compartido por los constructores de gráficos."""
+    global _calendario_actual
+    with _lock_calendario:
+        _calendario_actual = calendario
+
+
+def obtener_calendario(key_min, key_max):
+    """Devuelve un calendario que cubra el rango de claves, ampliándolo si es necesario."""
+    global _calendario_actual
+    calendario = _calendario_actual
+    if calendario is not None and not calendario.empty:
+        if calendario['dia_key'].iat[0] <= key_min and calendario['dia_key'].iat[-1] >= key_max:
+            return calendario
+
+    with _lock_calendario:
+        calendario = _calendario_actual
+        if calendario is not None and not calendario.empty:
+            key_min = min(key_min, int(calendario['dia_key'].iat[0]))
+            key_max = max(key_max, int(calendario['dia_key'].iat[-1]))
+        origen = pd.Timestamp('1970-01-01')
+        calendario = construir_calendario(origen + pd.Timedelta(days=int(key_min)), origen + pd.Timedelta(days=int(key_max)))
+        _calendario_actual = calendario
+    return calendario
+
+
+def agrupar_por_periodo(df, columna_fecha, periodo):
+    """Devuelve (grupo, etiqueta) alineados con `df` resolviendo el periodo en el calendario.
+
+    No modifica `df`: usa la clave precalculada de `columna_fecha` si existe o la calcula
+    sobre la marcha (una clave de otra columna de fecha nunca se usa).
+    """
+    columna_key = columna_dia_key(columna_fecha)
+    if columna_key in df.columns:
+        keys = df[columna_key].to_numpy()
+    else:
+        keys = fechas_a_dia_key(df[columna_fecha]).to_numpy()
+
+    columna_bucket, columna_label = COLUMNAS_PERIODO.get(periodo, COLUMNAS_PERIODO['M'])
+    grupo = np.full(len(keys), np.datetime64('NaT'), dtype='datetime64[ns]')
+    etiqueta = np.full(len(keys), None, dtype=object)
+
+    validas = keys != DIA_KEY_NULO
+    if validas.any():
+        calendario = obtener_calendario(int(keys[validas].min()), int(keys[validas].max()))
+        posiciones = keys[validas] - int(calendario['dia_key'].iat[0])
+        grupo[validas] = calendario[columna_bucket].to_numpy()[posiciones]
+        etiqueta[validas] = calendario[columna_label].to_numpy()[posiciones]
+
+    return (pd.Series(grupo, index=df.index, name='fecha_grupo'),
+            pd.Series(etiqueta, index=df.index, name='fecha_label'))
@@ -0,0 +1,108 @@
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pandas as pd
+
+# Carga de las tablas de archivos_output.
+# Cada tabla se describe con su archivo, formato de fechas y dtypes explícitos,
+# de modo que read_csv no tenga que inferir tipos y to_datetime no tenga que
+# adivinar el formato. Las lecturas se lanzan en paralelo en un pool de hilos
+# (el parser de pandas libera el GIL durante la mayor parte del trabajo).
+
+DIRECTORIO_OUTPUT = "archivos_output"
+FORMATO_FECHA_ISO = '%Y-%m-%d'
+
+TABLAS_DASHBOARD = {
+    'reservas': {
+        'archivo': 'reservas_HotBoat.csv',
+        'fechas': {'fecha_trip': FORMATO_FECHA_ISO, 'fecha_creacion_reserva': FORMATO_FECHA_ISO},
+        'dtype': {'ID': 'int64'},
+        # Columnas que pueden traer texto y se convierten con errors='coerce'
+        'numericas': ['TOTAL AMOUNT'],
+    },
+    'pagos': {
+        'archivo': 'abonos hotboat.csv',
+        'fechas': {'Fecha': FORMATO_FECHA_ISO},
+        'dtype': {'Monto': 'float64'},
+    },
+    'gastos': {
+        'archivo': 'gastos hotboat.csv',
+        'fechas': {'Fecha': FORMATO_FECHA_ISO},
+        'dtype': {'Monto': 'float64'},
+    },
+    'ingresos': {
+        'archivo': 'ingresos_totales.csv',
+        'fechas': {'fecha': FORMATO_FECHA_ISO},
+        'dtype': {'monto': 'float64', 'id_reserva': 'float64'},
+    },
+    'costos_operativos': {
+        'archivo': 'costos_operativos.csv',
+        'fechas': {'fecha': FORMATO_FECHA_ISO},
+        'dtype': {'monto': 'float64', 'id_reserva': 'float64'},
+    },
+    'gastos_marketing': {
+        'archivo': 'gastos_marketing.csv',
+        'fechas': {'fecha': FORMATO_FECHA_ISO},
+        'dtype': {'monto': 'float64'},
+    },
+}
+
+
+def cargar_tabla(especificacion, directorio=DIRECTORIO_OUTPUT):
+    """Lee una tabla según su especificación. Devuelve (DataFrame, bytes leídos, segundos)."""
+    ruta = os.path.join(directorio, especificacion['archivo'])
+    inicio = time.perf_counter()
+    tamano = os.path.getsize(ruta)
+
+    fechas = especificacion.get('fechas', {})
+    # Las fechas se leen como texto y se convierten con formato explícito
+    dtype = dict(especificacion.get('dtype', {}))
+    dtype.update({columna: 'string' for columna in fechas})
+
+    df = pd.read_csv(ruta, dtype=dtype)
+    for columna, formato in fechas.items():
+        df[columna] = pd.to_datetime(df[columna], format=formato)
+    for columna in especificacion.get('numericas', []):
+        df[columna] = pd.to_numeric(df[columna], errors='coerce')
+
+    return df, tamano, time.perf_counter() - inicio
+
+
+def cargar_tablas(especificaciones=None, directorio=DIRECTORIO_OUTPUT, paralelo=True, si_falta='error', max_hilos=None):
+    """Carga todas las tablas (en paralelo por defecto) e imprime tiempo y bytes por tabla.
+
+    si_falta='error' propaga FileNotFoundError; si_falta='vacio' deja un DataFrame vacío.
+    """
+    especificaciones = TABLAS_DASHBOARD if especificaciones is None else especificaciones
+    inicio = time.perf_counter()
+
+    def _cargar(clave):
+        try:
+            return clave, cargar_tabla(especificaciones[clave], directorio)
+        except FileNotFoundError:
+            if si_falta != 'vacio':
+                raise
+            print(f"❌ Archivo de {clave} no encontrado, creando DataFrame vacío")
+            return clave, (pd.DataFrame(), 0, 0.0)
+
+    claves = list(especificaciones)
+    if paralelo and len(claves) > 1:
+        with ThreadPoolExecutor(max_workers=max_hilos or len(claves), thread_name_prefix='carga-tablas') as pool:
+            resultados = dict(pool.map(_cargar, claves))
+    else:
+        resultados = dict(_cargar(clave) for clave in claves)
+
+    total = time.perf_counter() - inicio
+    tablas = {}
+    suma_segundos = 0.0
+    suma_bytes = 0
+    for clave in claves:
+        df, tamano, segundos = resultados[clave]
+        tablas[clave] = df
+        suma_segundos += segundos
+        suma_bytes += tamano
+        print(f"   📄 {clave:<18} {len(df):>7,} filas {tamano / 1024:>9.1f} KB {segundos:>7.3f}s")
+    print(f"✅ {len(claves)} tablas ({suma_bytes / 1024:,.1f} KB) cargadas en {total:.3f}s "
+          f"({'paralelo' if paralelo else 'secuencial'}; suma por tabla {suma_segundos:.3f}s)")
+    return tablas
@@ -150,27 +150,38 @@ def crear_selector_periodo():
         )
     ], style={'marginBottom': '20px', 'textAlign': 'center'})
 
-def crear_tarjetas_metricas():
-    """Crea las tarjetas de métricas del dashboard."""
+def crear_tarjetas_metricas(valores=None, estilos=None):
+    """Crea las tarjetas de métricas del dashboard.
+
+    `valores` y `estilos` (por id de tarjeta) permiten incrustar la vista inicial.
+    """
+    valores = valores or {}
+    estilos = estilos or {}
+    tarjetas = [
+        ('Total de Reservas', 'total-reservas', COLORS['primary']),
+        ('Total Ingresos', 'total-ingresos', COLORS['income']),
+        ('Total Gastos', 'total-gastos', COLORS['expense']),
+        ('Balance', 'balance', COLORS['income']),
+    ]
     return html.Div([
         html.Div([
-            html.H3('Total de Reservas', style={'color': COLORS['text'], 'marginBottom': '10px'}),
-            html.H2(id='total-reservas', style={'color': COLORS['primary'], 'fontSize': '2.5em', 'margin': '0'}),
-        ], style=CARD_STYLE),
-        html.Div([
-            html.H3('Total Ingresos', style={'color': COLORS['text'], 'marginBottom': '10px'}),
-            html.H2(id='total-ingresos', style={'color': COLORS['income'], 'fontSize': '2.5em', 'margin': '0'}),
-        ], style=CARD_STYLE),
-        html.Div([
-            html.H3('Total Gastos', style={'color': COLORS['text'], 'marginBottom': '10px'}),
-            html.H2(id='total-gastos', style={'color': COLORS['expense'], 'fontSize': '2.5em', 'margin': '0'}),
-        ], style=CARD_STYLE),
-        html.Div([
-            html.H3('Balance', style={'color': COLORS['text'], 'marginBottom': '10px'}),
-            html.H2(id='balance', style={'color': COLORS['income'], 'fontSize': '2.5em', 'margin': '0'}),
-        ], style=CARD_STYLE),
+            html.H3(titulo, style={'color': COLORS['text'], 'marginBottom': '10px'}),
+            html.H2(valores.get(id_tarjeta), id=id_tarjeta,
+                    style=estilos.get(id_tarjeta, {'color': color, 'fontSize': '2.5em', 'margin': '0'})),
+        ], style=CARD_STYLE)
+        for titulo, id_tarjeta, color in tarjetas
     ], style={'display': 'flex', 'justifyContent': 'center', 'marginBottom': '30px', 'flexWrap': 'wrap'})
 
+def crear_pagina_error(titulo_dashboard, error=None):
+    """Página que se muestra cuando los datos no se pudieron cargar (con la causa, si se conoce)."""
+    detalle = f"{type(error).__name__}: {error}" if error is not None else 'Revisa la consola para más detalles.'
+    return html.Div([
+        html.H1(f"⚠️ {titulo_dashboard}: no se pudieron cargar los datos", style={'color': COLORS['expense'], 'textAlign': 'center'}),
+        html.P(detalle, style={'color': COLORS['text'], 'textAlign': 'center'}),
+        html.P('Se reintentará la carga cuando cambien los archivos de datos; recarga la página en unos segundos.',
+               style={'color': COLORS['text'], 'textAlign': 'center'}),
+    ], style={'padding': 20, 'backgroundColor': COLORS['background'], 'minHeight': '100vh'})
+
 def crear_contenedor_grafico(id_grafico, titulo=None, figura=None):
     """Crea un contenedor para gráficos con estilo consistente."""
     contenido = []
@@ -178,7 +189,7 @@ def crear_contenedor_grafico(id_grafico, titulo=None, figura=None):
     if titulo:
         contenido.append(html.H2(titulo, style={'color': COLORS['text'], 'textAlign': 'center', 'marginBottom': '20px'}))
     
-    if figura:
+    if figura is not None:
         contenido.append(dcc.Graph(id=id_grafico, figure=figura))
     else:
         contenido.append(dcc.Graph(id=id_grafico))
@@ -191,11 +202,11 @@ def crear_contenedor_grafico(id_grafico, titulo=None, figura=None):
         'boxShadow': '0px 0px 10px rgba(255,255,255,0.1)'
     })
 
-def crear_contenedor_insights(id_insights, titulo="💡 Insights"):
-    """Crea un contenedor para mostrar insights."""
+def crear_contenedor_insights(id_insights, titulo="💡 Insights", contenido=None):
+    """Crea un contenedor para mostrar insights (`contenido` inicial opcional)."""
     return html.Div([
         html.H4(titulo, style={'color': COLORS['text'], 'marginBottom': '15px'}),
-        html.Ul(id=id_insights, style={
+        html.Ul(contenido, id=id_insights, style={
             'color': COLORS['text'],
             'fontSize': '14px',
             'lineHeight': '1.6',
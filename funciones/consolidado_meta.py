@@ -0,0 +1,191 @@
+import glob
+import json
+import os
+import threading
+
+import numpy as np
+import pandas as pd
+
+from funciones.meta_ads import (
+    COLUMNAS_CONTEO, DIRECTORIO_META, PREFIJO_EXPORT, VERSION_TABLA,
+    cargar_tabla_meta, clasificar_tabla, compactar_tabla, huella_archivo, memoria_mb,
+)
+
+# Consolidación de los exports de Meta.
+# La carpeta de marketing acumula descargas "por-dia" que se solapan: distintos
+# rangos de fechas, con y sin desglose por Región. Aquí se juntan todas en dos
+# tablas ordenadas:
+#   - 'regiones': filas (conjunto, anuncio, campaña, día, región) de los exports
+#     con Región;
+#   - 'diario': filas (conjunto, anuncio, campaña, día) sin región, de los
+#     exports sin Región y de la suma por región de los que sí la traen.
+# Ante una misma clave gana la fila del export con el 'Fin del informe' más
+# reciente (a igualdad, la descarga más nueva). Las tablas y un manifiesto con
+# los exports ya incorporados se guardan en disco; una descarga nueva solo
+# reescribe el tramo de fechas que cubre, el resto de la tabla no se toca.
+
+DIRECTORIO_CONSOLIDADO = os.environ.get('HOTBOAT_DIRECTORIO_META_CONSOLIDADO', os.path.join('archivos_output', 'meta_consolidado'))
+
+CLAVE_DIARIA = ['Nombre del conjunto de anuncios', 'Nombre del anuncio', 'Nombre de la campaña', 'Día']
+CLAVE_REGION = CLAVE_DIARIA + ['Región']
+
+ORDEN_DIARIO = ['Día', 'Nombre de la campaña', 'Nombre del conjunto de anuncios', 'Nombre del anuncio']
+ORDEN_REGION = ORDEN_DIARIO + ['Región']
+
+_lock_consolidacion = threading.Lock()
+
+
+def rutas_exports(directorio=DIRECTORIO_META):
+    """Exports por día de la carpeta, de la descarga más antigua a la más nueva."""
+    rutas = glob.glob(os.path.join(glob.escape(directorio), f'{glob.escape(PREFIJO_EXPORT)}*.csv'))
+    return sorted(rutas, key=lambda ruta: (os.path.getmtime(ruta), ruta))
+
+
+def _deduplicar(df, clave, orden):
+    """Una fila por clave: la de 'Fin del informe' más reciente (a igualdad, la última)."""
+    df = df.sort_values('Fin del informe', kind='mergesort', na_position='first')
+    df = df.drop_duplicates(subset=clave, keep='last')
+    return df.sort_values(orden, kind='mergesort', ignore_index=True)
+
+
+def _tramo(df, desde, hasta):
+    """Posiciones [inicio, fin) de las filas entre dos días en una tabla ordenada por Día."""
+    dias = df['Día'].to_numpy()
+    return (np.searchsorted(dias, np.datetime64(desde), side='left'),
+            np.searchsorted(dias, np.datetime64(hasta), side='right'))
+
+
+def _concatenar(partes):
+    """pd.concat sin los tramos vacíos (pandas avisa que cambiará los dtypes si se incluyen)."""
+    con_filas = [parte for parte in partes if not parte.empty]
+    if not con_filas:
+        return partes[0].iloc[0:0]
+    return pd.concat(con_filas, ignore_index=True)
+
+
+def _fusionar(existente, nuevas, clave, orden):
+    """Incorpora `nuevas` a `existente` (ordenada por Día) reescribiendo solo su tramo de fechas."""
+    if nuevas.empty:
+        return existente
+    if existente is None or existente.empty:
+        return _deduplicar(nuevas, clave, orden)
+
+    inicio, fin = _tramo(existente, nuevas['Día'].min(), nuevas['Día'].max())
+    tramo = _deduplicar(_concatenar([existente.iloc[inicio:fin], nuevas]), clave, orden)
+    return _concatenar([existente.iloc[:inicio], tramo, existente.iloc[fin:]])
+
+
+def sumar_regiones(df):
+    """Filas por (conjunto, anuncio, campaña, día) sumando las regiones; las tasas se recalculan."""
+    if df.empty:
+        return df.drop(columns=['Región'], errors='ignore')
+    conteos = [columna for columna in COLUMNAS_CONTEO if columna in df.columns]
+    # Clics (todos) no viene en el export, pero se recupera del CTR de cada fila
+    df = df.assign(_clics_todos=df['CTR (todos)'].fillna(0) * df['Impresiones'] / 100)
+    agregaciones = {columna: 'sum' for columna in conteos + ['_clics_todos']}
+    agregaciones['Fin del informe'] = 'max'
+    suma = df.groupby(CLAVE_DIARIA, observed=True, sort=False, dropna=False).agg(agregaciones).reset_index()
+
+    def _razon(numerador, denominador, factor=1):
+        return numerador / denominador.where(denominador > 0) * factor
+
+    suma['Frecuencia'] = _razon(suma['Impresiones'], suma['Alcance'])
+    suma['CTR (todos)'] = _razon(suma['_clics_todos'], suma['Impresiones'], 100)
+    suma['CPC (todos)'] = _razon(suma['Importe gastado (CLP)'], suma['_clics_todos'])
+    suma['CPM (costo por mil impresiones)'] = _razon(suma['Importe gastado (CLP)'], suma['Impresiones'], 1000)
+    suma['Costo por artículo agregado al carrito'] = _razon(suma['Importe gastado (CLP)'], suma['Artículos agregados al carrito'])
+    return clasificar_tabla(compactar_tabla(suma.drop(columns=['_clics_todos'])))
+
+
+def _incorporar(tablas, df):
+    """Agrega la tabla canónica de un export a las tablas consolidadas."""
+    if 'Región' in df.columns:
+        regiones = _fusionar(tablas['regiones'], df, CLAVE_REGION, ORDEN_REGION)
+        # La suma por región se rehace sobre el tramo ya fusionado: incluye regiones de exports anteriores
+        inicio, fin = _tramo(regiones, df['Día'].min(), df['Día'].max())
+        tablas['regiones'] = regiones
+        nuevas = sumar_regiones(regiones.iloc[inicio:fin])
+    else:
+        nuevas = df
+    tablas['diario'] = _fusionar(tablas['diario'], nuevas, CLAVE_DIARIA, ORDEN_DIARIO)
+
+
+def _rutas_salida(directorio):
+    return {nombre: os.path.join(directorio, f'{nombre}.pkl') for nombre in ('regiones', 'diario')}, \
+        os.path.join(directorio, 'manifiesto.json')
+
+
+def _leer_consolidado(directorio):
+    """(tablas, huellas incorporadas) desde disco, o (None, []) si no hay o son de otra versión."""
+    rutas, ruta_manifiesto = _rutas_salida(directorio)
+    try:
+        with open(ruta_manifiesto, encoding='utf-8') as archivo:
+            manifiesto = json.load(archivo)
+        if manifiesto.get('version') != VERSION_TABLA:
+            return None, []
+        tablas = {nombre: pd.read_pickle(ruta) for nombre, ruta in rutas.items()}
+        return tablas, manifiesto.get('exportes', [])
+    except FileNotFoundError:
+        return None, []
+    except Exception as e:
+        print(f"⚠️ Consolidado de Meta ilegible, se reconstruye: {e}")
+        return None, []
+
+
+def _guardar_consolidado(directorio, tablas, huellas):
+    """Escritura atómica de las tablas y del manifiesto (el manifiesto al final)."""
+    rutas, ruta_manifiesto = _rutas_salida(directorio)
+    sufijo = f'.{os.getpid()}.{threading.get_ident()}.tmp'
+    try:
+        os.makedirs(directorio, exist_ok=True)
+        for nombre, ruta in rutas.items():
+            tablas[nombre].to_pickle(ruta + sufijo)
+            os.replace(ruta + sufijo, ruta)
+        with open(ruta_manifiesto + sufijo, 'w', encoding='utf-8') as archivo:
+            json.dump({'version': VERSION_TABLA, 'exportes': huellas}, archivo, indent=2)
+        os.replace(ruta_manifiesto + sufijo, ruta_manifiesto)
+    except OSError as e:
+        print(f"⚠️ No se pudo guardar el consolidado de Meta: {e}")
+
+
+def consolidar_meta(directorio=DIRECTORIO_META, directorio_salida=DIRECTORIO_CONSOLIDADO):
+    """Tablas consolidadas {'regiones', 'diario'} de todos los exports de la carpeta.
+
+    Solo se procesan los exports que no estaban en el consolidado guardado; si
+    falta alguno de los ya incorporados (se borró o cambió) se reconstruye todo.
+    """
+    with _lock_consolidacion:
+        rutas = rutas_exports(directorio)
+        if not rutas:
+            raise FileNotFoundError(f"No hay exports de Meta en {directorio}")
+        huellas = {ruta: huella_archivo(ruta) for ruta in rutas}
+
+        tablas, incorporadas = _leer_consolidado(directorio_salida)
+        if tablas is None or not set(incorporadas) <= set(huellas.values()):
+            tablas = {'regiones': None, 'diario': None}
+            incorporadas = []
+
+        pendientes = [ruta for ruta in rutas if huellas[ruta] not in incorporadas]
+        for ruta in pendientes:
+            df = cargar_tabla_meta(ruta)
+            if df.empty or 'Día' not in df.columns:
+                print(f"⚠️ Export sin filas diarias, se omite: {os.path.basename(ruta)}")
+            else:
+                _incorporar(tablas, df)
+                print(f"🔗 Export incorporado al consolidado: {os.path.basename(ruta)} "
+                      f"({df['Día'].min():%Y-%m-%d} a {df['Día'].max():%Y-%m-%d})")
+            incorporadas.append(huellas[ruta])
+
+        for nombre in tablas:
+            if tablas[nombre] is None:
+                tablas[nombre] = pd.DataFrame(columns=ORDEN_REGION if nombre == 'regiones' else ORDEN_DIARIO)
+        if pendientes:
+            # Al concatenar exports con categorías distintas se pierden los tipos compactos
+            for tabla in tablas.values():
+                if not tabla.empty:
+                    clasificar_tabla(compactar_tabla(tabla))
+            _guardar_consolidado(directorio_salida, tablas, incorporadas)
+        print(f"📦 Meta consolidado: {len(tablas['regiones'])} filas por región, {len(tablas['diario'])} filas diarias "
+              f"({sum(memoria_mb(t) for t in tablas.values()):.2f} MB en vez de "
+              f"{sum(memoria_mb(t, compacta=False) for t in tablas.values()):.2f} MB)")
+        return tablas
@@ -0,0 +1,71 @@
+import pandas as pd
+
+from funciones.calendario import agrupar_por_periodo
+from funciones.serie_diaria import agregado_diario, serie_desde_agregado
+
+# Contexto de análisis de un callback.
+# Los gráficos temporales y los insights de un mismo callback agrupan las mismas
+# tablas filtradas por las mismas fechas. El contexto recorre cada serie una
+# sola vez (suma y conteo por día) y de ese agregado diario salen tanto la serie
+# del Store como los agrupados por semana o mes que usan los insights: reagrupar
+# unos cientos de días es mucho más barato que volver a agrupar todas las filas.
+# Un contexto vive lo que dura un callback; no se comparte entre peticiones.
+
+
+class ContextoAnalisis:
+    """Tablas filtradas de un callback y sus agregados, calculados una vez por serie.
+
+    `tablas` es {nombre: (df_filtrado, columna_fecha)}.
+    """
+
+    def __init__(self, tablas):
+        self.tablas = dict(tablas)
+        self._diarios = {}
+        self._periodos = {}
+
+    def tabla(self, nombre):
+        return self.tablas[nombre][0]
+
+    def diario(self, nombre, columna_valor=None):
+        """Suma y conteo por día de `columna_valor` (o de filas) en la tabla `nombre`."""
+        clave = (nombre, columna_valor)
+        if clave not in self._diarios:
+            df, columna_fecha = self.tablas[nombre]
+            self._diarios[clave] = agregado_diario(df, columna_fecha, columna_valor)
+        return self._diarios[clave]
+
+    def agrupado(self, nombre, periodo, columna_valor=None):
+        """Suma y conteo por periodo, indexados por fecha_grupo, derivados del agregado diario."""
+        clave = (nombre, columna_valor, periodo)
+        if clave not in self._periodos:
+            diario = self.diario(nombre, columna_valor)
+            if periodo == 'D' or diario.empty:
+                agrupado = diario
+            else:
+                dias = pd.DataFrame({'fecha': diario.index})
+                grupo, _ = agrupar_por_periodo(dias, 'fecha', periodo)
+                agrupado = diario.groupby(grupo.to_numpy()).sum()
+            self._periodos[clave] = agrupado.rename_axis('fecha_grupo')
+        return self._periodos[clave]
+
+    def etiquetas(self, nombre, periodo, columna_valor=None):
+        """Etiquetas del calendario ('Semana del ...', 'Enero 2024') alineadas con agrupado()."""
+        agrupado = self.agrupado(nombre, periodo, columna_valor)
+        _, etiqueta = agrupar_por_periodo(pd.DataFrame({'fecha': agrupado.index}), 'fecha', periodo)
+        return etiqueta.to_numpy()
+
+    def promedio(self, nombre, periodo, columna_valor):
+        """Promedio de `columna_valor` por periodo (suma / conteo de valores no nulos)."""
+        agrupado = self.agrupado(nombre, periodo, columna_valor)
+        return agrupado['suma'] / agrupado['conteo'].where(agrupado['conteo'] > 0)
+
+    def serie(self, nombre, columna_valor=None, agregacion='sum', categoria=None):
+        """Entrada de 'trazas' del Store (ver funciones/serie_diaria.py) para la tabla `nombre`."""
+        return serie_desde_agregado(self.diario(nombre, columna_valor), agregacion, categoria)
+
+
+def contexto_de(contexto, nombre, df, columna_fecha):
+    """Devuelve `contexto`, o uno nuevo con la sola tabla `nombre` si no se entregó."""
+    if contexto is None or nombre not in contexto.tablas:
+        return ContextoAnalisis({nombre: (df, columna_fecha)})
+    return contexto
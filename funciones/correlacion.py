@@ -0,0 +1,128 @@
+import os
+
+import numpy as np
+import pandas as pd
+
+from funciones.atribucion import gasto_diario
+
+# Correlación rezagada entre gasto en marketing e ingresos/reservas.
+# Para cada serie de gasto (por plataforma y total) y cada objetivo (ingresos
+# por día, reservas creadas por día) se calcula corr(gasto_t, objetivo_t+k)
+# para k = 0..MAX_REZAGO días en una sola pasada FFT. Las bandas de confianza
+# salen de un bootstrap de desplazamientos circulares del objetivo: conserva la
+# autocorrelación de cada serie pero rompe la relación entre ambas, así que una
+# correlación fuera de la banda no se explica por azar. Se prefieren
+# desplazamientos lejos de 0 (no reproducen la relación real); en rangos cortos
+# se usan todos los de 1..n-1 y, si ni así hay MIN_DESPLAZAMIENTOS distintos, la
+# banda queda en NaN. Todos los remuestreos van en un mismo lote de FFT.
+
+MAX_REZAGO = int(os.environ.get('HOTBOAT_MAX_REZAGO_CORRELACION', '30'))
+N_BOOTSTRAP = int(os.environ.get('HOTBOAT_BOOTSTRAP_CORRELACION', '500'))
+NIVEL_BANDA = 0.95
+# Desplazamientos distintos mínimos para estimar la banda; con menos, la correlación va sin banda
+MIN_DESPLAZAMIENTOS = 20
+
+GASTO_TOTAL = 'Gasto total'
+OBJETIVOS = ['Ingresos', 'Reservas']
+
+
+def series_diarias(gastos_marketing, ingresos, reservas):
+    """Tabla diaria continua: gasto por plataforma, 'Gasto total', 'Ingresos' y 'Reservas' (creadas)."""
+    gasto = gasto_diario(gastos_marketing, 'fecha', 'monto', 'plataforma')
+    gasto[GASTO_TOTAL] = gasto.sum(axis=1)
+    objetivos = {}
+    if ingresos is not None and not ingresos.empty:
+        objetivos['Ingresos'] = ingresos.groupby(ingresos['fecha'].dt.normalize())['monto'].sum()
+    if reservas is not None and not reservas.empty:
+        objetivos['Reservas'] = reservas.groupby(reservas['fecha_creacion_reserva'].dt.normalize()).size()
+    diaria = pd.concat([gasto, pd.DataFrame(objetivos)], axis=1)
+    if diaria.empty:
+        return diaria
+    return diaria.sort_index().asfreq('D').fillna(0)
+
+
+def _estandarizar(matriz):
+    """Centra y escala cada fila (último eje); filas constantes quedan en cero."""
+    centrada = matriz - matriz.mean(axis=-1, keepdims=True)
+    desviacion = centrada.std(axis=-1, keepdims=True)
+    return np.divide(centrada, desviacion, out=np.zeros_like(centrada), where=desviacion > 0)
+
+
+def correlacion_cruzada(x, y, max_rezago):
+    """corr(x_t, y_t+k) para k = 0..max_rezago vía FFT; x e y de forma (..., n) admiten lotes."""
+    n = x.shape[-1]
+    largo = 1 << int(np.ceil(np.log2(2 * n)))
+    espectro_x = np.fft.rfft(_estandarizar(x), largo)
+    espectro_y = np.fft.rfft(_estandarizar(y), largo)
+    cruzada = np.fft.irfft(np.conj(espectro_x) * espectro_y, largo)
+    return cruzada[..., :max_rezago + 1] / n
+
+
+def _desplazamientos_candidatos(n, max_rezago):
+    """Desplazamientos circulares para el bootstrap: lejos de 0 si alcanzan, si no todos los de 1..n-1."""
+    lejanos = np.arange(max_rezago + 1, n - max_rezago)
+    if len(lejanos) >= MIN_DESPLAZAMIENTOS:
+        return lejanos
+    return np.arange(1, n)
+
+
+def correlacion_rezagada(diaria, desde=None, hasta=None, max_rezago=MAX_REZAGO, n_bootstrap=N_BOOTSTRAP, semilla=0):
+    """Correlación por rezago de cada gasto contra cada objetivo en el rango, con bandas bootstrap.
+
+    Devuelve un DataFrame largo: Gasto, Objetivo, Rezago (días), Correlación, Banda inferior, Banda superior
+    (bandas en NaN si el rango es demasiado corto para estimarlas).
+    """
+    columnas = ['Gasto', 'Objetivo', 'Rezago', 'Correlación', 'Banda inferior', 'Banda superior']
+    tramo = diaria.loc[desde:hasta] if not diaria.empty else diaria
+    objetivos = [objetivo for objetivo in OBJETIVOS if objetivo in tramo.columns]
+    gastos = [columna for columna in tramo.columns if columna not in OBJETIVOS]
+    n = len(tramo)
+    max_rezago = min(max_rezago, n // 2)
+    if n < 3 or not objetivos or not gastos:
+        return pd.DataFrame(columns=columnas)
+
+    x = tramo[gastos].to_numpy(dtype='float64').T          # (gastos, n)
+    y = tramo[objetivos].to_numpy(dtype='float64').T       # (objetivos, n)
+    rezagos = np.arange(max_rezago + 1)
+    correlaciones = correlacion_cruzada(x[:, None, :], y[None, :, :], max_rezago)  # (gastos, objetivos, rezagos)
+
+    forma = correlaciones.shape
+    candidatos = _desplazamientos_candidatos(n, max_rezago)
+    if len(candidatos) < MIN_DESPLAZAMIENTOS:
+        inferior = superior = np.full(forma, np.nan)
+    else:
+        # Desplazamientos circulares del objetivo
+        generador = np.random.default_rng(semilla)
+        desplazamientos = generador.choice(candidatos, size=n_bootstrap)
+        indices = (np.arange(n)[None, :] + desplazamientos[:, None]) % n
+        nulas = correlacion_cruzada(x[:, None, None, :], y[None, :, indices], max_rezago)  # (gastos, objetivos, bootstrap, rezagos)
+        alfa = (1 - NIVEL_BANDA) / 2
+        inferior, superior = np.quantile(nulas, [alfa, 1 - alfa], axis=2)
+
+    return pd.DataFrame({
+        'Gasto': np.repeat(gastos, forma[1] * forma[2]),
+        'Objetivo': np.tile(np.repeat(objetivos, forma[2]), forma[0]),
+        'Rezago': np.tile(rezagos, forma[0] * forma[1]),
+        'Correlación': correlaciones.ravel(),
+        'Banda inferior': inferior.ravel(),
+        'Banda superior': superior.ravel(),
+    }, columns=columnas)
+
+
+def generar_insights_correlacion(df_correlacion):
+    """Rezago con mayor correlación por gasto y objetivo, indicando si supera la banda del azar."""
+    if df_correlacion.empty:
+        return ["ℹ️ Se necesitan al menos 3 días con gasto e ingresos para calcular la correlación"]
+
+    insights = []
+    mejores = df_correlacion.loc[df_correlacion.groupby(['Gasto', 'Objetivo'], sort=False)['Correlación'].idxmax()]
+    for _, fila in mejores.iterrows():
+        significativa = fila['Correlación'] > fila['Banda superior']
+        icono = "✅" if significativa else "➖"
+        if pd.isna(fila['Banda superior']):
+            detalle = "rango demasiado corto para estimar la banda del azar"
+        else:
+            detalle = "sobre la banda del azar" if significativa else "dentro de la banda del azar"
+        insights.append(f"{icono} {fila['Gasto']} → {fila['Objetivo']}: máxima correlación {fila['Correlación']:.2f} "
+                        f"con {fila['Rezago']} días de rezago ({detalle})")
+    return insights
@@ -0,0 +1,164 @@
+import numpy as np
+import pandas as pd
+
+# Cubo de embudo de Meta Ads.
+# CTR, CPC, conversión y hook rates son razones: el valor de un grupo (un tipo
+# de anuncio, una región, una semana) es suma del numerador / suma del
+# denominador, no el promedio de las razones de cada fila. El cubo guarda solo
+# medidas aditivas (impresiones, clics, gasto, carritos, reproducciones) al
+# grano (día, conjunto, anuncio, público, región); cualquier razón se deriva
+# sumando el cubo por las dimensiones pedidas y dividiendo, en O(grupos).
+# Todos los gráficos e insights de marketing leen de un mismo cubo.
+
+# Medidas aditivas. 'Clics (todos)' no viene en el export: se recupera del CTR (todos) de cada fila
+MEDIDAS = [
+    'Impresiones', 'Clics en el enlace', 'Clics (todos)', 'Importe gastado (CLP)',
+    'Artículos agregados al carrito', 'Reproducciones de video de 3 segundos',
+    'Reproducciones de video hasta el 25%', 'Reproducciones de video hasta el 50%',
+    'Reproducciones de video hasta el 75%', 'Reproducciones de video hasta el 100%',
+]
+
+# Dimensiones del grano; las clasificaciones dependen de los nombres y no agregan grupos
+DIMENSIONES = [
+    'Día', 'Nombre del conjunto de anuncios', 'Nombre del anuncio',
+    'Público', 'Público detallado', 'Tipo de Anuncio', 'Región',
+]
+
+# Razón: (numerador, denominador, factor)
+RAZONES = {
+    'CTR (%)': ('Clics en el enlace', 'Impresiones', 100),
+    'CTR (todos)': ('Clics (todos)', 'Impresiones', 100),
+    'CPC (CLP)': ('Importe gastado (CLP)', 'Clics en el enlace', 1),
+    'CPC (todos)': ('Importe gastado (CLP)', 'Clics (todos)', 1),
+    'CPM (CLP)': ('Importe gastado (CLP)', 'Impresiones', 1000),
+    'Conversión (%)': ('Artículos agregados al carrito', 'Clics en el enlace', 100),
+    'Costo por Conversión (CLP)': ('Importe gastado (CLP)', 'Artículos agregados al carrito', 1),
+    'Hook Rate 3s (%)': ('Reproducciones de video de 3 segundos', 'Impresiones', 100),
+    'Hook Rate 25% (%)': ('Reproducciones de video hasta el 25%', 'Impresiones', 100),
+    'Hook Rate 50% (%)': ('Reproducciones de video hasta el 50%', 'Impresiones', 100),
+    'Hook Rate 75% (%)': ('Reproducciones de video hasta el 75%', 'Impresiones', 100),
+    'Hook Rate 100% (%)': ('Reproducciones de video hasta el 100%', 'Impresiones', 100),
+}
+
+HOOK_RATES = ['Hook Rate 3s (%)', 'Hook Rate 25% (%)', 'Hook Rate 50% (%)', 'Hook Rate 75% (%)', 'Hook Rate 100% (%)']
+
+# Razones de embudo que muestran casi todas las vistas
+RAZONES_EMBUDO = ['CTR (%)', 'CPC (CLP)', 'Conversión (%)', 'Costo por Conversión (CLP)']
+
+
+def derivar(sumas, razones):
+    """Agrega a `sumas` (DataFrame o Series de medidas sumadas) las razones pedidas; 0 si el denominador es 0."""
+    for nombre in razones:
+        numerador, denominador, factor = RAZONES[nombre]
+        base = sumas[denominador]
+        if isinstance(sumas, pd.DataFrame):
+            sumas[nombre] = (sumas[numerador] / base.where(base > 0) * factor).fillna(0)
+        else:
+            sumas[nombre] = sumas[numerador] / base * factor if base > 0 else 0
+    return sumas
+
+
+class CuboMeta:
+    """Sumas aditivas de Meta Ads al grano (día, conjunto, anuncio, público, región)."""
+
+    def __init__(self, celdas):
+        # `celdas` ya agregadas y ordenadas por Día; usar CuboMeta.desde_hechos() para construirlo
+        self.celdas = celdas
+
+    @classmethod
+    def desde_hechos(cls, df):
+        """Agrega la tabla de hechos de Meta (funciones/meta_ads.py) al grano del cubo."""
+        df = df[df['Día'].notna()]
+        df = df.assign(**{'Clics (todos)': df['CTR (todos)'].fillna(0) * df['Impresiones'] / 100})
+        dimensiones = [dimension for dimension in DIMENSIONES if dimension in df.columns]
+        medidas = [medida for medida in MEDIDAS if medida in df.columns]
+        celdas = df.groupby(dimensiones, observed=True, sort=True, dropna=False)[medidas].sum().reset_index()
+        return cls(celdas)
+
+    @property
+    def vacio(self):
+        return self.celdas.empty
+
+    def filtrar(self, desde=None, hasta=None, **iguales):
+        """Subcubo entre dos días (inclusive) y con dimensión == valor para cada filtro dado."""
+        celdas = self.celdas
+        if desde is not None or hasta is not None:
+            dias = celdas['Día'].to_numpy()
+            inicio = 0 if desde is None else np.searchsorted(dias, np.datetime64(pd.Timestamp(desde)), side='left')
+            fin = len(dias) if hasta is None else np.searchsorted(dias, np.datetime64(pd.Timestamp(hasta)), side='right')
+            celdas = celdas.iloc[inicio:fin]
+        for dimension, valor in iguales.items():
+            if valor is not None:
+                celdas = celdas[celdas[dimension] == valor]
+        return CuboMeta(celdas)
+
+    def resumen(self, por, razones=()):
+        """Sumas por `por` (dimensión o lista) con las razones pedidas, una fila por grupo."""
+        sumas = self.celdas.groupby(por, observed=True)[self._medidas()].sum().reset_index()
+        return derivar(sumas, razones)
+
+    def total(self, razones=()):
+        """Sumas de todo el cubo (Series) con las razones pedidas."""
+        return derivar(self.celdas[self._medidas()].sum(), razones)
+
+    def valores(self, por, metrica):
+        """Resumen por `por` con la columna 'valor' = medida o razón `metrica`."""
+        resumen = self.resumen(por, [metrica] if metrica in RAZONES else [])
+        resumen['valor'] = resumen[metrica]
+        return resumen
+
+    def _medidas(self):
+        return [medida for medida in MEDIDAS if medida in self.celdas.columns]
+
+
+class MatrizRegional:
+    """Sumas diarias (día × región × medida) con sumas acumuladas por día.
+
+    La vista regional cambia de métrica o de rango sin reagrupar filas: las
+    sumas de un rango son acumulada[fin] - acumulada[inicio] (O(regiones ×
+    medidas)) y la métrica elegida se deriva de esas sumas con `derivar`.
+    """
+
+    def __init__(self, dias, regiones, medidas, acumulada):
+        self.dias = dias
+        self.regiones = regiones
+        self.medidas = medidas
+        # acumulada[i] = sumas de los días [0, i); la última medida cuenta las celdas del cubo
+        self.acumulada = acumulada
+
+    @classmethod
+    def desde_cubo(cls, cubo):
+        """Matriz densa a partir de las celdas con región de un CuboMeta."""
+        celdas = cubo.celdas
+        medidas = cubo._medidas()
+        if 'Región' in celdas.columns:
+            celdas = celdas[celdas['Región'].notna()]
+        if celdas.empty or 'Región' not in celdas.columns:
+            return cls(np.array([], dtype='datetime64[ns]'), np.array([], dtype=object), medidas,
+                       np.zeros((1, 0, len(medidas) + 1)))
+
+        sumas = celdas.assign(_celdas=1).groupby(['Día', 'Región'], observed=True)[medidas + ['_celdas']].sum()
+        dias, posicion_dia = np.unique(sumas.index.get_level_values('Día').to_numpy(), return_inverse=True)
+        posicion_region, regiones = pd.factorize(sumas.index.get_level_values('Región'), sort=True)
+
+        matriz = np.zeros((len(dias), len(regiones), len(medidas) + 1))
+        matriz[posicion_dia, posicion_region] = sumas.to_numpy(dtype='float64')
+        acumulada = np.zeros((len(dias) + 1, len(regiones), len(medidas) + 1))
+        np.cumsum(matriz, axis=0, out=acumulada[1:])
+        return cls(dias, np.asarray(regiones), medidas, acumulada)
+
+    def sumar(self, desde=None, hasta=None):
+        """Sumas por región entre dos días (inclusive); solo regiones con datos en el rango."""
+        inicio = 0 if desde is None else np.searchsorted(self.dias, np.datetime64(pd.Timestamp(desde)), side='left')
+        fin = len(self.dias) if hasta is None else np.searchsorted(self.dias, np.datetime64(pd.Timestamp(hasta)), side='right')
+        sumas = self.acumulada[fin] - self.acumulada[inicio]
+        con_datos = sumas[:, -1] > 0
+        df = pd.DataFrame(sumas[con_datos, :-1], columns=self.medidas)
+        df.insert(0, 'Región', self.regiones[con_datos])
+        return df
+
+    def valores(self, metrica, desde=None, hasta=None):
+        """Sumas por región en el rango con la columna 'valor' = medida o razón `metrica`."""
+        df = derivar(self.sumar(desde, hasta), [metrica] if metrica in RAZONES else [])
+        df['valor'] = df[metrica]
+        return df
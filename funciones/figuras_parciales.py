@@ -0,0 +1,56 @@
+from dash import Patch
+
+from funciones.payload import compactar_serie
+
+# Actualizaciones parciales de figuras.
+# Cada gráfico se separa en una figura base (layout, estilos, hovertemplates y
+# trazas vacías), que viaja una sola vez con el layout de la página, y una
+# "serie": el dict con lo que cambia al filtrar (x/y de cada traza, título y
+# ticks del eje). Los callbacks responden con un Patch construido desde la
+# serie, de modo que el payload queda del tamaño de los datos que cambiaron.
+#
+# Formato de la serie:
+#   {'titulo': str | None,
+#    'trazas': [{'x': ..., 'y': ...}, ...],   # una entrada por traza de la figura base, en orden
+#    'ejes': {'xaxis': {'tickvals': ..., 'ticktext': ...}},   # opcional
+#    'layout': {'annotations': [...]}}                       # opcional, propiedades de primer nivel
+# Antes de aplicarse, la serie pasa por compactar_serie (funciones/payload.py):
+# fechas como milisegundos y valores numéricos redondeados.
+
+
+def ticks_periodo(periodo, tickvals=None, ticktext=None):
+    """Propiedades del eje x: ticks explícitos para semana/mes y automáticos por día."""
+    if periodo in ('W', 'M') and tickvals is not None and len(tickvals) > 0:
+        return {'tickvals': tickvals, 'ticktext': ticktext}
+    return {'tickvals': None, 'ticktext': None}
+
+
+def aplicar_serie(fig, serie):
+    """Vuelca una serie sobre la figura base y devuelve la figura completa."""
+    serie = compactar_serie(serie)
+    for traza, propiedades in zip(fig.data, serie['trazas']):
+        traza.update(propiedades)
+    if serie.get('titulo') is not None:
+        fig.update_layout(title_text=serie['titulo'])
+    for eje, propiedades in serie.get('ejes', {}).items():
+        fig.update_layout({eje: propiedades})
+    if serie.get('layout'):
+        fig.update_layout(serie['layout'])
+    return fig
+
+
+def parche_figura(serie):
+    """Construye el Patch equivalente a aplicar_serie: solo datos de trazas, título y ticks."""
+    serie = compactar_serie(serie)
+    parche = Patch()
+    for indice, propiedades in enumerate(serie['trazas']):
+        for propiedad, valor in propiedades.items():
+            parche['data'][indice][propiedad] = valor
+    if serie.get('titulo') is not None:
+        parche['layout']['title']['text'] = serie['titulo']
+    for eje, propiedades in serie.get('ejes', {}).items():
+        for propiedad, valor in propiedades.items():
+            parche['layout'][eje][propiedad] = valor
+    for propiedad, valor in serie.get('layout', {}).items():
+        parche['layout'][propiedad] = valor
+    return parche
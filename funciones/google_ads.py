@@ -0,0 +1,199 @@
+import csv
+import glob
+import io
+import os
+import re
+import zipfile
+
+import pandas as pd
+
+# Carga de los exports de Google Ads ("Tarjetas de descripción general").
+# Los CSV se leen directo desde los .zip descargados, sin extraerlos. Cada
+# reporte se reconoce por su encabezado (no por el nombre del archivo, que
+# trae el rango de fechas) y los números y las etiquetas de semana en español
+# ("Semana de 10 mar 2025") se convierten columna a columna, sin recorrer
+# celdas. Si hay varios zips (descargas de distintos periodos) se juntan en
+# tablas continuas: las series por semana se deduplican (gana la descarga más
+# nueva) y los reportes agregados suman los periodos que no se solapan.
+
+DIRECTORIO_GOOGLE_ADS = os.environ.get(
+    'HOTBOAT_DIRECTORIO_GOOGLE_ADS', os.path.join('archivos_input', 'archivos input marketing', 'google ads'))
+
+# Reglas de reconocimiento (clave, columnas que deben estar en el encabezado).
+# Se aplican en orden y gana la primera que coincide: los reportes más
+# específicos van antes porque también traen columnas de campaña.
+REPORTES_GOOGLE_ADS = [
+    ('dia_hora', {'Día', 'Hora de inicio'}),
+    ('demograficos', {'Rango de edades', 'Género'}),
+    ('series_temporales', {'Semana'}),
+    ('palabras_clave', {'Palabra clave de la Búsqueda'}),
+    ('dispositivos', {'Dispositivo'}),
+    ('grupos_anuncios', {'Grupo de anuncios'}),
+    ('grupos_anuncios', {'Nombre del grupo de anuncios'}),
+    ('campañas', {'Nombre de la campaña'}),
+]
+
+COLUMNAS_MONETARIAS = ['Costo', 'CPC prom.']
+COLUMNAS_CONTEO = ['Clics', 'Impresiones']
+# Tasas que se recalculan desde los totales al sumar periodos: columna -> (numerador, denominador, factor)
+COLUMNAS_TASA = {
+    'CPC prom.': ('Costo', 'Clics', 1),
+    'CTR': ('Clics', 'Impresiones', 100),
+}
+
+# Líneas del comienzo del CSV donde se busca el encabezado (antes pueden venir título y rango de fechas)
+LINEAS_PREAMBULO = 5
+
+MESES_ABREVIADOS = {
+    'ene': 1, 'feb': 2, 'mar': 3, 'abr': 4, 'may': 5, 'jun': 6,
+    'jul': 7, 'ago': 8, 'sep': 9, 'set': 9, 'oct': 10, 'nov': 11, 'dic': 12,
+}
+
+_PATRON_SEMANA = r'(?P<dia>\d{1,2})\s+(?:de\s+)?(?P<mes>[a-záéíóú]{3})[a-záéíóú]*\.?\s+(?:de\s+)?(?P<anio>\d{4})'
+_PATRON_PERIODO = re.compile(r'(\d{4})[.-](\d{2})[.-](\d{2})\s*-\s*(\d{4})[.-](\d{2})[.-](\d{2})')
+
+
+def parsear_semanas(serie):
+    """Fechas desde etiquetas 'Semana de 10 mar 2025' (o fechas ISO), vectorizado; NaT si no se reconoce."""
+    texto = serie.astype('string').str.strip().str.lower()
+    partes = texto.str.extract(_PATRON_SEMANA)
+    componentes = pd.DataFrame({
+        'year': pd.to_numeric(partes['anio']).astype('float64'),
+        'month': partes['mes'].map(MESES_ABREVIADOS).astype('float64'),
+        'day': pd.to_numeric(partes['dia']).astype('float64'),
+    })
+    fechas = pd.to_datetime(componentes, errors='coerce')
+    sin_etiqueta = fechas.isna() & texto.notna()
+    if sin_etiqueta.any():
+        fechas[sin_etiqueta] = pd.to_datetime(texto[sin_etiqueta], errors='coerce', format='ISO8601')
+    return fechas
+
+
+def limpiar_numeros(serie):
+    """Montos y conteos ('CLP1,234', '1,234', '--') a float; lo que no es número queda en 0."""
+    if pd.api.types.is_numeric_dtype(serie):
+        return serie.astype('float64').fillna(0)
+    texto = serie.astype('string').str.replace(r'[^0-9.\-]', '', regex=True)
+    return pd.to_numeric(texto, errors='coerce').fillna(0).astype('float64')
+
+
+def reconocer_reporte(columnas):
+    """Clave del reporte según las columnas del encabezado, o None si no es un reporte conocido."""
+    columnas = {columna.strip() for columna in columnas}
+    for clave, requeridas in REPORTES_GOOGLE_ADS:
+        if requeridas <= columnas:
+            return clave
+    return None
+
+
+def _encabezado(lineas):
+    """(fila del encabezado, clave del reporte) dentro de las primeras líneas del CSV."""
+    for fila, campos in enumerate(csv.reader(lineas)):
+        clave = reconocer_reporte(campos)
+        if clave is not None:
+            return fila, clave
+    return None, None
+
+
+def periodo_export(nombre):
+    """(inicio, fin) del rango de fechas que Google pone en el nombre del archivo, o (None, None)."""
+    coincidencia = _PATRON_PERIODO.search(nombre)
+    if coincidencia is None:
+        return None, None
+    valores = [int(valor) for valor in coincidencia.groups()]
+    return pd.Timestamp(*valores[:3]), pd.Timestamp(*valores[3:])
+
+
+def leer_reporte(contenido):
+    """(clave, DataFrame limpio) de un CSV de Google Ads en bytes; (None, None) si no se reconoce."""
+    texto = contenido.decode('utf-8-sig', errors='replace')
+    fila, clave = _encabezado(texto.splitlines()[:LINEAS_PREAMBULO])
+    if clave is None:
+        return None, None
+
+    df = pd.read_csv(io.StringIO(texto), skiprows=fila, dtype='string')
+    df.columns = [columna.strip() for columna in df.columns]
+    for columna in COLUMNAS_MONETARIAS + COLUMNAS_CONTEO:
+        if columna in df.columns:
+            df[columna] = limpiar_numeros(df[columna])
+    if 'Semana' in df.columns:
+        df['Semana'] = parsear_semanas(df['Semana'])
+        df = df.dropna(subset=['Semana'])
+    return clave, df
+
+
+def rutas_zip(directorio=DIRECTORIO_GOOGLE_ADS):
+    """Zips de Google Ads de la carpeta, de la descarga más antigua a la más nueva."""
+    rutas = glob.glob(os.path.join(glob.escape(directorio), '*.zip'))
+    return sorted(rutas, key=lambda ruta: (os.path.getmtime(ruta), ruta))
+
+
+def leer_zip(ruta):
+    """Reportes reconocidos de un zip: lista de (clave, nombre del CSV, DataFrame)."""
+    reportes = []
+    with zipfile.ZipFile(ruta) as archivo_zip:
+        for nombre in archivo_zip.namelist():
+            if not nombre.lower().endswith('.csv'):
+                continue
+            clave, df = leer_reporte(archivo_zip.read(nombre))
+            if clave is None:
+                print(f"   ⚠️ Reporte no reconocido en {os.path.basename(ruta)}: {nombre}")
+                continue
+            reportes.append((clave, os.path.basename(nombre), df))
+    return reportes
+
+
+def _es_numerica(serie):
+    """True si todos los valores no vacíos son números ('CLP1,234', '2.5%', '--' cuenta como vacío)."""
+    texto = serie.dropna().astype('string').str.strip()
+    texto = texto[texto != '--']
+    return not texto.empty and bool(texto.str.fullmatch(r'[A-Za-z$]*\s?-?[\d.,]+\s?%?').all())
+
+
+def _sumar_periodos(clave, exports):
+    """Suma por categoría los reportes agregados de periodos que no se solapan (gana el más nuevo).
+
+    La tabla tiene la misma forma con uno o varios zips: se agrupa por las columnas de texto,
+    los montos y conteos se suman, las tasas de COLUMNAS_TASA se recalculan desde los totales
+    y las demás columnas numéricas (promedios y tasas sin sus totales) se descartan.
+    """
+    elegidos = []
+    for inicio, fin, df in reversed(exports):
+        solapa = any(inicio is None or otro_inicio is None or (inicio <= otro_fin and otro_inicio <= fin)
+                     for otro_inicio, otro_fin, _ in elegidos)
+        if not solapa:
+            elegidos.append((inicio, fin, df))
+
+    tablas = [df for _, _, df in elegidos]
+    comunes = [columna for columna in tablas[0].columns if all(columna in df.columns for df in tablas)]
+    unidas = pd.concat([df[comunes] for df in tablas], ignore_index=True)
+    medidas = [columna for columna in ['Costo'] + COLUMNAS_CONTEO if columna in comunes]
+    # Las columnas con que se reconoció el reporte siempre son categorías (la hora viene como número)
+    categorias = set().union(*(requeridas for otra, requeridas in REPORTES_GOOGLE_ADS if otra == clave))
+    claves = [columna for columna in comunes
+              if columna in categorias or (columna not in COLUMNAS_MONETARIAS + COLUMNAS_CONTEO
+                                           and columna not in COLUMNAS_TASA and not _es_numerica(unidas[columna]))]
+    suma = unidas.groupby(claves, dropna=False, sort=False)[medidas].sum().reset_index()
+    for columna, (numerador, denominador, factor) in COLUMNAS_TASA.items():
+        if columna in comunes and {numerador, denominador} <= set(suma.columns):
+            suma[columna] = (factor * suma[numerador] / suma[denominador].where(suma[denominador] > 0)).fillna(0)
+    return suma[[columna for columna in comunes if columna in suma.columns]]
+
+
+def cargar_google_ads(directorio=DIRECTORIO_GOOGLE_ADS):
+    """Tablas {clave de reporte: DataFrame} de todos los zips de la carpeta, unidas entre periodos."""
+    por_reporte = {}
+    for ruta in rutas_zip(directorio):
+        for clave, nombre, df in leer_zip(ruta):
+            inicio, fin = periodo_export(nombre)
+            por_reporte.setdefault(clave, []).append((inicio, fin, df))
+            print(f"   ✅ {clave:<18} {nombre} ({df.shape[0]} filas)")
+
+    datos = {}
+    for clave, exports in por_reporte.items():
+        if clave == 'series_temporales':
+            df = pd.concat([df for _, _, df in exports], ignore_index=True)
+            datos[clave] = df.drop_duplicates(subset=['Semana'], keep='last').sort_values('Semana', ignore_index=True)
+        else:
+            datos[clave] = _sumar_periodos(clave, exports)
+    return datos
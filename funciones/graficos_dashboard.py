@@ -1,194 +1,127 @@
-import plotly.express as px
 import plotly.graph_objects as go
+from plotly.subplots import make_subplots
 import pandas as pd
 
-# Definir colores y estilos para todos los gráficos
-COLORS = {
-    'background': '#000000',
-    'card_bg': '#1a1a1a',
-    'text': '#ffffff',
-    'primary': '#007bff',
-    'secondary': '#00a3ff',
-    'accent': '#004085',
-    'grid': '#333333',
-    'income': '#28a745',
-    'expense': '#dc3545'
-}
+from funciones.atribucion import SIN_ATRIBUIR
+from funciones.calendario import agrupar_por_periodo
+from funciones.componentes_dashboard import COLORS
+from funciones.contexto_analisis import ContextoAnalisis
+from funciones.correlacion import GASTO_TOTAL, OBJETIVOS
+from funciones.figuras_parciales import aplicar_serie, ticks_periodo
+from funciones.tema import TEMA
 
+# Fondo, grilla y fuentes vienen de la plantilla funciones/tema.py
 GRAPH_STYLE = {
-    'paper_bgcolor': COLORS['card_bg'],
-    'plot_bgcolor': COLORS['card_bg'],
-    'font': {'color': COLORS['text']},
+    'template': TEMA,
     'height': 500,
 }
 
-def crear_grafico_ingresos_gastos(df_payments, df_expenses, periodo):
-    """Crea un gráfico comparativo de ingresos y gastos por periodo."""
-    
-    # Preparar datos según el periodo seleccionado
-    if periodo == 'D':
-        df_payments['fecha_grupo'] = df_payments["Fecha"].dt.date
-        df_expenses['fecha_grupo'] = df_expenses["Fecha"].dt.date
-        titulo = 'Ingresos y Gastos por Día'
-    elif periodo == 'W':
-        df_payments['fecha_grupo'] = df_payments["Fecha"] - pd.to_timedelta(df_payments["Fecha"].dt.dayofweek, unit='D')
-        df_payments['fecha_label'] = df_payments['fecha_grupo'].dt.strftime('Semana del %d/%m/%Y')
-        df_expenses['fecha_grupo'] = df_expenses["Fecha"] - pd.to_timedelta(df_expenses["Fecha"].dt.dayofweek, unit='D')
-        df_expenses['fecha_label'] = df_expenses['fecha_grupo'].dt.strftime('Semana del %d/%m/%Y')
-        titulo = 'Ingresos y Gastos por Semana'
-    else:
-        df_payments['fecha_grupo'] = df_payments["Fecha"].dt.to_period('M').dt.to_timestamp()
-        df_payments['fecha_label'] = df_payments["Fecha"].dt.strftime('%B %Y')
-        df_expenses['fecha_grupo'] = df_expenses["Fecha"].dt.to_period('M').dt.to_timestamp()
-        df_expenses['fecha_label'] = df_expenses["Fecha"].dt.strftime('%B %Y')
-        titulo = 'Ingresos y Gastos por Mes'
-
-    # Agrupar datos
-    ingresos_totales = df_payments.groupby('fecha_grupo')['Monto'].sum().reset_index()
-    gastos = df_expenses.groupby('fecha_grupo')['Monto'].sum().reset_index()
-
-    # Crear figura
+NOMBRES_PERIODO = {'D': 'Día', 'W': 'Semana', 'M': 'Mes'}
+
+LAYOUT_BARRAS_MONTO = dict(
+    **GRAPH_STYLE,
+    barmode='group',
+    bargap=0.2,
+    bargroupgap=0.1,
+    xaxis_title='Fecha',
+    yaxis_title='Monto (CLP)',
+    hovermode='x unified'
+)
+
+def _figura_barras_monto(trazas):
+    """Figura base de barras agrupadas por fecha: (nombre, color) por traza, sin datos."""
     fig = go.Figure()
-    fig.add_trace(go.Bar(
-        x=ingresos_totales['fecha_grupo'],
-        y=ingresos_totales['Monto'],
-        name='Ingresos',
-        marker_color=COLORS['income'],
-        hovertemplate='Fecha: %{x}<br>Monto: $%{y:,.0f}<br>',
-        type='bar'
-    ))
-    fig.add_trace(go.Bar(
-        x=gastos['fecha_grupo'],
-        y=gastos['Monto'],
-        name='Gastos',
-        marker_color=COLORS['expense'],
-        hovertemplate='Fecha: %{x}<br>Monto: $%{y:,.0f}<br>',
-        type='bar'
-    ))
-    
-    # Configurar diseño
-    fig.update_layout(
-        title=titulo,
-        **GRAPH_STYLE,
-        barmode='group',
-        bargap=0.2,
-        bargroupgap=0.1,
-        xaxis=dict(
-            title='Fecha',
-            showgrid=True,
-            gridcolor=COLORS['grid'],
-            tickfont={'color': COLORS['text']},
-            title_font={'color': COLORS['text']}
-        ),
-        yaxis=dict(
-            title='Monto (CLP)',
-            showgrid=True,
-            gridcolor=COLORS['grid'],
-            tickfont={'color': COLORS['text']},
-            title_font={'color': COLORS['text']}
-        ),
-        legend=dict(font=dict(color=COLORS['text'])),
-        hovermode='x unified'
-    )
-    
-    # Ajustar etiquetas si es semanal o mensual
-    if periodo in ['W', 'M']:
-        fig.update_xaxes(
-            ticktext=df_payments.groupby('fecha_grupo')['fecha_label'].first(),
-            tickvals=ingresos_totales['fecha_grupo']
-        )
+    for nombre, color in trazas:
+        fig.add_trace(go.Bar(
+            x=[],
+            y=[],
+            name=nombre,
+            marker_color=color,
+            hovertemplate='Fecha: %{x}<br>Monto: $%{y:,.0f}<br>',
+            type='bar'
+        ))
+    fig.update_layout(**LAYOUT_BARRAS_MONTO)
     return fig
 
+# ---- Ingresos y gastos ----
+def figura_base_ingresos_gastos():
+    """Layout y trazas vacías del gráfico de ingresos y gastos."""
+    return _figura_barras_monto([('Ingresos', COLORS['income']), ('Gastos', COLORS['expense'])])
+
+def series_ingresos_gastos(df_payments, df_expenses, periodo):
+    """Datos del gráfico de ingresos y gastos para el periodo."""
+    
+    # Agrupar datos sin escribir columnas en los DataFrames compartidos
+    grupo_ingresos, label_ingresos = agrupar_por_periodo(df_payments, 'Fecha', periodo)
+    grupo_gastos, _ = agrupar_por_periodo(df_expenses, 'Fecha', periodo)
+
+    ingresos_totales = df_payments['Monto'].groupby(grupo_ingresos).sum().reset_index()
+    gastos = df_expenses['Monto'].groupby(grupo_gastos).sum().reset_index()
+
+    return {
+        'titulo': f'Ingresos y Gastos por {NOMBRES_PERIODO.get(periodo, "Mes")}',
+        'trazas': [
+            {'x': ingresos_totales['fecha_grupo'], 'y': ingresos_totales['Monto']},
+            {'x': gastos['fecha_grupo'], 'y': gastos['Monto']},
+        ],
+        # Etiquetas si es semanal o mensual
+        'ejes': {'xaxis': ticks_periodo(
+            periodo,
+            tickvals=ingresos_totales['fecha_grupo'],
+            ticktext=label_ingresos.groupby(grupo_ingresos).first()
+        )}
+    }
+
+def crear_grafico_ingresos_gastos(df_payments, df_expenses, periodo):
+    """Crea un gráfico comparativo de ingresos y gastos por periodo."""
+    return aplicar_serie(figura_base_ingresos_gastos(), series_ingresos_gastos(df_payments, df_expenses, periodo))
+
+# ---- Utilidad operativa ----
+def figura_base_utilidad_operativa():
+    """Layout y trazas vacías del gráfico de utilidad operativa."""
+    return _figura_barras_monto([
+        ('Ingresos Totales', COLORS['income']),
+        ('Costos Operativos', COLORS['expense']),
+        ('Gastos Marketing', '#ff6b6b'),
+    ])
+
+def series_utilidad_operativa(df_ingresos, df_costos_operativos, df_gastos_marketing, periodo, contexto=None):
+    """Datos del gráfico de utilidad operativa para el periodo.
+
+    Con `contexto` (funciones/contexto_analisis.py) reutiliza los agregados del callback.
+    """
+    if contexto is None:
+        contexto = ContextoAnalisis({
+            'ingresos': (df_ingresos, 'fecha'),
+            'costos_operativos': (df_costos_operativos, 'fecha'),
+            'gastos_marketing': (df_gastos_marketing, 'fecha'),
+        })
+
+    ingresos_totales = contexto.agrupado('ingresos', periodo, 'monto')['suma']
+    costos_operativos = contexto.agrupado('costos_operativos', periodo, 'monto')['suma']
+    gastos_marketing = contexto.agrupado('gastos_marketing', periodo, 'monto')['suma']
+
+    return {
+        'titulo': f'Utilidad Operativa por {NOMBRES_PERIODO.get(periodo, "Mes")}',
+        'trazas': [
+            {'x': ingresos_totales.index, 'y': ingresos_totales.to_numpy()},
+            {'x': costos_operativos.index, 'y': costos_operativos.to_numpy()},
+            {'x': gastos_marketing.index, 'y': gastos_marketing.to_numpy()},
+        ],
+        # Etiquetas si es semanal o mensual
+        'ejes': {'xaxis': ticks_periodo(
+            periodo,
+            tickvals=ingresos_totales.index,
+            ticktext=contexto.etiquetas('ingresos', periodo, 'monto')
+        )}
+    }
+
 def crear_grafico_utilidad_operativa(df_ingresos, df_costos_operativos, df_gastos_marketing, periodo):
     """Crea un gráfico de utilidad operativa por periodo."""
-    
-    # Preparar datos según el periodo seleccionado
-    if periodo == 'D':
-        df_ingresos['fecha_grupo'] = df_ingresos["fecha"].dt.date
-        df_costos_operativos['fecha_grupo'] = df_costos_operativos["fecha"].dt.date
-        df_gastos_marketing['fecha_grupo'] = df_gastos_marketing["fecha"].dt.date
-        titulo = 'Utilidad Operativa por Día'
-    elif periodo == 'W':
-        df_ingresos['fecha_grupo'] = df_ingresos["fecha"] - pd.to_timedelta(df_ingresos["fecha"].dt.dayofweek, unit='D')
-        df_ingresos['fecha_label'] = df_ingresos['fecha_grupo'].dt.strftime('Semana del %d/%m/%Y')
-        df_costos_operativos['fecha_grupo'] = df_costos_operativos["fecha"] - pd.to_timedelta(df_costos_operativos["fecha"].dt.dayofweek, unit='D')
-        df_costos_operativos['fecha_label'] = df_costos_operativos['fecha_grupo'].dt.strftime('Semana del %d/%m/%Y')
-        df_gastos_marketing['fecha_grupo'] = df_gastos_marketing["fecha"] - pd.to_timedelta(df_gastos_marketing["fecha"].dt.dayofweek, unit='D')
-        df_gastos_marketing['fecha_label'] = df_gastos_marketing['fecha_grupo'].dt.strftime('Semana del %d/%m/%Y')
-        titulo = 'Utilidad Operativa por Semana'
-    else:
-        df_ingresos['fecha_grupo'] = df_ingresos["fecha"].dt.to_period('M').dt.to_timestamp()
-        df_ingresos['fecha_label'] = df_ingresos["fecha"].dt.strftime('%B %Y')
-        df_costos_operativos['fecha_grupo'] = df_costos_operativos["fecha"].dt.to_period('M').dt.to_timestamp()
-        df_costos_operativos['fecha_label'] = df_costos_operativos["fecha"].dt.strftime('%B %Y')
-        df_gastos_marketing['fecha_grupo'] = df_gastos_marketing["fecha"].dt.to_period('M').dt.to_timestamp()
-        df_gastos_marketing['fecha_label'] = df_gastos_marketing["fecha"].dt.strftime('%B %Y')
-        titulo = 'Utilidad Operativa por Mes'
-
-    # Agrupar datos
-    ingresos_totales = df_ingresos.groupby('fecha_grupo')['monto'].sum().reset_index()
-    costos_operativos = df_costos_operativos.groupby('fecha_grupo')['monto'].sum().reset_index()
-    gastos_marketing = df_gastos_marketing.groupby('fecha_grupo')['monto'].sum().reset_index()
-
-    # Crear figura
-    fig = go.Figure()
-    fig.add_trace(go.Bar(
-        x=ingresos_totales['fecha_grupo'],
-        y=ingresos_totales['monto'],
-        name='Ingresos Totales',
-        marker_color=COLORS['income'],
-        hovertemplate='Fecha: %{x}<br>Monto: $%{y:,.0f}<br>',
-        type='bar'
-    ))
-    fig.add_trace(go.Bar(
-        x=costos_operativos['fecha_grupo'],
-        y=costos_operativos['monto'],
-        name='Costos Operativos',
-        marker_color=COLORS['expense'],
-        hovertemplate='Fecha: %{x}<br>Monto: $%{y:,.0f}<br>',
-        type='bar'
-    ))
-    fig.add_trace(go.Bar(
-        x=gastos_marketing['fecha_grupo'],
-        y=gastos_marketing['monto'],
-        name='Gastos Marketing',
-        marker_color='#ff6b6b',
-        hovertemplate='Fecha: %{x}<br>Monto: $%{y:,.0f}<br>',
-        type='bar'
-    ))
-    
-    # Configurar diseño
-    fig.update_layout(
-        title=titulo,
-        **GRAPH_STYLE,
-        barmode='group',
-        bargap=0.2,
-        bargroupgap=0.1,
-        xaxis=dict(
-            title='Fecha',
-            showgrid=True,
-            gridcolor=COLORS['grid'],
-            tickfont={'color': COLORS['text']},
-            title_font={'color': COLORS['text']}
-        ),
-        yaxis=dict(
-            title='Monto (CLP)',
-            showgrid=True,
-            gridcolor=COLORS['grid'],
-            tickfont={'color': COLORS['text']},
-            title_font={'color': COLORS['text']}
-        ),
-        legend=dict(font=dict(color=COLORS['text'])),
-        hovermode='x unified'
+    return aplicar_serie(
+        figura_base_utilidad_operativa(),
+        series_utilidad_operativa(df_ingresos, df_costos_operativos, df_gastos_marketing, periodo)
     )
-    
-    # Ajustar etiquetas si es semanal o mensual
-    if periodo in ['W', 'M']:
-        fig.update_xaxes(
-            ticktext=df_ingresos.groupby('fecha_grupo')['fecha_label'].first(),
-            tickvals=ingresos_totales['fecha_grupo']
-        )
-    return fig
 
 def crear_grafico_horas_populares(df):
     """Crea un gráfico de barras que muestra las horas más populares para reservas."""
@@ -196,6 +129,8 @@ def crear_grafico_horas_populares(df):
     if 'hora_trip' not in df.columns:
         return go.Figure()
     
+    import plotly.express as px  # import diferido: plotly.express es costoso de importar
+    
     horas_count = df['hora_trip'].value_counts().sort_index()
     
     fig = px.bar(
@@ -206,47 +141,104 @@ def crear_grafico_horas_populares(df):
         text=horas_count.values
     )
     
-    fig.update_layout(
-        **GRAPH_STYLE,
-        showlegend=False,
-        xaxis=dict(showgrid=True, gridcolor=COLORS['grid'], tickfont={'color': COLORS['text']}, title_font={'color': COLORS['text']}),
-        yaxis=dict(showgrid=True, gridcolor=COLORS['grid'], tickfont={'color': COLORS['text']}, title_font={'color': COLORS['text']})
-    )
+    fig.update_layout(**GRAPH_STYLE, showlegend=False)
     
     fig.update_traces(marker_color=COLORS['primary'], textposition='auto')
     
     return fig
 
+# ---- Reservas ----
+def figura_base_reservas():
+    """Layout y traza vacía del gráfico de reservas por periodo."""
+    fig = go.Figure(go.Bar(
+        x=[],
+        y=[],
+        marker_color=COLORS['primary'],
+        hovertemplate='Fecha=%{x}<br>Cantidad=%{y}<extra></extra>'
+    ))
+    fig.update_layout(**GRAPH_STYLE, showlegend=False, xaxis_title='Fecha', yaxis_title='Cantidad')
+    return fig
+
+def series_reservas(df_filtrado, periodo):
+    """Cantidad de reservas por periodo (día, semana, mes)."""
+    grupo, etiqueta = agrupar_por_periodo(df_filtrado, 'fecha_trip', periodo)
+    df_agrupado = (
+        pd.DataFrame({'fecha_grupo': grupo, 'fecha_label': etiqueta})
+        .groupby(['fecha_grupo', 'fecha_label']).size().reset_index(name='cantidad')
+        .sort_values('fecha_grupo')
+    )
+    return {
+        'titulo': f'Reservas por {NOMBRES_PERIODO.get(periodo, "Mes")}',
+        'trazas': [{'x': df_agrupado['fecha_grupo'], 'y': df_agrupado['cantidad']}],
+        'ejes': {'xaxis': ticks_periodo(periodo, tickvals=df_agrupado['fecha_grupo'], ticktext=df_agrupado['fecha_label'])}
+    }
+
 def crear_grafico_reservas(df_filtrado, periodo):
     """Crea un gráfico de reservas por periodo (día, semana, mes)."""
-    
-    if periodo == 'D':
-        df_agrupado = df_filtrado.groupby('fecha_trip').size().reset_index(name='cantidad')
-        fig = px.bar(df_agrupado, x='fecha_trip', y='cantidad', title='Reservas por Día')
-    elif periodo == 'W':
-        df_filtrado = df_filtrado.copy()
-        df_filtrado['inicio_semana'] = df_filtrado['fecha_trip'] - pd.to_timedelta(df_filtrado['fecha_trip'].dt.dayofweek, unit='D')
-        df_filtrado['semana_label'] = df_filtrado['inicio_semana'].dt.strftime('Semana del %d/%m/%Y')
-        df_agrupado = df_filtrado.groupby(['inicio_semana', 'semana_label']).size().reset_index(name='cantidad')
-        df_agrupado = df_agrupado.sort_values('inicio_semana')
-        fig = px.bar(df_agrupado, x='inicio_semana', y='cantidad', title='Reservas por Semana')
-        fig.update_xaxes(ticktext=df_agrupado['semana_label'], tickvals=df_agrupado['inicio_semana'])
-    else:
-        df_filtrado = df_filtrado.copy()
-        df_filtrado['inicio_mes'] = df_filtrado['fecha_trip'].dt.to_period('M').dt.to_timestamp()
-        df_filtrado['mes_label'] = df_filtrado['fecha_trip'].dt.strftime('%B %Y')
-        df_agrupado = df_filtrado.groupby(['inicio_mes', 'mes_label']).size().reset_index(name='cantidad')
-        df_agrupado = df_agrupado.sort_values('inicio_mes')
-        fig = px.bar(df_agrupado, x='inicio_mes', y='cantidad', title='Reservas por Mes')
-        fig.update_xaxes(ticktext=df_agrupado['mes_label'], tickvals=df_agrupado['inicio_mes'])
-    
+    return aplicar_serie(figura_base_reservas(), series_reservas(df_filtrado, periodo))
+
+# Correlación rezagada gasto → ingresos/reservas (ver funciones/correlacion.py)
+COLORES_GASTO = ['#ff6b6b', '#4ecdc4', '#ffd166', '#9370db']
+
+def crear_grafico_correlacion(df_correlacion):
+    """Correlación por rezago (días) entre cada gasto y cada objetivo, con la banda bootstrap del gasto total."""
+    fig = make_subplots(rows=len(OBJETIVOS), cols=1, shared_xaxes=True,
+                        subplot_titles=[f'Gasto vs {objetivo} (t + rezago)' for objetivo in OBJETIVOS])
+    if df_correlacion.empty:
+        fig.update_layout(title='No hay datos suficientes para calcular la correlación', template=TEMA, height=500)
+        return fig
+    
+    gastos = list(dict.fromkeys(df_correlacion['Gasto']))
+    for fila, objetivo in enumerate(OBJETIVOS, start=1):
+        df_objetivo = df_correlacion[df_correlacion['Objetivo'] == objetivo]
+        banda = df_objetivo[df_objetivo['Gasto'] == GASTO_TOTAL].dropna(subset=['Banda inferior', 'Banda superior'])
+        if not banda.empty:
+            # Banda del 95% bajo independencia (desplazamientos circulares)
+            fig.add_trace(go.Scatter(
+                x=list(banda['Rezago']) + list(banda['Rezago'][::-1]),
+                y=list(banda['Banda superior']) + list(banda['Banda inferior'][::-1]),
+                fill='toself', fillcolor='rgba(200, 200, 200, 0.2)', line=dict(width=0),
+                name='Banda 95% (azar)', showlegend=fila == 1, hoverinfo='skip'
+            ), row=fila, col=1)
+        for gasto, color in zip(gastos, COLORES_GASTO * len(gastos)):
+            df_gasto = df_objetivo[df_objetivo['Gasto'] == gasto]
+            fig.add_trace(go.Scatter(
+                x=df_gasto['Rezago'], y=df_gasto['Correlación'],
+                mode='lines+markers', name=gasto, legendgroup=gasto, showlegend=fila == 1,
+                line=dict(color=color, width=3 if gasto == GASTO_TOTAL else 1.5),
+                hovertemplate=f'{gasto}<br>Rezago: %{{x}} días<br>Correlación: %{{y:.2f}}<extra></extra>'
+            ), row=fila, col=1)
+    
+    fig.update_xaxes(title_text='Rezago (días)', row=len(OBJETIVOS), col=1)
+    fig.update_yaxes(title_text='Correlación', range=[-1, 1])
+    fig.update_layout(template=TEMA, height=600, hovermode='x unified')
+    return fig
+
+# Atribución de gasto a reservas (ver funciones/atribucion.py)
+def crear_grafico_atribucion(atribucion, ventana, start_date, end_date):
+    """Costo por reserva y ROAS de cada grupo (plataforma o público) en el período."""
+    df = atribucion.resumen(ventana, start_date, end_date)
+    df = df[(df[atribucion.dimension] != SIN_ATRIBUIR) & (df['Gasto (CLP)'] > 0)]
+
+    fig = make_subplots(rows=1, cols=2, subplot_titles=('Costo por reserva (CLP)', 'ROAS (ingresos / gasto)'))
+    fig.add_trace(go.Bar(
+        x=df[atribucion.dimension],
+        y=df['Costo por reserva (CLP)'],
+        marker_color=COLORS['expense'],
+        customdata=df[['Gasto (CLP)', 'Reservas atribuidas']],
+        hovertemplate='%{x}<br>Costo por reserva: $%{y:,.0f}<br>Gasto: $%{customdata[0]:,.0f}<br>Reservas: %{customdata[1]:.1f}<extra></extra>'
+    ), row=1, col=1)
+    fig.add_trace(go.Bar(
+        x=df[atribucion.dimension],
+        y=df['ROAS'],
+        marker_color=COLORS['income'],
+        customdata=df[['Ingresos atribuidos (CLP)']],
+        hovertemplate='%{x}<br>ROAS: %{y:.2f}<br>Ingresos: $%{customdata[0]:,.0f}<extra></extra>'
+    ), row=1, col=2)
     fig.update_layout(
-        **GRAPH_STYLE,
-        showlegend=False,
-        xaxis=dict(showgrid=True, gridcolor=COLORS['grid'], tickfont={'color': COLORS['text']}, title_font={'color': COLORS['text']}),
-        yaxis=dict(showgrid=True, gridcolor=COLORS['grid'], tickfont={'color': COLORS['text']}, title_font={'color': COLORS['text']})
+        title=f'Atribución por {atribucion.dimension} (ventana de {ventana} días)',
+        template=TEMA,
+        height=450,
+        showlegend=False
     )
-    
-    fig.update_traces(marker_color=COLORS['primary'])
-    
-    return fig 
\ No newline at end of file
+    return fig
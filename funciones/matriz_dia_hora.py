@@ -0,0 +1,68 @@
+import numpy as np
+import pandas as pd
+
+# Matrices día de la semana × hora (7 × 24).
+# El heatmap de Google Ads reagrupaba la tabla 'dia_hora' en cada carga y las
+# reservas, que tienen la misma estructura (día y hora de creación), nunca se
+# cruzaban con ella. Aquí cada fuente se reduce una sola vez a una matriz 7×24
+# con np.bincount sobre el índice día*24 + hora; los gráficos y el índice
+# reservas/anuncios trabajan sobre esas matrices sin volver a agrupar filas.
+
+DIAS_SEMANA = ['Lunes', 'Martes', 'Miércoles', 'Jueves', 'Viernes', 'Sábado', 'Domingo']
+HORAS = list(range(24))
+
+MEDIDAS_ANUNCIOS = ['Impresiones', 'Clics', 'Costo']
+
+# Nombre del día sin tildes y en minúsculas -> posición (lunes = 0, como dayofweek)
+_POSICION_DIA = {'lunes': 0, 'martes': 1, 'miercoles': 2, 'jueves': 3, 'viernes': 4, 'sabado': 5, 'domingo': 6}
+
+
+def _matriz(dias, horas, pesos=None):
+    """Matriz 7×24 con la suma de `pesos` (o el conteo) por día y hora; se ignoran posiciones nulas."""
+    validas = dias.notna() & horas.notna() & horas.between(0, 23)
+    indice = (dias[validas].to_numpy(dtype='int64') * 24 + horas[validas].to_numpy(dtype='int64'))
+    valores = None if pesos is None else pesos[validas].to_numpy(dtype='float64')
+    matriz = np.bincount(indice, weights=valores, minlength=7 * 24).astype('float64').reshape(7, 24)
+    return pd.DataFrame(matriz, index=DIAS_SEMANA, columns=HORAS)
+
+
+def _posicion_dia(nombres):
+    normalizados = (nombres.astype('string').str.normalize('NFKD')
+                    .str.encode('ascii', 'ignore').str.decode('ascii').str.strip().str.lower())
+    return normalizados.map(_POSICION_DIA)
+
+
+def _hora(texto):
+    """Hora (0-23) desde textos como '13', '13:00' o '13:00:00'."""
+    return pd.to_numeric(texto.astype('string').str.extract(r'(\d{1,2})', expand=False), errors='coerce')
+
+
+def matrices_anuncios(df_dia_hora):
+    """{medida: DataFrame 7×24} del reporte 'dia_hora' de Google Ads para las medidas que trae."""
+    if df_dia_hora is None or df_dia_hora.empty:
+        return {}
+    dias = _posicion_dia(df_dia_hora['Día'])
+    horas = _hora(df_dia_hora['Hora de inicio'])
+    return {medida: _matriz(dias, horas, df_dia_hora[medida])
+            for medida in MEDIDAS_ANUNCIOS if medida in df_dia_hora.columns}
+
+
+def matriz_reservas(reservas):
+    """DataFrame 7×24 con las reservas creadas por día de la semana y hora de creación."""
+    if reservas is None or reservas.empty or 'hora_creacion_reserva' not in reservas.columns:
+        return None
+    fechas = pd.to_datetime(reservas['fecha_creacion_reserva'], errors='coerce')
+    return _matriz(fechas.dt.dayofweek, _hora(reservas['hora_creacion_reserva']))
+
+
+def indice_relativo(reservas, anuncios):
+    """Participación de cada celda en las reservas dividida por su participación en la medida de anuncios.
+
+    > 1: en esa franja se reserva más de lo que se pauta; NaN donde no hubo anuncios.
+    """
+    total_reservas = reservas.to_numpy().sum()
+    total_anuncios = anuncios.to_numpy().sum()
+    if total_reservas <= 0 or total_anuncios <= 0:
+        return pd.DataFrame(np.nan, index=DIAS_SEMANA, columns=HORAS)
+    participacion_anuncios = anuncios / total_anuncios
+    return (reservas / total_reservas) / participacion_anuncios.where(participacion_anuncios > 0)
@@ -0,0 +1,268 @@
+import hashlib
+import os
+import re
+import threading
+
+import numpy as np
+import pandas as pd
+
+# Tabla de hechos canónica de Meta Ads.
+# Los exports "Comp-1-Conjunto-Anuncios-...-por-dia" se leían y limpiaban por
+# separado en cada dashboard de marketing (conversión numérica, hook rates,
+# clasificación de públicos y anuncios), cada uno con sus propias reglas. Aquí
+# se hace una sola vez: el export se convierte a una tabla tipada con columnas
+# derivadas comunes y se guarda en disco (pickle) con una clave que es el hash
+# del contenido del CSV. Mientras el export no cambie, cualquier dashboard que
+# arranque lee la tabla ya procesada en lugar de volver a parsear el CSV.
+
+DIRECTORIO_META = os.path.join('archivos_input', 'archivos input marketing')
+PREFIJO_EXPORT = 'Comp-1-Conjunto-Anuncios-2Campañas-3-anuncios-por-dia'
+
+DIRECTORIO_CACHE_META = os.environ.get('HOTBOAT_DIRECTORIO_CACHE_META', os.path.join('archivos_output', 'cache_meta'))
+
+# Máximo de tablas en caché; al superarlo se borran las más antiguas
+MAX_ARCHIVOS_META = int(os.environ.get('HOTBOAT_MAX_CACHE_META', '20'))
+
+# Subir al cambiar la preparación de la tabla: invalida las tablas ya guardadas
+VERSION_TABLA = 4
+
+FORMATO_FECHA_META = '%Y-%m-%d'
+COLUMNAS_FECHA = ['Día', 'Fin del informe']
+
+# Columnas del export que no se leen: constantes en cada descarga (la divisa ya
+# está en el nombre del importe) o sin uso y casi siempre vacías
+COLUMNAS_OMITIDAS = [
+    'Divisa', 'Configuración de atribución', 'Inicio del informe',
+    'Reproducciones de video hasta el 95%',
+]
+
+# Nombres y regiones: pocos valores distintos repetidos en miles de filas
+COLUMNAS_CATEGORIA = [
+    'Nombre del conjunto de anuncios', 'Nombre del anuncio', 'Nombre de la campaña', 'Región',
+]
+
+# Conteos y montos: una celda vacía en el export es 0
+COLUMNAS_CONTEO = [
+    'Alcance', 'Impresiones', 'Importe gastado (CLP)', 'Clics en el enlace',
+    'Artículos agregados al carrito', 'Reproducciones de video de 3 segundos',
+    'Reproducciones de video hasta el 25%', 'Reproducciones de video hasta el 50%',
+    'Reproducciones de video hasta el 75%', 'Reproducciones de video hasta el 100%',
+]
+
+# Conteos enteros que caben en int32 (el importe queda en float64)
+COLUMNAS_ENTERAS = [columna for columna in COLUMNAS_CONTEO if columna != 'Importe gastado (CLP)']
+
+# Tasas calculadas por Meta: vacías cuando no están definidas (sin clics, sin carritos)
+COLUMNAS_TASA = [
+    'Frecuencia', 'CTR (todos)', 'CPC (todos)', 'CPM (costo por mil impresiones)',
+    'Costo por artículo agregado al carrito',
+]
+
+# Reglas de clasificación (patrón en minúsculas contenido en el nombre, etiqueta).
+# Se aplican en orden y gana la primera que coincide.
+REGLAS_PUBLICO = [
+    (('advantage',), 'Advantage'),
+    (('pucon',), 'Pucón'),
+]
+
+# Público por ciudad; los conjuntos no reconocidos conservan su nombre
+REGLAS_PUBLICO_DETALLADO = [
+    (('advantage',), 'Publico Advantage'),
+    (('pucon',), 'Publico Pucón'),
+    (('concepcion',), 'Publico Concepción'),
+    (('valdivia',), 'Publico Valdivia'),
+    (('temuco',), 'Test Públicos Temuco'),
+]
+
+REGLAS_TIPO_ANUNCIO = [
+    (('explicando servicio',), 'Video explicativo'),
+    (('inicial',), 'Video inicial'),
+    (('publicitario',), 'Video publicitario'),
+    (('flo',), 'Video Flo'),
+    (('madre',), 'Día de la madre'),
+    (('parejas amor',), 'Parejas Amor'),
+    (('parejas dcto', 'pareja dcto', 'parejas descuento'), 'Parejas Descuento'),
+    (('karin',), 'Video Karin'),
+    (('lluvia',), 'Video Lluvia'),
+]
+
+# Hash por (ruta, tamaño, mtime): no se vuelve a leer un archivo que no cambió
+_huellas = {}
+_lock_huellas = threading.Lock()
+
+
+def ruta_export(numero=None, directorio=DIRECTORIO_META):
+    """Ruta del export por día; `numero` es el sufijo ' (n)' que agrega la descarga."""
+    sufijo = '' if numero is None else f' ({numero})'
+    return os.path.join(directorio, f'{PREFIJO_EXPORT}{sufijo}.csv')
+
+
+def clasificar(nombres, reglas, defecto=None):
+    """Clasifica `nombres` con una tabla de reglas; devuelve un Categorical.
+
+    Gana la primera regla con algún patrón contenido en el nombre (sin
+    distinguir mayúsculas); sin coincidencia se usa `defecto`, o el nombre
+    original si es None. Las reglas se evalúan sobre los nombres únicos y el
+    resultado se expande a las filas por código, sin recorrer fila por fila.
+    """
+    codigos, unicos = pd.factorize(nombres)
+    texto = pd.Series(unicos, dtype='string').str.lower()
+
+    if defecto is None:
+        etiquetas = pd.Series(unicos, dtype=object).astype(str)
+    else:
+        etiquetas = pd.Series(defecto, index=texto.index, dtype=object)
+    pendientes = np.ones(len(unicos), dtype=bool)
+    for patrones, etiqueta in reglas:
+        patron = '|'.join(re.escape(patron) for patron in patrones)
+        coincide = texto.str.contains(patron, regex=True).to_numpy(dtype=bool) & pendientes
+        etiquetas[coincide] = etiqueta
+        pendientes &= ~coincide
+
+    # Los nombres nulos (código -1) toman la última posición
+    etiquetas = pd.concat([etiquetas, pd.Series(['Sin nombre' if defecto is None else defecto])], ignore_index=True)
+    usadas = etiquetas.iloc[np.unique(codigos)] if len(codigos) else etiquetas.iloc[:0]
+
+    # Categorías en el orden de la tabla de reglas, seguidas de las demás; solo las presentes
+    orden = [etiqueta for _, etiqueta in reglas] + ([defecto] if defecto is not None else [])
+    presentes = set(usadas)
+    categorias = pd.Index(list(dict.fromkeys([e for e in orden if e in presentes] + list(usadas))))
+    return pd.Categorical.from_codes(categorias.get_indexer(etiquetas)[codigos], categories=categorias)
+
+
+def _a_numero(serie):
+    """Convierte una columna del export a número (decimales con coma, '-' o vacío como nulo)."""
+    if pd.api.types.is_numeric_dtype(serie):
+        return serie.astype('float64')
+    texto = serie.astype('string').str.replace('\u00a0', '', regex=False).str.replace(' ', '', regex=False)
+    texto = texto.str.replace(',', '.', regex=False)
+    texto = texto.mask(texto.isin(['', '-']))
+    return pd.to_numeric(texto, errors='coerce').astype('float64')
+
+
+def preparar_tabla_meta(df):
+    """Tabla canónica a partir del export crudo: tipos compactos y clasificaciones.
+
+    No se guardan razones por fila (CTR, hook rates): se derivan como suma/suma
+    en funciones/cubo_meta.py.
+    """
+    df = df.drop(columns=[columna for columna in COLUMNAS_OMITIDAS if columna in df.columns])
+
+    for columna in COLUMNAS_CONTEO:
+        if columna in df.columns:
+            df[columna] = _a_numero(df[columna]).fillna(0)
+    for columna in COLUMNAS_TASA:
+        if columna in df.columns:
+            df[columna] = _a_numero(df[columna])
+    for columna in COLUMNAS_FECHA:
+        if columna in df.columns:
+            df[columna] = pd.to_datetime(df[columna], format=FORMATO_FECHA_META, errors='coerce')
+
+    return clasificar_tabla(compactar_tabla(df))
+
+
+def compactar_tabla(df):
+    """Tipos compactos en el lugar: nombres y regiones categóricos, conteos int32."""
+    for columna in COLUMNAS_CATEGORIA:
+        if columna in df.columns and not isinstance(df[columna].dtype, pd.CategoricalDtype):
+            df[columna] = df[columna].astype('category')
+    campana = df['Nombre de la campaña']
+    if campana.isna().any():
+        if 'Sin nombre' not in campana.cat.categories:
+            campana = campana.cat.add_categories('Sin nombre')
+        df['Nombre de la campaña'] = campana.fillna('Sin nombre')
+    for columna in COLUMNAS_ENTERAS:
+        if columna in df.columns and df[columna].dtype != 'int32':
+            df[columna] = df[columna].round().astype('int32')
+    return df
+
+
+def memoria_mb(df, compacta=True):
+    """Memoria de la tabla en MB; con compacta=False, la que ocuparía con texto object y conteos float64."""
+    if not compacta:
+        tipos = {columna: object for columna in COLUMNAS_CATEGORIA if columna in df.columns}
+        tipos.update({columna: 'float64' for columna in COLUMNAS_ENTERAS if columna in df.columns})
+        tipos.update({columna: object for columna in ('Público', 'Público detallado', 'Tipo de Anuncio') if columna in df.columns})
+        df = df.astype(tipos)
+    return df.memory_usage(deep=True).sum() / 1e6
+
+
+def clasificar_tabla(df):
+    """(Re)calcula en el lugar las columnas de clasificación a partir de los nombres."""
+    df['Público'] = clasificar(df['Nombre del conjunto de anuncios'], REGLAS_PUBLICO, 'Otro')
+    df['Público detallado'] = clasificar(df['Nombre del conjunto de anuncios'], REGLAS_PUBLICO_DETALLADO)
+    df['Tipo de Anuncio'] = clasificar(df['Nombre del anuncio'], REGLAS_TIPO_ANUNCIO, 'Otro')
+    return df
+
+
+def huella_archivo(ruta):
+    """Hash del contenido del export (más la versión de la tabla)."""
+    estado = os.stat(ruta)
+    clave = (os.path.abspath(ruta), estado.st_size, estado.st_mtime_ns)
+    with _lock_huellas:
+        if clave in _huellas:
+            return _huellas[clave]
+
+    h = hashlib.blake2b(digest_size=16)
+    h.update(f'v{VERSION_TABLA}'.encode())
+    with open(ruta, 'rb') as archivo:
+        for bloque in iter(lambda: archivo.read(1 << 20), b''):
+            h.update(bloque)
+    huella = h.hexdigest()
+
+    with _lock_huellas:
+        _huellas[clave] = huella
+    return huella
+
+
+def _podar(directorio, max_archivos):
+    """Borra las tablas más antiguas si hay más de max_archivos."""
+    try:
+        entradas = [entrada for entrada in os.scandir(directorio) if entrada.name.endswith('.pkl')]
+        if len(entradas) <= max_archivos:
+            return
+        entradas.sort(key=lambda entrada: entrada.stat().st_mtime)
+        for entrada in entradas[:len(entradas) - max_archivos]:
+            os.remove(entrada.path)
+    except OSError:
+        pass
+
+
+def cargar_tabla_meta(ruta, directorio_cache=DIRECTORIO_CACHE_META):
+    """Tabla canónica del export `ruta`, leída de la caché si el CSV no cambió.
+
+    Lanza FileNotFoundError si el export no existe. Cada llamada devuelve una
+    tabla nueva, que el dashboard puede modificar libremente.
+    """
+    huella = huella_archivo(ruta)
+    ruta_cache = os.path.join(directorio_cache, f'meta-{huella}.pkl')
+    nombre = os.path.basename(ruta)
+
+    try:
+        df = pd.read_pickle(ruta_cache)
+        print(f"⚡ Tabla Meta desde caché: {nombre} ({len(df)} filas)")
+        return df
+    except FileNotFoundError:
+        pass
+    except Exception as e:
+        print(f"⚠️ Tabla Meta en caché ilegible, se vuelve a procesar ({nombre}): {e}")
+
+    # Solo las columnas necesarias; nombres y regiones se leen directo como categóricos
+    encabezado = pd.read_csv(ruta, encoding='utf-8-sig', nrows=0).columns
+    columnas = [columna for columna in encabezado if columna not in COLUMNAS_OMITIDAS]
+    tipos = {columna: 'category' for columna in COLUMNAS_CATEGORIA if columna in columnas}
+    df = preparar_tabla_meta(pd.read_csv(ruta, encoding='utf-8-sig', usecols=columnas, dtype=tipos))
+    print(f"✅ Export Meta procesado: {nombre} ({len(df)} filas, {len(encabezado) - len(columnas)} columnas omitidas, "
+          f"{memoria_mb(df):.2f} MB en vez de {memoria_mb(df, compacta=False):.2f} MB)")
+
+    # Escritura atómica: otro proceso nunca lee un archivo a medio escribir
+    temporal = f'{ruta_cache}.{os.getpid()}.{threading.get_ident()}.tmp'
+    try:
+        os.makedirs(directorio_cache, exist_ok=True)
+        df.to_pickle(temporal)
+        os.replace(temporal, ruta_cache)
+        print(f"💾 Tabla Meta guardada en caché: {os.path.basename(ruta_cache)}")
+        _podar(directorio_cache, MAX_ARCHIVOS_META)
+    except OSError as e:
+        print(f"⚠️ No se pudo guardar la tabla Meta en caché: {e}")
+    return df
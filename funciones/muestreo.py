@@ -0,0 +1,149 @@
+import os
+
+import numpy as np
+import pandas as pd
+
+# Series largas: muestreo LTTB y trazas WebGL.
+# Con varios años de historia una vista "Por Día" envía y dibuja un punto o una
+# barra por día. Por sobre UMBRAL_PUNTOS cada traza se reduce con
+# largest-triangle-three-buckets (LTTB), que conserva picos y forma de la
+# serie, y se dibuja como scattergl; las barras pasan a un área WebGL. Al hacer
+# zoom se vuelve a muestrear solo el rango visible (ver rango_relayout), de
+# modo que el detalle reaparece sin enviar nunca más de UMBRAL_PUNTOS por traza.
+# assets/periodos.js aplica la misma regla a los gráficos que se reagrupan en
+# el navegador.
+
+UMBRAL_PUNTOS = int(os.environ.get('HOTBOAT_UMBRAL_PUNTOS', '1000'))
+
+
+def lttb(x, y, n_salida):
+    """Índices de los `n_salida` puntos elegidos por LTTB (incluye el primero y el último)."""
+    n = len(x)
+    if n_salida >= n or n_salida < 3:
+        return np.arange(n)
+    x = np.asarray(x, dtype=float)
+    y = np.nan_to_num(np.asarray(y, dtype=float))
+
+    # n_salida - 2 baldes entre el primer y el último punto
+    bordes = np.linspace(1, n - 1, n_salida - 1).astype(np.int64)
+    indices = np.empty(n_salida, dtype=np.int64)
+    indices[0] = 0
+    indices[-1] = n - 1
+
+    anterior = 0
+    for i in range(n_salida - 2):
+        inicio, fin = bordes[i], bordes[i + 1]
+        siguiente_fin = bordes[i + 2] if i + 2 < len(bordes) else n
+        # Vértice promedio del balde siguiente
+        cx = x[fin:siguiente_fin].mean()
+        cy = y[fin:siguiente_fin].mean()
+        ax, ay = x[anterior], y[anterior]
+        areas = np.abs((ax - cx) * (y[inicio:fin] - ay) - (ax - x[inicio:fin]) * (cy - ay))
+        anterior = inicio + int(np.argmax(areas))
+        indices[i + 1] = anterior
+    return indices
+
+
+def _numerico(x):
+    """x como floats; las fechas pasan a nanosegundos."""
+    serie = pd.Series(x)
+    if pd.api.types.is_datetime64_any_dtype(serie.dtype):
+        return serie.to_numpy(dtype='datetime64[ns]').astype(np.int64).astype(float)
+    return pd.to_numeric(serie, errors='coerce').to_numpy(dtype=float)
+
+
+def _limites(rango, x):
+    """Límites del rango en la misma escala que _numerico(x); en ejes de fecha llegan como texto."""
+    if pd.api.types.is_datetime64_any_dtype(pd.Series(x).dtype):
+        return _numerico(pd.to_datetime(pd.Series(rango)))
+    return _numerico(rango)
+
+
+def rango_relayout(relayout, eje='xaxis'):
+    """Rango [inicio, fin] pedido por un zoom en relayoutData; None si se volvió al rango completo.
+
+    Devuelve False si el evento no cambia el rango del eje (autosize, zoom en y, etc.).
+    """
+    if not relayout:
+        return False
+    if relayout.get(f'{eje}.autorange'):
+        return None
+    if f'{eje}.range[0]' in relayout and f'{eje}.range[1]' in relayout:
+        return [relayout[f'{eje}.range[0]'], relayout[f'{eje}.range[1]']]
+    if f'{eje}.range' in relayout:
+        return list(relayout[f'{eje}.range'])
+    return False
+
+
+def trazas_base(fig):
+    """Tipo y color de cada traza de una figura base, para muestrear_serie."""
+    return [{'tipo': traza.type, 'color': getattr(traza.marker, 'color', None) if traza.type == 'bar' else None}
+            for traza in fig.data]
+
+
+def _tomar(valores, posiciones):
+    if isinstance(valores, (pd.Series, pd.Index)):
+        return valores[posiciones] if isinstance(valores, pd.Index) else valores.iloc[posiciones]
+    return np.asarray(valores)[posiciones]
+
+
+def muestrear_serie(serie, bases, rango=None, umbral=UMBRAL_PUNTOS):
+    """Recorta las trazas de `serie` al rango visible y las reduce con LTTB si superan `umbral`.
+
+    `bases` es trazas_base(figura_base). Las trazas grandes se cambian a
+    scattergl (las barras como área) y vuelven a su tipo original cuando caben.
+    El eje x queda fijo en `rango` o en autorange si `rango` es None.
+    """
+    trazas = []
+    for propiedades, base in zip(serie['trazas'], bases):
+        x, y = propiedades.get('x'), propiedades.get('y')
+        if x is None or y is None or len(x) == 0:
+            trazas.append(propiedades)
+            continue
+
+        n = len(x)
+        x_num = _numerico(x)
+        if rango is not None:
+            limites = _limites(rango, x)
+            posiciones = np.flatnonzero((x_num >= limites[0]) & (x_num <= limites[1]))
+        else:
+            posiciones = np.arange(n)
+        if len(posiciones) > umbral:
+            posiciones = posiciones[lttb(x_num[posiciones], _numerico(y)[posiciones], umbral)]
+
+        # Todas las propiedades por punto se recortan igual que x/y
+        nuevas = {
+            propiedad: _tomar(valor, posiciones)
+            if not isinstance(valor, (str, dict)) and hasattr(valor, '__len__') and len(valor) == n else valor
+            for propiedad, valor in propiedades.items()
+        }
+        # El tipo depende del largo total, así no cambia al hacer zoom
+        grande = n > umbral
+        if base['tipo'] == 'bar':
+            nuevas.update({'type': 'scattergl', 'mode': 'lines', 'fill': 'tozeroy', 'line': {'color': base['color']}}
+                          if grande else {'type': 'bar'})
+        elif base['tipo'] in ('scatter', 'scattergl'):
+            nuevas['type'] = 'scattergl' if grande else 'scatter'
+        trazas.append(nuevas)
+
+    ejes = {eje: dict(propiedades) for eje, propiedades in serie.get('ejes', {}).items()}
+    xaxis = ejes.setdefault('xaxis', {})
+    if rango is None:
+        xaxis.update({'autorange': True, 'range': None})
+    else:
+        xaxis.update({'autorange': False, 'range': list(rango)})
+    return dict(serie, trazas=trazas, ejes=ejes)
+
+
+def supera_umbral(serie, umbral=UMBRAL_PUNTOS):
+    """True si alguna traza de la serie tiene más puntos que `umbral`."""
+    return any(len(propiedades.get('x', [])) > umbral for propiedades in serie['trazas'])
+
+
+def traza_temporal(x, y, umbral=UMBRAL_PUNTOS, **propiedades):
+    """go.Scatter, o go.Scattergl muestreado con LTTB si la serie supera `umbral`."""
+    import plotly.graph_objects as go
+    if len(x) <= umbral:
+        return go.Scatter(x=x, y=y, **propiedades)
+    posiciones = lttb(_numerico(x), _numerico(y), umbral)
+    return go.Scattergl(x=_tomar(x, posiciones), y=_tomar(y, posiciones), **propiedades)
@@ -0,0 +1,148 @@
+import os
+import threading
+
+import numpy as np
+import pandas as pd
+
+# Payload compacto de las respuestas de los callbacks.
+# - Las fechas de las trazas viajan como milisegundos desde epoch (el eje x se
+#   declara de tipo 'date') y los valores como arreglos numéricos redondeados,
+#   en lugar de textos ISO y floats con 15 decimales.
+# - Los textos sobre las barras se formatean en el navegador con texttemplate
+#   (ver plantilla_monto) en vez de enviar un arreglo de strings por punto.
+# - Si orjson está instalado, plotly/Dash lo usan para serializar las figuras.
+# - Cada respuesta de callback se mide y se compara con un presupuesto en bytes;
+#   solo se avisa en consola al excederlo, los tamaños normales se consultan
+#   con resumen_tamanos().
+
+PRESUPUESTO_RESPUESTA_BYTES = int(os.environ.get('HOTBOAT_PRESUPUESTO_RESPUESTA', '250000'))
+
+# Con HOTBOAT_PRESUPUESTO_RESPUESTA_ESTRICTO=1 una respuesta que excede el presupuesto se reemplaza por un error 500
+# (independiente de HOTBOAT_PRESUPUESTO_ESTRICTO, que solo controla el presupuesto de arranque)
+PRESUPUESTO_RESPUESTA_ESTRICTO = os.environ.get('HOTBOAT_PRESUPUESTO_RESPUESTA_ESTRICTO', '0') == '1'
+
+DECIMALES_DEFECTO = 4
+
+_tamanos = {}
+_lock = threading.Lock()
+
+
+def plantilla_monto(eje='y'):
+    """texttemplate de montos en pesos: '$1,234' formateado en el navegador."""
+    return f'$%{{{eje}:,.0f}}'
+
+
+def fechas_ms(valores):
+    """Convierte fechas (Series, índice o lista) a milisegundos desde epoch."""
+    return pd.DatetimeIndex(pd.to_datetime(valores)).asi8 // 1_000_000
+
+
+def _es_fecha(valores):
+    if isinstance(valores, (pd.Series, pd.Index)):
+        return pd.api.types.is_datetime64_any_dtype(valores.dtype)
+    return isinstance(valores, np.ndarray) and np.issubdtype(valores.dtype, np.datetime64)
+
+
+def compactar_valores(valores, decimales=DECIMALES_DEFECTO):
+    """Fechas -> ms, números -> ndarray redondeado; el resto se devuelve igual."""
+    if valores is None or isinstance(valores, (str, dict)):
+        return valores
+    if _es_fecha(valores):
+        return fechas_ms(valores)
+    if isinstance(valores, (pd.Series, pd.Index, np.ndarray)):
+        arreglo = np.asarray(valores)
+        if np.issubdtype(arreglo.dtype, np.floating):
+            return arreglo.round(decimales)
+        if np.issubdtype(arreglo.dtype, np.integer):
+            return arreglo
+    return valores
+
+
+def compactar_serie(serie, decimales=DECIMALES_DEFECTO):
+    """Compacta una serie de funciones/figuras_parciales.py (trazas y ticks del eje x)."""
+    hay_fechas = False
+    trazas = []
+    for propiedades in serie['trazas']:
+        compactas = {}
+        for propiedad, valor in propiedades.items():
+            if propiedad == 'x' and _es_fecha(valor):
+                hay_fechas = True
+            compactas[propiedad] = compactar_valores(valor, decimales)
+        trazas.append(compactas)
+
+    ejes = {eje: dict(propiedades) for eje, propiedades in serie.get('ejes', {}).items()}
+    if hay_fechas:
+        xaxis = ejes.setdefault('xaxis', {})
+        xaxis['type'] = 'date'
+        if xaxis.get('tickvals') is not None:
+            xaxis['tickvals'] = fechas_ms(xaxis['tickvals'])
+
+    compacta = dict(serie, trazas=trazas)
+    if ejes:
+        compacta['ejes'] = ejes
+    return compacta
+
+
+def activar_json_rapido():
+    """Usa orjson como motor JSON de plotly (y por lo tanto de Dash) si está disponible."""
+    try:
+        import orjson  # noqa: F401
+    except ImportError:
+        print("ℹ️ orjson no está instalado; se usa el codificador JSON estándar")
+        return False
+    import plotly.io as pio
+    pio.json.config.default_engine = 'orjson'
+    return True
+
+
+def _etiqueta_salida(salida):
+    """'..a.figure...b.figure..' -> 'a.figure, b.figure'"""
+    return ', '.join(parte for parte in salida.strip('.').split('...') if parte) or salida
+
+
+def resumen_tamanos(nombre=None):
+    """Respuestas medidas por salida: {'n', 'ultimo', 'maximo', 'total'} en bytes."""
+    with _lock:
+        if nombre is not None:
+            return {salida: dict(datos) for salida, datos in _tamanos.get(nombre, {}).items()}
+        return {app: {salida: dict(datos) for salida, datos in salidas.items()} for app, salidas in _tamanos.items()}
+
+
+def configurar_payload(app, nombre, presupuesto=None, presupuestos=None):
+    """Activa el JSON rápido y registra el tamaño de cada respuesta de callback de `app`.
+
+    `presupuestos` permite fijar un límite por salida (por ejemplo {'grafico-evolucion.figure': 80000});
+    el resto usa `presupuesto` o PRESUPUESTO_RESPUESTA_BYTES.
+    """
+    from flask import request
+
+    presupuesto = PRESUPUESTO_RESPUESTA_BYTES if presupuesto is None else presupuesto
+    presupuestos = presupuestos or {}
+    activar_json_rapido()
+
+    @app.server.after_request
+    def medir_respuesta(response):
+        if not request.path.endswith('_dash-update-component') or response.direct_passthrough:
+            return response
+        cuerpo = request.get_json(silent=True) or {}
+        salida = _etiqueta_salida(cuerpo.get('output', '?'))
+        tamano = response.calculate_content_length()
+        if tamano is None:
+            tamano = len(response.get_data())
+
+        with _lock:
+            datos = _tamanos.setdefault(nombre, {}).setdefault(salida, {'n': 0, 'ultimo': 0, 'maximo': 0, 'total': 0})
+            datos['n'] += 1
+            datos['ultimo'] = tamano
+            datos['maximo'] = max(datos['maximo'], tamano)
+            datos['total'] += tamano
+
+        limite = presupuestos.get(salida, presupuesto)
+        if tamano > limite:
+            mensaje = f"❌ {nombre}: respuesta de {salida} excede el presupuesto ({tamano:,} > {limite:,} bytes)"
+            print(mensaje)
+            if PRESUPUESTO_RESPUESTA_ESTRICTO:
+                return app.server.response_class(mensaje, status=500, mimetype='text/plain')
+        return response
+
+    return medir_respuesta
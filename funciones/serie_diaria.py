@@ -0,0 +1,103 @@
+import numpy as np
+import pandas as pd
+
+from funciones.calendario import agrupar_por_periodo
+from funciones.muestreo import muestrear_serie, supera_umbral, trazas_base
+from funciones.payload import DECIMALES_DEFECTO, compactar_serie
+
+# Series diarias para reagrupar en el navegador.
+# Al cambiar el rango de fechas el servidor envía, por cada gráfico temporal,
+# las sumas y conteos por día de cada traza en un dcc.Store. El cambio de
+# periodo (día/semana/mes) lo resuelve una función clientside
+# (assets/periodos.js), sin volver a pasar por el servidor.
+#
+# Formato del Store:
+#   {'figuras': [{'titulos': {'D': ..., 'W': ..., 'M': ...},
+#                 'trazas': [{'fechas': ['2024-01-31', ...], 'sumas': [...], 'conteos': [...],
+#                             'agregacion': 'sum' | 'mean', 'categoria': opcional}]}],
+#    'insights': [{'D': componente, 'W': componente, 'M': componente}]}
+# Las listas siguen el mismo orden que los Outputs del callback clientside.
+
+PERIODOS = ('D', 'W', 'M')
+
+
+def agregado_diario(df, columna_fecha, columna_valor=None):
+    """DataFrame indexado por día con la suma y el conteo de `columna_valor` (o de filas si es None)."""
+    if df is None or df.empty:
+        return pd.DataFrame({'suma': pd.Series(dtype=float), 'conteo': pd.Series(dtype=int)},
+                            index=pd.DatetimeIndex([], name='fecha_grupo'))
+
+    dia, _ = agrupar_por_periodo(df, columna_fecha, 'D')
+    if columna_valor is None:
+        valores = pd.Series(1, index=df.index)
+    else:
+        valores = pd.to_numeric(df[columna_valor], errors='coerce')
+    agrupado = valores.groupby(dia).agg(['sum', 'count'])
+    return agrupado.rename(columns={'sum': 'suma', 'count': 'conteo'})
+
+
+def serie_desde_agregado(agregado, agregacion='sum', categoria=None):
+    """Entrada de 'trazas' del Store a partir de un agregado_diario."""
+    serie = {
+        'fechas': agregado.index.strftime('%Y-%m-%d').tolist(),
+        'sumas': agregado['suma'].round(DECIMALES_DEFECTO).tolist(),
+        'conteos': agregado['conteo'].astype(int).tolist(),
+        'agregacion': agregacion,
+    }
+    if categoria is not None:
+        serie['categoria'] = categoria
+    return serie
+
+
+def serie_diaria(df, columna_fecha, columna_valor=None, agregacion='sum', categoria=None):
+    """Sumas y conteos por día de `columna_valor` (o de filas si es None)."""
+    return serie_desde_agregado(agregado_diario(df, columna_fecha, columna_valor), agregacion, categoria)
+
+
+def por_periodo(funcion):
+    """Evalúa funcion(periodo) para día, semana y mes."""
+    return {periodo: funcion(periodo) for periodo in PERIODOS}
+
+
+def figura_periodica(titulos, trazas):
+    """Entrada de 'figuras' del Store: títulos por periodo y series diarias en el orden de las trazas."""
+    return {'titulos': titulos, 'trazas': trazas}
+
+
+def figura_dia(figura, especificacion, seleccion=None):
+    """Vista 'Por Día' de una entrada de 'figuras' sobre su figura base, como dict.
+
+    Es la misma figura que dibuja assets/periodos.js para el periodo 'D'; se usa
+    para incrustar la vista inicial en el layout.
+    """
+    trazas = []
+    for propiedades in especificacion['trazas']:
+        sumas = np.asarray(propiedades['sumas'], dtype=float)
+        if propiedades['agregacion'] == 'mean':
+            conteos = np.asarray(propiedades['conteos'], dtype=float)
+            y = np.divide(sumas, conteos, out=np.full(len(sumas), np.nan), where=conteos > 0)
+        else:
+            y = sumas
+        traza = {'x': pd.to_datetime(pd.Series(propiedades['fechas'], dtype=object)), 'y': y}
+        if 'categoria' in propiedades and seleccion is not None:
+            traza['visible'] = propiedades['categoria'] in seleccion
+        trazas.append(traza)
+
+    serie = {'trazas': trazas, 'ejes': {'xaxis': {'tickvals': None, 'ticktext': None}}}
+    if supera_umbral(serie):
+        serie = muestrear_serie(serie, trazas_base(figura))
+    serie = compactar_serie(serie)
+
+    base = figura.to_dict()
+    data = []
+    for traza, propiedades in zip(base['data'], serie['trazas']):
+        nueva = dict(traza, **propiedades)
+        if nueva.get('type') != traza.get('type'):
+            # periodos.js recupera el tipo original (barras) al pasar a semana o mes
+            nueva['meta'] = {'tipo_base': traza.get('type')}
+        data.append(nueva)
+
+    layout = dict(base.get('layout', {}))
+    layout['title'] = dict(layout.get('title', {}), text=especificacion['titulos']['D'])
+    layout['xaxis'] = dict(layout.get('xaxis', {}), **serie['ejes']['xaxis'])
+    return {'data': data + base['data'][len(data):], 'layout': layout}
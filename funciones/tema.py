@@ -0,0 +1,49 @@
+import plotly.graph_objects as go
+import plotly.io as pio
+
+from funciones.componentes_dashboard import COLORS
+
+# Tema Plotly de HotBoat.
+# Fondo, grilla, fuentes y leyenda de todos los gráficos se definen una sola vez
+# en una plantilla registrada en plotly.io.templates. Las figuras la referencian
+# por nombre (template=TEMA) y solo declaran lo propio: títulos, alturas y ejes
+# especiales. Además queda como plantilla por defecto, de modo que las figuras
+# ya no arrastran la plantilla 'plotly' completa en su JSON.
+
+TEMA = 'hotboat'
+
+_EJE = dict(
+    showgrid=True,
+    gridcolor=COLORS['grid'],
+    zerolinecolor=COLORS['grid'],
+    linecolor=COLORS['grid'],
+    tickfont={'color': COLORS['text']},
+    title_font={'color': COLORS['text']},
+)
+
+
+def _crear_tema():
+    return go.layout.Template(layout=dict(
+        paper_bgcolor=COLORS['card_bg'],
+        plot_bgcolor=COLORS['card_bg'],
+        font={'color': COLORS['text']},
+        title_font={'color': COLORS['text']},
+        xaxis=_EJE,
+        yaxis=_EJE,
+        legend={'font': {'color': COLORS['text']}},
+        colorway=[COLORS['primary'], COLORS['income'], COLORS['expense'], COLORS['secondary'],
+                  '#FFD700', '#9467bd', '#17becf', '#ff7f0e'],
+        coloraxis_colorbar={'tickfont': {'color': COLORS['text']}, 'title_font': {'color': COLORS['text']}},
+        hoverlabel={'font': {'color': COLORS['text']}, 'bgcolor': COLORS['background']},
+    ))
+
+
+def registrar_tema():
+    """Registra la plantilla (una vez por proceso) y la deja como predeterminada."""
+    if TEMA not in pio.templates:
+        pio.templates[TEMA] = _crear_tema()
+    pio.templates.default = TEMA
+    return TEMA
+
+
+registrar_tema()
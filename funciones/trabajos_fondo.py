@@ -0,0 +1,76 @@
+import functools
+import os
+
+from dash import html, Output
+
+# Callbacks pesados en segundo plano.
+# Los callbacks que agrupan muchas filas (regiones, hook rates, rendimiento de
+# anuncios, Google Ads) se ejecutan como background callbacks de Dash sobre un
+# DiskcacheManager: corren en un proceso aparte, informan su progreso en una
+# barra y, si llega una petición nueva para el mismo callback, Dash cancela el
+# trabajo anterior. Los callbacks livianos siguen respondiendo mientras tanto.
+#
+# diskcache, multiprocess y psutil son opcionales: si faltan, el callback se
+# registra como uno normal y se ejecuta en el hilo del servidor.
+
+DIRECTORIO_TRABAJOS = os.environ.get('HOTBOAT_DIRECTORIO_TRABAJOS', os.path.join('archivos_output', 'cache_trabajos'))
+
+# Los resultados de trabajos terminados se descartan después de este tiempo
+EXPIRACION_SEGUNDOS = 600
+
+
+def crear_gestor_fondo(nombre):
+    """DiskcacheManager propio del dashboard `nombre`, o None si faltan dependencias."""
+    try:
+        import diskcache
+        from dash import DiskcacheManager
+        cache = diskcache.Cache(os.path.join(DIRECTORIO_TRABAJOS, nombre))
+        gestor = DiskcacheManager(cache, expire=EXPIRACION_SEGUNDOS)
+    except ImportError as e:
+        print(f"ℹ️ {nombre}: callbacks pesados en el hilo del servidor ({e})")
+        return None
+    print(f"⚙️ {nombre}: callbacks pesados en segundo plano ({cache.directory})")
+    return gestor
+
+
+def _sin_progreso(_progreso):
+    pass
+
+
+def barra_progreso(id_barra):
+    """Barra de progreso oculta mientras no hay un trabajo en curso."""
+    return html.Progress(id=id_barra, value='0', max='1', style={'width': '100%', 'visibility': 'hidden'})
+
+
+def callback_pesado(registrar, gestor, *dependencias, id_progreso=None, **opciones):
+    """Decorador equivalente a `registrar(*dependencias)` (app.callback o dash.callback).
+
+    La función recibe `set_progress` como primer argumento y lo llama con
+    (paso, total). Con `id_progreso` el avance se muestra en la barra de
+    barra_progreso(id_progreso); sin gestor `set_progress` no hace nada.
+    """
+    def decorador(funcion):
+        if gestor is None or id_progreso is None:
+            @functools.wraps(funcion)
+            def sin_barra(*args):
+                return funcion(_sin_progreso, *args)
+            destino = sin_barra
+        else:
+            destino = funcion
+
+        if gestor is None:
+            return registrar(*dependencias, **opciones)(destino)
+
+        fondo = dict(background=True, manager=gestor)
+        if id_progreso is not None:
+            fondo['progress'] = [Output(id_progreso, 'value'), Output(id_progreso, 'max')]
+            fondo['running'] = [(Output(id_progreso, 'style'),
+                                 {'width': '100%', 'visibility': 'visible'},
+                                 {'width': '100%', 'visibility': 'hidden'})]
+        return registrar(*dependencias, **fondo, **opciones)(destino)
+    return decorador
+
+
+def avance(set_progress, paso, total):
+    """Reporta el paso `paso` de `total` en el formato de la barra (strings)."""
+    set_progress((str(paso), str(total)))
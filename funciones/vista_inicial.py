@@ -0,0 +1,57 @@
+import threading
+import time
+
+# Vista inicial precalculada.
+# Al abrir una página el navegador dibujaba gráficos vacíos y en seguida pedía
+# al servidor el callback principal con los valores por defecto (rango completo
+# de fechas, periodo 'D'). Esas salidas son siempre las mismas para una versión
+# de los datos, así que se calculan al iniciar y en cada recarga del almacén, y
+# el layout las trae incrustadas. Los callbacks se registran con
+# prevent_initial_call=True: la primera vista llega en la misma respuesta HTML.
+
+
+class VistaInicial:
+    """Salidas por defecto de un dashboard para la versión vigente de un AlmacenDatos.
+
+    `calcular(datos)` devuelve las salidas para los valores por defecto de los
+    filtros; el layout debe construir esos mismos valores a partir de `datos`.
+    """
+
+    def __init__(self, almacen, calcular, nombre):
+        self._almacen = almacen
+        self._calcular = calcular
+        self._nombre = nombre
+        self._vista = (None, None)
+        self._lock = threading.Lock()
+        # Se llama de inmediato si los datos ya están listos y luego en cada recarga
+        almacen.suscribir(self._precalcular)
+
+    def _guardar(self, version, salidas):
+        with self._lock:
+            if self._vista[0] is None or version >= self._vista[0]:
+                self._vista = (version, salidas)
+
+    def _precalcular(self, version, datos):
+        inicio = time.perf_counter()
+        try:
+            salidas = self._calcular(datos)
+        except Exception as e:
+            print(f"⚠️ {self._nombre}: no se pudo precalcular la vista inicial: {e}")
+            return
+        self._guardar(version, salidas)
+        print(f"⚡ {self._nombre}: vista inicial precalculada (versión {version}) en {time.perf_counter() - inicio:.2f}s")
+
+    def obtener(self):
+        """(datos, salidas) de una misma instantánea, para construir el layout de forma consistente.
+
+        Devuelve (None, None) si la carga de datos falló y aún no hay ninguna versión (ver AlmacenDatos.error).
+        """
+        version, datos = self._almacen.instantanea()
+        if datos is None:
+            return None, None
+        version_vista, salidas = self._vista
+        if version_vista != version:
+            # La recarga aún no termina de precalcular: se calcula en esta petición
+            salidas = self._calcular(datos)
+            self._guardar(version, salidas)
+        return datos, salidas
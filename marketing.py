@@ -1,15 +1,19 @@
 #!/usr/bin/env python3
 # -*- coding: utf-8 -*-
 
-# Importaciones
+# Importaciones (arranque primero, para medir todo lo demás)
+from funciones.arranque import marcar, reporte_arranque
+
 print("📊 INICIANDO DASHBOARD DE MARKETING HOTBOAT...")
 print("=" * 60)
 
-# Ejecutar dashboard de marketing específico
-from dashboard_marketing_simple import app
+# Ejecutar dashboard de marketing específico (los datos se cargan en segundo plano)
+from dashboard_marketing_simple import app, almacen
+marcar('importar dashboard marketing')
 
 if __name__ == '__main__':
-    print("📈 Cargando datos de marketing...")
+    print("📈 Cargando datos de marketing en segundo plano...")
+    almacen.iniciar_vigilancia()
     print("📊 Dashboard de marketing con métricas CPC, CTR, región")
     print("🎯 Análisis de audiencias y tipos de anuncios")
     print("💹 Hook rates y conversiones")
@@ -17,5 +21,6 @@ if __name__ == '__main__':
     print("🌐 URL: http://localhost:8056")
     print("🔄 Para detener: Ctrl+C")
     print("=" * 60)
+    reporte_arranque('dashboard de marketing')
     
-    app.run(debug=False, host='0.0.0.0', port=8056) 
\ No newline at end of file
+    app.run(debug=False, host='0.0.0.0', port=8056, threaded=True)
\ No newline at end of file
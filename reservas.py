@@ -1,30 +1,41 @@
 #!/usr/bin/env python3
 # -*- coding: utf-8 -*-
 
-# Importaciones
+# Importaciones (arranque primero, para medir todo lo demás)
+from funciones.arranque import marcar, reporte_arranque
+
 print("🚤 INICIANDO DASHBOARD DE RESERVAS HOTBOAT...")
 print("=" * 60)
 
 # Importar funciones desde dashboards.py
 from dashboards import crear_app_reservas, cargar_datos
+from funciones.almacen_datos import AlmacenDatos
+marcar('importar dashboards')
 
-if __name__ == '__main__':
-    print("📊 Cargando datos...")
-    
-    # Cargar todos los datos necesarios
-    datos = cargar_datos()
-    
-    # Mostrar resumen de datos cargados
+def resumen_datos(version, datos):
+    """Muestra el resumen de datos cargados cada vez que se publica una versión."""
+    print(f"✅ Datos versión {version}:")
     print(f"✅ Reservas cargadas: {len(datos['reservas'])} filas")
     print(f"✅ Pagos cargados: {len(datos['pagos'])} filas")
     print(f"✅ Gastos cargados: {len(datos['gastos'])} filas")
+
+if __name__ == '__main__':
+    print("📊 Cargando datos en segundo plano...")
+    
+    # Cargar los datos sin bloquear el arranque (se recargan solos al cambiar archivos_output)
+    almacen = AlmacenDatos(cargar_datos, cargar_en_segundo_plano=True)
+    almacen.suscribir(resumen_datos)
+    almacen.iniciar_vigilancia()
+    marcar('iniciar precarga de datos')
     
     # Crear y ejecutar app
-    app = crear_app_reservas(datos)
+    app = crear_app_reservas(almacen)
+    marcar('crear app')
     
     print("✅ Dashboard de reservas creado exitosamente")
     print("🌐 URL: http://localhost:8050")
     print("🔄 Para detener: Ctrl+C")
     print("=" * 60)
+    reporte_arranque('dashboard de reservas')
     
-    app.run(debug=False, host='0.0.0.0', port=8050) 
\ No newline at end of file
+    app.run(debug=False, host='0.0.0.0', port=8050, threaded=True)
\ No newline at end of file
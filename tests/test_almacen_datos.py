@@ -0,0 +1,57 @@
+import os
+
+from funciones.almacen_datos import AlmacenDatos
+
+
+def _escribir(directorio, nombre, texto, mtime):
+    ruta = directorio / nombre
+    ruta.write_text(texto)
+    os.utime(ruta, ns=(mtime, mtime))
+
+
+def test_recarga_parcial_reutiliza_tablas_sin_cambios(tmp_path):
+    _escribir(tmp_path, 'a.csv', 'x', 1_000_000_000)
+    _escribir(tmp_path, 'b.csv', 'y', 1_000_000_000)
+    llamadas = []
+
+    def cargador(cambiados=None, anteriores=None):
+        llamadas.append(cambiados)
+        if cambiados is None:
+            return {'a.csv': object(), 'b.csv': object()}
+        nuevos = dict(anteriores)
+        for nombre in cambiados:
+            nuevos[nombre] = object()
+        return nuevos
+
+    almacen = AlmacenDatos(cargador, directorio=str(tmp_path))
+    _, antes = almacen.instantanea()
+    _escribir(tmp_path, 'a.csv', 'xx', 2_000_000_000)
+
+    assert almacen.recargar()
+    version, despues = almacen.instantanea()
+    assert version == 2
+    assert llamadas == [None, {'a.csv'}]
+    assert despues['b.csv'] is antes['b.csv']
+    assert despues['a.csv'] is not antes['a.csv']
+
+
+def test_recarga_fallida_espera_nuevo_cambio(tmp_path):
+    _escribir(tmp_path, 'a.csv', 'x', 1_000_000_000)
+    intentos = []
+
+    def cargador():
+        intentos.append(1)
+        if len(intentos) == 2:
+            raise ValueError('archivo corrupto')
+        return {'intento': len(intentos)}
+
+    almacen = AlmacenDatos(cargador, directorio=str(tmp_path))
+    _escribir(tmp_path, 'a.csv', 'roto', 2_000_000_000)
+    assert not almacen.recargar()
+    assert not almacen.recargar()
+    assert len(intentos) == 2
+    assert almacen.version == 1
+
+    _escribir(tmp_path, 'a.csv', 'arreglado', 3_000_000_000)
+    assert almacen.recargar()
+    assert almacen.datos == {'intento': 3}
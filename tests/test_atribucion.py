@@ -0,0 +1,68 @@
+import numpy as np
+import pandas as pd
+
+from funciones.atribucion import SIN_ATRIBUIR, AtribucionGasto, gasto_diario
+
+
+def _atribucion(gastos, reservas, ventanas=(7,)):
+    df_gastos = pd.DataFrame(gastos, columns=['fecha', 'plataforma', 'monto'])
+    df_gastos['fecha'] = pd.to_datetime(df_gastos['fecha'])
+    df_reservas = pd.DataFrame(reservas, columns=['fecha_creacion_reserva', 'TOTAL AMOUNT'])
+    df_reservas['fecha_creacion_reserva'] = pd.to_datetime(df_reservas['fecha_creacion_reserva'])
+    gasto = gasto_diario(df_gastos, 'fecha', 'monto', 'plataforma')
+    return AtribucionGasto.desde_tablas('Plataforma', gasto, df_reservas, list(ventanas))
+
+
+def _fila(df, grupo):
+    return df.set_index('Plataforma').loc[grupo]
+
+
+def test_gasto_fuera_de_la_ventana_no_recibe_credito():
+    # Google gastó el 01-01 (fuera de la ventana de 7 días de una reserva del 01-08), Meta el 01-05
+    atribucion = _atribucion(
+        [('2025-01-01', 'Google', 2000), ('2025-01-05', 'Meta', 1000)],
+        [('2025-01-08', 50000)],
+    )
+    resumen = atribucion.resumen(7)
+    assert _fila(resumen, 'Google')['Reservas atribuidas'] == 0
+    assert _fila(resumen, 'Meta')['Reservas atribuidas'] == 1
+
+
+def test_borde_de_la_ventana():
+    # Gasto el 01-01: una reserva el 01-07 está dentro (6 días después), una el 01-08 no
+    atribucion = _atribucion(
+        [('2025-01-01', 'Meta', 1000)],
+        [('2025-01-07', 10000), ('2025-01-08', 20000)],
+    )
+    resumen = atribucion.resumen(7)
+    assert _fila(resumen, 'Meta')['Reservas atribuidas'] == 1
+    assert _fila(resumen, 'Meta')['Ingresos atribuidos (CLP)'] == 10000
+    assert _fila(resumen, SIN_ATRIBUIR)['Reservas atribuidas'] == 1
+
+
+def test_rango_sin_gasto_no_da_costo_cero():
+    atribucion = _atribucion(
+        [('2025-01-01', 'Meta', 1000), ('2025-01-10', 'Google', 500)],
+        [('2025-01-03', 10000), ('2025-01-12', 20000), ('2025-01-20', 5000)],
+    )
+    # Del 01-02 al 01-12: Meta tiene una reserva pero su gasto quedó antes del rango
+    resumen = atribucion.resumen(7, '2025-01-02', '2025-01-12')
+    meta = _fila(resumen, 'Meta')
+    assert meta['Gasto (CLP)'] == 0
+    assert meta['Reservas atribuidas'] == 1
+    assert np.isnan(meta['Costo por reserva (CLP)'])
+    assert np.isnan(meta['ROAS'])
+    google = _fila(resumen, 'Google')
+    assert google['Gasto (CLP)'] == 500
+    assert google['Costo por reserva (CLP)'] == 500
+    assert np.isnan(_fila(resumen, SIN_ATRIBUIR)['Costo por reserva (CLP)'])
+
+
+def test_rango_corta_por_dia_incluido():
+    atribucion = _atribucion(
+        [('2025-01-01', 'Meta', 100), ('2025-01-02', 'Meta', 200), ('2025-01-03', 'Meta', 400)],
+        [('2025-01-02', 1000), ('2025-01-03', 2000)],
+    )
+    assert _fila(atribucion.resumen(7, '2025-01-02', '2025-01-02'), 'Meta')['Gasto (CLP)'] == 200
+    assert _fila(atribucion.resumen(7, '2025-01-02', '2025-01-03'), 'Meta')['Reservas atribuidas'] == 2
+    assert _fila(atribucion.resumen(7), 'Meta')['Gasto (CLP)'] == 700
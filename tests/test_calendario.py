@@ -0,0 +1,26 @@
+import pandas as pd
+
+from funciones.calendario import agregar_dia_key, agrupar_por_periodo
+
+
+def test_agrupa_por_la_columna_pedida_aunque_otra_tenga_clave():
+    df = pd.DataFrame({
+        'fecha_trip': pd.to_datetime(['2025-03-10', '2025-04-15']),
+        'fecha_creacion_reserva': pd.to_datetime(['2025-01-05', '2025-01-20']),
+    })
+    agregar_dia_key(df, 'fecha_trip')
+
+    grupo, etiqueta = agrupar_por_periodo(df, 'fecha_creacion_reserva', 'M')
+    assert list(grupo) == [pd.Timestamp('2025-01-01')] * 2
+    assert list(etiqueta) == ['Enero 2025'] * 2
+
+    grupo, etiqueta = agrupar_por_periodo(df, 'fecha_trip', 'M')
+    assert list(grupo) == [pd.Timestamp('2025-03-01'), pd.Timestamp('2025-04-01')]
+    assert list(etiqueta) == ['Marzo 2025', 'Abril 2025']
+
+
+def test_semana_empieza_el_lunes():
+    df = pd.DataFrame({'fecha': pd.to_datetime(['2025-01-08', '2025-01-12', '2025-01-13'])})
+    grupo, etiqueta = agrupar_por_periodo(df, 'fecha', 'W')
+    assert list(grupo) == [pd.Timestamp('2025-01-06')] * 2 + [pd.Timestamp('2025-01-13')]
+    assert etiqueta.iat[0] == 'Semana del 06/01/2025'
@@ -0,0 +1,34 @@
+import warnings
+
+import pandas as pd
+
+from funciones.consolidado_meta import _fusionar
+
+
+def _filas(dias, valores, fin):
+    return pd.DataFrame({
+        'Día': pd.to_datetime(dias),
+        'Anuncio': 'a',
+        'Valor': valores,
+        'Fin del informe': pd.Timestamp(fin),
+    })
+
+
+def test_fusionar_fuera_del_tramo_no_concatena_tablas_vacias():
+    existente = _filas(['2024-01-01', '2024-01-02'], ['x', 'y'], '2024-01-05')
+    nuevas = _filas(['2024-02-01'], [3.0], '2024-02-05')
+
+    with warnings.catch_warnings():
+        warnings.simplefilter('error', FutureWarning)
+        fusion = _fusionar(existente, nuevas, ['Anuncio', 'Día'], ['Día', 'Anuncio'])
+
+    assert fusion['Día'].tolist() == list(pd.to_datetime(['2024-01-01', '2024-01-02', '2024-02-01']))
+
+
+def test_fusionar_reemplaza_el_tramo_con_el_informe_mas_reciente():
+    existente = _filas(['2024-01-01', '2024-01-02', '2024-01-03'], [1.0, 2.0, 3.0], '2024-01-05')
+    nuevas = _filas(['2024-01-02'], [20.0], '2024-01-10')
+
+    fusion = _fusionar(existente, nuevas, ['Anuncio', 'Día'], ['Día', 'Anuncio'])
+
+    assert fusion['Valor'].tolist() == [1.0, 20.0, 3.0]
@@ -0,0 +1,38 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from funciones.correlacion import GASTO_TOTAL, correlacion_rezagada
+
+
+def _diaria(n, rezago, semilla=1):
+    """Gasto aleatorio y objetivos que lo repiten `rezago` días después (más ruido)."""
+    generador = np.random.default_rng(semilla)
+    gasto = generador.gamma(2.0, 1000.0, size=n + rezago)
+    objetivo = gasto[:n] + generador.normal(0, 200.0, size=n)
+    return pd.DataFrame({
+        GASTO_TOTAL: gasto[rezago:],
+        'Ingresos': objetivo * 10,
+        'Reservas': objetivo,
+    }, index=pd.date_range('2025-01-01', periods=n, freq='D'))
+
+
+@pytest.mark.parametrize('n', [30, 45, 61, 62, 90])
+def test_banda_con_ancho_en_rangos_cortos(n):
+    df = correlacion_rezagada(_diaria(n, 0), n_bootstrap=200)
+    ancho = df['Banda superior'] - df['Banda inferior']
+    assert (ancho > 0).all()
+
+
+@pytest.mark.parametrize('n', [45, 90])
+def test_recupera_el_rezago_plantado(n):
+    df = correlacion_rezagada(_diaria(n, 5), max_rezago=10, n_bootstrap=200)
+    reservas = df[df['Objetivo'] == 'Reservas'].set_index('Rezago')
+    assert reservas['Correlación'].idxmax() == 5
+    assert reservas.loc[5, 'Correlación'] > reservas.loc[5, 'Banda superior']
+
+
+def test_sin_banda_si_hay_muy_pocos_desplazamientos():
+    df = correlacion_rezagada(_diaria(10, 0), n_bootstrap=50)
+    assert not df.empty
+    assert df['Banda superior'].isna().all()
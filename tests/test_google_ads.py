@@ -0,0 +1,52 @@
+import pandas as pd
+
+from funciones.google_ads import _sumar_periodos
+
+
+def _campanas(costos, clics, impresiones, estado='Activa'):
+    return pd.DataFrame({
+        'Nombre de la campaña': pd.array(['A', 'B'], dtype='string'),
+        'Estado': pd.array([estado, estado], dtype='string'),
+        'Costo': [float(valor) for valor in costos],
+        'Clics': [float(valor) for valor in clics],
+        'Impresiones': [float(valor) for valor in impresiones],
+        'CPC prom.': [0.0, 0.0],
+        'CTR': pd.array(['1.00%', '2.00%'], dtype='string'),
+        'Tasa de conv.': pd.array(['5.00%', '--'], dtype='string'),
+    })
+
+
+def test_misma_forma_con_uno_o_varios_exports():
+    enero = _campanas([100, 50], [10, 5], [1000, 100])
+    febrero = _campanas([300, 0], [30, 0], [1000, 0])
+
+    uno = _sumar_periodos('campañas', [(pd.Timestamp(2024, 1, 1), pd.Timestamp(2024, 1, 31), enero)])
+    dos = _sumar_periodos('campañas', [(pd.Timestamp(2024, 1, 1), pd.Timestamp(2024, 1, 31), enero),
+                                       (pd.Timestamp(2024, 2, 1), pd.Timestamp(2024, 2, 29), febrero)])
+
+    assert list(uno.columns) == list(dos.columns)
+    assert dict(uno.dtypes) == dict(dos.dtypes)
+    assert 'Tasa de conv.' not in dos.columns
+
+
+def test_tasas_se_recalculan_desde_los_totales():
+    enero = _campanas([100, 50], [10, 5], [1000, 100])
+    febrero = _campanas([300, 0], [30, 0], [1000, 0])
+
+    suma = _sumar_periodos('campañas', [(pd.Timestamp(2024, 1, 1), pd.Timestamp(2024, 1, 31), enero),
+                                        (pd.Timestamp(2024, 2, 1), pd.Timestamp(2024, 2, 29), febrero)])
+    a = suma.set_index('Nombre de la campaña').loc['A']
+
+    assert a['Costo'] == 400 and a['Clics'] == 40 and a['Impresiones'] == 2000
+    assert a['CPC prom.'] == 10
+    assert a['CTR'] == 2
+
+
+def test_periodos_solapados_gana_el_mas_nuevo():
+    viejo = _campanas([100, 50], [10, 5], [1000, 100])
+    nuevo = _campanas([200, 60], [20, 6], [2000, 200])
+
+    suma = _sumar_periodos('campañas', [(pd.Timestamp(2024, 1, 1), pd.Timestamp(2024, 1, 31), viejo),
+                                        (pd.Timestamp(2024, 1, 15), pd.Timestamp(2024, 2, 15), nuevo)])
+
+    assert suma['Costo'].tolist() == [200, 60]